@@ -1,5 +1,7 @@
 import os
 
+from pyrevolve.experiment_store import ExperimentStore
+
 # set these variables according to your experiments #
 dirpath = 'data'
 experiments_type = [
@@ -9,6 +11,22 @@ runs = 1
 # set these variables according to your experiments #
 
 
+def consolidate_store(path):
+    store = ExperimentStore(path + '/experiment.sqlite')
+
+    headers, rows = store.all_measures()
+    with open(path + "/all_measures.tsv", "w+") as file_summary:
+        file_summary.write('\t'.join(headers) + '\n')
+        for row in rows:
+            file_summary.write('\t'.join(row[0].split('_')[-1:] + [str(value) for value in row[1:]]) + '\n')
+
+    with open(path + "/snapshots_ids.tsv", "w+") as file_summary:
+        file_summary.write('generation\trobot_id\n')
+        for gen, robot_id in store.snapshots():
+            file_summary.write(str(gen) + '\t' + robot_id.split('_')[-1] + '\n')
+    store.close()
+
+
 def build_headers(path):
 
     print(path + "/all_measures.txt")
@@ -43,6 +61,10 @@ for exp in experiments_type:
 
         print(exp, run)
         path = os.path.join(dirpath, str(exp), str(run))
+        if os.path.isfile(path + '/experiment.sqlite'):
+            consolidate_store(path)
+            continue
+
         behavior_headers, phenotype_headers = build_headers(path)
 
         file_summary = open(path + "/all_measures.tsv", "a")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Evaluates on the local simulators the robots of a manager started with --broker-address.
+Start one on each machine with
+`./revolve.py --manager experiments/examples/evaluation_worker.py --broker-address <manager host>:<port> --n-cores 8`
+"""
+from pyrevolve import parser
+from pyrevolve.config import str_to_address
+from pyrevolve.util.supervisor.distributed import EvaluationWorker
+from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
+from pyrevolve.custom_logging.logger import logger
+
+
+async def run():
+    settings = parser.parse_args()
+    n_cores = settings.n_cores
+
+    simulator_queue = SimulatorQueue(n_cores, settings, settings.port_start,
+                                     min_cores=settings.min_cores or n_cores,
+                                     max_cores=settings.max_cores or n_cores,
+                                     n_spares=settings.spare_simulators,
+                                     autoscale_interval=settings.autoscale_interval,
+                                     robots_per_simulator=settings.robots_per_simulator,
+                                     robot_spacing=settings.robot_spacing,
+                                     scheduling_policy=settings.scheduling_policy,
+                                     retries_last=settings.retries_last)
+    await simulator_queue.start()
+
+    capacity = (settings.max_cores or n_cores) * settings.robots_per_simulator
+    worker = EvaluationWorker(str_to_address(settings.broker_address), simulator_queue, capacity)
+    logger.info(f'Evaluation worker {worker.name} connecting to {settings.broker_address}')
+    await worker.run()
+
+    simulator_queue.log_statistics()
+    await simulator_queue.stop()
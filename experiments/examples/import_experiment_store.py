@@ -0,0 +1,24 @@
+import os
+import sys
+
+from pyrevolve.experiment_store import ExperimentStore
+
+# set these variables according to your experiments #
+dirpath = 'data'
+experiments_type = [
+                    'default_experiment'
+                    ]
+runs = 1
+# set these variables according to your experiments #
+
+# imports the per-robot files of existing runs into an experiment.sqlite per run
+for exp in experiments_type:
+    for run in range(1, runs+1):
+        path = os.path.join(dirpath, str(exp), str(run))
+        if os.path.isfile(os.path.join(path, 'experiment.sqlite')):
+            print(path, 'already imported', file=sys.stderr)
+            continue
+        print(exp, run)
+        store = ExperimentStore(os.path.join(path, 'experiment.sqlite'))
+        store.import_data_fullevolution(path)
+        store.close()
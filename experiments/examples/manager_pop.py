@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 import asyncio
+import os
+import zlib
 
 from pyrevolve import parser
+from pyrevolve.config import str_to_address
 from pyrevolve.evolution import fitness
 from pyrevolve.evolution.selection import multiple_selection, tournament_selection
 from pyrevolve.evolution.population import Population, PopulationConfig
+from pyrevolve.evolution.development_pool import DevelopmentPool
+from pyrevolve.evolution.phenotype_cache import PhenotypeCache
+from pyrevolve.evolution.deduplication import PhenotypeDeduplicator
+from pyrevolve.evolution.controller_screen import ControllerScreen
+from pyrevolve.evolution.surrogate import SurrogateFitness
+from pyrevolve.evolution.early_stopping import DisplacementBound, EarlyStopping, FlippedOver
 from pyrevolve.evolution.pop_management.steady_state import steady_state_population_management
+from pyrevolve.evolution.selection_engine import SelectionEngine
 from pyrevolve.experiment_management import ExperimentManagement
 from pyrevolve.genotype.plasticoding.crossover.crossover import CrossoverConfig
 from pyrevolve.genotype.plasticoding.crossover.standard_crossover import standard_crossover
@@ -14,6 +24,8 @@ from pyrevolve.genotype.plasticoding.mutation.mutation import MutationConfig
 from pyrevolve.genotype.plasticoding.mutation.standard_mutation import standard_mutation
 from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
 from pyrevolve.util.supervisor.analyzer_queue import AnalyzerQueue
+from pyrevolve.util.supervisor.collision_prescreen import CollisionPreScreen
+from pyrevolve.util.supervisor.distributed import DistributedSimulatorQueue
 from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
 from pyrevolve.custom_logging.logger import logger
 
@@ -59,6 +71,23 @@ async def run():
         gen_num = 0
         next_robot_id = 1
 
+    if settings.selection_engine:
+        # the same tournaments, vectorized on the fitness array of the population
+        seed = settings.selection_seed
+        if seed is None:
+            # every run of the experiment is reproducible
+            seed = zlib.crc32(settings.run.encode())
+        selection_engine = SelectionEngine(seed)
+        selection = selection_engine.tournament_selection
+        parent_selection = lambda individuals: selection_engine.tournament(individuals, 2)
+        population_management = selection_engine.steady_state_population_management
+        population_management_selector = None
+    else:
+        selection = lambda individuals: tournament_selection(individuals, 2)
+        parent_selection = lambda individuals: multiple_selection(individuals, 2, tournament_selection)
+        population_management = steady_state_population_management
+        population_management_selector = tournament_selection
+
     population_conf = PopulationConfig(
         population_size=population_size,
         genotype_constructor=random_initialization,
@@ -68,52 +97,106 @@ async def run():
         mutation_conf=mutation_conf,
         crossover_operator=standard_crossover,
         crossover_conf=crossover_conf,
-        selection=lambda individuals: tournament_selection(individuals, 2),
-        parent_selection=lambda individuals: multiple_selection(individuals, 2, tournament_selection),
-        population_management=steady_state_population_management,
-        population_management_selector=tournament_selection,
+        selection=selection,
+        parent_selection=parent_selection,
+        population_management=population_management,
+        population_management_selector=population_management_selector,
         evaluation_time=settings.evaluation_time,
         offspring_size=offspring_size,
         experiment_name=settings.experiment_name,
         experiment_management=experiment_management,
+        generation_deadline=settings.generation_deadline or None,
+        controller_screen=ControllerScreen(settings.evaluation_time, settings.controller_update_rate)
+        if settings.controller_prescreen else None,
+        surrogate=SurrogateFitness(settings.surrogate_oversampling, settings.surrogate_min_samples)
+        if settings.surrogate_fitness else None,
+        early_stopping=EarlyStopping([FlippedOver(), DisplacementBound(settings.early_stopping_max_speed)],
+                                     shadow_rate=settings.early_stopping_shadow_rate)
+        if settings.early_stopping else None,
     )
 
     n_cores = settings.n_cores
 
     settings = parser.parse_args()
-    simulator_queue = SimulatorQueue(n_cores, settings, settings.port_start)
+    if settings.broker_address:
+        # the robots are evaluated by the remote workers connecting to this address
+        simulator_queue = DistributedSimulatorQueue(str_to_address(settings.broker_address),
+                                                    scheduling_policy=settings.scheduling_policy,
+                                                    retries_last=settings.retries_last)
+        analyzer_port = settings.port_start
+    else:
+        simulator_queue = SimulatorQueue(n_cores, settings, settings.port_start,
+                                         min_cores=settings.min_cores or n_cores,
+                                         max_cores=settings.max_cores or n_cores,
+                                         n_spares=settings.spare_simulators,
+                                         autoscale_interval=settings.autoscale_interval,
+                                         robots_per_simulator=settings.robots_per_simulator,
+                                         robot_spacing=settings.robot_spacing,
+                                         scheduling_policy=settings.scheduling_policy,
+                                         retries_last=settings.retries_last)
+        analyzer_port = simulator_queue.port_end
     await simulator_queue.start()
 
-    analyzer_queue = AnalyzerQueue(1, settings, settings.port_start+n_cores)
+    analyzer_queue = AnalyzerQueue(1, settings, analyzer_port)
+    if settings.collision_prescreen:
+        analyzer_queue = CollisionPreScreen(analyzer_queue, settings.collision_prescreen_margin)
     await analyzer_queue.start()
 
-    population = Population(population_conf, simulator_queue, analyzer_queue, next_robot_id)
+    development_pool = DevelopmentPool(settings.n_development_workers)
 
-    if do_recovery:
-        # loading a previous state of the experiment
-        await population.load_snapshot(gen_num)
-        if gen_num >= 0:
-            logger.info('Recovered snapshot '+str(gen_num)+', pop with ' + str(len(population.individuals))+' individuals')
-        if has_offspring:
-            individuals = await population.load_offspring(gen_num, population_size, offspring_size, next_robot_id)
-            gen_num += 1
-            logger.info('Recovered unfinished offspring '+str(gen_num))
+    phenotype_cache = None
+    if settings.phenotype_cache_size > 0:
+        phenotype_cache = PhenotypeCache(capacity=settings.phenotype_cache_size,
+                                         cache_folder=os.path.join(experiment_management.experiment_folder,
+                                                                   'phenotype_cache'),
+                                         policy=settings.phenotype_cache_policy,
+                                         resample_probability=settings.phenotype_cache_resample)
 
-            if gen_num == 0:
-                await population.init_pop(individuals)
+    deduplicator = PhenotypeDeduplicator() if settings.deduplicate_phenotypes else None
+
+    population = Population(population_conf, simulator_queue, analyzer_queue, next_robot_id,
+                            development_pool, phenotype_cache, deduplicator)
+
+    try:
+        if do_recovery:
+            # loading a previous state of the experiment
+            if experiment_management.has_checkpoint(gen_num):
+                await population.load_checkpoint(gen_num)
             else:
-                population = await population.next_gen(gen_num, individuals)
+                await population.load_snapshot(gen_num)
+            if gen_num >= 0:
+                logger.info('Recovered snapshot '+str(gen_num)+', pop with ' + str(len(population.individuals))+' individuals')
+            if has_offspring:
+                individuals = await population.load_offspring(gen_num, population_size, offspring_size, next_robot_id)
+                gen_num += 1
+                logger.info('Recovered unfinished offspring '+str(gen_num))
+
+                if gen_num == 0:
+                    await population.init_pop(individuals)
+                else:
+                    population = await population.next_gen(gen_num, individuals)
+
+                experiment_management.export_snapshots(population.individuals, gen_num)
+                experiment_management.export_checkpoint(population, gen_num)
+        else:
+            # starting a new experiment
+            experiment_management.create_exp_folders()
+            await population.init_pop()
+            experiment_management.export_snapshots(population.individuals, gen_num)
+            experiment_management.export_checkpoint(population, gen_num)
 
+        while gen_num < num_generations-1:
+            gen_num += 1
+            population = await population.next_gen(gen_num)
             experiment_management.export_snapshots(population.individuals, gen_num)
-    else:
-        # starting a new experiment
-        experiment_management.create_exp_folders()
-        await population.init_pop()
-        experiment_management.export_snapshots(population.individuals, gen_num)
-
-    while gen_num < num_generations-1:
-        gen_num += 1
-        population = await population.next_gen(gen_num)
-        experiment_management.export_snapshots(population.individuals, gen_num)
+            experiment_management.export_checkpoint(population, gen_num)
+
+        # images not rendered during the evolution, e.g. with the lazy render mode
+        experiment_management.render_missing_images()
+        experiment_management.render_service.log_statistics()
+    finally:
+        # the worker processes of the render service and of the development pool
+        experiment_management.render_service.shutdown()
+        development_pool.shutdown()
 
     # output result after completing all generations...
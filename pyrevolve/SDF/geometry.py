@@ -105,6 +105,15 @@ class Collision(SDF.Posable):
                 raise RuntimeError("Adding to many boxes to this collision, only one supported")
             self._box_geometry = module.box
 
+    @property
+    def box_size(self):
+        """
+        :return: sizes (x, y, z) of the box geometry
+        """
+        if self._box_geometry is None:
+            raise RuntimeError("This Collision element has no BoxGeometry set")
+        return self._box_geometry
+
     @property
     def boundaries(self):
         if self._box_geometry is None:
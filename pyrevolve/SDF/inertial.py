@@ -93,3 +93,38 @@ def transform_inertia_tensor(mass, tensor, displacement, rotation):
 
     # J matrix as on Wikipedia
     return it + mass * (t1.dot(t1) * np.eye(3) - np.outer(t1.data, t1.data))
+
+
+def box_inertia_tensors(masses, sizes):
+    """
+    Inertia tensors of solid boxes about their center, as Collision.get_inertial
+    :param masses: masses of the boxes, array of shape (N,)
+    :param sizes: sizes (x, y, z) of the boxes, array of shape (N, 3)
+    :return: array of shape (N, 3, 3)
+    """
+    r = np.asarray(masses, dtype=np.float64) / 12.0
+    squares = np.square(np.asarray(sizes, dtype=np.float64).reshape(-1, 3))
+    tensors = np.zeros((len(squares), 3, 3))
+    tensors[:, 0, 0] = r * (squares[:, 1] + squares[:, 2])
+    tensors[:, 1, 1] = r * (squares[:, 0] + squares[:, 2])
+    tensors[:, 2, 2] = r * (squares[:, 0] + squares[:, 1])
+    return tensors
+
+
+def transform_inertia_tensors(masses, tensors, displacements, rotations):
+    """
+    transform_inertia_tensor for several bodies in one pass
+    :param masses: array of shape (N,)
+    :param tensors: inertia tensors of the bodies, array of shape (N, 3, 3)
+    :param displacements: displacements of the bodies, array of shape (N, 3)
+    :param rotations: rotations of the bodies as quaternions, array of shape (N, 4)
+    :return: the transformed tensors, array of shape (N, 3, 3)
+    """
+    masses = np.asarray(masses, dtype=np.float64)
+    displacements = np.asarray(displacements, dtype=np.float64).reshape(-1, 3)
+    r = SDF.math.batch.rotation_matrices(rotations)
+    rotated = np.einsum('nij,njk,nlk->nil', r, tensors, r)
+    squared_norms = np.einsum('ni,ni->n', displacements, displacements)
+    parallel_axis = squared_norms[:, np.newaxis, np.newaxis] * np.eye(3) \
+        - displacements[:, :, np.newaxis] * displacements[:, np.newaxis, :]
+    return rotated + masses[:, np.newaxis, np.newaxis] * parallel_axis
@@ -1,8 +1,7 @@
 import numpy as np
-import sys
 
 from pyrevolve import SDF
-from pyrevolve.SDF.inertial import transform_inertia_tensor
+from pyrevolve.SDF.inertial import box_inertia_tensors, transform_inertia_tensors
 from ..custom_logging.logger import logger
 
 
@@ -46,22 +45,26 @@ class Link(SDF.Posable):
 
         super().append(subelement)
 
-    def align_center_of_mass(self):
+    def align_center_of_mass(self, center_of_mass=None):
         """
         Aligns the children posable objects relative to the center of mass of this link.
 
         It calculates the center of mass, and apply this as the center of the Link.
         All children posable are relative to the position of the Link, so their position needs
         to be adjusted.
+        :param center_of_mass: center of mass of the link if already calculated
         :return: the position of the center of mass
         :rtype: SDF.math.Vector3
         """
-        translation = self.get_center_of_mass()
+        translation = self.get_center_of_mass() if center_of_mass is None else center_of_mass
         self.set_position(translation*2.0)
-        for el in self.iter_elements(lambda elem: isinstance(elem, SDF.Posable)):
-            el.translate(-translation)
+        offset = -translation
+        # iter() includes the link itself, hence the double translation above
+        for el in self.iter():
+            if isinstance(el, SDF.Posable):
+                el.translate(offset)
         for joint in self.joints:
-            joint.translate(-translation)
+            joint.translate(offset)
         return translation
 
     def calculate_inertial(self):
@@ -75,27 +78,17 @@ class Link(SDF.Posable):
         This method prints an error if this is currently not the case.
         :return:
         """
+        if self.get_center_of_mass().norm() > 1e-8:
+            logger.warning("calculating inertial for link with nonzero center of mass.")
+
+        masses = np.array([collision.mass for collision in self.collisions], dtype=np.float64)
+        inertia = _collision_inertia_tensors(self.collisions, masses).sum(axis=0)
+        self._set_inertial(float(masses.sum()), inertia)
+
+    def _set_inertial(self, mass, inertia):
         if self.inertial is not None:
             raise RuntimeError("Inertial for this link already existing")
-
-        if not np.allclose(self.get_center_of_mass().norm(), 0):
-            logger.warning("calculating inertial for link with nonzero center of mass.", file=sys.stderr)
-
-        i_final = np.zeros((3, 3))
-        total_mass = 0.0
-        for collision in self.collisions:
-            rotation = collision.get_rotation()
-            position = collision.get_position()
-            mass = collision.mass
-            total_mass += mass
-            i_final += transform_inertia_tensor(
-                mass,
-                collision.get_inertial().get_matrix(),
-                position,
-                rotation
-            )
-
-        self.inertial = SDF.Inertial.from_mass_matrix(total_mass, i_final)
+        self.inertial = SDF.Inertial.from_mass_matrix(mass, inertia)
         self.append(self.inertial)
 
     def get_center_of_mass(self):
@@ -105,18 +98,17 @@ class Link(SDF.Posable):
         :return: The center of mass as determined by all the collision geometries
         :rtype: Vector3
         """
-        com = SDF.math.Vector3(0, 0, 0)
-        total_mass = 0.0
-        for collision in self.collisions:
-            col_com = collision.get_center_of_mass()
-            mass = collision.mass
-            com += mass * col_com
-            total_mass += mass
+        if len(self.collisions) == 0:
+            return SDF.math.Vector3(0, 0, 0)
 
+        masses = np.array([collision.mass for collision in self.collisions], dtype=np.float64)
+        centers = SDF.math.batch.as_vectors([collision.get_center_of_mass() for collision in self.collisions])
+        com = masses.dot(centers)
+        total_mass = masses.sum()
         if total_mass > 0:
             com /= total_mass
 
-        return com
+        return SDF.math.Vector3(com)
 
     def add_joint(self, joint):
         """
@@ -126,3 +118,42 @@ class Link(SDF.Posable):
         :type joint: SDF.Joint
         """
         self.joints.append(joint)
+
+
+def _collision_inertia_tensors(collisions, masses):
+    """
+    :return: inertia tensors of the box collisions in the frame of their link, array of shape (N, 3, 3)
+    """
+    return transform_inertia_tensors(
+        masses,
+        box_inertia_tensors(masses, [collision.box_size for collision in collisions]),
+        SDF.math.batch.as_vectors([collision.get_position() for collision in collisions]),
+        SDF.math.batch.as_quaternions([collision.get_rotation() for collision in collisions]))
+
+
+def calculate_mass_properties(links):
+    """
+    Aligns every link on its center of mass and calculates its inertial, as `align_center_of_mass` followed by
+    `calculate_inertial` on each link, with the collisions of all the links in the same arrays.
+    :param links: links without inertial
+    :type links: list(Link)
+    """
+    collisions = [collision for link in links for collision in link.collisions]
+    link_indices = np.repeat(np.arange(len(links)), [len(link.collisions) for link in links])
+    masses = np.array([collision.mass for collision in collisions], dtype=np.float64)
+
+    total_masses = np.zeros(len(links))
+    np.add.at(total_masses, link_indices, masses)
+    centers = SDF.math.batch.as_vectors([collision.get_center_of_mass() for collision in collisions])
+    centers_of_mass = np.zeros((len(links), 3))
+    np.add.at(centers_of_mass, link_indices, masses[:, np.newaxis] * centers)
+    heavy = total_masses > 0
+    centers_of_mass[heavy] /= total_masses[heavy, np.newaxis]
+
+    for link, center_of_mass in zip(links, centers_of_mass):
+        link.align_center_of_mass(SDF.math.Vector3(center_of_mass))
+
+    inertias = np.zeros((len(links), 3, 3))
+    np.add.at(inertias, link_indices, _collision_inertia_tensors(collisions, masses))
+    for link, total_mass, inertia in zip(links, total_masses, inertias):
+        link._set_inertial(float(total_mass), inertia)
@@ -1,5 +1,7 @@
 """
 Vector, Quaternion and RotationMatrix classes written as
-wrappers over `transformations.py` (see that file for license/origin).
+wrappers over `transformations.py` (see that file for license/origin),
+and their batched versions over numpy arrays in `batch.py`.
 """
 from .classes import Vector3, Quaternion, RotationMatrix
+from . import batch
@@ -0,0 +1,120 @@
+"""
+Batched versions of the Vector3 / Quaternion operations, on numpy arrays
+of shape (N, 3) for vectors and (N, 4) for quaternions (w, x, y, z).
+A single vector or quaternion is broadcast against the others.
+"""
+from __future__ import division
+
+import numpy as np
+
+from .transformations import _EPS
+
+
+def as_vectors(vectors):
+    """
+    :param vectors: iterable of Vector3 or array of shape (N, 3)
+    :return: array of shape (N, 3)
+    """
+    if not isinstance(vectors, np.ndarray):
+        vectors = [tuple(vector) for vector in vectors]
+    return np.asarray(vectors, dtype=np.float64).reshape(-1, 3)
+
+
+def as_quaternions(quaternions):
+    """
+    :param quaternions: iterable of Quaternion or array of shape (N, 4)
+    :return: array of shape (N, 4)
+    """
+    if not isinstance(quaternions, np.ndarray):
+        quaternions = [tuple(quaternion) for quaternion in quaternions]
+    return np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)
+
+
+def _scaled_components(quaternions):
+    """
+    :return: w, x, y, z of the quaternions scaled by sqrt(2) / norm, zero for the null quaternions
+    """
+    q = np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)
+    n = np.einsum('ij,ij->i', q, q)
+    valid = n >= _EPS
+    scale = np.zeros_like(n)
+    scale[valid] = np.sqrt(2.0 / n[valid])
+    return (q * scale[:, np.newaxis]).T
+
+
+def rotation_matrices(quaternions):
+    """
+    :param quaternions: array of shape (N, 4)
+    :return: rotation matrices of the quaternions, array of shape (N, 3, 3), identity for the null quaternions
+    """
+    w, x, y, z = _scaled_components(quaternions)
+    matrices = np.empty((len(w), 3, 3))
+    matrices[:, 0, 0] = 1.0 - y * y - z * z
+    matrices[:, 0, 1] = x * y - z * w
+    matrices[:, 0, 2] = x * z + y * w
+    matrices[:, 1, 0] = x * y + z * w
+    matrices[:, 1, 1] = 1.0 - x * x - z * z
+    matrices[:, 1, 2] = y * z - x * w
+    matrices[:, 2, 0] = x * z - y * w
+    matrices[:, 2, 1] = y * z + x * w
+    matrices[:, 2, 2] = 1.0 - x * x - y * y
+    return matrices
+
+
+def quaternion_multiply(quaternions0, quaternions1):
+    """
+    :param quaternions0: array of shape (N, 4) or (4,)
+    :param quaternions1: array of shape (N, 4) or (4,)
+    :return: the products quaternions0 * quaternions1, array of shape (N, 4)
+    """
+    w1, x1, y1, z1 = np.asarray(quaternions0, dtype=np.float64).reshape(-1, 4).T
+    w0, x0, y0, z0 = np.asarray(quaternions1, dtype=np.float64).reshape(-1, 4).T
+    return np.stack([-x1 * x0 - y1 * y0 - z1 * z0 + w1 * w0,
+                     x1 * w0 + y1 * z0 - z1 * y0 + w1 * x0,
+                     -x1 * z0 + y1 * w0 + z1 * x0 + w1 * y0,
+                     x1 * y0 - y1 * x0 + z1 * w0 + w1 * z0], axis=-1)
+
+
+def rotate(quaternions, vectors):
+    """
+    :param quaternions: array of shape (N, 4) or (4,)
+    :param vectors: array of shape (N, 3) or (3,)
+    :return: the vectors rotated by the quaternions, array of shape (N, 3)
+    """
+    matrices = rotation_matrices(quaternions)
+    vectors = np.asarray(vectors, dtype=np.float64).reshape(-1, 3)
+    n = max(len(matrices), len(vectors))
+    return np.einsum('nij,nj->ni', np.broadcast_to(matrices, (n, 3, 3)), np.broadcast_to(vectors, (n, 3)))
+
+
+def transform_points(position, rotation, points):
+    """
+    Batched `Posable.to_parent_frame`
+    :param position: position of the frame, Vector3 or array of shape (3,)
+    :param rotation: rotation of the frame, Quaternion or array of shape (4,)
+    :param points: points in the frame, array of shape (N, 3)
+    :return: the points in the parent frame, array of shape (N, 3)
+    """
+    matrix = rotation_matrices(np.asarray(tuple(rotation), dtype=np.float64))[0]
+    return np.asarray(points, dtype=np.float64).reshape(-1, 3).dot(matrix.T) + np.asarray(tuple(position))
+
+
+def rpy(quaternions):
+    """
+    Batched `Quaternion.get_rpy`
+    :param quaternions: array of shape (N, 4)
+    :return: roll, pitch and yaw of the quaternions, array of shape (N, 3)
+    """
+    # only the elements of the rotation matrices that are needed
+    w, x, y, z = _scaled_components(quaternions)
+    m00 = 1.0 - y * y - z * z
+    m10 = x * y + z * w
+    cy = np.hypot(m00, m10)
+    regular = cy > _EPS
+    angles = np.empty((len(w), 3))
+    angles[:, 0] = np.where(regular,
+                            np.arctan2(y * z + x * w, 1.0 - x * x - y * y),
+                            np.arctan2(-(y * z - x * w), 1.0 - x * x - z * z))
+    angles[:, 1] = np.arctan2(-(x * z - y * w), cy)
+    angles[:, 2] = np.where(regular, np.arctan2(m10, m00), 0.0)
+    return angles
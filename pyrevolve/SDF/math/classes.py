@@ -1,14 +1,11 @@
 from __future__ import division
 
+import math
+
 import numpy as np
 
-from .transformations import quaternion_multiply
-from .transformations import quaternion_matrix
+from .transformations import _EPS
 from .transformations import quaternion_from_matrix
-from .transformations import euler_from_quaternion
-from .transformations import quaternion_about_axis
-from .transformations import quaternion_conjugate
-from .transformations import quaternion_inverse
 from .transformations import quaternion_from_euler
 
 # Epsilon value used for zero comparisons
@@ -17,47 +14,95 @@ OPPOSITE = -1
 PARALLEL = 1
 NOT_PARALLEL = 0
 
+_new = object.__new__
+
+
+def _vector3(x, y, z):
+    """
+    Creates a Vector3 from floats, skipping the checks of the constructor
+    """
+    vector = _new(Vector3)
+    vector.x = x
+    vector.y = y
+    vector.z = z
+    return vector
+
+
+def _quaternion(w, x, y, z):
+    """
+    Creates a Quaternion from floats, skipping the checks of the constructor
+    """
+    quaternion = _new(Quaternion)
+    quaternion.w = w
+    quaternion.x = x
+    quaternion.y = y
+    quaternion.z = z
+    return quaternion
+
 
 class VectorBase(object):
     """
-    Base class with shared functionality for Quaternion / Vector3
+    Base class with shared functionality for Quaternion / Vector3.
+    The components are plain floats stored in slots, numpy is only used
+    when the vector is converted to an array.
     """
+    __slots__ = ()
+
     LENGTH = 0
     """ Required length of the vector """
 
     ATTRS = ''
-    """ Indexed attributes to be retrieved by __getattr__ """
+    """ Names of the components, in index order """
 
-    def __init__(self, *args):
+    def _set(self, values):
         """
-
-        :param args:
-        :return:
+        :param values: iterable of LENGTH numbers
         """
-        if len(args) == 1 and hasattr(args[0], '__iter__'):
-            self.data = np.array(args[0], dtype=np.float_, copy=True)
-        else:
-            self.data = np.array(args, dtype=np.float_, copy=True)
-
-        if len(self.data) != self.LENGTH:
+        values = tuple(values)
+        if len(values) != self.LENGTH:
             raise AssertionError("Invalid data size {}, expecting {}".format(
-                    len(self.data),
+                    len(values),
                     self.LENGTH))
+        for attr, value in zip(self.ATTRS, values):
+            object.__setattr__(self, attr, float(value))
+
+    @property
+    def data(self):
+        """
+        :return: copy of the components as a numpy array
+        :rtype: numpy.ndarray
+        """
+        return np.array(tuple(self), dtype=np.float64)
+
+    @data.setter
+    def data(self, values):
+        self._set(values)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(tuple(self), dtype=np.float64 if dtype is None else dtype)
 
     def __copy__(self):
         """
         Creates a copy of the vector class
         :return:
         """
-        return self.__class__(self.data)
+        return self.__class__(tuple(self))
 
     copy = __copy__
 
+    def __getstate__(self):
+        return tuple(self)
+
+    def __setstate__(self, state):
+        self._set(state)
+
     def __getitem__(self, item):
         """
-        :param item:
+        :param item: index or slice
         :return:
         """
+        if type(item) is int:
+            return getattr(self, self.ATTRS[item])
         return self.data[item]
 
     def __setitem__(self, key, value):
@@ -68,62 +113,26 @@ class VectorBase(object):
         :type value: float
         :return:
         """
-        self.data[key] = value
-
-    def __getattr__(self, item):
-        """
-
-        :param item:
-        :return:
-        """
-        try:
-            idx = self.ATTRS.index(item)
-        except:
-            raise AttributeError("Unknown attribute `{}`".format(item))
-
-        return self.data[idx]
-
-    def __setattr__(self, key, value):
-        """
-
-        :param key:
-        :param value:
-        :return:
-        """
-        try:
-            idx = self.ATTRS.index(key)
-            self.data[idx] = value
-            return value
-        except ValueError:
-            # Ignore error, just pass on to parent
-            pass
-        return super(VectorBase, self).__setattr__(key, value)
+        setattr(self, self.ATTRS[key], float(value))
 
     def __iter__(self):
         """
         """
-        return iter(self.data)
+        return iter([getattr(self, attr) for attr in self.ATTRS])
 
     def __len__(self):
         """
         :return: The length of this vector type
         :rtype: int
         """
-        return len(self.data)
+        return self.LENGTH
 
     def __abs__(self):
         """
         :return: Norm of this vector
         :rtype: float
         """
-        return np.linalg.norm(self.data)
-
-    def __neg__(self):
-        """
-        Return negative vector.
-        :return:
-        """
-        return Vector3(-self.data)
+        return math.sqrt(sum(value * value for value in self))
 
     norm = __abs__
     magnitude = __abs__
@@ -132,20 +141,16 @@ class VectorBase(object):
         """
         Normalizes this object
         """
-        self.data /= self.norm()
-
-    def normalized(self):
-        """
-        :return: Normalized version of this vector
-        """
-        return Vector3(self.data / self.norm())
+        norm = self.norm()
+        self._set(value / norm for value in self)
 
 
 class Vector3(VectorBase):
     """
-    Defines an abstract vector data type as a wrapper
-    over a numpy array.
+    Defines a 3D vector of floats
     """
+    __slots__ = ('x', 'y', 'z')
+
     LENGTH = 3
     ATTRS = 'xyz'
 
@@ -160,15 +165,45 @@ class Vector3(VectorBase):
         :return:
         """
         if hasattr(x, '__iter__'):
-            super(Vector3, self).__init__(x)
+            self._set(x)
         else:
-            super(Vector3, self).__init__(x, y, z)
+            self.x = float(x)
+            self.y = float(y)
+            self.z = float(z)
+
+    def __copy__(self):
+        return _vector3(self.x, self.y, self.z)
+
+    copy = __copy__
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
 
     def __repr__(self):
         """
         :return:
         """
-        return 'Vector3(%e, %e, %e)' % tuple(self)
+        return 'Vector3(%e, %e, %e)' % (self.x, self.y, self.z)
+
+    def __abs__(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    norm = __abs__
+    magnitude = __abs__
+
+    def __neg__(self):
+        """
+        Return negative vector.
+        :return:
+        """
+        return _vector3(-self.x, -self.y, -self.z)
+
+    def normalized(self):
+        """
+        :return: Normalized version of this vector
+        """
+        norm = self.norm()
+        return _vector3(self.x / norm, self.y / norm, self.z / norm)
 
     def __add__(self, other):
         """
@@ -176,19 +211,25 @@ class Vector3(VectorBase):
         :param other:
         :return:
         """
-        if len(self) != len(other):
-            raise AssertionError("Cannot add different length vectors.")
-        return Vector3([x + y for x, y in zip(self, other)])
+        if type(other) is not Vector3:
+            if len(self) != len(other):
+                raise AssertionError("Cannot add different length vectors.")
+            other = Vector3(other)
+        return _vector3(self.x + other.x, self.y + other.y, self.z + other.z)
 
     def __sub__(self, other):
         """
         :param other:
         :return:
         """
-        return Vector3([x - y for x, y in zip(self, other)])
+        if type(other) is not Vector3:
+            other = Vector3(other)
+        return _vector3(self.x - other.x, self.y - other.y, self.z - other.z)
 
     __radd__ = __add__
-    __rsub__ = __sub__
+
+    def __rsub__(self, other):
+        return Vector3(other) - self
 
     def __iadd__(self, other):
         """
@@ -196,9 +237,9 @@ class Vector3(VectorBase):
         """
         if len(self) != len(other):
             raise AssertionError("Cannot add different length vectors.")
-        self[0] += other[0]
-        self[1] += other[1]
-        self[2] += other[2]
+        self.x += other[0]
+        self.y += other[1]
+        self.z += other[2]
         return self
 
     def __isub__(self, other):
@@ -207,9 +248,10 @@ class Vector3(VectorBase):
         """
         if len(self) != len(other):
             raise AssertionError("Cannot add different length vectors.")
-        self[0] -= other[0]
-        self[1] -= other[1]
-        self[2] -= other[2]
+        self.x -= other[0]
+        self.y -= other[1]
+        self.z -= other[2]
+        return self
 
     def __mul__(self, number):
         """
@@ -217,7 +259,7 @@ class Vector3(VectorBase):
         :type number: float
         :return:
         """
-        return Vector3(self[0] * number, self[1] * number, self[2] * number)
+        return _vector3(self.x * number, self.y * number, self.z * number)
 
     def __imul__(self, number):
         """
@@ -225,9 +267,9 @@ class Vector3(VectorBase):
         :type number: float
         :return:
         """
-        self[0] *= number
-        self[1] *= number
-        self[2] *= number
+        self.x *= number
+        self.y *= number
+        self.z *= number
         return self
 
     def __div__(self, number):
@@ -248,6 +290,7 @@ class Vector3(VectorBase):
 
     __rmul__ = __mul__
     __truediv__ = __div__
+    __itruediv__ = __idiv__
 
     def cross(self, v1):
         """
@@ -258,7 +301,9 @@ class Vector3(VectorBase):
         :return:
         :rtype: Vector3
         """
-        return Vector3(np.cross(self.data, v1.data))
+        return _vector3(self.y * v1.z - self.z * v1.y,
+                        self.z * v1.x - self.x * v1.z,
+                        self.x * v1.y - self.y * v1.x)
 
     def dot(self, v1):
         """
@@ -266,7 +311,7 @@ class Vector3(VectorBase):
         :type v1: Vector3
         :return:
         """
-        return np.dot(self.data, v1.data)
+        return self.x * v1.x + self.y * v1.y + self.z * v1.z
 
     def parallelism(self, other):
         """
@@ -314,6 +359,8 @@ class Quaternion(VectorBase):
     """
     Quaternion convenience class
     """
+    __slots__ = ('w', 'x', 'y', 'z')
+
     LENGTH = 4
     ATTRS = 'wxyz'
 
@@ -326,15 +373,51 @@ class Quaternion(VectorBase):
         :return:
         """
         if hasattr(w, '__iter__'):
-            super(Quaternion, self).__init__(w)
+            self._set(w)
         else:
-            super(Quaternion, self).__init__(w, x, y, z)
+            self.w = float(w)
+            self.x = float(x)
+            self.y = float(y)
+            self.z = float(z)
+
+    def __copy__(self):
+        return _quaternion(self.w, self.x, self.y, self.z)
+
+    copy = __copy__
+
+    def __iter__(self):
+        return iter((self.w, self.x, self.y, self.z))
 
     def __repr__(self):
         """
         :return:
         """
-        return 'Quaternion(real=%e, imag=<%e, %e, %e>)' % tuple(self)
+        return 'Quaternion(real=%e, imag=<%e, %e, %e>)' % (self.w, self.x, self.y, self.z)
+
+    def __neg__(self):
+        return _quaternion(-self.w, -self.x, -self.y, -self.z)
+
+    def _product(self, other):
+        w1, x1, y1, z1 = self.w, self.x, self.y, self.z
+        w0, x0, y0, z0 = other.w, other.x, other.y, other.z
+        return (-x1 * x0 - y1 * y0 - z1 * z0 + w1 * w0,
+                x1 * w0 + y1 * z0 - z1 * y0 + w1 * x0,
+                -x1 * z0 + y1 * w0 + z1 * x0 + w1 * y0,
+                x1 * y0 - y1 * x0 + z1 * w0 + w1 * z0)
+
+    def _rotation(self):
+        """
+        :return: the 9 coefficients of the rotation matrix, row by row, identity for a null quaternion
+        """
+        w, x, y, z = self.w, self.x, self.y, self.z
+        n = w * w + x * x + y * y + z * z
+        if n < _EPS:
+            return 1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0
+        s = math.sqrt(2.0 / n)
+        w, x, y, z = w * s, x * s, y * s, z * s
+        return (1.0 - y * y - z * z, x * y - z * w, x * z + y * w,
+                x * y + z * w, 1.0 - x * x - z * z, y * z - x * w,
+                x * z - y * w, y * z + x * w, 1.0 - x * x - y * y)
 
     def __mul__(self, other):
         """
@@ -343,11 +426,14 @@ class Quaternion(VectorBase):
         :return:
         """
         if isinstance(other, Quaternion):
-            return Quaternion(quaternion_multiply(self, other))
+            return _quaternion(*self._product(other))
         elif isinstance(other, Vector3):
-            # Get homogeneous rotation matrix and turn vector into
-            # homogeneous vector.
-            return self.get_matrix() * other
+            m00, m01, m02, m10, m11, m12, m20, m21, m22 = self._rotation()
+            x, y, z = other.x, other.y, other.z
+            return _vector3(m00 * x + m01 * y + m02 * z,
+                            m10 * x + m11 * y + m12 * z,
+                            m20 * x + m21 * y + m22 * z)
+        return NotImplemented
 
     def __imul__(self, other):
         """
@@ -357,7 +443,8 @@ class Quaternion(VectorBase):
         """
         if not isinstance(other, Quaternion):
             raise AssertionError("Vector is not an instance of Quaternion")
-        self.data[:] = quaternion_multiply(self, other)
+        self.w, self.x, self.y, self.z = self._product(other)
+        return self
 
     def get_matrix(self):
         """
@@ -365,27 +452,36 @@ class Quaternion(VectorBase):
         :return:
         :rtype: RotationMatrix
         """
-        return RotationMatrix(quaternion_matrix(self))
+        m00, m01, m02, m10, m11, m12, m20, m21, m22 = self._rotation()
+        return RotationMatrix([[m00, m01, m02, 0.0],
+                               [m10, m11, m12, 0.0],
+                               [m20, m21, m22, 0.0],
+                               [0.0, 0.0, 0.0, 1.0]])
 
     def get_rpy(self):
         """
         Returns roll / pitch / yaw corresponding to this Quaternion
         """
-        return euler_from_quaternion(self.data[:], 'sxyz')
+        m00, _m01, _m02, m10, m11, m12, m20, m21, m22 = self._rotation()
+        cy = math.sqrt(m00 * m00 + m10 * m10)
+        if cy > _EPS:
+            return math.atan2(m21, m22), math.atan2(-m20, cy), math.atan2(m10, m00)
+        return math.atan2(-m12, m11), math.atan2(-m20, cy), 0.0
 
     def conjugated(self):
         """
         :return:
         :rtype: Quaternion
         """
-        return Quaternion(quaternion_conjugate(self))
+        return _quaternion(self.w, -self.x, -self.y, -self.z)
 
     def inversed(self):
         """
         :return:
         :rtype: Quaternion
         """
-        return Quaternion(quaternion_inverse(self))
+        n = self.w * self.w + self.x * self.x + self.y * self.y + self.z * self.z
+        return _quaternion(self.w / n, -self.x / n, -self.y / n, -self.z / n)
 
     @staticmethod
     def from_angle_axis(angle, axis):
@@ -397,7 +493,12 @@ class Quaternion(VectorBase):
         :return:
         :rtype: Quaternion
         """
-        return Quaternion(quaternion_about_axis(angle, axis))
+        x, y, z = axis
+        norm = math.sqrt(x * x + y * y + z * z)
+        if norm > _EPS:
+            factor = math.sin(angle / 2.0) / norm
+            x, y, z = x * factor, y * factor, z * factor
+        return _quaternion(math.cos(angle / 2.0), float(x), float(y), float(z))
 
     @staticmethod
     def from_rpy(roll, pitch, yaw):
@@ -2,12 +2,52 @@ import math
 import xml.etree.ElementTree
 
 from pyrevolve import SDF
+from pyrevolve.SDF import xml_writer
+from pyrevolve.SDF.link import calculate_mass_properties
 from pyrevolve.revolve_bot.revolve_module import ActiveHingeModule, Orientation, BoxSlot
 
 
 def revolve_bot_to_sdf(robot, robot_pose, nice_format, self_collide=True):
+    """
+    :param robot: RevolveBot
+    :param robot_pose: position of the robot in the world
+    :param nice_format: indentation of the xml, None for the compact format
+    :param self_collide: whether the links of the robot collide with each other
+    :return: the sdf document of the robot
+    """
+    return xml_writer.to_string(_revolve_bot_sdf_element(robot, robot_pose, self_collide), nice_format)
+
+
+class SDFTemplate:
+    """
+    Compact sdf document of a robot without its pose, which is filled in at each insertion.
+    The pose is the only part of the document depending on where the robot is inserted, so the robot is only
+    converted once for all its evaluations, retries and analyses.
+    """
+
+    def __init__(self, robot, self_collide=True):
+        """
+        :param robot: RevolveBot
+        :param self_collide: whether the links of the robot collide with each other
+        """
+        robot_pose = SDF.math.Vector3(0, 0, 0)
+        document = revolve_bot_to_sdf(robot, robot_pose, None, self_collide)
+        # the pose of the model is the first pose of the document
+        start = document.index('<pose>') + len('<pose>')
+        end = start + len(SDF.Pose(robot_pose).text)
+        self._prefix = document[:start]
+        self._suffix = document[end:]
+
+    def render(self, robot_pose):
+        """
+        :param robot_pose: position of the robot in the world
+        :return: the sdf document of the robot, identical to revolve_bot_to_sdf
+        """
+        return self._prefix + SDF.Pose(robot_pose).text + self._suffix
+
+
+def _revolve_bot_sdf_element(robot, robot_pose, self_collide):
     from xml.etree import ElementTree
-    from pyrevolve import SDF
 
     sdf_root = ElementTree.Element('sdf', {'version': '1.6'})
 
@@ -57,31 +97,15 @@ def revolve_bot_to_sdf(robot, robot_pose, nice_format, self_collide=True):
         if joint.is_motorized():
             actuators.append(joint)
 
+    calculate_mass_properties(links)
     for link in links:
-        link.align_center_of_mass()
-        link.calculate_inertial()
         model.append(link)
 
     # ADD BRAIN
     plugin_elem = _sdf_brain_plugin_conf(robot._brain, sensors, actuators, robot_genome=None)
     model.append(plugin_elem)
 
-    # XML RENDER PHASE #
-    def prettify(rough_string, indent='\t'):
-        """Return a pretty-printed XML string for the Element.
-        """
-        import xml.dom.minidom
-        reparsed = xml.dom.minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent=indent)
-
-    res = xml.etree.ElementTree.tostring(sdf_root, encoding='utf8', method='xml')
-
-    if nice_format is not None:
-        res = prettify(res, nice_format)
-    else:
-        res = res.decode()
-
-    return res
+    return sdf_root
 
 
 def _sdf_attach_module(module_slot, module_orientation: float,
@@ -0,0 +1,203 @@
+"""
+Geometric self collision check of the sdf of a robot, on the oriented collision boxes of its links.
+
+Like the physics engine, only the boxes of different links that are not connected by a joint are tested against
+each other. The pairs of boxes are first screened by their axis aligned bounding boxes, then tested with the
+separating axis theorem on the oriented boxes.
+"""
+import numpy as np
+
+from pyrevolve import SDF
+from pyrevolve.SDF.revolve_bot_sdf_builder import _revolve_bot_sdf_element
+
+# cross products of almost parallel axes are not tested as separating axes
+_PARALLEL_EPS = 1e-9
+
+
+class OrientedBoxes:
+    """
+    Collision boxes of the links of a model, in the frame of the model
+    """
+
+    def __init__(self, names, link_indices, centers, axes, half_sizes):
+        """
+        :param names: names of the collision elements
+        :param link_indices: index of the link of each box, array of shape (N,)
+        :param centers: centers of the boxes, array of shape (N, 3)
+        :param axes: rotation matrices of the boxes, whose columns are the axes of the boxes, array of shape (N, 3, 3)
+        :param half_sizes: half the sizes of the boxes along their axes, array of shape (N, 3)
+        """
+        self.names = names
+        self.link_indices = link_indices
+        self.centers = centers
+        self.axes = axes
+        self.half_sizes = half_sizes
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_links(cls, links):
+        """
+        :param links: links of the model, with their poses relative to the model
+        :type links: list(SDF.Link)
+        """
+        collisions = [collision for link in links for collision in link.collisions]
+        link_indices = np.repeat(np.arange(len(links)), [len(link.collisions) for link in links])
+        link_positions = SDF.math.batch.as_vectors([link.get_position() for link in links])[link_indices]
+        link_rotations = SDF.math.batch.as_quaternions([link.get_rotation() for link in links])[link_indices]
+
+        centers = SDF.math.batch.rotate(
+            link_rotations, SDF.math.batch.as_vectors([collision.get_position() for collision in collisions]))
+        rotations = SDF.math.batch.quaternion_multiply(
+            link_rotations, SDF.math.batch.as_quaternions([collision.get_rotation() for collision in collisions]))
+        half_sizes = np.array([collision.box_size for collision in collisions], dtype=np.float64).reshape(-1, 3) / 2
+
+        return cls([collision.name for collision in collisions],
+                   link_indices,
+                   centers + link_positions,
+                   SDF.math.batch.rotation_matrices(rotations),
+                   half_sizes)
+
+    def aabb_half_sizes(self):
+        """
+        :return: half the sizes of the axis aligned bounding boxes of the boxes, array of shape (N, 3)
+        """
+        return np.einsum('nij,nj->ni', np.abs(self.axes), self.half_sizes)
+
+
+def joined_link_pairs(links, joints):
+    """
+    :param links: links of the model
+    :param joints: joints of the model
+    :return: set of the (i, j) indices, i < j, of the links connected by a joint
+    """
+    indices = {link.name: i for i, link in enumerate(links)}
+    pairs = set()
+    for joint in joints:
+        parent = indices[joint.findtext('parent')]
+        child = indices[joint.findtext('child')]
+        pairs.add((min(parent, child), max(parent, child)))
+    return pairs
+
+
+def candidate_pairs(boxes, excluded_link_pairs, margin):
+    """
+    Broad phase: the pairs of boxes of different links, not connected by a joint, whose axis aligned bounding boxes
+    are closer than `margin`
+    :param boxes: OrientedBoxes
+    :param excluded_link_pairs: set of (i, j) indices of links, i < j, whose boxes are not tested
+    :param margin: distance below which the boxes are considered touching
+    :return: indices (first, second) of the boxes of the pairs, two arrays of shape (P,)
+    """
+    first, second = np.triu_indices(len(boxes), k=1)
+    first_links, second_links = boxes.link_indices[first], boxes.link_indices[second]
+    tested = first_links != second_links
+    if excluded_link_pairs:
+        low, high = np.minimum(first_links, second_links), np.maximum(first_links, second_links)
+        excluded = np.array(sorted(excluded_link_pairs)).reshape(-1, 2)
+        n_links = max(int(boxes.link_indices.max(initial=0)), int(excluded.max())) + 1
+        tested &= ~np.isin(low * n_links + high, excluded[:, 0] * n_links + excluded[:, 1])
+    first, second = first[tested], second[tested]
+
+    aabb = boxes.aabb_half_sizes()
+    gaps = np.abs(boxes.centers[second] - boxes.centers[first]) - aabb[first] - aabb[second]
+    close = np.all(gaps <= margin, axis=1)
+    return first[close], second[close]
+
+
+def box_separations(boxes, first, second):
+    """
+    Narrow phase: separating axis test of pairs of oriented boxes.
+
+    A positive separation is a lower bound of the distance between the two boxes, a negative separation is the
+    depth of their interpenetration.
+    :param boxes: OrientedBoxes
+    :param first: indices of the first boxes of the pairs, array of shape (P,)
+    :param second: indices of the second boxes of the pairs, array of shape (P,)
+    :return: separations of the pairs, array of shape (P,)
+    """
+    axes_a, axes_b = boxes.axes[first], boxes.axes[second]
+    half_a, half_b = boxes.half_sizes[first], boxes.half_sizes[second]
+    translations = boxes.centers[second] - boxes.centers[first]
+
+    # the 3 face axes of each box and the 9 cross products of their edges, shape (P, 15, 3)
+    edges_a = np.swapaxes(axes_a, 1, 2)
+    edges_b = np.swapaxes(axes_b, 1, 2)
+    crosses = np.cross(edges_a[:, :, np.newaxis, :], edges_b[:, np.newaxis, :, :]).reshape(-1, 9, 3)
+    norms = np.linalg.norm(crosses, axis=-1)
+    parallel = norms < _PARALLEL_EPS
+    crosses /= np.where(parallel, 1.0, norms)[:, :, np.newaxis]
+    separating_axes = np.concatenate([edges_a, edges_b, crosses], axis=1)
+
+    radii_a = np.einsum('pak,pk->pa', np.abs(np.einsum('pai,pik->pak', separating_axes, axes_a)), half_a)
+    radii_b = np.einsum('pak,pk->pa', np.abs(np.einsum('pai,pik->pak', separating_axes, axes_b)), half_b)
+    distances = np.abs(np.einsum('pai,pi->pa', separating_axes, translations))
+
+    separations = distances - radii_a - radii_b
+    separations[:, 6:][parallel] = -np.inf
+    return separations.max(axis=1, initial=-np.inf)
+
+
+class SelfCollisionReport:
+    """
+    Result of the geometric self collision check of a robot
+    """
+
+    def __init__(self, colliding, touching):
+        """
+        :param colliding: (name, name) pairs of collision elements that interpenetrate by more than the margin
+        :param touching: (name, name) pairs of collision elements closer than the margin, that may be in contact or not
+        """
+        self.colliding = colliding
+        self.touching = touching
+
+    @property
+    def ambiguous(self):
+        """
+        :return: True if the check can't decide, there are no collisions but some boxes are in contact
+        """
+        return not self.colliding and bool(self.touching)
+
+    def __repr__(self):
+        return f'SelfCollisionReport({len(self.colliding)} colliding, {len(self.touching)} touching)'
+
+
+def check_self_collisions(model, margin=1e-3):
+    """
+    :param model: sdf root, or model element, built by `revolve_bot_sdf_builder`
+    :param margin: in meters, boxes interpenetrating by more than the margin collide, boxes separated by more
+    than the margin don't, the others are touching
+    :return: SelfCollisionReport
+    :rtype: SelfCollisionReport
+    """
+    if model.tag == 'sdf':
+        model = model.find('model')
+    links = [element for element in model if isinstance(element, SDF.Link)]
+    joints = [element for element in model if isinstance(element, SDF.Joint)]
+
+    boxes = OrientedBoxes.from_links(links)
+    first, second = candidate_pairs(boxes, joined_link_pairs(links, joints), margin)
+    separations = box_separations(boxes, first, second)
+
+    def names(selection):
+        return [(boxes.names[i], boxes.names[j]) for i, j in zip(first[selection], second[selection])]
+
+    return SelfCollisionReport(names(separations < -margin),
+                               names((separations >= -margin) & (separations <= margin)))
+
+
+def check_robot_self_collisions(robot, margin=1e-3):
+    """
+    Self collision check of a robot, as the body analyzer does in gazebo.
+
+    Note that `RevolveBot.update_substrate(raise_for_intersections=True)` is not equivalent: it ignores the
+    orientation of the modules and the modules sharing a link, that never collide with each other.
+    :param robot: RevolveBot
+    :param margin: see `check_self_collisions`
+    :return: SelfCollisionReport
+    :rtype: SelfCollisionReport
+    """
+    if not robot.self_collide:
+        return SelfCollisionReport([], [])
+    return check_self_collisions(_revolve_bot_sdf_element(robot, SDF.math.Vector3(0, 0, 0), True), margin)
@@ -0,0 +1,98 @@
+"""
+Streaming serializer of ElementTree elements. It writes the elements straight into a list of strings, without the
+namespace and encoding handling of `ElementTree.tostring` and without reparsing the document to pretty-print it.
+"""
+
+XML_DECLARATION = "<?xml version='1.0' encoding='utf8'?>\n"
+PRETTY_XML_DECLARATION = '<?xml version="1.0" ?>\n'
+
+
+def escape_text(text):
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def escape_attribute(value):
+    value = escape_text(value)
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    if '\r' in value:
+        value = value.replace('\r', '&#13;')
+    if '\n' in value:
+        value = value.replace('\n', '&#10;')
+    if '\t' in value:
+        value = value.replace('\t', '&#09;')
+    return value
+
+
+def _open_tag(element):
+    if len(element.attrib) == 0:
+        return '<' + element.tag
+    attributes = ''.join(' {}="{}"'.format(key, escape_attribute(str(value)))
+                         for key, value in element.attrib.items())
+    return '<' + element.tag + attributes
+
+
+def write_element(element, out):
+    """
+    Appends the compact serialization of the element, identical to the one of `ElementTree.tostring`, to `out`
+    :param element: xml element
+    :param out: list of strings
+    """
+    out.append(_open_tag(element))
+    text = element.text
+    if text or len(element) > 0:
+        out.append('>')
+        if text:
+            out.append(escape_text(text))
+        for child in element:
+            write_element(child, out)
+        out.append('</' + element.tag + '>')
+    else:
+        out.append(' />')
+    if element.tail:
+        out.append(escape_text(element.tail))
+
+
+def write_pretty_element(element, out, indent, depth=0):
+    """
+    Appends the indented serialization of the element, identical to the one of `minidom.toprettyxml`, to `out`
+    :param element: xml element without mixed content
+    :param out: list of strings
+    :param indent: indentation of one level
+    :param depth: level of the element
+    """
+    prefix = indent * depth
+    out.append(prefix + _open_tag(element))
+    text = element.text
+    if len(element) > 0:
+        out.append('>\n')
+        if text:
+            out.append(prefix + indent + escape_text(text) + '\n')
+        for child in element:
+            write_pretty_element(child, out, indent, depth + 1)
+        out.append(prefix + '</' + element.tag + '>\n')
+    elif text:
+        out.append('>' + escape_text(text) + '</' + element.tag + '>\n')
+    else:
+        out.append('/>\n')
+
+
+def to_string(element, indent=None):
+    """
+    :param element: root xml element
+    :param indent: indentation of one level, None for the compact format
+    :return: the xml document of the element
+    """
+    if indent is None:
+        out = [XML_DECLARATION]
+        write_element(element, out)
+    else:
+        out = [PRETTY_XML_DECLARATION]
+        write_pretty_element(element, out, indent)
+    return ''.join(out)
@@ -1,13 +1,12 @@
 from __future__ import absolute_import
 from __future__ import division
 
-import numpy as np
-from collections import deque
+import asyncio
+import math
 
-from pyrevolve.SDF.math import Vector3, Quaternion
+from pyrevolve.SDF.math import Vector3
 from pyrevolve.util import Time
-import math
-import os
+from .trajectory import RingBuffer, Trajectory
 
 
 class RobotManager(object):
@@ -35,7 +34,12 @@ class RobotManager(object):
         :type battery_level: float
         :return:
         """
-        self.dead = False
+        self._dead = False
+        self._dead_event = asyncio.Event()
+        # called with the robot manager at each state update, returns the reason to stop the robot early or None
+        self.early_stopping = None
+        # reason why the evaluation of the robot was stopped before the end of its life
+        self.stopped_early = None
         self.warmup_time = warmup_time
         self.speed_window = speed_window
         self.robot = robot
@@ -47,16 +51,9 @@ class RobotManager(object):
         self.last_update = time
         self.last_mate = None
 
-        self._ds = deque(maxlen=speed_window)
-        self._dt = deque(maxlen=speed_window)
-        self._positions = deque(maxlen=speed_window)
-        self._orientations = deque(maxlen=speed_window)
-        self._contacts = deque(maxlen=speed_window)
-        self._seconds = deque(maxlen=speed_window)
-        self._times = deque(maxlen=speed_window)
+        self._trajectory = Trajectory(speed_window)
+        self._contacts = RingBuffer(speed_window, 1)
 
-        self._dist = 0
-        self._time = 0
         self._idx = 0
         self._count = 0
         self.second = 1
@@ -68,10 +65,46 @@ class RobotManager(object):
         self.avg_y = 0
         self.avg_z = 0
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_dead_event']
+        state['early_stopping'] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('early_stopping', None)
+        state.setdefault('stopped_early', None)
+        self.__dict__.update(state)
+        self._dead_event = asyncio.Event()
+        if self._dead:
+            self._dead_event.set()
+
     @property
     def name(self):
         return str(self.robot.id)
 
+    @property
+    def dead(self):
+        return self._dead
+
+    @dead.setter
+    def dead(self, dead):
+        self._dead = dead
+        if dead:
+            self._dead_event.set()
+        else:
+            self._dead_event.clear()
+
+    async def wait_dead(self, timeout=None):
+        """
+        Waits until the robot is dead, i.e. until the simulator reports the end of its life.
+        The robot is marked dead as soon as the state message arrives, there is no polling.
+
+        :param timeout: maximum time to wait in seconds, None to wait forever
+        :raise asyncio.TimeoutError: if the robot is still alive after the timeout
+        """
+        await asyncio.wait_for(self._dead_event.wait(), timeout=timeout)
+
     def update_state(self, world, time, state, poses_file):
         """
         Updates the robot state from a state message.
@@ -85,33 +118,30 @@ class RobotManager(object):
         :type poses_file: csv.writer
         :return:
         """
-        dead = state.dead if state.dead is not None else False
-        self.dead = dead or self.dead
+        if state.dead:
+            self.dead = True
 
+        # the fields of the message are stored as they are, the orientation is
+        # converted to roll / pitch / yaw only when the measures need it
         pos = state.pose.position
-        position = Vector3(pos.x, pos.y, pos.z)
-
-        rot = state.pose.orientation
-        qua = Quaternion(rot.w, rot.x, rot.y, rot.z)
-        euler = qua.get_rpy()
-        euler = np.array([euler[0], euler[1], euler[2]]) # roll / pitch / yaw
-
-        age = world.age()
+        x, y, z = pos.x, pos.y, pos.z
 
         if self.starting_time is None:
             self.starting_time = time
             self.last_update = time
-            self.last_position = position
+            self.last_position = Vector3(x, y, z)
 
         if poses_file:
             age = world.age()
             poses_file.writerow([self.robot.id, age.sec, age.nsec,
-                                 position.x, position.y, position.z,
+                                 x, y, z,
                                  self.get_battery_level()])
 
-        if float(self.age()) < self.warmup_time:
+        # float differences of the times, cheaper than subtracting Time objects
+        last_update = float(self.last_update)
+        if last_update - float(self.starting_time) < self.warmup_time:
             # Don't update position values within the warmup time
-            self.last_position = position
+            self.last_position = Vector3(x, y, z)
             self.last_update = time
             return
 
@@ -119,39 +149,23 @@ class RobotManager(object):
         # distance over the x and y coordinates (we don't care for flying),
         # as well as the time it took to cover this distance.
         last = self.last_position
-        ds = np.sqrt((position.x - last.x)**2 + (position.y - last.y)**2)
-        dt = float(time - self.last_update)
-
-        # Velocity is of course sum(distance) / sum(time)
-        # Storing all separate distance and time values allows us to
-        # efficiently calculate the new speed over the window without
-        # having to sum the entire arrays each time, by subtracting
-        # the values we're about to remove from the _dist / _time values.
-        self._dist += ds
-        self._time += dt
-
-        if len(self._dt) >= self.speed_window:
-            # Subtract oldest values if we're about to override it
-            self._dist -= self._ds[0]
-            self._time -= self._dt[0]
+        ds = math.sqrt((x - last.x)**2 + (y - last.y)**2)
+        dt = float(time) - last_update
 
-        self.last_position = position
+        self.last_position = Vector3(x, y, z)
         self.last_update = time
 
-        self._positions.append(position)
-        self._times.append(time)
-        self._ds.append(ds)
-        self._dt.append(dt)
-        self._orientations.append(euler)
-        self._seconds.append(age.sec)
-
-    def update_contacts(self, world, module_contacts):
+        rot = state.pose.orientation
+        self._trajectory.append((time.sec, time.nsec, x, y, z, rot.w, rot.x, rot.y, rot.z, ds, dt))
 
-        number_contacts = 0
-        for position in module_contacts.position:
-            number_contacts += 1
+        if self.early_stopping is not None and not self._dead:
+            reason = self.early_stopping(self)
+            if reason is not None:
+                self.stopped_early = reason
+                self.dead = True
 
-        self._contacts.append(number_contacts)
+    def update_contacts(self, world, module_contacts):
+        self._contacts.append((len(module_contacts.position),))
 
     def age(self):
         """
@@ -0,0 +1,152 @@
+from __future__ import absolute_import
+from __future__ import division
+
+import struct
+
+import numpy as np
+
+from pyrevolve.SDF.math import batch
+from pyrevolve.util import Time
+
+
+class RingBuffer(object):
+    """
+    The last `capacity` rows appended, in a preallocated numpy array filled in place.
+    The rows are packed directly in the memory of the array, without creating an intermediate array.
+    """
+
+    def __init__(self, capacity, n_columns):
+        """
+        :param capacity: maximum number of rows kept, the oldest rows are overwritten
+        :param n_columns: number of values in a row
+        """
+        self.capacity = capacity
+        self.n_columns = n_columns
+        self._memory = bytearray(capacity * n_columns * 8)
+        self._next = 0
+        self._count = 0
+        # total number of rows appended, the overwritten ones included
+        self.n_appended = 0
+        self._init_views()
+
+    def _init_views(self):
+        self._row = struct.Struct('{}d'.format(self.n_columns))
+        self._data = np.frombuffer(self._memory, dtype=np.float64).reshape(self.capacity, self.n_columns)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_row']
+        del state['_data']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_views()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, row):
+        """
+        :param row: tuple of `n_columns` values
+        """
+        self._row.pack_into(self._memory, self._next * self._row.size, *row)
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+        if self._count < self.capacity:
+            self._count += 1
+        self.n_appended += 1
+
+    def array(self):
+        """
+        :return: the rows from the oldest to the newest, array of shape (len(self), n_columns)
+        """
+        if self._count < self.capacity:
+            return self._data[:self._count]
+        return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+    def row(self, i):
+        """
+        :param i: index from the oldest row, negative from the newest
+        :return: the row, array of shape (n_columns,)
+        """
+        if not -self._count <= i < self._count:
+            raise IndexError(i)
+        if i < 0:
+            i += self._count
+        if self._count < self.capacity:
+            return self._data[i]
+        return self._data[(self._next + i) % self.capacity]
+
+
+class Trajectory(RingBuffer):
+    """
+    Pose samples of a robot: time, position, orientation quaternion, and the distance and time
+    since the previous sample. The orientations are converted to roll / pitch / yaw only when requested.
+    """
+    SEC, NSEC = 0, 1
+    POSITION = slice(2, 5)
+    ORIENTATION = slice(5, 9)
+    DISTANCE = 9
+    DURATION = 10
+
+    def __init__(self, capacity):
+        super(Trajectory, self).__init__(capacity, 11)
+        # (n_appended, roll / pitch / yaw) of the last conversion
+        self._rpy = (0, np.zeros((0, 3)))
+
+    def time(self, i):
+        """
+        :return: time of sample i
+        :rtype: Time
+        """
+        row = self.row(i)
+        return Time(sec=row[self.SEC], nsec=row[self.NSEC])
+
+    def times(self):
+        """
+        :return: times of the samples in seconds, array of shape (N,)
+        """
+        data = self.array()
+        return data[:, self.SEC] + data[:, self.NSEC] / 1e9
+
+    def position(self, i):
+        """
+        :return: position of sample i, array of shape (3,)
+        """
+        return self.row(i)[self.POSITION]
+
+    def positions(self):
+        """
+        :return: array of shape (N, 3)
+        """
+        return self.array()[:, self.POSITION]
+
+    def orientations(self):
+        """
+        :return: quaternions (w, x, y, z), array of shape (N, 4)
+        """
+        return self.array()[:, self.ORIENTATION]
+
+    def rpy(self):
+        """
+        :return: roll, pitch and yaw of the orientations, array of shape (N, 3)
+        """
+        n_appended, rpy = self._rpy
+        if n_appended != self.n_appended:
+            rpy = batch.rpy(self.orientations())
+            self._rpy = (self.n_appended, rpy)
+        return rpy
+
+    def distances(self):
+        """
+        :return: distance covered over the x and y coordinates since the previous sample, array of shape (N,)
+        """
+        return self.array()[:, self.DISTANCE]
+
+    def durations(self):
+        """
+        :return: time elapsed since the previous sample in seconds, array of shape (N,)
+        """
+        return self.array()[:, self.DURATION]
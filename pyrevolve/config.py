@@ -101,7 +101,22 @@ parser.add_argument(
 parser.add_argument(
     '--simulator-cmd',
     default='gzserver', type=str,
-    help="Determine whether to use gzserver or gazebo. Default to \"gzserver\"."
+    help="Determine whether to use gzserver or gazebo, \"mock\" evaluates the robots in an in-process "
+         "mock simulator instead of Gazebo. Default to \"gzserver\"."
+)
+
+parser.add_argument(
+    '--mock-speed',
+    default=100.0, type=float,
+    help="Simulated seconds per real second of the mock simulator (--simulator-cmd mock), "
+         "0 simulates as fast as possible. Default to \"100\"."
+)
+
+parser.add_argument(
+    '--mock-failure-rate',
+    default=0.0, type=float,
+    help="Probability that the mock simulator crashes while inserting a robot, "
+         "to exercise the restart of the simulators. Default to \"0.0\"."
 )
 
 parser.add_argument(
@@ -110,10 +125,215 @@ parser.add_argument(
     help="Number of simulators to use at the same time. Default to \"1\"."
 )
 
+parser.add_argument(
+    '--min-cores',
+    default=0, type=int,
+    help="Minimum number of simulators when the simulator pool scales with the load of the machine, "
+         "0 to use --n-cores. Default to \"0\"."
+)
+
+parser.add_argument(
+    '--max-cores',
+    default=0, type=int,
+    help="Maximum number of simulators when the simulator pool scales with the load of the machine, "
+         "0 to use --n-cores. Default to \"0\"."
+)
+
+parser.add_argument(
+    '--spare-simulators',
+    default=0, type=int,
+    help="Number of pre-warmed simulators replacing instantly the simulators that fail. Default to \"0\"."
+)
+
+parser.add_argument(
+    '--autoscale-interval',
+    default=30, type=float,
+    help="Seconds between two decisions of the simulator pool autoscaling. Default to \"30\"."
+)
+
+parser.add_argument(
+    '--robots-per-simulator',
+    default=1, type=int,
+    help="Number of robots evaluated together in the same simulated world. Default to \"1\"."
+)
+
+parser.add_argument(
+    '--robot-spacing',
+    default=10.0, type=float,
+    help="Distance in meters between the robots evaluated together in the same world, "
+         "large enough for them never to meet. Default to \"10.0\"."
+)
+
+parser.add_argument(
+    '--scheduling-policy',
+    default='fifo', type=str,
+    choices=['fifo', 'largest_first', 'expected_runtime'],
+    help="Order in which the robots waiting for a simulator are evaluated: arrival order (\"fifo\"), "
+         "largest bodies first (\"largest_first\") or longest expected evaluations first (\"expected_runtime\"). "
+         "Default to \"fifo\"."
+)
+
+parser.add_argument(
+    '--retries-last',
+    default=False, type=str_to_bool,
+    help="Evaluates the robots whose evaluation failed after all the other waiting robots. Default \"False\"."
+)
+
+parser.add_argument(
+    '--generation-deadline',
+    default=0, type=float,
+    help="Seconds allowed for the evaluation of a generation, the robots still waiting for a simulator "
+         "afterwards are not evaluated. If 0, there is no deadline. Default to \"0\"."
+)
+
+parser.add_argument(
+    '--broker-address',
+    default='', type=str,
+    help="Address (host:port) on which the manager waits for remote evaluation workers "
+         "(experiments/examples/evaluation_worker.py) and to which the workers connect. "
+         "If empty, the robots are evaluated on local simulators. Default to \"\"."
+)
+
+parser.add_argument(
+    '--n-development-workers',
+    default=0, type=int,
+    help="Number of processes developing and measuring new individuals in parallel. "
+         "If 0, they are developed in the manager process. Default to \"0\"."
+)
+
+parser.add_argument(
+    '--experiment-store',
+    default='files', type=str,
+    choices=['files', 'sqlite'],
+    help="Whether the data of the robots is exported in one file per robot and measure (\"files\") "
+         "or in a single database per run (\"sqlite\"). Default to \"files\"."
+)
+
+parser.add_argument(
+    '--render-mode',
+    default='background', type=str,
+    choices=['inline', 'background', 'lazy'],
+    help="Whether the images of the robots are rendered by a pool of worker processes (\"background\"), "
+         "immediately by the manager (\"inline\"), or only after the evolution, on demand (\"lazy\"). "
+         "Default to \"background\"."
+)
+
+parser.add_argument(
+    '--n-render-workers',
+    default=1, type=int,
+    help="Number of processes rendering the images of the robots with --render-mode background. Default to \"1\"."
+)
+
+parser.add_argument(
+    '--phenotype-cache-size',
+    default=0, type=int,
+    help="Number of developed phenotypes (and their evaluations) kept in memory by the phenotype cache. "
+         "If 0, the cache is disabled. Default to \"0\"."
+)
+
+parser.add_argument(
+    '--phenotype-cache-policy',
+    default='phenotype_only', type=str,
+    choices=['phenotype_only', 'reuse', 'resample'],
+    help="Whether the phenotype cache also reuses the fitness of already evaluated genotypes "
+         "(\"reuse\"), re-evaluates them with probability --phenotype-cache-resample "
+         "(\"resample\"), or only reuses phenotypes (\"phenotype_only\"). Default to \"phenotype_only\"."
+)
+
+parser.add_argument(
+    '--phenotype-cache-resample',
+    default=0.1, type=float,
+    help="Probability of re-evaluating a cached genotype with the \"resample\" cache policy. Default to \"0.1\"."
+)
+
+parser.add_argument(
+    '--deduplicate-phenotypes',
+    default=False, type=str_to_bool,
+    help="Evaluates only once robots with identical bodies and brains, duplicates reuse the result. "
+         "Default \"False\"."
+)
+
+parser.add_argument(
+    '--collision-prescreen',
+    default=False, type=str_to_bool,
+    help="Checks the self collisions of the robots on their collision boxes before the body analyzer, "
+         "only the robots with boxes in contact are sent to the analyzer. Default \"False\"."
+)
+
+parser.add_argument(
+    '--collision-prescreen-margin',
+    default=0.001, type=float,
+    help="Distance in meters under which the collision pre-screen considers two boxes in contact: boxes "
+         "interpenetrating by more collide, boxes further apart don't. Default to \"0.001\"."
+)
+
+parser.add_argument(
+    '--controller-prescreen',
+    default=False, type=str_to_bool,
+    help="Simulates the neural network of the robots offline and discards the robots whose controller "
+         "can't move them (no outputs, or only constant outputs) before the simulation. Default \"False\"."
+)
+
+parser.add_argument(
+    '--selection-engine',
+    default=False, type=str_to_bool,
+    help="Selects the parents and the survivors with the tournaments of the selection engine, vectorized on the "
+         "fitness array of the population. Default \"False\"."
+)
+
+parser.add_argument(
+    '--selection-seed',
+    default=None, type=int,
+    help="Seed of the random generator of the selection engine. Default to a hash of the run name."
+)
+
+parser.add_argument(
+    '--surrogate-fitness',
+    default=False, type=str_to_bool,
+    help="Learns the fitness from the descriptors of the evaluated robots, and only simulates the offspring "
+         "with the best predicted fitness. Default \"False\"."
+)
+
+parser.add_argument(
+    '--surrogate-oversampling',
+    default=2.0, type=float,
+    help="Number of candidates developed and measured per simulated offspring with the surrogate fitness. "
+         "Default to \"2.0\"."
+)
+
+parser.add_argument(
+    '--surrogate-min-samples',
+    default=50, type=int,
+    help="Number of evaluated robots before the surrogate fitness starts filtering the offspring. Default to \"50\"."
+)
+
+parser.add_argument(
+    '--early-stopping',
+    default=False, type=str_to_bool,
+    help="Stops the evaluation of the robots that flipped over, or that can't reach the fitness of the worst "
+         "individual of the population anymore, their fitness is computed on their truncated trajectory. "
+         "Default \"False\"."
+)
+
+parser.add_argument(
+    '--early-stopping-max-speed',
+    default=0.1, type=float,
+    help="Speed in m/s the robots are assumed to be able to reach until the end of their evaluation, when "
+         "deciding whether they can still reach the fitness of the population. Default to \"0.1\"."
+)
+
+parser.add_argument(
+    '--early-stopping-shadow-rate',
+    default=0.05, type=float,
+    help="Fraction of the robots to stop early that are evaluated completely instead, to estimate how many "
+         "stopped robots would have been selected with a complete evaluation. Default to \"0.05\"."
+)
+
 parser.add_argument(
     '--port-start',
     default=11345, type=int,
-    help="Gazebo ports [start_port, start_port + n_cores + n_analyzers]. Default to \"11345\"."
+    help="Gazebo ports [start_port, start_port + max_cores + spare_simulators + n_analyzers]. "
+         "Default to \"11345\"."
 )
 
 parser.add_argument(
@@ -147,6 +367,13 @@ parser.add_argument(
     help="Whether the recovery is enabled (save and load the recovery both). Default \"True\"."
 )
 
+parser.add_argument(
+    '--keep-checkpoints',
+    default=2, type=int,
+    help="Number of most recent population checkpoints kept on disk, the older ones are deleted. "
+         "Default to \"2\"."
+)
+
 parser.add_argument(
     '--export-phenotype',
     default=True, type=str_to_bool,
@@ -0,0 +1,101 @@
+import os
+import pickle
+import random
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint:
+    def __init__(self, gen_num, individuals, next_robot_id, random_state=None, numpy_random_state=None):
+        """
+        Full state of a population after the selection of a generation
+
+        :param gen_num: generation number
+        :param individuals: developed, measured and evaluated individuals of the population
+        :param next_robot_id: id of the next robot to create
+        :param random_state: state of the python random generator, the current one if None
+        :param numpy_random_state: state of the numpy random generator, the current one if None
+        """
+        self.version = CHECKPOINT_VERSION
+        self.gen_num = gen_num
+        self.individuals = individuals
+        self.next_robot_id = next_robot_id
+        self.random_state = random_state if random_state is not None else random.getstate()
+        self.numpy_random_state = numpy_random_state if numpy_random_state is not None else np.random.get_state()
+
+    def restore_random_state(self):
+        random.setstate(self.random_state)
+        np.random.set_state(self.numpy_random_state)
+
+
+def save_checkpoint(path, checkpoint):
+    """
+    Writes the checkpoint atomically: it is written in a temporary file that replaces the old one only once it is
+    complete and on disk, a crash in the meantime leaves the previous checkpoint untouched.
+
+    :param path: path of the checkpoint file
+    :param checkpoint: Checkpoint to write
+    """
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(checkpoint, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+    # makes the rename itself durable
+    if hasattr(os, 'O_DIRECTORY'):
+        folder = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(folder)
+        finally:
+            os.close(folder)
+
+
+def load_checkpoint(path):
+    """
+    :param path: path of the checkpoint file
+    :return: the Checkpoint
+    :raise RuntimeError: if the checkpoint was written by an incompatible version
+    """
+    with open(path, 'rb') as f:
+        checkpoint = pickle.load(f)
+    if checkpoint.version != CHECKPOINT_VERSION:
+        raise RuntimeError(f'Checkpoint {path} has version {checkpoint.version}, expected {CHECKPOINT_VERSION}')
+    return checkpoint
+
+
+def append_offspring(path, individual):
+    """
+    Appends an evaluated individual of an unfinished generation to its offspring file. A crash while writing leaves
+    only the last record incomplete, it is skipped by load_offspring.
+
+    :param path: path of the offspring file
+    :param individual: evaluated individual
+    """
+    with open(path, 'ab') as f:
+        pickle.dump(individual, f, pickle.HIGHEST_PROTOCOL)
+        f.flush()
+
+
+def load_offspring(path):
+    """
+    :param path: path of the offspring file
+    :return: the individuals appended to the offspring file, without the last one if it is incomplete
+    """
+    individuals = []
+    if not os.path.isfile(path):
+        return individuals
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                individuals.append(pickle.load(f))
+            except (EOFError, pickle.UnpicklingError):
+                break
+    return individuals
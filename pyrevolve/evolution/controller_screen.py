@@ -0,0 +1,60 @@
+from pyrevolve.revolve_bot.brain import BrainNN
+from pyrevolve.revolve_bot.brain.signals import simulate
+from pyrevolve.custom_logging.logger import logger
+
+
+class ControllerScreenStatistics:
+    def __init__(self):
+        self.screened = 0
+        self.rejected = 0
+        # brains the offline simulation doesn't support, sent to the simulator
+        self.unsupported = 0
+
+    def rejection_rate(self):
+        return self.rejected / self.screened if self.screened > 0 else 0.0
+
+    def __repr__(self):
+        return f'rejection rate {self.rejection_rate():.3f} ({self.rejected} rejected out of {self.screened}, ' \
+               f'{self.unsupported} unsupported)'
+
+
+class ControllerScreen:
+    """
+    Simulates the neural network of the robots offline, to discard the robots whose controller can't move them
+    (see `ActuatorSignals.degenerate`) before they take a simulator.
+    """
+
+    def __init__(self, duration, update_rate=8, tolerance=1e-6):
+        """
+        :param duration: seconds of simulated time
+        :param update_rate: updates of the controller per second, as `--controller-update-rate`
+        :param tolerance: outputs varying by less are constant
+        """
+        self.duration = duration
+        self.update_rate = update_rate
+        self.tolerance = tolerance
+        self.statistics = ControllerScreenStatistics()
+
+    def is_degenerate(self, robot):
+        """
+        :param robot: RevolveBot
+        :return: True if the controller of the robot can't move it
+        """
+        brain = robot._brain
+        if not isinstance(brain, BrainNN):
+            return False
+        try:
+            signals = simulate([brain], self.duration, self.update_rate)
+        except RuntimeError as e:
+            self.statistics.unsupported += 1
+            logger.warning(f'Could not simulate the controller of robot {robot.id}: {e}')
+            return False
+
+        self.statistics.screened += 1
+        degenerate = bool(signals.degenerate(self.tolerance)[0])
+        if degenerate:
+            self.statistics.rejected += 1
+        return degenerate
+
+    def log_statistics(self):
+        logger.info(f'Controller screen: {self.statistics}')
@@ -0,0 +1,65 @@
+import asyncio
+import copy
+from collections import OrderedDict
+
+from pyrevolve.custom_logging.logger import logger
+
+
+class PhenotypeDeduplicator:
+    """
+    Coalesces the evaluations of individuals with identical phenotypes (same RevolveBot fingerprint).
+    The first individual is evaluated, every duplicate, in the same generation or in a later one,
+    awaits the same future instead of occupying another simulator.
+    The evaluations are kept with LRU eviction.
+    """
+
+    def __init__(self, capacity=10000):
+        """
+        :param capacity: maximum number of evaluations kept
+        """
+        assert (capacity > 0)
+        self._capacity = capacity
+        self._evaluations = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._evaluations)
+
+    async def evaluate(self, individual, evaluate):
+        """
+        :param individual: individual to evaluate
+        :param evaluate: coroutine function evaluating an individual, returns (fitness, behavioural measurements)
+        :return: (fitness, behavioural measurements)
+        """
+        fingerprint = individual.phenotype.fingerprint()
+        future = self._evaluations.get(fingerprint)
+
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(evaluate(individual))
+            self._evaluations[fingerprint] = future
+            while len(self._evaluations) > self._capacity:
+                # the evicted evaluations still resolve for the duplicates already awaiting them
+                self._evaluations.popitem(last=False)
+            future.add_done_callback(lambda f: self._forget_failed(fingerprint, f))
+            return await asyncio.shield(future)
+
+        self.hits += 1
+        self._evaluations.move_to_end(fingerprint)
+        logger.info(f'Individual {individual.phenotype.id} has the same phenotype of an already evaluated one')
+        fitness, behavioural_measurements = await asyncio.shield(future)
+        return fitness, copy.deepcopy(behavioural_measurements)
+
+    def _forget_failed(self, fingerprint, future):
+        # failed evaluations are not shared with later duplicates, they will be tried again. The simulator queue
+        # reports a robot given up after its failed attempts, or past its deadline, with a None fitness
+        if future.cancelled() or future.exception() is not None or future.result()[0] is None:
+            if self._evaluations.get(fingerprint) is future:
+                del self._evaluations[fingerprint]
+
+    def log_statistics(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total > 0 else 0.0
+        logger.info(f'Phenotype deduplication: {len(self)} distinct phenotypes, '
+                    f'{self.hits} duplicated evaluations avoided ({rate:.3f})')
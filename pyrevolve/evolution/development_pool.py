@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.custom_logging.logger import logger
+
+
+def develop_individual(genotype, phenotype=None, experiment_management=None):
+    """
+    Develops a genotype into an individual, measures its phenotype and exports its files.
+    Images are not rendered here, see RenderService.
+    Defined at module level, so that it can be executed by a worker process.
+
+    :param genotype: genotype of the new individual
+    :param phenotype: (optional) already developed and measured phenotype of the genotype, e.g. from a cache
+    :param experiment_management: (optional) object with methods for managing the current experiment, exporting the
+    per-robot files of the individual. If None, nothing is exported, e.g. with the experiment store, which is written
+    by the manager process only.
+    :return: developed and measured individual (picklable)
+    """
+    individual = Individual(genotype, phenotype)
+    individual.develop()
+    if individual.phenotype._morphological_measurements is None \
+            or individual.phenotype._brain_measurements is None:
+        individual.phenotype.measure_phenotype()
+    if experiment_management is not None:
+        experiment_management.export_developed(individual)
+
+    return individual
+
+
+class DevelopmentPool:
+    """
+    Develops and measures batches of genotypes in a pool of worker processes,
+    keeping the asyncio event loop free to serve the simulators in the meantime.
+    """
+
+    def __init__(self, n_workers: int = None):
+        """
+        :param n_workers: number of worker processes. If 0, genotypes are developed inline in the event loop.
+        If None, one per CPU.
+        """
+        self._n_workers = n_workers
+        self._executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers != 0 else None
+
+    def develop(self, genotypes, phenotypes=None, experiment_management=None):
+        """
+        Submits a whole batch of genotypes for development
+
+        :param genotypes: genotypes to develop
+        :param phenotypes: (optional) list of already developed phenotypes (or None) matching the genotypes
+        :param experiment_management: (optional) exports the files of the individuals from the workers,
+        see `develop_individual`
+        :return: list of futures, one per genotype in the same order, each resolving to the developed Individual
+        """
+        if phenotypes is None:
+            phenotypes = [None] * len(genotypes)
+
+        loop = asyncio.get_event_loop()
+        futures = []
+        for genotype, phenotype in zip(genotypes, phenotypes):
+            if self._executor is None:
+                future = loop.create_future()
+                future.set_result(develop_individual(genotype, phenotype, experiment_management))
+            else:
+                future = loop.run_in_executor(self._executor, develop_individual, genotype, phenotype,
+                                              experiment_management)
+            futures.append(future)
+        logger.info(f'Submitted {len(futures)} genotypes for development')
+        return futures
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
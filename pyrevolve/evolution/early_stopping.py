@@ -0,0 +1,287 @@
+import math
+import random
+
+import numpy as np
+
+from pyrevolve.angle.manage.trajectory import Trajectory
+from pyrevolve.custom_logging.logger import logger
+
+
+def seconds(time):
+    """
+    :param time: Time
+    :return: the time in seconds
+    """
+    return time.sec + time.nsec / 1e9
+
+
+def robot_age(robot_manager):
+    """
+    :return: seconds of simulated time since the insertion of the robot
+    """
+    return seconds(robot_manager.last_update) - seconds(robot_manager.starting_time)
+
+
+class EarlyStoppingPolicy:
+    """
+    Decides from the live state of a robot in the simulator whether its evaluation can stop before the end of its
+    life. Policies are checked while the robot is simulated, they should only look at the last samples of its
+    trajectory.
+    """
+
+    def should_stop(self, robot_manager, age, evaluation_time):
+        """
+        :param robot_manager: RobotManager of the robot being evaluated
+        :param age: seconds of simulated time since the insertion of the robot
+        :param evaluation_time: seconds of simulated time of a complete evaluation
+        :return: the reason to stop the evaluation, None to continue it
+        """
+        raise NotImplementedError()
+
+    def update(self, individuals):
+        """
+        Called with the current population before each generation is evaluated
+        :param individuals: evaluated individuals of the population
+        """
+        pass
+
+
+class FlippedOver(EarlyStoppingPolicy):
+    """
+    Stops the robots lying on their back or on their side: a robot that flipped over can't get up again,
+    and would keep a poor `head_balance` until the end of its life.
+    """
+
+    def __init__(self, max_tilt=math.pi / 2, min_age=5.0):
+        """
+        :param max_tilt: angle in radians between the vertical axis of the core and the vertical above which
+        the robot flipped over
+        :param min_age: seconds of simulated time before the first check, while the robot falls on the ground
+        """
+        self.max_tilt = max_tilt
+        self.min_age = min_age
+
+    def should_stop(self, robot_manager, age, evaluation_time):
+        trajectory = robot_manager._trajectory
+        if age < self.min_age or len(trajectory) == 0:
+            return None
+        w, x, y, z = trajectory.row(-1)[Trajectory.ORIENTATION]
+        norm = w * w + x * x + y * y + z * z
+        if norm == 0.0:
+            return None
+        # vertical component of the vertical axis of the core, the last element of the rotation matrix
+        up = 1.0 - 2.0 * (x * x + y * y) / norm
+        if up < math.cos(self.max_tilt):
+            return 'flipped over'
+        return None
+
+
+class DisplacementBound(EarlyStoppingPolicy):
+    """
+    Stops the robots that can't reach the fitness of the current population anymore, even moving in a straight line
+    at `max_speed` until the end of their life. Only valid for the `displacement` and `displacement_velocity`
+    fitness functions.
+    """
+
+    def __init__(self, max_speed, fraction=0.5, quantile=0.0, velocity=True):
+        """
+        :param max_speed: optimistic speed of the robots in m/s
+        :param fraction: fraction of the evaluation time after which the robots are checked
+        :param quantile: quantile of the fitness of the population the robots must be able to reach, 0.0 for the
+        worst individual, which loses all its tournaments
+        :param velocity: whether the fitness is the displacement velocity, or the displacement
+        """
+        self.max_speed = max_speed
+        self.fraction = fraction
+        self.quantile = quantile
+        self.velocity = velocity
+        self.threshold = None
+
+    def update(self, individuals):
+        fitnesses = [individual.fitness for individual in individuals if individual.fitness is not None]
+        self.threshold = float(np.quantile(fitnesses, self.quantile)) if len(fitnesses) > 0 else None
+
+    def should_stop(self, robot_manager, age, evaluation_time):
+        trajectory = robot_manager._trajectory
+        if self.threshold is None or age < self.fraction * evaluation_time or len(trajectory) < 2:
+            return None
+        first, last = trajectory.row(0), trajectory.row(-1)
+        displacement = math.hypot(last[2] - first[2], last[3] - first[3])
+        remaining = max(evaluation_time - age, 0.0)
+        bound = displacement + self.max_speed * remaining
+        if self.velocity:
+            start = first[Trajectory.SEC] + first[Trajectory.NSEC] / 1e9
+            bound /= max(seconds(robot_manager.starting_time) + evaluation_time - start, 1e-9)
+        if bound < self.threshold:
+            return 'too slow'
+        return None
+
+
+class EarlyStoppingStatistics:
+    def __init__(self):
+        self.evaluations = 0
+        self.stopped = 0
+        # number of stopped robots by reason
+        self.reasons = {}
+        # seconds of simulation left to the stopped robots
+        self.simulation_time_saved = 0.0
+        # stopped robots that survived the population management anyway, with their truncated fitness
+        self.stopped_survived = 0
+        # shadow evaluations: robots ruled out by a policy, but evaluated until the end of their life
+        self.shadowed = 0
+        # shadowed robots that survived the population management with their complete fitness
+        self.shadowed_selected = 0
+
+    def stop_rate(self):
+        return self.stopped / self.evaluations if self.evaluations > 0 else 0.0
+
+    def wrongly_stopped(self):
+        """
+        :return: estimated number of stopped robots that would have been selected with a complete evaluation, from
+        the fraction of the shadowed robots that were selected. None without shadow evaluations.
+        """
+        if self.shadowed == 0:
+            return None
+        return self.stopped * self.shadowed_selected / self.shadowed
+
+    def __repr__(self):
+        reasons = ', '.join(f'{count} {reason}' for reason, count in sorted(self.reasons.items()))
+        wrongly_stopped = self.wrongly_stopped()
+        wrongly_stopped = '-' if wrongly_stopped is None else f'{wrongly_stopped:.1f}'
+        return f'{self.stopped} stopped out of {self.evaluations} evaluations ({reasons or "-"}), ' \
+               f'stop rate {self.stop_rate():.3f}, {self.simulation_time_saved / 3600:.2f} simulator hours saved, ' \
+               f'{self.stopped_survived} stopped robots survived with their truncated fitness, ' \
+               f'{self.shadowed_selected} of {self.shadowed} shadow evaluations selected, ' \
+               f'{wrongly_stopped} stopped robots estimated to be selected with a complete evaluation'
+
+
+class _RobotWatch:
+    """
+    Checks the policies every `check_interval` seconds of simulated time of a robot
+    """
+
+    def __init__(self, early_stopping, evaluation_time):
+        self.early_stopping = early_stopping
+        self.evaluation_time = evaluation_time
+        self.next_check = 0.0
+
+    def __call__(self, robot_manager):
+        age = robot_age(robot_manager)
+        if age < self.next_check:
+            return None
+        self.next_check = age + self.early_stopping.check_interval
+        reason = self.early_stopping.check(robot_manager, age, self.evaluation_time)
+        if reason is None:
+            return None
+        if self.early_stopping.shadow(robot_manager):
+            # evaluated until the end of its life, not checked anymore
+            self.next_check = math.inf
+            return None
+        self.early_stopping.record_stop(reason, age, self.evaluation_time)
+        return reason
+
+
+class EarlyStopping:
+    """
+    Stops the evaluation of the robots as soon as one of the policies rules them out. The simulator deletes them,
+    and their fitness is computed on their truncated trajectory, with the age at which they were stopped in the
+    `early_stopped` behavioural measurement.
+    A small random fraction of the robots to stop are evaluated until the end of their life instead (shadow
+    evaluations), to estimate how many stopped robots would have been selected with a complete evaluation.
+    """
+
+    def __init__(self, policies, check_interval=1.0, shadow_rate=0.0, seed=None):
+        """
+        :param policies: list of EarlyStoppingPolicy, the robot is stopped when any of them says so
+        :param check_interval: seconds of simulated time between two checks of the same robot
+        :param shadow_rate: probability that a robot to stop is evaluated until the end of its life instead
+        :param seed: seed of the random generator of the shadow evaluations, separate from the one of the evolution
+        """
+        assert (0.0 <= shadow_rate <= 1.0)
+        self.policies = policies
+        self.check_interval = check_interval
+        self.shadow_rate = shadow_rate
+        self._rng = random.Random(seed)
+        # names of the robots being shadowed, until their selection is observed
+        self._shadowed = set()
+        self.statistics = EarlyStoppingStatistics()
+        # statistics of the current generation
+        self.generation_statistics = EarlyStoppingStatistics()
+
+    def update(self, individuals):
+        """
+        :param individuals: evaluated individuals of the current population
+        """
+        for policy in self.policies:
+            policy.update(individuals)
+
+    def watch(self, robot_manager, evaluation_time):
+        """
+        Checks the robot at its state updates
+        :param robot_manager: RobotManager of the robot just inserted
+        :param evaluation_time: seconds of simulated time of a complete evaluation
+        """
+        robot_manager.early_stopping = _RobotWatch(self, evaluation_time)
+        for statistics in (self.statistics, self.generation_statistics):
+            statistics.evaluations += 1
+
+    def check(self, robot_manager, age, evaluation_time):
+        """
+        :return: the reason to stop the robot, None to continue its evaluation
+        """
+        for policy in self.policies:
+            reason = policy.should_stop(robot_manager, age, evaluation_time)
+            if reason is not None:
+                return reason
+        return None
+
+    def shadow(self, robot_manager):
+        """
+        Draws whether a robot to stop is evaluated until the end of its life instead
+        :return: whether the robot is shadowed
+        """
+        if self.shadow_rate == 0.0 or self._rng.random() >= self.shadow_rate:
+            return False
+        self._shadowed.add(robot_manager.name)
+        for statistics in (self.statistics, self.generation_statistics):
+            statistics.shadowed += 1
+        return True
+
+    def record_stop(self, reason, age, evaluation_time):
+        for statistics in (self.statistics, self.generation_statistics):
+            statistics.stopped += 1
+            statistics.reasons[reason] = statistics.reasons.get(reason, 0) + 1
+            statistics.simulation_time_saved += max(evaluation_time - age, 0.0)
+
+    def observe_selection(self, offspring, survivors):
+        """
+        Counts the stopped robots that survived the population management with their truncated fitness, and the
+        shadowed robots selected with their complete fitness
+        :param offspring: individuals evaluated in this generation
+        :param survivors: individuals of the next population
+        """
+        survivors = set(survivors)
+        n_survived = sum(1 for individual in offspring if individual in survivors and stopped_early(individual))
+        n_shadowed_selected = 0
+        for individual in offspring:
+            if individual.phenotype is not None and individual.phenotype.id in self._shadowed:
+                self._shadowed.discard(individual.phenotype.id)
+                if individual in survivors:
+                    n_shadowed_selected += 1
+        for statistics in (self.statistics, self.generation_statistics):
+            statistics.stopped_survived += n_survived
+            statistics.shadowed_selected += n_shadowed_selected
+
+    def log_statistics(self):
+        logger.info(f'Early stopping in this generation: {self.generation_statistics}')
+        logger.info(f'Early stopping: {self.statistics}')
+        self.generation_statistics = EarlyStoppingStatistics()
+
+
+def stopped_early(individual):
+    """
+    :return: whether the evaluation of the individual was stopped early, its fitness is truncated
+    """
+    phenotype = individual.phenotype
+    measurements = None if phenotype is None else phenotype._behavioural_measurements
+    return measurements is not None and getattr(measurements, 'early_stopped', None) is not None
@@ -0,0 +1,190 @@
+import copy
+import os
+import pickle
+import random
+from collections import OrderedDict
+
+from pyrevolve.custom_logging.logger import logger
+
+
+class CachePolicy:
+    # only developed phenotypes and their measurements are reused, every individual is simulated
+    PHENOTYPE_ONLY = 'phenotype_only'
+    # the cached fitness is reused, individuals with an already evaluated genotype are never simulated again
+    REUSE = 'reuse'
+    # the cached fitness is reused, but re-evaluated with a probability. The cached fitness is the average of samples
+    RESAMPLE = 'resample'
+
+
+class CacheEntry:
+    def __init__(self, phenotype):
+        """
+        :param phenotype: developed and measured RevolveBot
+        """
+        self.phenotype = phenotype
+        self.fitness_samples = []
+        self.behavioural_measurements = None
+
+    @property
+    def evaluated(self):
+        return len(self.fitness_samples) > 0
+
+    @property
+    def fitness(self):
+        if len(self.fitness_samples) == 0:
+            return None
+        return sum(self.fitness_samples) / len(self.fitness_samples)
+
+
+class PhenotypeCache:
+    """
+    Content-addressed cache of developed phenotypes, their measurements and (optionally) their fitness,
+    keyed by the canonical hash of the genotype.
+    Entries are kept in memory with LRU eviction and, if a folder is given, also stored on disk.
+    """
+
+    def __init__(self,
+                 capacity=1000,
+                 cache_folder=None,
+                 policy=CachePolicy.PHENOTYPE_ONLY,
+                 resample_probability=0.0):
+        """
+        :param capacity: maximum number of entries kept in memory
+        :param cache_folder: (optional) folder of the on-disk backing store
+        :param policy: CachePolicy used to decide if a cached fitness is reused
+        :param resample_probability: probability of re-evaluating a cached individual with CachePolicy.RESAMPLE
+        """
+        assert (capacity > 0)
+        self._capacity = capacity
+        self._cache_folder = cache_folder
+        self.policy = policy
+        self.resample_probability = resample_probability
+        self._entries = OrderedDict()
+
+        self.phenotype_hits = 0
+        self.phenotype_misses = 0
+        self.fitness_hits = 0
+        self.fitness_misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry_path(self, key):
+        return os.path.join(self._cache_folder, f'{key}.pickle')
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if self._cache_folder is not None and os.path.isfile(self._entry_path(key)):
+            with open(self._entry_path(key), 'rb') as f:
+                entry = pickle.load(f)
+            self._put(key, entry, write_through=False)
+        return entry
+
+    def _put(self, key, entry, write_through=True):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+        if write_through and self._cache_folder is not None:
+            # write and rename, a crash never leaves a truncated entry behind
+            os.makedirs(self._cache_folder, exist_ok=True)
+            tmp_path = self._entry_path(key) + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._entry_path(key))
+
+    def phenotype(self, genotype):
+        """
+        :param genotype: genotype of the new individual
+        :return: a copy of the cached phenotype with the id of the genotype, None if not cached
+        """
+        entry = self._get(genotype.canonical_hash())
+        if entry is None:
+            self.phenotype_misses += 1
+            return None
+        self.phenotype_hits += 1
+
+        phenotype = copy.deepcopy(entry.phenotype)
+        phenotype._id = genotype.id if type(genotype.id) == str and genotype.id.startswith("robot") \
+            else "robot_{}".format(genotype.id)
+        return phenotype
+
+    def store_phenotype(self, individual):
+        """
+        Caches the developed and measured phenotype of the individual, if not cached yet
+        :param individual: developed individual
+        """
+        key = individual.genotype.canonical_hash()
+        if self._get(key) is None:
+            phenotype = copy.deepcopy(individual.phenotype)
+            phenotype._behavioural_measurements = None
+            self._put(key, CacheEntry(phenotype))
+
+    def evaluation(self, individual):
+        """
+        Looks up the evaluation of the individual, according to the cache policy
+        :param individual: individual to evaluate
+        :return: (fitness, behavioural measurements) if the cached result can be used, None otherwise
+        """
+        entry = None
+        if self.policy != CachePolicy.PHENOTYPE_ONLY:
+            entry = self._get(individual.genotype.canonical_hash())
+
+        if entry is None or not entry.evaluated \
+                or (self.policy == CachePolicy.RESAMPLE and random.random() < self.resample_probability):
+            self.fitness_misses += 1
+            return None
+
+        self.fitness_hits += 1
+        return entry.fitness, copy.deepcopy(entry.behavioural_measurements)
+
+    def store_evaluation(self, individual, fitness, behavioural_measurements):
+        """
+        Adds the result of an evaluation to the cache
+        :param individual: evaluated individual
+        :param fitness: fitness of the evaluation
+        :param behavioural_measurements: behavioural measurements of the evaluation
+        :return: the fitness to use for the individual, averaged over all the samples with CachePolicy.RESAMPLE,
+        None if the evaluation failed
+        """
+        key = individual.genotype.canonical_hash()
+        entry = self._get(key)
+        if entry is None:
+            entry = CacheEntry(copy.deepcopy(individual.phenotype))
+            entry.phenotype._behavioural_measurements = None
+
+        if fitness is None:
+            # a failed, rejected or expired evaluation is not a sample and gets no fitness, whatever the policy.
+            # The individual is simulated again next time
+            self._put(key, entry)
+            return None
+
+        if self.policy != CachePolicy.RESAMPLE:
+            entry.fitness_samples = []
+        entry.fitness_samples.append(fitness)
+        entry.behavioural_measurements = behavioural_measurements
+        self._put(key, entry)
+
+        return entry.fitness if self.policy == CachePolicy.RESAMPLE else fitness
+
+    @staticmethod
+    def _rate(hits, misses):
+        return hits / (hits + misses) if hits + misses > 0 else 0.0
+
+    def hit_rates(self):
+        """
+        :return: (phenotype hit rate, fitness hit rate)
+        """
+        return self._rate(self.phenotype_hits, self.phenotype_misses), \
+            self._rate(self.fitness_hits, self.fitness_misses)
+
+    def log_statistics(self):
+        phenotype_rate, fitness_rate = self.hit_rates()
+        logger.info(f'Phenotype cache: {len(self)} entries in memory, '
+                    f'phenotype hit rate {phenotype_rate:.3f} ({self.phenotype_hits} hits), '
+                    f'fitness hit rate {fitness_rate:.3f} ({self.fitness_hits} hits)')
@@ -1,6 +1,7 @@
 # [(G,P), (G,P), (G,P), (G,P), (G,P)]
 
 from pyrevolve.evolution.individual import Individual
+from pyrevolve.evolution.development_pool import develop_individual
 from pyrevolve.SDF.math import Vector3
 from pyrevolve.tol.manage import measures
 from ..custom_logging.logger import logger
@@ -27,7 +28,11 @@ class PopulationConfig:
                  experiment_name,
                  experiment_management,
                  offspring_size=None,
-                 next_robot_id=1):
+                 next_robot_id=1,
+                 generation_deadline=None,
+                 controller_screen=None,
+                 surrogate=None,
+                 early_stopping=None):
         """
         Creates a PopulationConfig object that sets the particular configuration for the population
 
@@ -45,6 +50,13 @@ class PopulationConfig:
         :param experiment_name: name for the folder of the current experiment
         :param experiment_management: object with methods for managing the current experiment
         :param offspring_size (optional): size of offspring (for steady state)
+        :param generation_deadline (optional): seconds allowed for the evaluation of a generation, the robots still
+        waiting for a simulator after it are not evaluated
+        :param controller_screen (optional): ControllerScreen discarding the robots with a degenerate controller
+        before the simulation
+        :param surrogate (optional): SurrogateFitness choosing which offspring is simulated
+        :param early_stopping (optional): EarlyStopping ending the evaluation of the robots ruled out by their
+        partial trajectory
         """
         self.population_size = population_size
         self.genotype_constructor = genotype_constructor
@@ -63,10 +75,15 @@ class PopulationConfig:
         self.experiment_management = experiment_management
         self.offspring_size = offspring_size
         self.next_robot_id = next_robot_id
+        self.generation_deadline = generation_deadline
+        self.controller_screen = controller_screen
+        self.surrogate = surrogate
+        self.early_stopping = early_stopping
 
 
 class Population:
-    def __init__(self, conf: PopulationConfig, simulator_queue, analyzer_queue=None, next_robot_id=1):
+    def __init__(self, conf: PopulationConfig, simulator_queue, analyzer_queue=None, next_robot_id=1,
+                 development_pool=None, phenotype_cache=None, deduplicator=None):
         """
         Creates a Population object that initialises the
         individuals in the population with an empty list
@@ -77,56 +94,77 @@ class Population:
         :param simulator_queue: connection to the simulator queue
         :param analyzer_queue: connection to the analyzer simulator queue
         :param next_robot_id: (sequential) id of the next individual to be created
+        :param development_pool: (optional) DevelopmentPool to develop and measure new individuals in parallel
+        :param phenotype_cache: (optional) PhenotypeCache to reuse phenotypes and evaluations of known genotypes
+        :param deduplicator: (optional) PhenotypeDeduplicator to evaluate identical phenotypes only once
         """
         self.conf = conf
         self.individuals = []
         self.analyzer_queue = analyzer_queue
         self.simulator_queue = simulator_queue
         self.next_robot_id = next_robot_id
+        self.development_pool = development_pool
+        self.phenotype_cache = phenotype_cache
+        self.deduplicator = deduplicator
 
     def _new_individual(self, genotype):
-        individual = Individual(genotype)
-        individual.develop()
-        self.conf.experiment_management.export_genotype(individual)
-        self.conf.experiment_management.export_phenotype(individual)
-        self.conf.experiment_management.export_phenotype_images(os.path.join('data_fullevolution', 'phenotype_images'), individual)
-        individual.phenotype.measure_phenotype()
-        individual.phenotype.export_phenotype_measurements(self.conf.experiment_management.data_folder)
-
+        individual = develop_individual(genotype, self._cached_phenotype(genotype))
+        self._cache_phenotype(individual)
+        self._export_developed(individual)
         return individual
 
+    def _worker_exports(self):
+        """
+        :return: the experiment management exporting the files of the individuals from the development workers,
+        None if they are exported by the manager process, which owns the experiment store
+        """
+        experiment_management = self.conf.experiment_management
+        return experiment_management if experiment_management.exports_files else None
+
+    def _export_developed(self, individual, exported=False):
+        """
+        :param exported: whether the files of the individual were already exported by its development worker
+        """
+        # images are queued in the manager process, where the render service keeps track of the rendered robots
+        experiment_management = self.conf.experiment_management
+        if not exported:
+            experiment_management.export_developed(individual)
+        experiment_management.export_phenotype_images(os.path.join('data_fullevolution', 'phenotype_images'),
+                                                      individual)
+
+    def _cached_phenotype(self, genotype):
+        if self.phenotype_cache is None:
+            return None
+        return self.phenotype_cache.phenotype(genotype)
+
+    def _cache_phenotype(self, individual):
+        if self.phenotype_cache is not None:
+            self.phenotype_cache.store_phenotype(individual)
+
     async def load_individual(self, id):
-        data_path = self.conf.experiment_management.data_folder
+        experiment_management = self.conf.experiment_management
         genotype = self.conf.genotype_constructor(self.conf.genotype_conf, id)
-        genotype.load_genotype(os.path.join(data_path, 'genotypes', f'genotype_{id}.txt'))
+        experiment_management.read_genotype(genotype, id)
 
         individual = Individual(genotype)
         individual.develop()
         individual.phenotype.measure_phenotype()
+        individual.fitness = experiment_management.read_fitness(id)
 
-        with open(os.path.join(data_path, 'fitness', f'fitness_{id}.txt')) as f:
-            data = f.readlines()[0]
-            individual.fitness = None if data == 'None' else float(data)
-
-        with open(os.path.join(data_path, 'descriptors', f'behavior_desc_{id}.txt')) as f:
-            lines = f.readlines()
-            if lines[0] == 'None':
-                individual.phenotype._behavioural_measurements = None
-            else:
-                individual.phenotype._behavioural_measurements = measures.BehaviouralMeasurements()
-                for line in lines:
-                    if line.split(' ')[0] == 'velocity':
-                        individual.phenotype._behavioural_measurements.velocity = float(line.split(' ')[1])
-                    #if line.split(' ')[0] == 'displacement':
-                     #   individual.phenotype._behavioural_measurements.displacement = float(line.split(' ')[1])
-                    if line.split(' ')[0] == 'displacement_velocity':
-                        individual.phenotype._behavioural_measurements.displacement_velocity = float(line.split(' ')[1])
-                    if line.split(' ')[0] == 'displacement_velocity_hill':
-                        individual.phenotype._behavioural_measurements.displacement_velocity_hill = float(line.split(' ')[1])
-                    if line.split(' ')[0] == 'head_balance':
-                        individual.phenotype._behavioural_measurements.head_balance = float(line.split(' ')[1])
-                    if line.split(' ')[0] == 'contacts':
-                        individual.phenotype._behavioural_measurements.contacts = float(line.split(' ')[1])
+        behavior_measures = experiment_management.read_behavior_measures(id)
+        if behavior_measures is None:
+            individual.phenotype._behavioural_measurements = None
+        else:
+            individual.phenotype._behavioural_measurements = measures.BehaviouralMeasurements()
+            for key in ['velocity',
+                        #'displacement',
+                        'displacement_velocity',
+                        'displacement_velocity_hill',
+                        'head_balance',
+                        'contacts',
+                        'early_stopped']:
+                if key in behavior_measures:
+                    setattr(individual.phenotype._behavioural_measurements, key, behavior_measures[key])
 
         return individual
 
@@ -135,19 +173,34 @@ class Population:
         Recovers all genotypes and fitnesses of robots in the lastest selected population
         :param gen_num: number of the generation snapshot to recover
         """
-        data_path = self.conf.experiment_management.experiment_folder
-        for r, d, f in os.walk(data_path +'/selectedpop_'+str(gen_num)):
-            for file in f:
-                if 'body' in file:
-                    id = file.split('.')[0].split('_')[-2]+'_'+file.split('.')[0].split('_')[-1]
-                    self.individuals.append(await self.load_individual(id))
+        for id in self.conf.experiment_management.read_snapshot_ids(gen_num):
+            self.individuals.append(await self.load_individual(id))
+
+    async def load_checkpoint(self, gen_num):
+        """
+        Recovers the population of a generation from its checkpoint, with the developed phenotypes
+        and the state of the random generators
+        :param gen_num: number of the generation checkpoint to recover
+        """
+        checkpoint = self.conf.experiment_management.read_checkpoint(gen_num)
+        self.individuals = checkpoint.individuals
+        self.next_robot_id = checkpoint.next_robot_id
+        checkpoint.restore_random_state()
 
     async def load_offspring(self, last_snapshot, population_size, offspring_size, next_robot_id):
         """
-        Recovers the part of an unfinished offspring
+        Recovers the part of an unfinished offspring, from the offspring file next to the checkpoint of the last
+        snapshot when there is one, from the files of the robots otherwise
         :param
         :return:
         """
+        experiment_management = self.conf.experiment_management
+        if experiment_management.has_checkpoint(last_snapshot):
+            individuals = experiment_management.read_offspring(last_snapshot + 1)
+            self.next_robot_id = max([next_robot_id] + [int(individual.phenotype.id.split('_')[-1]) + 1
+                                                         for individual in individuals])
+            return individuals
+
         individuals = []
         # number of robots expected until the latest snapshot
         if last_snapshot == -1:
@@ -165,12 +218,16 @@ class Population:
         """
         Populates the population (individuals list) with Individual objects that contains their respective genotype.
         """
+        genotypes = []
         for i in range(self.conf.population_size-len(recovered_individuals)):
-            individual = self._new_individual(self.conf.genotype_constructor(self.conf.genotype_conf, self.next_robot_id))
-            self.individuals.append(individual)
+            genotypes.append(self.conf.genotype_constructor(self.conf.genotype_conf, self.next_robot_id))
             self.next_robot_id += 1
 
-        await self.evaluate(self.individuals, 0)
+        if self.development_pool is not None:
+            self.individuals.extend(await self.develop_and_evaluate(genotypes, 0))
+        else:
+            self.individuals.extend(self._new_individual(genotype) for genotype in genotypes)
+            await self.evaluate(self.individuals, 0)
         self.individuals = recovered_individuals + self.individuals
 
     async def next_gen(self, gen_num, recovered_individuals=[]):
@@ -182,9 +239,18 @@ class Population:
         :return: new population
         """
 
-        new_individuals = []
+        n_offspring = self.conf.offspring_size - len(recovered_individuals)
+        surrogate = self.conf.surrogate
+        if surrogate is not None:
+            surrogate.observe(self.individuals)
+        early_stopping = self.conf.early_stopping
+        if early_stopping is not None:
+            early_stopping.update(self.individuals)
+        n_candidates = n_offspring if surrogate is None else surrogate.n_candidates(n_offspring)
+
+        child_genotypes = []
 
-        for _i in range(self.conf.offspring_size-len(recovered_individuals)):
+        for _i in range(n_candidates):
             # Selection operator (based on fitness)
             # Crossover
             if self.conf.crossover_operator is not None:
@@ -199,14 +265,33 @@ class Population:
 
             # Mutation operator
             child_genotype = self.conf.mutation_operator(child.genotype, self.conf.mutation_conf)
-            # Insert individual in new population
-            individual = self._new_individual(child_genotype)
+            child_genotypes.append(child_genotype)
 
-            new_individuals.append(individual)
-
-        # evaluate new individuals
-        await self.evaluate(new_individuals, gen_num)
+        # develop and evaluate new individuals
+        if n_candidates > n_offspring:
+            new_individuals = await self._develop_and_select(child_genotypes, n_offspring, gen_num)
+        elif self.development_pool is not None:
+            new_individuals = await self.develop_and_evaluate(child_genotypes, gen_num)
+        else:
+            # Insert individuals in new population
+            new_individuals = [self._new_individual(child_genotype) for child_genotype in child_genotypes]
+            await self.evaluate(new_individuals, gen_num)
+        if surrogate is not None:
+            surrogate.observe(new_individuals)
+
+        if self.phenotype_cache is not None:
+            self.phenotype_cache.log_statistics()
+        if self.deduplicator is not None:
+            self.deduplicator.log_statistics()
+        self.simulator_queue.log_statistics()
+        if self.analyzer_queue is not None:
+            self.analyzer_queue.log_statistics()
+        if self.conf.controller_screen is not None:
+            self.conf.controller_screen.log_statistics()
+        if surrogate is not None:
+            surrogate.log_statistics()
 
+        offspring = new_individuals
         new_individuals = recovered_individuals + new_individuals
 
         # create next population
@@ -215,7 +300,11 @@ class Population:
                                                               self.conf.population_management_selector)
         else:
             new_individuals = self.conf.population_management(self.individuals, new_individuals)
-        new_population = Population(self.conf, self.simulator_queue, self.analyzer_queue, self.next_robot_id)
+        if early_stopping is not None:
+            early_stopping.observe_selection(offspring, new_individuals)
+            early_stopping.log_statistics()
+        new_population = Population(self.conf, self.simulator_queue, self.analyzer_queue, self.next_robot_id,
+                                    self.development_pool, self.phenotype_cache, self.deduplicator)
         new_population.individuals = new_individuals
         logger.info(f'Population selected in gen {gen_num} with {len(new_population.individuals)} individuals...')
 
@@ -230,40 +319,136 @@ class Population:
         """
         # Parse command line / file input arguments
         # await self.simulator_connection.pause(True)
+        deadline = self._generation_deadline()
         robot_futures = []
         for individual in new_individuals:
             logger.info(f'Evaluating individual (gen {gen_num}) {individual.genotype.id} ...')
-            robot_futures.append(asyncio.ensure_future(self.evaluate_single_robot(individual)))
-
-        await asyncio.sleep(1)
+            robot_futures.append(asyncio.ensure_future(self._evaluate_individual(individual, deadline)))
 
-        for i, future in enumerate(robot_futures):
-            individual = new_individuals[i]
+        # results are consumed as they complete, a slow robot does not hold back the export of the others
+        for future in asyncio.as_completed(robot_futures):
+            individual, (fitness, behavioural_measurements) = await future
             logger.info(f'Evaluation of Individual {individual.phenotype.id}')
-            individual.fitness, individual.phenotype._behavioural_measurements = await future
+            individual.fitness = fitness
+            individual.phenotype._behavioural_measurements = behavioural_measurements
+            self._export_evaluation(individual, gen_num, type_simulation)
 
-            if individual.phenotype._behavioural_measurements is None:
-                assert (individual.fitness is None)
+    def _generation_deadline(self):
+        if self.conf.generation_deadline is None:
+            return None
+        return time.time() + self.conf.generation_deadline
 
-            if type_simulation == 'evolve':
-                self.conf.experiment_management.export_behavior_measures(individual.phenotype.id, individual.phenotype._behavioural_measurements)
+    async def _evaluate_individual(self, individual, deadline):
+        return individual, await self.evaluate_single_robot(individual, deadline)
 
-            logger.info(f'Individual {individual.phenotype.id} has a fitness of {individual.fitness}')
-            if type_simulation == 'evolve':
-                self.conf.experiment_management.export_fitness(individual)
+    async def develop_and_evaluate(self, genotypes, gen_num, type_simulation='evolve'):
+        """
+        Develops the genotypes in the development pool and evaluates each new individual as soon as it is developed,
+        while the rest of the batch is still developing
 
-    async def evaluate_single_robot(self, individual):
+        :param genotypes: genotypes of the new individuals
+        :param gen_num: generation number
+        :return: the evaluated individuals, in the same order as the genotypes
+        """
+        deadline = self._generation_deadline()
+        phenotypes = [self._cached_phenotype(genotype) for genotype in genotypes]
+        worker_exports = self._worker_exports()
+        robot_futures = []
+        for individual_future in self.development_pool.develop(genotypes, phenotypes, worker_exports):
+            robot_futures.append(asyncio.ensure_future(
+                self._evaluate_developed_robot(individual_future, gen_num, deadline, worker_exports is not None)))
+
+        for future in asyncio.as_completed(robot_futures):
+            individual, (fitness, behavioural_measurements) = await future
+            individual.fitness = fitness
+            individual.phenotype._behavioural_measurements = behavioural_measurements
+            self._export_evaluation(individual, gen_num, type_simulation)
+
+        return [future.result()[0] for future in robot_futures]
+
+    async def _develop_and_select(self, genotypes, n_offspring, gen_num):
+        """
+        Develops all the candidate genotypes and evaluates the offspring chosen by the surrogate fitness
+
+        :param genotypes: genotypes of the candidates, with consecutive ids
+        :param n_offspring: number of individuals to evaluate
+        :param gen_num: generation number
+        :return: the evaluated individuals
+        """
+        first_id = genotypes[0].id
+        phenotypes = [self._cached_phenotype(genotype) for genotype in genotypes]
+        # the candidates are renumbered after the selection, only the selected ones are exported, by the manager
+        if self.development_pool is not None:
+            candidates = list(await asyncio.gather(*self.development_pool.develop(genotypes, phenotypes)))
+        else:
+            candidates = [develop_individual(genotype, phenotype) for genotype, phenotype in zip(genotypes, phenotypes)]
+
+        new_individuals = self.conf.surrogate.select(candidates, n_offspring, self.conf.evaluation_time)
+        # the ids stay consecutive, as if the discarded candidates had never been created
+        for robot_id, individual in enumerate(new_individuals, start=first_id):
+            individual.genotype.id = robot_id
+            individual.phenotype._id = f'robot_{robot_id}'
+        self.next_robot_id = first_id + len(new_individuals)
+
+        for individual in new_individuals:
+            self._cache_phenotype(individual)
+            self._export_developed(individual)
+        await self.evaluate(new_individuals, gen_num)
+        return new_individuals
+
+    async def _evaluate_developed_robot(self, individual_future, gen_num, deadline=None, exported=False):
+        individual = await individual_future
+        self._cache_phenotype(individual)
+        self._export_developed(individual, exported)
+        logger.info(f'Evaluating individual (gen {gen_num}) {individual.genotype.id} ...')
+        return individual, await self.evaluate_single_robot(individual, deadline)
+
+    def _export_evaluation(self, individual, gen_num, type_simulation):
+        if individual.phenotype._behavioural_measurements is None:
+            assert (individual.fitness is None)
+
+        if type_simulation == 'evolve':
+            self.conf.experiment_management.export_behavior_measures(individual.phenotype.id, individual.phenotype._behavioural_measurements)
+
+        logger.info(f'Individual {individual.phenotype.id} has a fitness of {individual.fitness}')
+        if type_simulation == 'evolve':
+            self.conf.experiment_management.export_fitness(individual)
+            self.conf.experiment_management.export_offspring(individual, gen_num)
+
+    async def evaluate_single_robot(self, individual, deadline=None):
         """
         :param individual: individual
+        :param deadline: time after which the individual is not evaluated if it is still waiting for a simulator
         :return: Returns future of the evaluation, future returns (fitness, [behavioural] measurements)
         """
+        if self.phenotype_cache is not None:
+            cached_evaluation = self.phenotype_cache.evaluation(individual)
+            if cached_evaluation is not None:
+                logger.info(f'Reusing cached evaluation for individual {individual.phenotype.id}')
+                return cached_evaluation
+
+        if self.deduplicator is not None:
+            fitness, behavioural_measurements = await self.deduplicator.evaluate(
+                individual, lambda duplicate: self._simulate_single_robot(duplicate, deadline))
+        else:
+            fitness, behavioural_measurements = await self._simulate_single_robot(individual, deadline)
+
+        if self.phenotype_cache is not None:
+            fitness = self.phenotype_cache.store_evaluation(individual, fitness, behavioural_measurements)
+        return fitness, behavioural_measurements
+
+    async def _simulate_single_robot(self, individual, deadline=None):
         if individual.phenotype is None:
             individual.develop()
 
+        if self.conf.controller_screen is not None and self.conf.controller_screen.is_degenerate(individual.phenotype):
+            logger.info(f"discarding robot {individual} because its controller can't move it")
+            return None, None
+
         if self.analyzer_queue is not None:
             collisions, _bounding_box = await self.analyzer_queue.test_robot(individual, self.conf)
             if collisions > 0:
                 logger.info(f"discarding robot {individual} because there are {collisions} self collisions")
                 return None, None
 
-        return await self.simulator_queue.test_robot(individual, self.conf)
+        return await self.simulator_queue.test_robot(individual, self.conf, deadline)
@@ -0,0 +1,195 @@
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from pyrevolve.custom_logging.logger import logger
+
+
+class RenderMode:
+    # images are rendered immediately, in the calling process
+    INLINE = 'inline'
+    # images are rendered by a pool of worker processes, without blocking the evolution
+    BACKGROUND = 'background'
+    # nothing is rendered during the evolution, queued images are rendered by render_pending()
+    LAZY = 'lazy'
+
+
+def image_paths(folder, phenotype_id):
+    """
+    :param folder: folder of the images
+    :param phenotype_id: id of the phenotype
+    :return: (path of the body image, path of the brain image)
+    """
+    return os.path.join(folder, f'body_{phenotype_id}.png'), os.path.join(folder, f'brain_{phenotype_id}.png')
+
+
+def render_phenotype_images(phenotype, folder):
+    """
+    Renders the body and the brain of a phenotype.
+    Defined at module level, so that it can be executed by a worker process.
+
+    :param phenotype: RevolveBot to render
+    :param folder: folder where the images are stored
+    """
+    body_path, brain_path = image_paths(folder, phenotype.id)
+    phenotype.render_body(body_path)
+    phenotype.render_brain(brain_path)
+
+
+def link_images(source_folder, target_folder, phenotype_id):
+    """
+    Hard-links the images of a phenotype into another folder, copying them if the file system has no hard links
+
+    :param source_folder: folder of the rendered images
+    :param target_folder: folder where the images are needed
+    :param phenotype_id: id of the phenotype
+    """
+    for source, target in zip(image_paths(source_folder, phenotype_id), image_paths(target_folder, phenotype_id)):
+        if not os.path.isfile(source) or os.path.exists(target):
+            continue
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+
+class _RenderJob:
+    def __init__(self, phenotype_id, folder, phenotype=None):
+        # the phenotype is only kept by the lazy jobs that can't load it back from the exported data
+        self.phenotype = phenotype
+        self.phenotype_id = phenotype_id
+        self.folder = folder
+        self.future = None
+        self.links = []
+        self.finished = threading.Event()
+
+
+class RenderService:
+    """
+    Renders the images of the phenotypes out of the evolution hot path.
+    Every phenotype is rendered only once per folder, snapshots reuse the rendered images through hard links.
+    Only the queued jobs are kept, of the rendered images only the (folder, phenotype id) keys are remembered.
+    """
+
+    def __init__(self, mode=RenderMode.BACKGROUND, n_workers=1, load_phenotype=None):
+        """
+        :param mode: RenderMode deciding when and where images are rendered
+        :param n_workers: number of worker processes with RenderMode.BACKGROUND
+        :param load_phenotype: function returning the RevolveBot of a phenotype id, to load the phenotypes queued
+        with RenderMode.LAZY only when they are rendered. If None, the queued phenotypes are kept in memory.
+        """
+        assert (n_workers > 0)
+        self.mode = mode
+        self._n_workers = n_workers
+        self._load_phenotype = load_phenotype
+        self._executor = None
+        # queued jobs, by (folder, phenotype id)
+        self._jobs = {}
+        # (folder, phenotype id) of the rendered images
+        self._done = set()
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.duplicates = 0
+        self.links = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs) + len(self._done)
+
+    def submit(self, phenotype, folder):
+        """
+        Queues the rendering of the images of a phenotype, unless they are already queued or rendered in the folder
+
+        :param phenotype: RevolveBot to render
+        :param folder: folder where the images are stored
+        """
+        key = (folder, phenotype.id)
+        with self._lock:
+            if key in self._jobs or key in self._done:
+                self.duplicates += 1
+                return
+            self.submitted += 1
+            if all(os.path.isfile(path) for path in image_paths(folder, phenotype.id)):
+                # already rendered by a previous run of the experiment
+                self._done.add(key)
+                return
+            job = _RenderJob(phenotype.id, folder)
+            self._jobs[key] = job
+
+        if self.mode == RenderMode.INLINE:
+            self._render(job, phenotype)
+        elif self.mode == RenderMode.BACKGROUND:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._n_workers)
+            job.future = self._executor.submit(render_phenotype_images, phenotype, folder)
+            job.future.add_done_callback(lambda future: self._finish(job))
+        elif self._load_phenotype is None:
+            job.phenotype = phenotype
+
+    def link(self, phenotype, folder, target_folder):
+        """
+        Makes the images of a phenotype available in another folder (e.g. a snapshot) without rendering them again.
+        If the images are not rendered yet, they are queued and linked as soon as they are.
+
+        :param phenotype: RevolveBot whose images are needed
+        :param folder: folder where the images are rendered
+        :param target_folder: folder where the images are linked
+        """
+        self.submit(phenotype, folder)
+        with self._lock:
+            job = self._jobs.get((folder, phenotype.id))
+            if job is not None:
+                job.links.append(target_folder)
+                return
+        self._link(folder, phenotype.id, target_folder)
+
+    def render_pending(self):
+        """
+        Renders all the queued images and waits for the ones being rendered in background
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.future is not None:
+                job.finished.wait()
+            else:
+                self._render(job, job.phenotype)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _render(self, job, phenotype):
+        try:
+            if phenotype is None:
+                phenotype = self._load_phenotype(job.phenotype_id)
+            render_phenotype_images(phenotype, job.folder)
+        except Exception:
+            logger.exception(f'Failed rendering images of {job.phenotype_id}')
+        self._finish(job)
+
+    def _finish(self, job):
+        # in background mode, executed by the thread collecting the results of the workers
+        if job.future is not None and not job.future.cancelled() and job.future.exception() is not None:
+            logger.error(f'Failed rendering images of {job.phenotype_id}: {job.future.exception()}')
+        key = (job.folder, job.phenotype_id)
+        with self._lock:
+            # the images are on disk, only the key is kept to avoid rendering them again
+            self._done.add(key)
+            del self._jobs[key]
+            links, job.links = job.links, []
+        job.phenotype = None
+        for target_folder in links:
+            self._link(job.folder, job.phenotype_id, target_folder)
+        job.finished.set()
+
+    def _link(self, folder, phenotype_id, target_folder):
+        link_images(folder, target_folder, phenotype_id)
+        self.links += 1
+
+    def log_statistics(self):
+        logger.info(f'Render service: {self.submitted} phenotypes queued, '
+                    f'{self.duplicates} duplicated renderings avoided, {self.links} snapshot links')
@@ -31,11 +31,14 @@ def multiple_selection(population, selection_size, selection_function):
     """
     assert (len(population) >= selection_size)
     selected_individuals = []
+    # identities of the selected individuals, checked in constant time
+    selected_ids = set()
     for _ in range(selection_size):
         new_individual = False
         while new_individual is False:
             selected_individual = selection_function(population)
-            if selected_individual not in selected_individuals:
+            if id(selected_individual) not in selected_ids:
                 selected_individuals.append(selected_individual)
+                selected_ids.add(id(selected_individual))
                 new_individual = True
     return selected_individuals
@@ -0,0 +1,260 @@
+import numpy as np
+
+
+def fitness_array(individuals):
+    """
+    :param individuals: list of Individual
+    :return: fitness of the individuals, array of shape (N,), -inf for the individuals without fitness
+    """
+    fitness = np.array([-np.inf if individual.fitness is None else individual.fitness
+                        for individual in individuals], dtype=np.float64)
+    fitness[np.isnan(fitness)] = -np.inf
+    return fitness
+
+
+def objective_array(individuals, objectives):
+    """
+    :param individuals: list of Individual
+    :param objectives: function returning the tuple of objectives of an individual, all maximized, None if missing
+    :return: array of shape (N, n_objectives), -inf for the missing objectives
+    """
+    rows = [[-np.inf if value is None else value for value in objectives(individual)] for individual in individuals]
+    array = np.array(rows, dtype=np.float64).reshape(len(rows), -1)
+    array[np.isnan(array)] = -np.inf
+    return array
+
+
+def non_dominated_fronts(objectives):
+    """
+    Non dominated sorting of NSGA-II, on the dominance matrix of all the pairs of individuals
+    :param objectives: array of shape (N, n_objectives), all maximized
+    :return: list of arrays of indices, from the first front to the last
+    """
+    n_individuals = len(objectives)
+    # one objective at a time, without the (N, N, n_objectives) comparisons
+    better_or_equal = np.ones((n_individuals, n_individuals), dtype=bool)
+    better = np.zeros((n_individuals, n_individuals), dtype=bool)
+    for values in objectives.T:
+        better_or_equal &= values[:, None] >= values[None, :]
+        better |= values[:, None] > values[None, :]
+    # dominates[i, j]: individual i dominates individual j
+    dominates = better_or_equal & better
+    n_dominating = dominates.sum(axis=0)
+    remaining = np.ones(n_individuals, dtype=bool)
+    fronts = []
+    while remaining.any():
+        front = np.nonzero(remaining & (n_dominating == 0))[0]
+        fronts.append(front)
+        remaining[front] = False
+        n_dominating -= dominates[front].sum(axis=0)
+    return fronts
+
+
+def crowding_distance(objectives):
+    """
+    :param objectives: objectives of the individuals of a front, array of shape (N, n_objectives)
+    :return: crowding distance of the individuals, array of shape (N,), inf at the boundaries of the front
+    """
+    n_individuals = len(objectives)
+    distance = np.zeros(n_individuals)
+    if n_individuals <= 2:
+        distance[:] = np.inf
+        return distance
+    for values in objectives.T:
+        order = np.argsort(values, kind='stable')
+        ordered = values[order]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        span = ordered[-1] - ordered[0]
+        if np.isfinite(span) and span > 0:
+            distance[order[1:-1]] += (ordered[2:] - ordered[:-2]) / span
+    return distance
+
+
+class SelectionEngine:
+    """
+    Selection operators on the numpy array of the fitness of a population, the individuals without fitness
+    have a fitness of -inf. The operators select distinct individuals: they sample without replacement, in
+    a number of vectorized draws that doesn't depend on the selection pressure.
+    All the draws come from the random state of the engine, a seeded engine selects the same individuals.
+    """
+
+    # operators selecting n distinct individuals, usable as selector of the population management
+    OPERATORS = ('tournament', 'roulette', 'rank', 'truncation')
+
+    def __init__(self, seed=None):
+        """
+        :param seed: seed of the random state, None to seed it from the system
+        """
+        self.rng = np.random.RandomState(seed)
+
+    def _weighted_sample(self, weights, n):
+        """
+        :param weights: non negative weights, array of shape (N,)
+        :param n: number of indices to sample
+        :return: n distinct indices, the indices with a zero weight come last, in a random order
+        """
+        # Gumbel top-k trick, equivalent to drawing the indices one after the other proportionally to their weight
+        with np.errstate(divide='ignore'):
+            keys = np.log(weights) + self.rng.gumbel(size=len(weights))
+        order = np.lexsort((self.rng.random_sample(len(weights)), -keys))
+        return order[:n]
+
+    def tournament_indices(self, fitness, n, k=2):
+        """
+        :param fitness: array of shape (N,)
+        :param n: number of individuals to select
+        :param k: size of the tournaments
+        :return: indices of n distinct winners of tournaments between k individuals drawn at random, the
+        tournaments of a round are drawn among the individuals not selected yet
+        """
+        assert (len(fitness) >= n)
+        pool = np.arange(len(fitness))
+        selected = []
+        while len(selected) < n:
+            missing = n - len(selected)
+            contestants = pool[self.rng.randint(0, len(pool), size=(missing, k))]
+            winners = contestants[np.arange(missing), np.argmax(fitness[contestants], axis=1)]
+            # each winner is kept once, in the order of the tournaments
+            _values, first = np.unique(winners, return_index=True)
+            winners = winners[np.sort(first)]
+            selected.extend(winners)
+            pool = pool[~np.isin(pool, winners)]
+        return np.array(selected, dtype=np.int64)
+
+    def roulette_indices(self, fitness, n):
+        """
+        Fitness proportionate selection, the fitness is shifted so that the worst fitness has a zero weight.
+        When all the fitness are equal the selection is uniform.
+        :param fitness: array of shape (N,)
+        :param n: number of individuals to select
+        :return: indices of n distinct individuals
+        """
+        assert (len(fitness) >= n)
+        finite = np.isfinite(fitness)
+        if not finite.any():
+            return self.rng.permutation(len(fitness))[:n]
+        weights = np.where(finite, fitness - fitness[finite].min(), 0.0)
+        if weights.sum() == 0:
+            weights = finite.astype(np.float64)
+        return self._weighted_sample(weights, n)
+
+    def rank_indices(self, fitness, n, pressure=1.5):
+        """
+        Linear ranking selection
+        :param fitness: array of shape (N,)
+        :param n: number of individuals to select
+        :param pressure: expected number of selections of the best individual for one of the median, in [1, 2]
+        :return: indices of n distinct individuals
+        """
+        assert (len(fitness) >= n)
+        assert (1.0 <= pressure <= 2.0)
+        n_individuals = len(fitness)
+        ranks = np.empty(n_individuals)
+        # 0 for the worst individual, the ties are ranked in their order
+        ranks[np.argsort(fitness, kind='stable')] = np.arange(n_individuals)
+        weights = (2.0 - pressure) + 2.0 * (pressure - 1.0) * ranks / max(n_individuals - 1, 1)
+        return self._weighted_sample(weights, n)
+
+    @staticmethod
+    def truncation_indices(fitness, n):
+        """
+        :param fitness: array of shape (N,)
+        :param n: number of individuals to select
+        :return: indices of the n best individuals, the ties are kept in their order
+        """
+        assert (len(fitness) >= n)
+        return np.argsort(-fitness, kind='stable')[:n]
+
+    @staticmethod
+    def nsga2_indices(objectives, n):
+        """
+        Survivor selection of NSGA-II: the first non dominated fronts, and the least crowded individuals of the
+        front that doesn't fit completely
+        :param objectives: array of shape (N, n_objectives), all maximized
+        :param n: number of individuals to select
+        :return: indices of n distinct individuals
+        """
+        assert (len(objectives) >= n)
+        selected = []
+        for front in non_dominated_fronts(objectives):
+            if len(selected) + len(front) <= n:
+                selected.extend(front)
+            else:
+                distance = crowding_distance(objectives[front])
+                selected.extend(front[np.argsort(-distance, kind='stable')[:n - len(selected)]])
+            if len(selected) == n:
+                break
+        return np.array(selected, dtype=np.int64)
+
+    # operators on the individuals
+
+    def tournament(self, individuals, n, k=2):
+        return [individuals[i] for i in self.tournament_indices(fitness_array(individuals), n, k)]
+
+    def roulette(self, individuals, n):
+        return [individuals[i] for i in self.roulette_indices(fitness_array(individuals), n)]
+
+    def rank(self, individuals, n, pressure=1.5):
+        return [individuals[i] for i in self.rank_indices(fitness_array(individuals), n, pressure)]
+
+    def truncation(self, individuals, n):
+        return [individuals[i] for i in self.truncation_indices(fitness_array(individuals), n)]
+
+    def nsga2(self, individuals, n, objectives):
+        """
+        :param objectives: function returning the tuple of objectives of an individual, see `objective_array`
+        """
+        return [individuals[i] for i in self.nsga2_indices(objective_array(individuals, objectives), n)]
+
+    def tournament_selection(self, individuals, k=2):
+        """
+        Drop-in replacement of `selection.tournament_selection`
+        :return: the winner of a tournament between k individuals
+        """
+        return self.tournament(individuals, 1, k)[0]
+
+    # population management, with the signature of `PopulationConfig.population_management`
+
+    def _operator(self, selector):
+        """
+        :param selector: operator of this engine selecting n individuals, or a single winner selector taking only the
+        individuals, e.g. `selection.tournament_selection`. None for `tournament`.
+        :return: function taking the individuals and the number of distinct individuals to select
+        """
+        if selector is None:
+            return self.tournament
+        if getattr(selector, '__self__', None) is self and selector.__name__ in self.OPERATORS:
+            return selector
+        return lambda individuals, n: self.without_replacement(selector, individuals, n)
+
+    @staticmethod
+    def without_replacement(selector, individuals, n):
+        """
+        Calls a single winner selector n times, each winner is removed from the individuals of the next calls
+        :param selector: function taking a list of individuals and returning one of them
+        :return: n distinct individuals
+        """
+        assert (len(individuals) >= n)
+        pool = list(individuals)
+        selected = []
+        for _ in range(n):
+            winner = selector(pool)
+            index = next(i for i, individual in enumerate(pool) if individual is winner)
+            selected.append(pool.pop(index))
+        return selected
+
+    def steady_state_population_management(self, old_individuals, new_individuals, selector=None):
+        """
+        Drop-in replacement of `steady_state_population_management`
+        :param selector: operator of the engine taking the individuals and the number to select (e.g.
+        `engine.rank`), or a single winner selector like `selection.tournament_selection`, called on the
+        individuals not selected yet. None for the vectorized `tournament`.
+        :return: as many individuals as in the old population, selected among the old and the new individuals
+        """
+        return self._operator(selector)(old_individuals + new_individuals, len(old_individuals))
+
+    def plus_population_management(self, old_individuals, new_individuals):
+        """
+        (mu + lambda) selection: the best individuals among the parents and their offspring
+        """
+        return self.truncation(old_individuals + new_individuals, len(old_individuals))
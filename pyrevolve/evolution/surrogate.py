@@ -0,0 +1,239 @@
+import random
+
+import numpy as np
+
+from pyrevolve.custom_logging.logger import logger
+
+
+def phenotype_descriptors(phenotype):
+    """
+    Descriptors of a measured phenotype, as exported by `export_phenotype_measurements`
+    :param phenotype: RevolveBot with its morphological and brain measurements
+    :return: list of (name, value), the value is None if it was not measured
+    """
+    descriptors = []
+    for measurements in (phenotype._morphological_measurements, phenotype._brain_measurements):
+        if measurements is not None:
+            descriptors.extend(measurements.measurements_to_dict().items())
+    return descriptors
+
+
+class RidgeRegressor:
+    """
+    Ridge regression of the fitness on the standardized descriptors and their squares.
+    The samples are kept in growing numpy arrays and the model is fitted again when new samples are added.
+    """
+
+    def __init__(self, regularization=1.0, capacity=5000):
+        """
+        :param regularization: weight of the L2 penalty on the coefficients
+        :param capacity: maximum number of samples kept, the oldest samples are forgotten
+        """
+        self.regularization = regularization
+        self.capacity = capacity
+        self._features = None
+        self._targets = np.zeros(0)
+        self._coefficients = None
+        self._means = None
+        self._scales = None
+
+    def __len__(self):
+        return len(self._targets)
+
+    def add(self, features, targets):
+        """
+        :param features: array of shape (N, n_descriptors), nan for the missing values
+        :param targets: array of shape (N,)
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if self._features is None:
+            self._features = np.zeros((0, features.shape[1]))
+        self._features = np.concatenate((self._features, features))[-self.capacity:]
+        self._targets = np.concatenate((self._targets, targets))[-self.capacity:]
+        self._coefficients = None
+
+    def _expand(self, features):
+        standardized = (np.where(np.isnan(features), self._means, features) - self._means) / self._scales
+        return np.concatenate((np.ones((len(features), 1)), standardized, standardized ** 2), axis=1)
+
+    def fit(self):
+        with np.errstate(invalid='ignore'):
+            means = np.nanmean(self._features, axis=0)
+        self._means = np.where(np.isnan(means), 0.0, means)
+        filled = np.where(np.isnan(self._features), self._means, self._features)
+        scales = filled.std(axis=0)
+        self._scales = np.where(scales > 0, scales, 1.0)
+
+        expanded = self._expand(self._features)
+        penalty = self.regularization * np.eye(expanded.shape[1])
+        # the intercept is not penalized
+        penalty[0, 0] = 0.0
+        self._coefficients = np.linalg.lstsq(expanded.T.dot(expanded) + penalty,
+                                             expanded.T.dot(self._targets), rcond=None)[0]
+
+    def predict(self, features):
+        """
+        :param features: array of shape (N, n_descriptors), nan for the missing values
+        :return: predicted fitness, array of shape (N,)
+        """
+        if self._coefficients is None:
+            self.fit()
+        return self._expand(np.asarray(features, dtype=np.float64)).dot(self._coefficients)
+
+
+class SurrogateStatistics:
+    def __init__(self):
+        self.candidates = 0
+        self.simulated = 0
+        self.discarded = 0
+        # seconds of simulation of the discarded candidates
+        self.simulation_time_saved = 0.0
+        # predicted and observed fitness of the simulated candidates
+        self.predictions = []
+        self.observations = []
+
+    def rank_correlation(self):
+        """
+        Spearman correlation between the predicted and the observed fitness, None with less than two values
+        """
+        if len(self.predictions) < 2:
+            return None
+        predicted = np.argsort(np.argsort(self.predictions))
+        observed = np.argsort(np.argsort(self.observations))
+        if np.all(predicted == predicted[0]) or np.all(observed == observed[0]):
+            return None
+        return float(np.corrcoef(predicted, observed)[0, 1])
+
+    def mean_absolute_error(self):
+        if len(self.predictions) == 0:
+            return None
+        return float(np.mean(np.abs(np.array(self.predictions) - np.array(self.observations))))
+
+    def __repr__(self):
+        correlation = self.rank_correlation()
+        error = self.mean_absolute_error()
+        return f'{self.simulated} simulated and {self.discarded} discarded out of {self.candidates} candidates, ' \
+               f'{self.simulation_time_saved / 3600:.2f} simulator hours saved, ' \
+               f'rank correlation {"-" if correlation is None else f"{correlation:.3f}"}, ' \
+               f'mean absolute error {"-" if error is None else f"{error:.4f}"}'
+
+
+class SurrogateFitness:
+    """
+    Online regression of the fitness on the descriptors of the phenotypes, to pre-filter the offspring.
+
+    Once it has seen enough evaluated individuals, the population creates `oversampling` times more offspring
+    than needed, develops and measures them, and only the candidates with the best predicted fitness are simulated.
+    A fraction of the simulated candidates is drawn at random among the others, so that the model keeps seeing
+    the whole range of the offspring.
+    """
+
+    def __init__(self, oversampling=2.0, min_samples=50, exploration=0.1, regressor=None):
+        """
+        :param oversampling: number of candidates developed per simulated offspring
+        :param min_samples: number of evaluated individuals before the offspring is filtered
+        :param exploration: fraction of the simulated candidates chosen at random
+        :param regressor: model with the `add`, `predict` and `__len__` of RidgeRegressor
+        """
+        assert (oversampling >= 1.0)
+        self.oversampling = oversampling
+        self.min_samples = min_samples
+        self.exploration = exploration
+        self.regressor = RidgeRegressor() if regressor is None else regressor
+        self.descriptor_names = None
+        self.statistics = SurrogateStatistics()
+        # statistics of the current generation
+        self.generation_statistics = SurrogateStatistics()
+        # prediction of the candidates sent to the simulation, by individual
+        self._pending = {}
+        self._observed = set()
+
+    @property
+    def active(self):
+        return len(self.regressor) >= self.min_samples
+
+    def n_candidates(self, n_offspring):
+        """
+        :param n_offspring: number of individuals to simulate
+        :return: number of candidates to develop
+        """
+        if not self.active:
+            return n_offspring
+        return int(round(n_offspring * self.oversampling))
+
+    def _features(self, individuals):
+        rows = []
+        for individual in individuals:
+            descriptors = dict(phenotype_descriptors(individual.phenotype))
+            rows.append([descriptors.get(name) for name in self.descriptor_names])
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(self.descriptor_names))
+
+    def predict(self, individuals):
+        """
+        :param individuals: developed and measured individuals
+        :return: predicted fitness, array of shape (len(individuals),)
+        """
+        return self.regressor.predict(self._features(individuals))
+
+    def select(self, candidates, n_offspring, evaluation_time=0.0):
+        """
+        :param candidates: developed and measured individuals
+        :param n_offspring: number of individuals to simulate
+        :param evaluation_time: seconds of simulation of an individual, for the statistics
+        :return: the candidates to simulate, in the order of `candidates`
+        """
+        if not self.active or len(candidates) <= n_offspring:
+            return candidates
+
+        predictions = self.predict(candidates)
+        # a candidate without prediction is simulated
+        predictions = np.where(np.isnan(predictions), np.inf, predictions)
+        n_explored = int(round(n_offspring * self.exploration))
+        order = np.argsort(-predictions, kind='stable')
+        selected = list(order[:n_offspring - n_explored])
+        selected += random.sample(list(order[n_offspring - n_explored:]), n_explored)
+        selected.sort()
+
+        n_discarded = len(candidates) - len(selected)
+        for statistics in (self.statistics, self.generation_statistics):
+            statistics.candidates += len(candidates)
+            statistics.simulated += len(selected)
+            statistics.discarded += n_discarded
+            statistics.simulation_time_saved += n_discarded * evaluation_time
+        for i in selected:
+            self._pending[candidates[i]] = predictions[i]
+        return [candidates[i] for i in selected]
+
+    def observe(self, individuals):
+        """
+        Adds the evaluated individuals to the training samples, each individual is added once
+        :param individuals: individuals with their fitness, None if they were not evaluated
+        """
+        new = [individual for individual in individuals
+               if individual.fitness is not None and individual.phenotype is not None
+               and individual.phenotype.id not in self._observed]
+        if self.descriptor_names is None:
+            # the descriptors of the first individual measured completely
+            for individual in new:
+                phenotype = individual.phenotype
+                if phenotype._morphological_measurements is not None and phenotype._brain_measurements is not None:
+                    self.descriptor_names = [name for name, _value in phenotype_descriptors(phenotype)]
+                    break
+        if len(new) == 0 or self.descriptor_names is None:
+            return
+
+        for individual in new:
+            self._observed.add(individual.phenotype.id)
+            prediction = self._pending.pop(individual, None)
+            if prediction is not None and np.isfinite(prediction):
+                for statistics in (self.statistics, self.generation_statistics):
+                    statistics.predictions.append(prediction)
+                    statistics.observations.append(individual.fitness)
+        self.regressor.add(self._features(new), np.array([individual.fitness for individual in new], dtype=np.float64))
+
+    def log_statistics(self):
+        logger.info(f'Surrogate fitness in this generation: {self.generation_statistics}')
+        logger.info(f'Surrogate fitness: {self.statistics}')
+        self.generation_statistics = SurrogateStatistics()
+        # the candidates that were not evaluated
+        self._pending.clear()
@@ -2,9 +2,22 @@ import os
 import shutil
 import numpy as np
 from pyrevolve.custom_logging.logger import logger
+from pyrevolve.evolution.checkpoint import Checkpoint, save_checkpoint, load_checkpoint, append_offspring, \
+    load_offspring
+from pyrevolve.evolution.render_service import RenderService, image_paths
+from pyrevolve.experiment_store import ExperimentStore, read_snapshot_folder, BEHAVIOUR, PHENOTYPE
+from pyrevolve.revolve_bot import RevolveBot
 import sys
 
 
+class _RenderedPhenotype:
+    """
+    Stands for a phenotype whose images are already rendered, only its id is needed to link them
+    """
+    def __init__(self, _id):
+        self.id = _id
+
+
 class ExperimentManagement:
     # ids of robots in the name of all types of files are always phenotype ids, and the standard for id is 'robot_ID'
 
@@ -13,8 +26,34 @@ class ExperimentManagement:
         manager_folder = os.path.dirname(self.settings.manager)
         self._experiment_folder = os.path.join(manager_folder, 'data', self.settings.experiment_name, self.settings.run)
         self._data_folder = os.path.join(self._experiment_folder, 'data_fullevolution')
+        # the queued phenotypes are loaded back from the exported data when they are rendered
+        load_phenotype = self.read_phenotype if self.settings.export_phenotype else None
+        self.render_service = RenderService(mode=self.settings.render_mode, n_workers=self.settings.n_render_workers,
+                                            load_phenotype=load_phenotype)
+        self._store = None
+        if os.path.exists(self.experiment_folder):
+            # data of a previous run of the experiment, for the recovery
+            self._open_store()
+
+    def __getstate__(self):
+        # the render service (and its worker processes) and the database stay in the manager process
+        state = self.__dict__.copy()
+        state['render_service'] = None
+        state['_store'] = None
+        return state
+
+    def _open_store(self):
+        if self.settings.experiment_store == 'sqlite':
+            self._store = ExperimentStore(os.path.join(self.experiment_folder, 'experiment.sqlite'))
+
+    def _close_store(self):
+        if self._store is not None:
+            self._store.close()
+            self._store = None
 
     def create_exp_folders(self):
+        # the database of a previous run is closed before its folder is removed
+        self._close_store()
         if os.path.exists(self.experiment_folder):
             shutil.rmtree(self.experiment_folder)
         os.makedirs(self.experiment_folder)
@@ -25,6 +64,8 @@ class ExperimentManagement:
         os.mkdir(os.path.join(self.data_folder, 'fitness'))
         os.mkdir(os.path.join(self.data_folder, 'phenotype_images'))
         os.mkdir(os.path.join(self.data_folder, 'failed_eval_robots'))
+        os.mkdir(os.path.join(self.experiment_folder, 'checkpoints'))
+        self._open_store()
 
     @property
     def experiment_folder(self):
@@ -34,13 +75,54 @@ class ExperimentManagement:
     def data_folder(self):
         return self._data_folder
 
+    @property
+    def store(self):
+        """
+        :return: the ExperimentStore of the run, None if the data is exported in per-robot files.
+        The store is opened by the constructor for an existing run, or created by create_exp_folders.
+        """
+        if self.settings.experiment_store != 'sqlite':
+            return None
+        assert (self._store is not None), 'the experiment store is only open in the manager process'
+        return self._store
+
+    @property
+    def exports_files(self):
+        """
+        :return: whether the data is exported in per-robot files, which the development workers can write in
+        parallel. The experiment store is only written by the manager process.
+        """
+        return self.settings.experiment_store != 'sqlite'
+
+    def export_developed(self, individual):
+        """
+        Exports the genotype, the phenotype and the phenotype measurements of a newly developed individual
+        """
+        self.export_genotype(individual)
+        self.export_phenotype(individual)
+        self.export_phenotype_measurements(individual)
+
     def export_genotype(self, individual):
         if self.settings.recovery_enabled:
-            individual.export_genotype(self.data_folder)
+            if self.store is not None:
+                self.store.add_genotype(individual.phenotype.id, individual.genotype.genotype_text())
+            else:
+                individual.export_genotype(self.data_folder)
 
     def export_phenotype(self, individual):
         if self.settings.export_phenotype:
-            individual.export_phenotype(self.data_folder)
+            if self.store is not None:
+                self.store.add_phenotype(individual.phenotype.id, individual.phenotype.to_yaml())
+            else:
+                individual.export_phenotype(self.data_folder)
+
+    def export_phenotype_measurements(self, individual):
+        if self.store is not None:
+            measurements = list(individual.phenotype._morphological_measurements.measurements_to_dict().items()) \
+                           + list(individual.phenotype._brain_measurements.measurements_to_dict().items())
+            self.store.add_measures(individual.phenotype.id, PHENOTYPE, measurements)
+        else:
+            individual.phenotype.export_phenotype_measurements(self.data_folder)
 
     def export_fitnesses(self, individuals):
         folder = self.data_folder
@@ -48,10 +130,16 @@ class ExperimentManagement:
             individual.export_fitness(folder)
 
     def export_fitness(self, individual):
+        if self.store is not None:
+            self.store.add_fitness(individual.phenotype.id, individual.fitness)
+            return
         folder = os.path.join(self.data_folder, 'fitness')
         individual.export_fitness(folder)
 
     def export_behavior_measures(self, _id, measures):
+        if self.store is not None:
+            self.store.add_measures(_id, BEHAVIOUR, None if measures is None else measures.items())
+            return
         filename = os.path.join(self.data_folder, 'descriptors', f'behavior_desc_{_id}.txt')
         with open(filename, "w") as f:
             if measures is None:
@@ -60,9 +148,12 @@ class ExperimentManagement:
                 for key, val in measures.items():
                     f.write(f"{key} {val}\n")
 
+    @property
+    def phenotype_images_folder(self):
+        return os.path.join(self.data_folder, 'phenotype_images')
+
     def export_phenotype_images(self, dirpath, individual):
-        individual.phenotype.render_body(os.path.join(self.experiment_folder, dirpath, f'body_{individual.phenotype.id}.png'))
-        individual.phenotype.render_brain(os.path.join(self.experiment_folder, dirpath, f'brain_{individual.phenotype.id}.png'))
+        self.render_service.submit(individual.phenotype, os.path.join(self.experiment_folder, dirpath))
 
     def export_failed_eval_robot(self, individual):
         individual.genotype.export_genotype(os.path.join(self.data_folder, 'failed_eval_robots', f'genotype_{individual.phenotype.id}.txt'))
@@ -70,18 +161,187 @@ class ExperimentManagement:
         individual.phenotype.save_file(os.path.join(self.data_folder, 'failed_eval_robots', f'phenotype_{individual.phenotype.id}.sdf'), conf_type='sdf')
 
     def export_snapshots(self, individuals, gen_num):
+        if self.store is not None:
+            # all the data of the generation is committed together with its snapshot
+            self.store.add_snapshot(gen_num, [ind.phenotype.id for ind in individuals])
+            self.store.flush()
         if self.settings.recovery_enabled:
             path = os.path.join(self.experiment_folder, f'selectedpop_{gen_num}')
             if os.path.exists(path):
                 shutil.rmtree(path)
             os.mkdir(path)
+            if self.store is None:
+                # the list of the selected robots makes the snapshot complete, images are linked as soon as rendered
+                with open(os.path.join(path, 'snapshot.txt.tmp'), 'w') as f:
+                    for ind in individuals:
+                        f.write(f'{ind.phenotype.id}\n')
+                os.replace(os.path.join(path, 'snapshot.txt.tmp'), os.path.join(path, 'snapshot.txt'))
             for ind in individuals:
-                self.export_phenotype_images(f'selectedpop_{str(gen_num)}', ind)
+                self.render_service.link(ind.phenotype, self.phenotype_images_folder, path)
             logger.info(f'Exported snapshot {str(gen_num)} with {str(len(individuals))} individuals')
 
+    def _checkpoint_path(self, gen_num):
+        return os.path.join(self.experiment_folder, 'checkpoints', f'checkpoint_{gen_num}.pickle')
+
+    def export_checkpoint(self, population, gen_num):
+        """
+        Writes the whole state of the population, restored by Population.load_checkpoint without developing again
+        :param population: population after the selection of the generation
+        :param gen_num: generation number
+        """
+        if self.store is not None:
+            # the buffered writes are on disk at least once per generation
+            self.store.flush()
+        if self.settings.recovery_enabled:
+            os.makedirs(os.path.join(self.experiment_folder, 'checkpoints'), exist_ok=True)
+            save_checkpoint(self._checkpoint_path(gen_num),
+                            Checkpoint(gen_num, population.individuals, population.next_robot_id))
+            logger.info(f'Exported checkpoint {str(gen_num)}')
+            self._prune_checkpoints(gen_num)
+
+    def _prune_checkpoints(self, gen_num):
+        """
+        Deletes the checkpoints older than the `keep_checkpoints` most recent ones, once the checkpoint of the
+        generation is safely on disk, and the offspring files of the generations it contains
+        :param gen_num: generation of the last checkpoint
+        """
+        generations = [generation for generation in self._checkpoint_generations() if generation <= gen_num]
+        # the last checkpoint is always kept, for the recovery
+        for generation in sorted(generations)[:-max(self.settings.keep_checkpoints, 1)]:
+            os.remove(self._checkpoint_path(generation))
+        folder = os.path.join(self.experiment_folder, 'checkpoints')
+        for name in os.listdir(folder):
+            if name.startswith('offspring_') and name.endswith('.pickle'):
+                if int(name[len('offspring_'):-len('.pickle')]) <= gen_num:
+                    os.remove(os.path.join(folder, name))
+
+    def _checkpoint_generations(self):
+        folder = os.path.join(self.experiment_folder, 'checkpoints')
+        if not os.path.isdir(folder):
+            return []
+        return [int(name[len('checkpoint_'):-len('.pickle')]) for name in os.listdir(folder)
+                if name.startswith('checkpoint_') and name.endswith('.pickle')]
+
+    def has_checkpoint(self, gen_num):
+        return os.path.isfile(self._checkpoint_path(gen_num))
+
+    def read_checkpoint(self, gen_num):
+        return load_checkpoint(self._checkpoint_path(gen_num))
+
+    def _offspring_path(self, gen_num):
+        return os.path.join(self.experiment_folder, 'checkpoints', f'offspring_{gen_num}.pickle')
+
+    def export_offspring(self, individual, gen_num):
+        """
+        Appends an evaluated individual to the offspring of its generation, restored with the checkpoint of the
+        previous generation by Population.load_offspring without developing again
+        :param individual: evaluated individual
+        :param gen_num: generation of the individual
+        """
+        if self.settings.recovery_enabled:
+            os.makedirs(os.path.join(self.experiment_folder, 'checkpoints'), exist_ok=True)
+            append_offspring(self._offspring_path(gen_num), individual)
+
+    def read_offspring(self, gen_num):
+        """
+        :param gen_num: generation of the offspring
+        :return: the evaluated individuals of the unfinished generation
+        """
+        return load_offspring(self._offspring_path(gen_num))
+
+    def read_snapshot_ids(self, gen_num):
+        """
+        :param gen_num: generation of the snapshot
+        :return: phenotype ids of the robots selected in the snapshot
+        """
+        if self.store is not None:
+            return self.store.snapshot_ids(gen_num)
+        return read_snapshot_folder(os.path.join(self.experiment_folder, f'selectedpop_{gen_num}'))
+
+    def read_genotype(self, genotype, _id):
+        """
+        Loads an exported genotype
+        :param genotype: empty genotype to load into
+        :param _id: phenotype id of the robot
+        """
+        if self.store is not None:
+            genotype.load_genotype_text(self.store.genotype(_id))
+        else:
+            genotype.load_genotype(os.path.join(self.data_folder, 'genotypes', f'genotype_{_id}.txt'))
+
+    def read_fitness(self, _id):
+        if self.store is not None:
+            return self.store.fitness(_id)
+        with open(os.path.join(self.data_folder, 'fitness', f'fitness_{_id}.txt')) as f:
+            data = f.readlines()[0]
+            return None if data == 'None' else float(data)
+
+    def read_behavior_measures(self, _id):
+        """
+        :return: dict of the exported behavioural measures of a robot, None if it has none
+        """
+        if self.store is not None:
+            return self.store.measures(_id, BEHAVIOUR)
+        with open(os.path.join(self.data_folder, 'descriptors', f'behavior_desc_{_id}.txt')) as f:
+            lines = f.readlines()
+            if lines[0] == 'None':
+                return None
+            measures = {}
+            for line in lines:
+                key, value = line.strip().split(' ')
+                measures[key] = None if value == 'None' else float(value)
+            return measures
+
+    def read_phenotype(self, _id):
+        """
+        :return: the exported phenotype of a robot, as a RevolveBot
+        """
+        phenotype = RevolveBot()
+        if self.store is not None:
+            phenotype.load_yaml(self.store.phenotype(_id))
+        else:
+            phenotype.load_file(os.path.join(self.data_folder, 'phenotypes', f'{_id}.yaml'), conf_type='yaml')
+        return phenotype
+
+    def render_missing_images(self):
+        """
+        Renders the images that were not rendered during the evolution (e.g. with RenderMode.LAZY),
+        also for the robots of previous runs of the experiment, and completes the snapshots with them
+        """
+        self.render_service.render_pending()
+        phenotypes = {}
+
+        def phenotype(_id):
+            # only the phenotypes whose images are missing are loaded
+            if all(os.path.isfile(path) for path in image_paths(self.phenotype_images_folder, _id)):
+                return _RenderedPhenotype(_id)
+            if _id not in phenotypes:
+                phenotypes[_id] = self.read_phenotype(_id)
+            return phenotypes[_id]
+
+        snapshot_ids = set()
+        for name in os.listdir(self.experiment_folder):
+            if not name.startswith('selectedpop_'):
+                continue
+            for _id in self.read_snapshot_ids(int(name.split('_')[1])):
+                snapshot_ids.add(_id)
+                self.render_service.link(phenotype(_id), self.phenotype_images_folder,
+                                         os.path.join(self.experiment_folder, name))
+        if self.store is not None:
+            robot_ids = self.store.robot_ids()
+        else:
+            robot_ids = [name[:-len('.yaml')] for name in os.listdir(os.path.join(self.data_folder, 'phenotypes'))
+                         if name.endswith('.yaml')]
+        for _id in robot_ids:
+            if _id not in snapshot_ids:
+                self.render_service.submit(phenotype(_id), self.phenotype_images_folder)
+        self.render_service.render_pending()
+
     def experiment_is_new(self):
         if not os.path.exists(self.experiment_folder):
             return True
+        if self.store is not None:
+            return len(self.store.robot_ids()) == 0
         path, dirs, files = next(os.walk(os.path.join(self.data_folder, 'fitness')))
         if len(files) == 0:
             return True
@@ -89,14 +349,25 @@ class ExperimentManagement:
             return False
 
     def read_recovery_state(self, population_size, offspring_size):
+        checkpoints = self._checkpoint_generations()
+        if len(checkpoints) > 0:
+            # the latest checkpoint and the offspring evaluated after it, the files of the robots are not read
+            last_snapshot = max(checkpoints)
+            n_robots = population_size + last_snapshot * offspring_size
+            robot_ids = [int(individual.phenotype.id.split('_')[-1])
+                         for individual in self.read_offspring(last_snapshot + 1)]
+            return last_snapshot, len(robot_ids) > 0, max([n_robots] + robot_ids) + 1
+
         snapshots = []
 
-        for r, d, f in os.walk(self.experiment_folder):
-            for dir in d:
-                if 'selectedpop' in dir:
-                    exported_files = len([name for name in os.listdir(os.path.join(self.experiment_folder, dir)) if os.path.isfile(os.path.join(self.experiment_folder, dir, name))])
-                    if exported_files == (population_size * 2): # body and brain files
-                        snapshots.append(int(dir.split('_')[1]))
+        if self.store is not None:
+            snapshots = [gen_num for gen_num, size in self.store.snapshot_sizes().items() if size == population_size]
+        else:
+            for r, d, f in os.walk(self.experiment_folder):
+                for dir in d:
+                    if 'selectedpop' in dir:
+                        if len(self.read_snapshot_ids(int(dir.split('_')[1]))) == population_size:
+                            snapshots.append(int(dir.split('_')[1]))
 
         if len(snapshots) > 0:
             # the latest complete snapshot
@@ -108,9 +379,12 @@ class ExperimentManagement:
             n_robots = 0
 
         robot_ids = []
-        for r, d, f in os.walk(os.path.join(self.data_folder, 'fitness')):
-            for file in f:
-                robot_ids.append(int(file.split('.')[0].split('_')[-1]))
+        if self.store is not None:
+            robot_ids = [int(_id.split('_')[-1]) for _id in self.store.robot_ids()]
+        else:
+            for r, d, f in os.walk(os.path.join(self.data_folder, 'fitness')):
+                for file in f:
+                    robot_ids.append(int(file.split('.')[0].split('_')[-1]))
         last_id = np.sort(robot_ids)[-1]
 
         # if there are more robots to recover than the number expected in this snapshot
@@ -0,0 +1,242 @@
+import os
+import sqlite3
+
+from pyrevolve.custom_logging.logger import logger
+
+
+BEHAVIOUR = 'behaviour'
+PHENOTYPE = 'phenotype'
+
+
+def read_snapshot_folder(path):
+    """
+    :param path: folder of a snapshot of the selected robots (selectedpop_N)
+    :return: phenotype ids of the robots of the snapshot
+    """
+    if os.path.isfile(os.path.join(path, 'snapshot.txt')):
+        with open(os.path.join(path, 'snapshot.txt')) as f:
+            return [line.strip() for line in f if line.strip() != '']
+    # snapshots exported before the list of the selected robots, only made of images
+    return [name[len('body_'):-len('.png')] for name in sorted(os.listdir(path))
+            if name.startswith('body_') and os.path.isfile(os.path.join(path, 'brain_' + name[len('body_'):]))]
+
+
+def _to_value(value):
+    if value is None or value == 'None':
+        return None
+    return float(value)
+
+
+class ExperimentStore:
+    """
+    Append-only SQLite database with all the data of an experiment run:
+    genotypes, phenotypes, fitnesses, behavioural and phenotype measurements and the robots of every snapshot.
+    Writes are buffered and committed in a single transaction per generation (see flush()).
+    """
+
+    def __init__(self, path, batch_size=1000):
+        """
+        :param path: path of the database file, created if missing
+        :param batch_size: maximum number of buffered writes before they are flushed anyway
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path)
+        self._buffer = []
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS robots (
+                robot_id TEXT PRIMARY KEY,
+                genotype TEXT,
+                phenotype TEXT
+            );
+            CREATE TABLE IF NOT EXISTS fitness (
+                robot_id TEXT PRIMARY KEY,
+                fitness REAL
+            );
+            CREATE TABLE IF NOT EXISTS measures (
+                robot_id TEXT,
+                kind TEXT,
+                name TEXT,
+                value REAL,
+                PRIMARY KEY (robot_id, kind, name)
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                generation INTEGER,
+                robot_id TEXT,
+                PRIMARY KEY (generation, robot_id)
+            );
+        ''')
+        self._connection.commit()
+
+    def __getstate__(self):
+        raise TypeError('ExperimentStore is bound to the manager process and cannot be pickled')
+
+    def _write(self, query, rows):
+        self._buffer.append((query, rows))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Commits all the buffered writes in a single transaction
+        """
+        if len(self._buffer) == 0:
+            return
+        with self._connection:
+            for query, rows in self._buffer:
+                self._connection.executemany(query, rows)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    # writes
+
+    def add_genotype(self, robot_id, genotype_text):
+        self._write('INSERT INTO robots (robot_id, genotype) VALUES (?, ?) '
+                    'ON CONFLICT (robot_id) DO UPDATE SET genotype = excluded.genotype',
+                    [(robot_id, genotype_text)])
+
+    def add_phenotype(self, robot_id, phenotype_yaml):
+        self._write('INSERT INTO robots (robot_id, phenotype) VALUES (?, ?) '
+                    'ON CONFLICT (robot_id) DO UPDATE SET phenotype = excluded.phenotype',
+                    [(robot_id, phenotype_yaml)])
+
+    def add_fitness(self, robot_id, fitness):
+        self._write('INSERT OR REPLACE INTO fitness VALUES (?, ?)', [(robot_id, _to_value(fitness))])
+
+    def add_measures(self, robot_id, kind, measures):
+        """
+        :param robot_id: phenotype id of the robot
+        :param kind: BEHAVIOUR or PHENOTYPE
+        :param measures: iterable of (name, value). If None, the robot has no measures of this kind
+        """
+        self._write('DELETE FROM measures WHERE robot_id = ? AND kind = ?', [(robot_id, kind)])
+        if measures is not None:
+            self._write('INSERT INTO measures VALUES (?, ?, ?, ?)',
+                        [(robot_id, kind, name, _to_value(value)) for name, value in measures])
+
+    def add_snapshot(self, generation, robot_ids):
+        self._write('DELETE FROM snapshots WHERE generation = ?', [(generation,)])
+        self._write('INSERT INTO snapshots VALUES (?, ?)', [(generation, robot_id) for robot_id in robot_ids])
+
+    # queries
+
+    def _query(self, query, parameters=()):
+        self.flush()
+        return self._connection.execute(query, parameters).fetchall()
+
+    def robot_ids(self):
+        """
+        :return: ids of all the evaluated robots
+        """
+        return [row[0] for row in self._query('SELECT robot_id FROM fitness')]
+
+    def genotype(self, robot_id):
+        rows = self._query('SELECT genotype FROM robots WHERE robot_id = ?', (robot_id,))
+        return rows[0][0] if len(rows) > 0 else None
+
+    def phenotype(self, robot_id):
+        rows = self._query('SELECT phenotype FROM robots WHERE robot_id = ?', (robot_id,))
+        return rows[0][0] if len(rows) > 0 else None
+
+    def fitness(self, robot_id):
+        """
+        :raise KeyError: if the robot was never evaluated
+        """
+        rows = self._query('SELECT fitness FROM fitness WHERE robot_id = ?', (robot_id,))
+        if len(rows) == 0:
+            raise KeyError(robot_id)
+        return rows[0][0]
+
+    def measures(self, robot_id, kind):
+        """
+        :return: dict of the measures of the robot, None if it has no measures of this kind
+        """
+        rows = self._query('SELECT name, value FROM measures WHERE robot_id = ? AND kind = ? ORDER BY rowid',
+                           (robot_id, kind))
+        return {name: value for name, value in rows} if len(rows) > 0 else None
+
+    def snapshot_ids(self, generation):
+        return [row[0] for row in self._query('SELECT robot_id FROM snapshots WHERE generation = ? ORDER BY rowid',
+                                              (generation,))]
+
+    def snapshots(self):
+        """
+        :return: list of (generation, robot id) of all the snapshots
+        """
+        return self._query('SELECT generation, robot_id FROM snapshots ORDER BY generation, rowid')
+
+    def snapshot_sizes(self):
+        """
+        :return: dict generation -> number of robots in the snapshot
+        """
+        return dict(self._query('SELECT generation, COUNT(*) FROM snapshots GROUP BY generation'))
+
+    def all_measures(self):
+        """
+        One row per evaluated robot, with its behavioural and phenotype measures and its fitness,
+        the same table of consolidate_experiments.py
+
+        :return: (headers, rows)
+        """
+        columns = self._query('SELECT DISTINCT kind, name FROM measures ORDER BY kind, rowid')
+        columns = [(kind, name) for kind, name in columns if kind == BEHAVIOUR] + \
+                  [(kind, name) for kind, name in columns if kind == PHENOTYPE]
+        index = {column: i for i, column in enumerate(columns)}
+
+        rows = {robot_id: [None] * len(columns) + [fitness]
+                for robot_id, fitness in self._query('SELECT robot_id, fitness FROM fitness')}
+        for robot_id, kind, name, value in self._query('SELECT robot_id, kind, name, value FROM measures'):
+            if robot_id in rows:
+                rows[robot_id][index[(kind, name)]] = value
+
+        headers = ['robot_id'] + [name for _kind, name in columns] + ['fitness']
+        return headers, [[robot_id] + row for robot_id, row in rows.items()]
+
+    # import
+
+    def import_data_fullevolution(self, experiment_folder):
+        """
+        Imports the per-robot files of an experiment run (data_fullevolution and selectedpop folders)
+
+        :param experiment_folder: folder of the run
+        """
+        data_folder = os.path.join(experiment_folder, 'data_fullevolution')
+
+        for name in os.listdir(os.path.join(data_folder, 'genotypes')):
+            with open(os.path.join(data_folder, 'genotypes', name)) as f:
+                self.add_genotype(name[len('genotype_'):-len('.txt')], f.read())
+
+        if os.path.isdir(os.path.join(data_folder, 'phenotypes')):
+            for name in os.listdir(os.path.join(data_folder, 'phenotypes')):
+                if name.endswith('.yaml'):
+                    with open(os.path.join(data_folder, 'phenotypes', name)) as f:
+                        self.add_phenotype(name[:-len('.yaml')], f.read())
+
+        for name in os.listdir(os.path.join(data_folder, 'fitness')):
+            with open(os.path.join(data_folder, 'fitness', name)) as f:
+                self.add_fitness(name[len('fitness_'):-len('.txt')], f.read().strip())
+
+        for name in os.listdir(os.path.join(data_folder, 'descriptors')):
+            if name.startswith('behavior_desc_'):
+                robot_id, kind = name[len('behavior_desc_'):-len('.txt')], BEHAVIOUR
+            elif name.startswith('phenotype_desc_'):
+                robot_id, kind = name[len('phenotype_desc_'):-len('.txt')], PHENOTYPE
+            else:
+                continue
+            with open(os.path.join(data_folder, 'descriptors', name)) as f:
+                lines = [line.strip() for line in f if line.strip() != '']
+            if lines == ['None']:
+                self.add_measures(robot_id, kind, None)
+            else:
+                self.add_measures(robot_id, kind, [line.split(' ') for line in lines])
+
+        for name in os.listdir(experiment_folder):
+            if not name.startswith('selectedpop_'):
+                continue
+            self.add_snapshot(int(name.split('_')[1]), read_snapshot_folder(os.path.join(experiment_folder, name)))
+
+        self.flush()
+        logger.info(f'Imported {len(self.robot_ids())} robots from {experiment_folder}')
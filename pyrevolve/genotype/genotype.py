@@ -5,6 +5,32 @@ class Genotype:
         """
         raise NotImplementedError("Method must be implemented by genome")
 
+    def canonical_hash(self):
+        """
+        Hash of the genome content, equal for genomes that develop into the same phenotype
+
+        :return: hexadecimal digest
+        :rtype: str
+        """
+        raise NotImplementedError("Method must be implemented by genome")
+
+    def genotype_text(self):
+        """
+        Serializes the genome, in the same format of its exported file
+
+        :return: text of the genome
+        :rtype: str
+        """
+        raise NotImplementedError("Method must be implemented by genome")
+
+    def load_genotype_text(self, text):
+        """
+        Loads the genome from its serialized text
+
+        :param text: text of the genome, as returned by genotype_text()
+        """
+        raise NotImplementedError("Method must be implemented by genome")
+
     def develop(self):
         """
         Develops the genome into a revolve_bot (proto-phenotype)
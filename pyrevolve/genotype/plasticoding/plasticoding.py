@@ -16,6 +16,7 @@ from ...custom_logging.logger import logger
 import random
 import math
 import copy
+import hashlib
 import itertools
 
 
@@ -97,6 +98,14 @@ class Alphabet(Enum):
         ]
 
 
+# Symbol-category lookup tables, built once from the Alphabet
+MODULES = frozenset(symbol[0] for symbol in Alphabet.modules())
+MORPHOLOGY_MOUNTING_COMMANDS = frozenset(symbol[0] for symbol in Alphabet.morphology_mounting_commands())
+MORPHOLOGY_MOVING_COMMANDS = frozenset(symbol[0] for symbol in Alphabet.morphology_moving_commands())
+CONTROLLER_CHANGING_COMMANDS = frozenset(symbol[0] for symbol in Alphabet.controller_changing_commands())
+CONTROLLER_MOVING_COMMANDS = frozenset(symbol[0] for symbol in Alphabet.controller_moving_commands())
+
+
 class Plasticoding(Genotype):
     """
     L-system genotypic representation, enhanced with epigenetic capabilities for phenotypic plasticity, through Genetic Programming.
@@ -133,9 +142,10 @@ class Plasticoding(Genotype):
 
     def load_genotype(self, genotype_file):
         with open(genotype_file) as f:
-            lines = f.readlines()
+            self.load_genotype_text(f.read())
 
-        for line in lines:
+    def load_genotype_text(self, text):
+        for line in text.splitlines(keepends=True):
             line_array = line.split(' ')
             repleceable_symbol = Alphabet(line_array[0])
             self.grammar[repleceable_symbol] = []
@@ -150,7 +160,11 @@ class Plasticoding(Genotype):
                 self.grammar[repleceable_symbol].append([symbol, params])
 
     def export_genotype(self, filepath):
-        file = open(filepath, 'w+')
+        with open(filepath, 'w+') as file:
+            file.write(self.genotype_text())
+
+    def genotype_text(self):
+        text = ''
         for key, rule in self.grammar.items():
             line = key.value + ' '
             for item_rule in range(0, len(rule)):
@@ -163,8 +177,32 @@ class Plasticoding(Genotype):
                             params += '|'
                     symbol += params
                 line += symbol + ' '
-            file.write(line+'\n')
-        file.close()
+            text += line+'\n'
+        return text
+
+    def canonical_hash(self):
+        """
+        Content hash of the grammar and of the configuration parameters that affect development.
+        Genotypes with the same hash develop into the same phenotype (ids apart).
+
+        :return: hexadecimal sha1 digest
+        """
+        digest = hashlib.sha1()
+        digest.update('{} {} {} {} {} {} {}\n'.format(
+            self.conf.axiom_w.value,
+            self.conf.i_iterations,
+            self.conf.max_structural_modules,
+            self.conf.oscillator_param_min,
+            self.conf.oscillator_param_max,
+            self.conf.weight_param_min,
+            self.conf.weight_param_max).encode())
+        for key in sorted(self.grammar, key=lambda letter: letter.value):
+            line = key.value
+            for symbol in self.grammar[key]:
+                line += ' ' + symbol[self.index_symbol].value
+                line += '_' + '|'.join(repr(float(param)) for param in symbol[self.index_params])
+            digest.update((line + '\n').encode())
+        return digest.hexdigest()
 
     def load_and_develop(self, load, genotype_path='', id_genotype=None):
 
@@ -189,26 +227,38 @@ class Plasticoding(Genotype):
 
     def early_development(self):
 
-        self.intermediate_phenotype = [[self.conf.axiom_w, []]]
-
-        for i in range(0, self.conf.i_iterations):
-
-            position = 0
-            for aux_index in range(0, len(self.intermediate_phenotype)):
-
-                symbol = self.intermediate_phenotype[position]
-                if [symbol[self.index_symbol], []] in Alphabet.modules():
-                    # removes symbol
-                    self.intermediate_phenotype.pop(position)
-                    # replaces by its production rule
-                    for ii in range(0, len(self.grammar[symbol[self.index_symbol]])):
-                        self.intermediate_phenotype.insert(position+ii,
-                                                           self.grammar[symbol[self.index_symbol]][ii])
-                    position = position+ii+1
-                else:
-                    position = position + 1
+        self.intermediate_phenotype = self.expand([self.conf.axiom_w, []],
+                                                  self.conf.i_iterations,
+                                                  {})
         # logger.info('Robot ' + str(self.id) + ' was early-developed.')
 
+    def expand(self, symbol, iterations, expansions):
+        """
+        Rewrites a symbol through the grammar for a number of iterations.
+
+        Rewriting is context free, so the expansion of a module symbol after
+        a given number of iterations is computed only once and memoized in
+        `expansions`, which makes the whole development linear in the length
+        of the resulting string. Symbols are shared with the grammar, exactly
+        like the incremental rewriting used to do.
+
+        :param symbol: [Alphabet, params] symbol to be expanded
+        :param iterations: number of rewriting iterations
+        :param expansions: memo of {(Alphabet, iterations): expanded symbols}
+        :return: list of the expanded symbols
+        """
+        if iterations == 0 or symbol[self.index_symbol] not in MODULES:
+            return [symbol]
+
+        key = (symbol[self.index_symbol], iterations)
+        expansion = expansions.get(key)
+        if expansion is None:
+            expansion = []
+            for rule_symbol in self.grammar[symbol[self.index_symbol]]:
+                expansion.extend(self.expand(rule_symbol, iterations-1, expansions))
+            expansions[key] = expansion
+        return expansion
+
     def late_development(self):
 
         self.phenotype = RevolveBot()
@@ -227,10 +277,10 @@ class Plasticoding(Genotype):
                 module.rgb = [1, 1, 0]
                 self.mounting_reference = module
 
-            if [symbol[self.index_symbol], []] in Alphabet.morphology_mounting_commands():
+            if symbol[self.index_symbol] in MORPHOLOGY_MOUNTING_COMMANDS:
                 self.morph_mounting_container = symbol[self.index_symbol]
 
-            if [symbol[self.index_symbol], []] in Alphabet.modules() \
+            if symbol[self.index_symbol] in MODULES \
                     and symbol[self.index_symbol] is not Alphabet.CORE_COMPONENT \
                     and self.morph_mounting_container is not None:
 
@@ -245,13 +295,13 @@ class Plasticoding(Genotype):
                                     symbol[self.index_symbol],
                                     symbol)
 
-            if [symbol[self.index_symbol], []] in Alphabet.morphology_moving_commands():
+            if symbol[self.index_symbol] in MORPHOLOGY_MOVING_COMMANDS:
                 self.move_in_body(symbol)
 
-            if [symbol[self.index_symbol], []] in Alphabet.controller_changing_commands():
+            if symbol[self.index_symbol] in CONTROLLER_CHANGING_COMMANDS:
                 self.decode_brain_changing(symbol)
 
-            if [symbol[self.index_symbol], []] in Alphabet.controller_moving_commands():
+            if symbol[self.index_symbol] in CONTROLLER_MOVING_COMMANDS:
                 self.decode_brain_moving(symbol)
 
         self.add_imu_nodes()
@@ -325,7 +375,7 @@ class Plasticoding(Genotype):
 
         if symbol[self.index_symbol] == Alphabet.MUTATE_EDGE:
             if len(self.edges) > 0:
-                if (self.inputs_stack[-1].id, self.outputs_stack[-1].id) in self.edges.keys():
+                if (self.inputs_stack[-1].id, self.outputs_stack[-1].id) in self.edges:
                     self.edges[self.inputs_stack[-1].id, self.outputs_stack[-1].id].weight \
                         += float(symbol[self.index_params][0])
                     if self.edges[self.inputs_stack[-1].id, self.outputs_stack[-1].id].weight \
@@ -341,22 +391,22 @@ class Plasticoding(Genotype):
         if len(self.outputs_stack) > 0 and len(self.inputs_stack) > 0:
             if symbol[self.index_symbol] == Alphabet.LOOP:
 
-                if (self.outputs_stack[-1].id, self.outputs_stack[-1].id) not in self.edges.keys():
+                if (self.outputs_stack[-1].id, self.outputs_stack[-1].id) not in self.edges:
                     connection = Connection()
                     connection.src = self.outputs_stack[-1].id
                     connection.dst = connection.src
                     connection.weight = float(symbol[self.index_params][0])
                     self.edges[connection.src, connection.src] = connection
-                    self.phenotype._brain.connections.append(connection)
+                    self.phenotype._brain.add_connection(connection)
 
             if symbol[self.index_symbol] == Alphabet.ADD_EDGE:
-                if (self.inputs_stack[-1].id, self.outputs_stack[-1].id) not in self.edges.keys():
+                if (self.inputs_stack[-1].id, self.outputs_stack[-1].id) not in self.edges:
                     connection = Connection()
                     connection.src = self.inputs_stack[-1].id
                     connection.dst = self.outputs_stack[-1].id
                     connection.weight = float(symbol[self.index_params][0])
                     self.edges[connection.src, connection.dst] = connection
-                    self.phenotype._brain.connections.append(connection)
+                    self.phenotype._brain.add_connection(connection)
                     self.inputs_stack[-1].output_nodes.append(self.outputs_stack[-1])
                     self.outputs_stack[-1].input_nodes.append(self.inputs_stack[-1])
 
@@ -563,7 +613,7 @@ class Plasticoding(Genotype):
                     else:
                         connection.weight = float(self.outputs_stack[output_node].weight)
                     self.edges[connection.src, connection.dst] = connection
-                    self.phenotype._brain.connections.append(connection)
+                    self.phenotype._brain.add_connection(connection)
                 self.outputs_stack = [self.outputs_stack[-1]]
 
         if symbol[self.index_symbol] == Alphabet.JOINT_VERTICAL \
@@ -602,7 +652,7 @@ class Plasticoding(Genotype):
                     else:
                         connection.weight = float(self.inputs_stack[input_node].weight)
                     self.edges[connection.src, connection.dst] = connection
-                    self.phenotype._brain.connections.append(connection)
+                    self.phenotype._brain.add_connection(connection)
                 self.inputs_stack = [self.inputs_stack[-1]]
 
         self.phenotype._brain.nodes[node.id] = node
@@ -3,6 +3,9 @@ Class containing the brain parts to compose a robot
 """
 import xml.etree.ElementTree
 from collections import OrderedDict
+
+import numpy as np
+
 import pyrevolve.SDF
 from .base import Brain
 
@@ -12,11 +15,98 @@ class BrainNN(Brain):
     Base class allowing for constructing neural network controller components in an overviewable manner
     """
     TYPE = 'neural-network'
+    # columns of `params_array`
+    PERIOD, PHASE_OFFSET, AMPLITUDE = 0, 1, 2
 
     def __init__(self):
         self.nodes = {}
         self.connections = []
         self.params = {}
+        # node id -> connections from / to the node, in the order of `connections`
+        self._outgoing = {}
+        self._incoming = {}
+        # list and (list version, connection edits) the indexes were built from
+        self._indexed_connections = None
+        self._indexed_version = None
+
+    def __setstate__(self, state):
+        state = dict(state)
+        connections = state.pop('connections', None)
+        # brains pickled before the adjacency indexes existed, or indexed by the number of connections
+        state.pop('_n_indexed_connections', None)
+        self.__dict__.update(state)
+        if connections is not None:
+            self.connections = connections
+        if '_indexed_connections' not in state:
+            self._outgoing = {}
+            self._incoming = {}
+            self._indexed_connections = None
+            self._indexed_version = None
+
+    @property
+    def connections(self):
+        return self._connections
+
+    @connections.setter
+    def connections(self, connections):
+        if not isinstance(connections, _ConnectionList):
+            connections = _ConnectionList(connections)
+        self._connections = connections
+
+    def add_connection(self, connection):
+        """
+        Appends a connection to the network and to the adjacency indexes
+        :param connection: Connection
+        """
+        self._update_indexes()
+        self.connections.append(connection)
+        self._index(connection)
+        self._indexed_version = (self._connections.version, Connection.edits)
+
+    def _index(self, connection):
+        self._outgoing.setdefault(connection.src, []).append(connection)
+        self._incoming.setdefault(connection.dst, []).append(connection)
+        connection._indexed = True
+
+    def _update_indexes(self):
+        # the list replaced or changed in place, or the ends of an indexed connection changed
+        if self._indexed_connections is self._connections \
+                and self._indexed_version == (self._connections.version, Connection.edits):
+            return
+        self._outgoing = {}
+        self._incoming = {}
+        for connection in self._connections:
+            self._index(connection)
+        self._indexed_connections = self._connections
+        self._indexed_version = (self._connections.version, Connection.edits)
+
+    def outgoing(self, node_id):
+        """
+        :param node_id: id of a node
+        :return: the connections whose source is the node
+        :rtype: list(Connection)
+        """
+        self._update_indexes()
+        return self._outgoing.get(node_id, [])
+
+    def incoming(self, node_id):
+        """
+        :param node_id: id of a node
+        :return: the connections whose destination is the node
+        :rtype: list(Connection)
+        """
+        self._update_indexes()
+        return self._incoming.get(node_id, [])
+
+    def params_array(self):
+        """
+        The oscillator parameters as numpy columns, in the order of `params`.
+        Params are changed in place during the development, the array is a snapshot.
+        :return: array of shape (len(params), 3), columns PERIOD, PHASE_OFFSET and AMPLITUDE, nan for missing values
+        """
+        array = np.array([(params.period, params.phase_offset, params.amplitude) for params in self.params.values()],
+                         dtype=np.float64)
+        return array.reshape(-1, 3)
 
     @staticmethod
     def from_yaml(yaml_object):
@@ -41,7 +131,7 @@ class BrainNN(Brain):
             for edge in yaml_object['connections']:
                 connection = Connection()
                 connection.load_yaml(edge)
-                brain.connections.append(connection)
+                brain.add_connection(connection)
 
         for k_node in yaml_object['params']:
             params = Params()
@@ -144,12 +234,78 @@ class Node:
         self.type = yaml_object_node['type']
 
 
+class _ConnectionList(list):
+    """
+    List of the connections of a network, counting its changes to keep the adjacency indexes up to date
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+
+    def _changed(method):
+        def wrapper(self, *args):
+            self.version = getattr(self, 'version', 0) + 1
+            return method(self, *args)
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    append = _changed(list.append)
+    extend = _changed(list.extend)
+    insert = _changed(list.insert)
+    remove = _changed(list.remove)
+    pop = _changed(list.pop)
+    clear = _changed(list.clear)
+    sort = _changed(list.sort)
+    reverse = _changed(list.reverse)
+    __setitem__ = _changed(list.__setitem__)
+    __delitem__ = _changed(list.__delitem__)
+    __iadd__ = _changed(list.__iadd__)
+    __imul__ = _changed(list.__imul__)
+    del _changed
+
+
 class Connection:
+    # changes to the ends of connections already in an adjacency index
+    edits = 0
+
     def __init__(self):
+        self._indexed = False
         self.dst = None
         self.src = None
         self.weight = None
 
+    def __setstate__(self, state):
+        state = dict(state)
+        # connections pickled with plain src and dst attributes
+        for end in ('src', 'dst'):
+            if end in state:
+                state['_' + end] = state.pop(end)
+        state.setdefault('_indexed', False)
+        self.__dict__.update(state)
+
+    @property
+    def src(self):
+        return self._src
+
+    @src.setter
+    def src(self, src):
+        self._src = src
+        self._edited()
+
+    @property
+    def dst(self):
+        return self._dst
+
+    @dst.setter
+    def dst(self, dst):
+        self._dst = dst
+        self._edited()
+
+    def _edited(self):
+        if self._indexed:
+            Connection.edits += 1
+
     def load_yaml(self, yaml_object_connection):
         self.dst = yaml_object_connection['dst']
         self.src = yaml_object_connection['src']
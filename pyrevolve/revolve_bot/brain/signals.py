@@ -0,0 +1,239 @@
+from __future__ import division
+
+import math
+
+import numpy as np
+
+from .brain_nn import BrainNN
+
+# neuron types of the `ann` controller, 0 for the padding of the smaller networks
+OSCILLATOR, SIGMOID, SIMPLE = 1, 2, 3
+NEURON_TYPES = {
+    'Oscillator': OSCILLATOR,
+    'Sigmoid': SIGMOID,
+    'Simple': SIMPLE,
+}
+
+
+class BatchedNetworks:
+    """
+    Neural networks of several brains padded to the same size, laid out as the `ann` controller of the simulator
+    (cpprevolve NeuralNetwork.cpp) does: the output neurons, then the hidden neurons, with the weights of the
+    connections from the inputs and from the other neurons.
+    The output neurons are in the order of `brain.nodes`, the simulator orders them by motor.
+    """
+
+    def __init__(self, brains, use_connections=True):
+        """
+        :param brains: list of BrainNN
+        :param use_connections: if False the weights are left to zero. The controller plugin reads the connections
+        in `rv:brain` while `BrainNN.controller_sdf` writes them in `rv:controller`, so the simulated robots run
+        without them. It makes no difference for networks of oscillators, which don't read their inputs.
+        """
+        layouts = []
+        for brain in brains:
+            if not isinstance(brain, BrainNN):
+                raise RuntimeError('Brain not supported')
+            layers = {'input': [], 'output': [], 'hidden': []}
+            for node in brain.nodes.values():
+                if node.layer not in layers:
+                    raise RuntimeError(f'Unknown neuron layer {node.layer} of neuron {node.id}')
+                layers[node.layer].append(node)
+            layouts.append(layers)
+
+        n_brains = len(brains)
+        self.n_inputs = max((len(layers['input']) for layers in layouts), default=0)
+        self.n_neurons = max((len(layers['output']) + len(layers['hidden']) for layers in layouts), default=0)
+        self.n_outputs = np.array([len(layers['output']) for layers in layouts], dtype=np.int64)
+        self.output_ids = [[node.id for node in layers['output']] for layers in layouts]
+
+        self.types = np.zeros((n_brains, self.n_neurons), dtype=np.int8)
+        # period, phase offset and amplitude of the oscillators, bias and gain of the other neurons
+        self.params = np.zeros((n_brains, self.n_neurons, 3))
+        self.input_weights = np.zeros((n_brains, self.n_inputs, self.n_neurons))
+        self.weights = np.zeros((n_brains, self.n_neurons, self.n_neurons))
+
+        for i, (brain, layers) in enumerate(zip(brains, layouts)):
+            positions = {}
+            for j, node in enumerate(layers['input']):
+                positions[node.id] = (self.input_weights, j)
+            for j, node in enumerate(layers['output'] + layers['hidden']):
+                positions[node.id] = (self.weights, j)
+                self.types[i, j], self.params[i, j] = self._neuron(brain, node)
+
+            if not use_connections:
+                continue
+            for connection in brain.connections:
+                if connection.src not in positions or connection.dst not in positions:
+                    raise RuntimeError(f'Connection between unknown neurons {connection.src} and {connection.dst}')
+                weights, src = positions[connection.src]
+                destination_weights, dst = positions[connection.dst]
+                if destination_weights is self.input_weights:
+                    raise RuntimeError(f'Destination neuron {connection.dst} is an input neuron')
+                weights[i, src, dst] = connection.weight
+
+    @staticmethod
+    def _neuron(brain, node):
+        if node.type not in NEURON_TYPES:
+            raise RuntimeError(f'Unsupported neuron type {node.type} of neuron {node.id}')
+        neuron_type = NEURON_TYPES[node.type]
+        params = brain.params.get(node.id)
+        if neuron_type == OSCILLATOR:
+            values = (None,) if params is None else (params.period, params.phase_offset, params.amplitude)
+        else:
+            values = (None,) if params is None else (params.bias, params.gain, 0.0)
+        if None in values:
+            raise RuntimeError(f'Missing parameters of the {node.type} neuron {node.id}')
+        return neuron_type, values
+
+    def oscillations(self, times):
+        """
+        Values of the oscillators, which only depend on the time
+        :param times: array of shape (T,)
+        :return: array of shape (n_brains, n_neurons, T), zero for the other neurons
+        """
+        # only the oscillators, not the padding
+        brain_index, neuron_index = np.nonzero(self.types == OSCILLATOR)
+        period, phase_offset, gain = (column[:, None] for column in self.params[brain_index, neuron_index].T)
+        t = times[None, :]
+        # a zero period gives nan, as in the simulator
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = (np.sin((2.0 * math.pi / period) * (t - period * phase_offset)) + 1.0) / 2.0
+            value = 0.5 - (gain / 2.0) + value * gain
+        oscillations = np.zeros((len(self.types), self.n_neurons, len(times)))
+        oscillations[brain_index, neuron_index] = value
+        return oscillations
+
+    def simulate(self, duration, update_rate=8, inputs=None):
+        """
+        Steps the networks as the controller does, at each update of the controller
+        :param duration: seconds of simulated time
+        :param update_rate: updates of the controller per second
+        :param inputs: values read from the sensors, array of shape (n_brains, T, n_inputs), zero if None
+        :return: ActuatorSignals
+        """
+        n_steps = int(round(duration * update_rate))
+        times = np.arange(1, n_steps + 1) / update_rate
+        states = self.oscillations(times)
+
+        if np.any((self.types != OSCILLATOR) & (self.types != 0)):
+            if inputs is None:
+                inputs = np.zeros((len(self.types), n_steps, self.n_inputs))
+            bias = self.params[:, :, 0]
+            gain = self.params[:, :, 1]
+            is_oscillator = self.types == OSCILLATOR
+            state = np.zeros(self.types.shape)
+            with np.errstate(over='ignore'):
+                for k in range(n_steps):
+                    activation = np.einsum('bi,bij->bj', inputs[:, k], self.input_weights) \
+                                 + np.einsum('bi,bij->bj', state, self.weights) - bias
+                    state = np.select([is_oscillator, self.types == SIGMOID, self.types == SIMPLE],
+                                      [states[:, :, k], 1.0 / (1.0 + np.exp(-gain * activation)), gain * activation])
+                    states[:, :, k] = state
+
+        n_outputs = self.n_outputs.max(initial=0)
+        values = states[:, :n_outputs]
+        values[np.arange(n_outputs)[None, :] >= self.n_outputs[:, None]] = np.nan
+        return ActuatorSignals(times, values, self.n_outputs, self.output_ids)
+
+
+def simulate(brains, duration, update_rate=8, inputs=None, use_connections=True):
+    """
+    Actuator signals of the brains without the simulator
+    :param brains: list of BrainNN
+    :param duration: seconds of simulated time
+    :param update_rate: updates of the controller per second
+    :param inputs: see `BatchedNetworks.simulate`
+    :param use_connections: see `BatchedNetworks`
+    :return: ActuatorSignals
+    """
+    return BatchedNetworks(brains, use_connections).simulate(duration, update_rate, inputs)
+
+
+class ActuatorSignals:
+    """
+    Values sent to the motors by a batch of brains
+    """
+    DESCRIPTORS = ('amplitude', 'offset', 'frequency', 'synchrony')
+
+    def __init__(self, times, values, n_outputs, output_ids):
+        """
+        :param times: times of the updates, array of shape (T,)
+        :param values: array of shape (n_brains, max outputs, T), nan after the outputs of a brain
+        :param n_outputs: number of outputs of each brain, array of shape (n_brains,)
+        :param output_ids: ids of the output neurons of each brain
+        """
+        self.times = times
+        self.values = values
+        self.n_outputs = n_outputs
+        self.output_ids = output_ids
+
+    def __len__(self):
+        return len(self.values)
+
+    def _mask(self):
+        return np.arange(self.values.shape[1])[None, :] < self.n_outputs[:, None]
+
+    def _mean_over_outputs(self, values, mask=None):
+        mask = self._mask() if mask is None else mask
+        count = mask.sum(axis=1)
+        total = np.where(mask, values, 0.0).sum(axis=1)
+        return np.where(count > 0, total / np.maximum(count, 1), 0.0)
+
+    def constant_outputs(self, tolerance=1e-6):
+        """
+        :param tolerance: outputs varying by less are constant
+        :return: array of shape (n_brains, max outputs), False after the outputs of a brain
+        """
+        with np.errstate(invalid='ignore'):
+            return self._mask() & (np.ptp(self.values, axis=2) <= tolerance)
+
+    def degenerate(self, tolerance=1e-6):
+        """
+        Brains that can't move their robot: without outputs, with only constant outputs (zero amplitude
+        oscillators), or with outputs that aren't numbers (zero period oscillators)
+        :param tolerance: outputs varying by less are constant
+        :return: array of bool of shape (n_brains,)
+        """
+        mask = self._mask()
+        not_finite = np.any(mask & ~np.all(np.isfinite(self.values), axis=2), axis=1)
+        all_constant = np.all(self.constant_outputs(tolerance) | ~mask, axis=1)
+        return (self.n_outputs == 0) | not_finite | all_constant
+
+    def descriptors(self):
+        """
+        Descriptors of the signals, for the novelty search of controllers, averaged over the outputs of each brain:
+        - amplitude: difference between the largest and the smallest value
+        - offset: mean value
+        - frequency: dominant frequency in Hz, zero for constant outputs
+        - synchrony: absolute correlation of the outputs with each other, zero with less than two varying outputs
+        :return: array of shape (n_brains, len(DESCRIPTORS))
+        """
+        mask = self._mask()
+        values = np.where(mask[:, :, None], self.values, 0.0)
+        n_steps = values.shape[2]
+        amplitude = np.ptp(values, axis=2) if n_steps > 0 else np.zeros(mask.shape)
+        offset = values.mean(axis=2) if n_steps > 0 else np.zeros(mask.shape)
+        centered = values - offset[:, :, None]
+
+        frequency = np.zeros(mask.shape)
+        if n_steps > 1:
+            spectrum = np.abs(np.fft.rfft(centered, axis=2))[:, :, 1:]
+            frequencies = np.fft.rfftfreq(n_steps, self.times[1] - self.times[0])[1:]
+            frequency = np.where(amplitude > 0, frequencies[spectrum.argmax(axis=2)], 0.0)
+
+        norms = np.sqrt((centered ** 2).sum(axis=2))
+        varying = mask & (norms > 0)
+        normalized = centered / np.where(varying, norms, 1.0)[:, :, None]
+        correlations = np.abs(np.matmul(normalized, normalized.transpose(0, 2, 1)))
+        n_varying = varying.sum(axis=1)
+        n_pairs = n_varying * (n_varying - 1)
+        pairs = correlations.sum(axis=(1, 2)) - np.trace(correlations, axis1=1, axis2=2)
+        synchrony = np.where(n_pairs > 0, pairs / np.maximum(n_pairs, 1), 0.0)
+
+        return np.stack([
+            self._mean_over_outputs(amplitude, mask),
+            self._mean_over_outputs(offset, mask),
+            self._mean_over_outputs(frequency, mask),
+            synchrony,
+        ], axis=1)
@@ -1,10 +1,29 @@
 import math
 from ..render.render import Render
-from ..render.grid import Grid
 from ..revolve_module import ActiveHingeModule, BrickModule, TouchSensorModule, BrickSensorModule, CoreModule
 from ...custom_logging.logger import logger
 
 
+# Modules that move the traversal on the 2d grid (same as Render.traverse_path_of_robot)
+GRID_MODULES = (ActiveHingeModule, BrickModule, TouchSensorModule, BrickSensorModule)
+
+# Grid displacement (x, y) of a child attached to `slot` of a parent with `orientation`: GRID_MOVES[orientation][slot]
+GRID_MOVES = {
+    0: ((0, -1), (0, 1), (-1, 0), (1, 0)),
+    1: ((0, 1), (0, -1), (1, 0), (-1, 0)),
+    2: ((-1, 0), (1, 0), (0, 1), (0, -1)),
+    3: ((1, 0), (-1, 0), (0, -1), (0, 1)),
+}
+
+# Grid orientation of a child attached to `slot` of a parent with `orientation`: GRID_ORIENTATIONS[orientation][slot]
+GRID_ORIENTATIONS = {
+    0: (1, 0, 3, 2),
+    1: (0, 1, 2, 3),
+    2: (3, 2, 0, 1),
+    3: (2, 3, 1, 0),
+}
+
+
 class MeasureBody:
     def __init__(self, body):
         self.body = body
@@ -164,32 +183,38 @@ class MeasureBody:
         try:
             render = Render()
             render.traverse_path_of_robot(self.body, 0, False)
-            coordinates = render.grid.visited_coordinates
-
-            horizontal_mirrored = 0
-            horizontal_total = 0
-            vertical_mirrored = 0
-            vertical_total = 0
-            # Calculate symmetry in body
-            for position in coordinates:
-                if position[0] is not 0:
-                    horizontal_total += 1
-                    if [-position[0], position[1]] in coordinates:
-                        horizontal_mirrored += 1
-                if position[1] is not 0:
-                    vertical_total += 1
-                    if [position[0], -position[1]] in coordinates:
-                        vertical_mirrored += 1
-
-            horizontal_symmetry = horizontal_mirrored / horizontal_total if horizontal_mirrored > 0 else 0
-            vertical_symmetry = vertical_mirrored / vertical_total if vertical_mirrored > 0 else 0
-
-            self.symmetry = max(horizontal_symmetry, vertical_symmetry)
-            return self.symmetry
+            return self._measure_symmetry(render.grid.visited_coordinates)
 
         except Exception as e:
             logger.exception(f'Exception: {e}. \nFailed measuring symmetry')
 
+    def _measure_symmetry(self, coordinates):
+        """
+        Measure symmetry from the grid coordinates of the modules
+        """
+        occupied = set((position[0], position[1]) for position in coordinates)
+
+        horizontal_mirrored = 0
+        horizontal_total = 0
+        vertical_mirrored = 0
+        vertical_total = 0
+        # Calculate symmetry in body
+        for position in coordinates:
+            if position[0] != 0:
+                horizontal_total += 1
+                if (-position[0], position[1]) in occupied:
+                    horizontal_mirrored += 1
+            if position[1] != 0:
+                vertical_total += 1
+                if (position[0], -position[1]) in occupied:
+                    vertical_mirrored += 1
+
+        horizontal_symmetry = horizontal_mirrored / horizontal_total if horizontal_mirrored > 0 else 0
+        vertical_symmetry = vertical_mirrored / vertical_total if vertical_mirrored > 0 else 0
+
+        self.symmetry = max(horizontal_symmetry, vertical_symmetry)
+        return self.symmetry
+
     def measure_coverage(self):
         """
         Measure the coverage of the robot, specified by the amount of modules
@@ -337,19 +362,97 @@ class MeasureBody:
         except Exception as e:
             logger.exception(f'Exception: {e}. \nFailed measuring width and height')
 
+    def traverse_body(self):
+        """
+        Walks the body tree once, iteratively, and computes all the counts the
+        measurements are derived from, plus the 2d grid coordinates of the
+        modules (excluding core and sensors) used for width, height and symmetry.
+        :return: list of visited [x, y] grid coordinates
+        """
+        self.hinge_count = 0
+        self.brick_count = 0
+        self.brick_sensor_count = 0
+        self.touch_sensor_count = 0
+        self.branching_modules_count = 0
+        self.extremities = 0
+        self.extensiveness = 0
+        self.active_hinges_count = 0
+        self.free_slots = 0
+        visited_coordinates = []
+
+        # (module, parent slot, x, y, grid orientation of the parent)
+        to_process = [(self.body, 0, 0, 0, 1)]
+        while len(to_process) > 0:
+            module, slot, x, y, orientation = to_process.pop()
+
+            if isinstance(module, GRID_MODULES):
+                move = GRID_MOVES[orientation][slot]
+                x += move[0]
+                y += move[1]
+                orientation = GRID_ORIENTATIONS[orientation][slot]
+                if not isinstance(module, TouchSensorModule):
+                    visited_coordinates.append([x, y])
+
+            if module is not self.body:
+                if isinstance(module, ActiveHingeModule):
+                    self.hinge_count += 1
+                elif isinstance(module, BrickModule):
+                    self.brick_count += 1
+                elif isinstance(module, BrickSensorModule):
+                    self.brick_sensor_count += 1
+                elif isinstance(module, TouchSensorModule):
+                    self.touch_sensor_count += 1
+
+            # children that are not sensors, with and without brick sensors
+            children_count = 0
+            structural_children_count = 0
+            for child_slot, child_module in module.iter_children():
+                if child_module is None:
+                    continue
+                to_process.append((child_module, child_slot, x, y, orientation))
+                if not isinstance(child_module, TouchSensorModule):
+                    children_count += 1
+                    if not isinstance(child_module, BrickSensorModule):
+                        structural_children_count += 1
+
+            if (isinstance(module, BrickModule) and structural_children_count == 3) \
+                    or (isinstance(module, CoreModule) and structural_children_count == 4):
+                self.branching_modules_count += 1
+            if not (isinstance(module, CoreModule) or isinstance(module, TouchSensorModule)):
+                if children_count == 0:
+                    self.extremities += 1
+                if children_count == 1:
+                    self.extensiveness += 1
+            if isinstance(module, ActiveHingeModule) and module.has_children():
+                self.active_hinges_count += 1
+            if isinstance(module, CoreModule):
+                self.free_slots += (4-children_count)
+            if isinstance(module, BrickModule):
+                self.free_slots += (3-children_count)
+
+        self.absolute_size = self.brick_count + self.hinge_count + 1
+        return visited_coordinates
+
     def measure_all(self):
         """
-        Perform all measurements
+        Perform all measurements in a single traversal of the body
         :return:
         """
+        coordinates = self.traverse_body()
+
+        min_x = min([0] + [position[0] for position in coordinates])
+        max_x = max([0] + [position[0] for position in coordinates])
+        min_y = min([0] + [position[1] for position in coordinates])
+        max_y = max([0] + [position[1] for position in coordinates])
+        self.width = max_x - min_x + 1
+        self.height = max_y - min_y + 1
+
         self.measure_limbs()
         self.measure_length_of_limbs()
-        self.measure_width_height()
-        self.measure_absolute_size()
         self.measure_proportion()
         self.measure_joints()
         self.measure_coverage()
-        self.measure_symmetry()
+        self._measure_symmetry(coordinates)
         self.measure_branching()
         self.measure_sensors()
         return self.measurements_to_dict()
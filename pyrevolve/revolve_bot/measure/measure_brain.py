@@ -17,9 +17,12 @@ class MeasureBrain:
         self.max_param = max_param
         self.params = None
         self.count_oscillators = None
+        # columns of the oscillator parameters, arrays in the order of brain.params
         self.periods = None
         self.phase_offsets = None
         self.amplitudes = None
+        self._params_array = None
+        self._deviations = {}
         # Average Period
         self.avg_period = None
         # Deviation of Period
@@ -74,13 +77,20 @@ class MeasureBrain:
             logger.error('Brain not supported')
             return
         self.params = self.brain.params
-        if self.params is not None:
-            if self.periods is None:
-                self.periods = [self.params[param].period for param in self.params]
-            if self.phase_offsets is None:
-                self.phase_offsets = [self.params[param].phase_offset for param in self.params]
-            if self.amplitudes is None:
-                self.amplitudes = [self.params[param].amplitude for param in self.params]
+        if self.params is not None and self._params_array is None:
+            self._params_array = self.brain.params_array()
+            # contiguous copies, reduced exactly as lists of the values would be
+            self.periods, self.phase_offsets, self.amplitudes = self._params_array.T.copy()
+
+    def _deviation(self, column):
+        """
+        Standard deviation of a set of parameters, computed once per set
+        :param column: 'periods', 'phase_offsets' or 'amplitudes'
+        """
+        if column not in self._deviations:
+            values = getattr(self, column)
+            self._deviations[column] = np.std(values) if len(values) > 0 else 0
+        return self._deviations[column]
 
     def calc_count_oscillators(self):
         """
@@ -88,12 +98,7 @@ class MeasureBrain:
         """
         if not isinstance(self.brain, BrainNN):
             return
-        oscillators = 0
-        nodes = self.brain.nodes
-        for node in nodes:
-            if nodes[node].type == 'Oscillator':
-                oscillators += 1
-        self.count_oscillators = oscillators
+        self.count_oscillators = sum(1 for node in self.brain.nodes.values() if node.type == 'Oscillator')
 
     def measure_avg_period(self):
         """
@@ -104,7 +109,7 @@ class MeasureBrain:
             return self.avg_period
         if self.periods is None:
             self.collect_sets_of_params()
-        median = np.median(self.periods) if self.periods else 0
+        median = np.median(self.periods) if len(self.periods) > 0 else 0
         if median == 0 or self.max_param == 0:
             self.avg_period = 0
         else:
@@ -120,7 +125,7 @@ class MeasureBrain:
             return self.dev_period
         if self.periods is None:
             self.collect_sets_of_params()
-        self.dev_period = self.sigmoid(np.std(self.periods)) if self.periods else 0
+        self.dev_period = self.sigmoid(self._deviation('periods')) if len(self.periods) > 0 else 0
         return self.dev_period
 
     def measure_avg_phase_offset(self):
@@ -132,7 +137,7 @@ class MeasureBrain:
             return self.avg_phase_offset
         if self.phase_offsets is None:
             self.collect_sets_of_params()
-        median = np.median(self.phase_offsets) if self.phase_offsets else 0
+        median = np.median(self.phase_offsets) if len(self.phase_offsets) > 0 else 0
         if median == 0 or self.max_param == 0:
             self.avg_phase_offset = 0
         else:
@@ -148,7 +153,7 @@ class MeasureBrain:
             return self.dev_phase_offset
         if self.phase_offsets is None:
             self.collect_sets_of_params()
-        self.dev_phase_offset = self.sigmoid(np.std(self.phase_offsets)) if self.phase_offsets else 0
+        self.dev_phase_offset = self.sigmoid(self._deviation('phase_offsets')) if len(self.phase_offsets) > 0 else 0
         return self.dev_phase_offset
 
     def measure_avg_amplitude(self):
@@ -160,7 +165,7 @@ class MeasureBrain:
             return self.avg_amplitude
         if self.amplitudes is None:
             self.collect_sets_of_params()
-        median = np.median(self.amplitudes) if self.amplitudes else 0
+        median = np.median(self.amplitudes) if len(self.amplitudes) > 0 else 0
         if median == 0 or self.max_param == 0:
             self.avg_amplitude = 0
         else:
@@ -176,7 +181,7 @@ class MeasureBrain:
             return self.dev_amplitude
         if self.amplitudes is None:
             self.collect_sets_of_params()
-        self.dev_amplitude = self.sigmoid(np.std(self.amplitudes)) if self.amplitudes else 0
+        self.dev_amplitude = self.sigmoid(self._deviation('amplitudes')) if len(self.amplitudes) > 0 else 0
         return self.dev_amplitude
 
     def measure_avg_intra_dev_params(self):
@@ -186,9 +191,10 @@ class MeasureBrain:
         if self.params is None:
             self.avg_intra_dev_params = 0
             return self.avg_intra_dev_params
-        params = self.params
-        dt = [np.std([params[param].period, params[param].phase_offset, params[param].amplitude]) for param in params] if params else 0
-        self.avg_intra_dev_params = self.sigmoid(np.median(dt)) if dt else 0
+        if self._params_array is None:
+            self.collect_sets_of_params()
+        dt = np.std(self._params_array, axis=1)
+        self.avg_intra_dev_params = self.sigmoid(np.median(dt)) if len(dt) > 0 else 0
         return self.avg_intra_dev_params
 
     def measure_avg_inter_dev_params(self):
@@ -200,9 +206,9 @@ class MeasureBrain:
             return self.avg_inter_dev_params
         if self.periods is None or self.phase_offsets is None or self.amplitudes is None:
             self.collect_sets_of_params()
-        periods_std = np.std(self.periods) if self.periods else 0
-        p_offset_std = np.std(self.phase_offsets) if self.phase_offsets else 0
-        amplitude_std = np.std(self.amplitudes) if self.amplitudes else 0
+        periods_std = self._deviation('periods')
+        p_offset_std = self._deviation('phase_offsets')
+        amplitude_std = self._deviation('amplitudes')
         self.avg_inter_dev_params = self.sigmoid((periods_std + p_offset_std + amplitude_std) / 3)
         return self.avg_inter_dev_params
 
@@ -219,13 +225,10 @@ class MeasureBrain:
         connections = []
         nodes = self.brain.nodes
         # TODO REMOVE condition WHEN duplicated nodes bug is fixed -- duplicated nodes end in '-[0-9]+' or '-core[0-9]+' (node2-2, node2-core1)
-        duplicates = fnmatch.filter(nodes, 'node*-*')
+        duplicates = set(fnmatch.filter(nodes, 'node*-*'))
         for node in nodes:
             if node not in duplicates and nodes[node].type == 'Input':
-                connections_of_node = 0
-                for connection in self.brain.connections:
-                    if connection.src == nodes[node].id:
-                        connections_of_node += 1
+                connections_of_node = len(self.brain.outgoing(nodes[node].id))
                 if connections_of_node == 0 or self.count_oscillators == 0:
                     connections.append(0)
                 else:
@@ -269,13 +272,12 @@ class MeasureBrain:
             return self.synaptic_reception
         balance_set = []
         nodes = self.brain.nodes
-        connections = self.brain.connections
         for node in nodes:
             if nodes[node].type == 'Oscillator':
                 inhibitory = []
                 excitatory = []
-                for connection in connections:
-                    if connection.dst == nodes[node].id and connection.src != nodes[node].id:
+                for connection in self.brain.incoming(nodes[node].id):
+                    if connection.src != nodes[node].id:
                         if connection.weight < 0:
                             inhibitory.append(abs(connection.weight))
                         if connection.weight > 0:
@@ -298,6 +300,8 @@ class MeasureBrain:
         if not isinstance(self.brain, BrainNN):
             self.set_measurements_to_zero()
             raise RuntimeError('Brain not supported')
+        if self._params_array is not None and np.isnan(self._params_array).any():
+            raise TypeError('Oscillator without period, phase offset or amplitude')
         self.calc_count_oscillators()
         self.measure_avg_period()
         self.measure_dev_period()
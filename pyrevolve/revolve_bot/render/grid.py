@@ -10,57 +10,57 @@ class Grid:
 		self.core_position = None
 		self.visited_coordinates = []
 
-	# Current position of last drawn element
-	x_pos = 0
-	y_pos = 0
+		# Current position of last drawn element
+		self.x_pos = 0
+		self.y_pos = 0
 
-	# Orientation of robot
-	orientation = 1
+		# Orientation of robot
+		self.orientation = 1
 
-	# Direction of last movement
-	previous_move = -1
+		# Direction of last movement
+		self.previous_move = -1
 
-	# Coordinates and orientation of movements
-	movement_stack = [[0,0,1]]
+		# Coordinates and orientation of movements
+		self.movement_stack = [[0,0,1]]
 
 	def get_position(self):
 		"""Return current position on x and y axis"""
-		return [Grid.x_pos, Grid.y_pos]
+		return [self.x_pos, self.y_pos]
 
 	def set_position(self, x, y):
 		"""Set position of x and y axis"""
-		Grid.x_pos = x
-		Grid.y_pos = y
+		self.x_pos = x
+		self.y_pos = y
 
 	def set_orientation(self, orientation):
 		"""Set new orientation on grid"""
 		if orientation in [0, 1, 2, 3]:
-			Grid.orientation = orientation
+			self.orientation = orientation
 		else:
 			return False
 
 	def calculate_orientation(self):
 		"""Set orientation by previous move and orientation"""
-		if (Grid.previous_move == -1 or
-		(Grid.previous_move == 1 and Grid.orientation == 1) or
-		(Grid.previous_move == 2 and Grid.orientation == 3) or
-		(Grid.previous_move == 3 and Grid.orientation == 2) or
-		(Grid.previous_move == 0 and Grid.orientation == 0)):
+		if (self.previous_move == -1 or
+		(self.previous_move == 1 and self.orientation == 1) or
+		(self.previous_move == 2 and self.orientation == 3) or
+		(self.previous_move == 3 and self.orientation == 2) or
+		(self.previous_move == 0 and self.orientation == 0)):
 			self.set_orientation(1)
-		elif ((Grid.previous_move == 2 and Grid.orientation == 1) or
-		(Grid.previous_move == 0 and Grid.orientation == 3) or
-		(Grid.previous_move == 1 and Grid.orientation == 2) or
-		(Grid.previous_move == 3 and Grid.orientation == 0)):
+		elif ((self.previous_move == 2 and self.orientation == 1) or
+		(self.previous_move == 0 and self.orientation == 3) or
+		(self.previous_move == 1 and self.orientation == 2) or
+		(self.previous_move == 3 and self.orientation == 0)):
 			self.set_orientation(2)
-		elif ((Grid.previous_move == 0 and Grid.orientation == 1) or
-		(Grid.previous_move == 3 and Grid.orientation == 3) or
-		(Grid.previous_move == 2 and Grid.orientation == 2) or
-		(Grid.previous_move == 1 and Grid.orientation == 0)):
+		elif ((self.previous_move == 0 and self.orientation == 1) or
+		(self.previous_move == 3 and self.orientation == 3) or
+		(self.previous_move == 2 and self.orientation == 2) or
+		(self.previous_move == 1 and self.orientation == 0)):
 			self.set_orientation(0)
-		elif ((Grid.previous_move == 3 and Grid.orientation == 1) or
-		(Grid.previous_move == 1 and Grid.orientation == 3) or
-		(Grid.previous_move == 0 and Grid.orientation == 2) or
-		(Grid.previous_move == 2 and Grid.orientation == 0)):
+		elif ((self.previous_move == 3 and self.orientation == 1) or
+		(self.previous_move == 1 and self.orientation == 3) or
+		(self.previous_move == 0 and self.orientation == 2) or
+		(self.previous_move == 2 and self.orientation == 0)):
 			self.set_orientation(3)
 
 	def move_by_slot(self, slot):
@@ -76,66 +76,66 @@ class Grid:
 
 	def move_right(self):
 		"""Set position one to the right in correct orientation"""
-		if Grid.orientation == 1:
-			Grid.x_pos += 1
-		elif Grid.orientation == 2:
-			Grid.y_pos += 1
-		elif Grid.orientation == 0:
-			Grid.x_pos -= 1
-		elif Grid.orientation == 3:
-			Grid.y_pos -= 1
-		Grid.previous_move = 2
+		if self.orientation == 1:
+			self.x_pos += 1
+		elif self.orientation == 2:
+			self.y_pos += 1
+		elif self.orientation == 0:
+			self.x_pos -= 1
+		elif self.orientation == 3:
+			self.y_pos -= 1
+		self.previous_move = 2
 
 	def move_left(self):
 		"""Set position one to the left"""
-		if Grid.orientation == 1:
-			Grid.x_pos -= 1
-		elif Grid.orientation == 2:
-			Grid.y_pos -= 1
-		elif Grid.orientation == 0:
-			Grid.x_pos += 1
-		elif Grid.orientation == 3:
-			Grid.y_pos += 1
-		Grid.previous_move = 3
+		if self.orientation == 1:
+			self.x_pos -= 1
+		elif self.orientation == 2:
+			self.y_pos -= 1
+		elif self.orientation == 0:
+			self.x_pos += 1
+		elif self.orientation == 3:
+			self.y_pos += 1
+		self.previous_move = 3
 
 	def move_up(self):
 		"""Set position one upwards"""
-		if Grid.orientation == 1:
-			Grid.y_pos -= 1
-		elif Grid.orientation == 2:
-			Grid.x_pos += 1
-		elif Grid.orientation == 0:
-			Grid.y_pos += 1
-		elif Grid.orientation == 3:
-			Grid.x_pos -= 1
-		Grid.previous_move = 1
+		if self.orientation == 1:
+			self.y_pos -= 1
+		elif self.orientation == 2:
+			self.x_pos += 1
+		elif self.orientation == 0:
+			self.y_pos += 1
+		elif self.orientation == 3:
+			self.x_pos -= 1
+		self.previous_move = 1
 
 	def move_down(self):
 		"""Set position one downwards"""
-		if Grid.orientation == 1:
-			Grid.y_pos += 1
-		elif Grid.orientation == 2:
-			Grid.x_pos -= 1
-		elif Grid.orientation == 0:
-			Grid.y_pos -= 1
-		elif Grid.orientation == 3:
-			Grid.x_pos += 1
-		Grid.previous_move = 0
+		if self.orientation == 1:
+			self.y_pos += 1
+		elif self.orientation == 2:
+			self.x_pos -= 1
+		elif self.orientation == 0:
+			self.y_pos -= 1
+		elif self.orientation == 3:
+			self.x_pos += 1
+		self.previous_move = 0
 
 	def move_back(self):
-		if len(Grid.movement_stack) > 1:
-			Grid.movement_stack.pop()
-		last_movement = Grid.movement_stack[-1]
-		Grid.x_pos = last_movement[0]
-		Grid.y_pos = last_movement[1]
-		Grid.orientation = last_movement[2]
+		if len(self.movement_stack) > 1:
+			self.movement_stack.pop()
+		last_movement = self.movement_stack[-1]
+		self.x_pos = last_movement[0]
+		self.y_pos = last_movement[1]
+		self.orientation = last_movement[2]
 
 	def add_to_visited(self, include_sensors=True, is_sensor=False):
 		"""Add current position to visited coordinates list"""
 		self.calculate_orientation()
 		if (include_sensors and is_sensor) or not is_sensor:
-			self.visited_coordinates.append([Grid.x_pos, Grid.y_pos])
-		Grid.movement_stack.append([Grid.x_pos, Grid.y_pos, Grid.orientation])
+			self.visited_coordinates.append([self.x_pos, self.y_pos])
+		self.movement_stack.append([self.x_pos, self.y_pos, self.orientation])
 
 	def calculate_grid_dimensions(self):
 		min_x = 0
@@ -160,8 +160,8 @@ class Grid:
 		return self.core_position
 
 	def reset_grid(self):
-		Grid.x_pos = 0
-		Grid.y_pos = 0
-		Grid.orientation = 1
-		Grid.previous_move = -1
-		Grid.movement_stack = [[0,0,1]]
+		self.x_pos = 0
+		self.y_pos = 0
+		self.orientation = 1
+		self.previous_move = -1
+		self.movement_stack = [[0,0,1]]
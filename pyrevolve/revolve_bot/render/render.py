@@ -22,17 +22,17 @@ class Render:
             canvas.draw_controller(module.id)
         elif isinstance(module, ActiveHingeModule):
             canvas.move_by_slot(slot)
-            Canvas.rotating_orientation += module.orientation
+            canvas.rotating_orientation += module.orientation
             canvas.draw_hinge(module.id)
             canvas.draw_connector_to_parent()
         elif isinstance(module, BrickModule):
             canvas.move_by_slot(slot)
-            Canvas.rotating_orientation += module.orientation
+            canvas.rotating_orientation += module.orientation
             canvas.draw_module(module.id)
             canvas.draw_connector_to_parent()
         elif isinstance(module, TouchSensorModule) or isinstance(module, BrickSensorModule):
             canvas.move_by_slot(slot)
-            Canvas.rotating_orientation += module.orientation
+            canvas.rotating_orientation += module.orientation
             canvas.save_sensor_position()
 
         if module.has_children():
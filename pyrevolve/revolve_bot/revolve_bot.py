@@ -2,6 +2,7 @@
 Revolve body generator based on RoboGen framework
 """
 import yaml
+import hashlib
 import traceback
 from collections import OrderedDict
 from collections import deque
@@ -36,6 +37,21 @@ class RevolveBot:
         self._behavioural_measurements = None
         self.self_collide = self_collide
         self.battery_level = 0.0
+        # (fingerprint, id, self_collide) -> SDF.SDFTemplate of the last conversion
+        self._sdf_template_key = None
+        self._sdf_template = None
+
+    def __getstate__(self):
+        # the sdf template is generated again when needed
+        state = self.__dict__.copy()
+        state['_sdf_template_key'] = None
+        state['_sdf_template'] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('_sdf_template_key', None)
+        state.setdefault('_sdf_template', None)
+        self.__dict__.update(state)
 
     @property
     def id(self):
@@ -61,6 +77,52 @@ class RevolveBot:
 
         return count
 
+    def fingerprint(self):
+        """
+        Canonical structural fingerprint of the robot: the module tree with
+        the types and orientations of the modules plus the nodes, connections
+        and parameters of the brain. Module and node ids are relabeled in
+        tree order, so robots developed from different genotypes into the
+        same phenotype share the same fingerprint.
+
+        :return: hexadecimal sha1 digest
+        """
+        digest = hashlib.sha1()
+        part_labels = {}
+
+        to_process = [(self._body, None)]
+        while len(to_process) > 0:
+            module, slot = to_process.pop()
+            part_labels[module.id] = len(part_labels)
+            digest.update('{} {} {} {};'.format(part_labels[module.id], slot, module.TYPE, module.orientation).encode())
+            children = [(child, child_slot) for child_slot, child in module.iter_children() if child is not None]
+            to_process.extend(reversed(children))
+
+        if isinstance(self._brain, BrainNN):
+            node_labels = {}
+            part_nodes = {}
+            for node in self._brain.nodes.values():
+                part_nodes.setdefault(part_labels.get(node.part_id), []).append(node)
+            for part_label in sorted(part_nodes, key=lambda label: -1 if label is None else label):
+                for ordinal, node in enumerate(sorted(part_nodes[part_label],
+                                                      key=lambda n: (str(n.layer), str(n.type), str(n.id)))):
+                    node_labels[node.id] = '{}:{}'.format(part_label, ordinal)
+                    digest.update('|{} {} {}'.format(node_labels[node.id], node.layer, node.type).encode())
+                    params = self._brain.params.get(node.id)
+                    if params is not None:
+                        digest.update(' {} {} {} {} {}'.format(
+                            params.period, params.phase_offset, params.amplitude, params.bias, params.gain).encode())
+
+            connections = sorted('{}>{} {}'.format(node_labels.get(connection.src, connection.src),
+                                                   node_labels.get(connection.dst, connection.dst),
+                                                   connection.weight)
+                                 for connection in self._brain.connections)
+            digest.update(('|' + ';'.join(connections)).encode())
+        elif self._brain is not None:
+            digest.update(('|' + yaml.dump(self._brain.to_yaml())).encode())
+
+        return digest.hexdigest()
+
     def measure_behaviour(self):
         """
 
@@ -100,9 +162,14 @@ class RevolveBot:
         """
         try:
             measure = MeasureBrain(self._brain, 10)
-            measure_b = MeasureBody(self._body)
-            measure_b.count_active_hinges()
-            if measure_b.active_hinges_count > 0:
+            if self._morphological_measurements is not None \
+                    and self._morphological_measurements.active_hinges_count is not None:
+                active_hinges_count = self._morphological_measurements.active_hinges_count
+            else:
+                measure_b = MeasureBody(self._body)
+                measure_b.count_active_hinges()
+                active_hinges_count = measure_b.active_hinges_count
+            if active_hinges_count > 0:
                 measure.measure_all()
             else:
                 measure.set_all_zero()
@@ -157,9 +224,22 @@ class RevolveBot:
         self.load(robot, conf_type)
 
     def to_sdf(self, pose=SDF.math.Vector3(0, 0, 0.25), nice_format=None):
+        """
+        :param pose: position of the robot in the world
+        :param nice_format: indentation of the xml (True for tabs), None or False for the compact format
+        :return: the sdf document of the robot. The compact document is generated once per phenotype, the next calls
+        only fill in the pose.
+        """
         if type(nice_format) is bool:
             nice_format = '\t' if nice_format else None
-        return SDF.revolve_bot_to_sdf(self, pose, nice_format, self_collide=self.self_collide)
+        if nice_format is not None:
+            return SDF.revolve_bot_to_sdf(self, pose, nice_format, self_collide=self.self_collide)
+
+        key = (self.fingerprint(), self._id, self.self_collide)
+        if self._sdf_template_key != key:
+            self._sdf_template = SDF.SDFTemplate(self, self_collide=self.self_collide)
+            self._sdf_template_key = key
+        return self._sdf_template.render(pose)
 
     def to_yaml(self):
         """
@@ -23,6 +23,12 @@ class BehaviouralMeasurements:
             self.displacement_velocity_hill = displacement_velocity_hill(robot_manager)
             self.head_balance = head_balance(robot_manager)
             self.contacts = contacts(robot_manager, robot)
+            # seconds of simulated time after which the evaluation was stopped early, None if it was complete
+            self.early_stopped = None
+            if getattr(robot_manager, 'stopped_early', None) is not None:
+                last_update, starting_time = robot_manager.last_update, robot_manager.starting_time
+                self.early_stopped = (last_update.sec - starting_time.sec) \
+                    + (last_update.nsec - starting_time.nsec) / 1e9
         else:
             self.velocity = None
             self.displacement = None
@@ -30,6 +36,7 @@ class BehaviouralMeasurements:
             self.displacement_velocity_hill = None
             self.head_balance = None
             self.contacts = None
+            self.early_stopped = None
 
     def items(self):
         return {
@@ -38,7 +45,8 @@ class BehaviouralMeasurements:
             'displacement_velocity': self.displacement_velocity,
             'displacement_velocity_hill': self.displacement_velocity_hill,
             'head_balance': self.head_balance,
-            'contacts': self.contacts
+            'contacts': self.contacts,
+            'early_stopped': self.early_stopped,
         }.items()
 
 
@@ -48,7 +56,9 @@ def velocity(robot_manager):
     Returns the velocity over the maintained window
     :return:
     """
-    return robot_manager._dist / robot_manager._time if robot_manager._time > 0 else 0
+    trajectory = robot_manager._trajectory
+    time = float(trajectory.durations().sum())
+    return float(trajectory.distances().sum()) / time if time > 0 else 0
 
 
 def displacement(robot_manager):
@@ -60,16 +70,17 @@ def displacement(robot_manager):
              and the second a `Time` instance.
     :rtype: tuple(Vector3, Time)
     """
-    if len(robot_manager._positions) == 0:
+    trajectory = robot_manager._trajectory
+    if len(trajectory) == 0:
         return Vector3(0, 0, 0), Time()
     return (
-        robot_manager._positions[-1] - robot_manager._positions[0],
-        robot_manager._times[-1] - robot_manager._times[0]
+        Vector3(trajectory.position(-1) - trajectory.position(0)),
+        trajectory.time(-1) - trajectory.time(0)
     )
 
 
 def path_length(robot_manager):
-    return robot_manager._dist
+    return float(robot_manager._trajectory.distances().sum())
 
 
 def displacement_velocity(robot_manager):
@@ -98,21 +109,16 @@ def head_balance(robot_manager):
     Returns the average rotation of teh head in the roll and pitch dimensions.
     :return:
     """
-    roll = 0
-    pitch = 0
-    instants = len(robot_manager._orientations)
-    for o in robot_manager._orientations:
-        roll = roll + abs(o[0]) * 180 / math.pi
-        pitch = pitch + abs(o[1]) * 180 / math.pi
+    orientations = robot_manager._trajectory.rpy()
+    instants = len(orientations)
+    if instants == 0:
+        return None
     #  accumulated angles for each type of rotation
     #  divided by iterations * maximum angle * each type of rotation
-    if instants == 0:
-        balance = None
-    else:
-        balance = (roll + pitch) / (instants * 180 * 2)
-        # turns imbalance to balance
-        balance = 1 - balance
-    return balance
+    roll_pitch = float(np.abs(orientations[:, :2]).sum()) * 180 / math.pi
+    balance = roll_pitch / (instants * 180 * 2)
+    # turns imbalance to balance
+    return 1 - balance
 
 
 def contacts(robot_manager, robot):
@@ -126,9 +132,7 @@ def contacts(robot_manager, robot):
     :param robot: reference to the robot for size measurement
     :return: average number of contacts per block in the lifetime
     """
-    avg_contacts = 0
-    for c in robot_manager._contacts:
-        avg_contacts += c
+    avg_contacts = float(robot_manager._contacts.array().sum())
     avg_contacts = avg_contacts / robot.phenotype._morphological_measurements.measurements_to_dict()['absolute_size']
     return avg_contacts
 
@@ -136,12 +140,14 @@ def contacts(robot_manager, robot):
 def logs_position_orientation(robot_manager, o, evaluation_time, robotid, path):
     with open(path + '/data_fullevolution/descriptors/positions_' + robotid + '.txt', "a+") as f:
         if robot_manager.second <= evaluation_time:
-            robot_manager.avg_roll += robot_manager._orientations[o][0]
-            robot_manager.avg_pitch += robot_manager._orientations[o][1]
-            robot_manager.avg_yaw += robot_manager._orientations[o][2]
-            robot_manager.avg_x += robot_manager._positions[o].x
-            robot_manager.avg_y += robot_manager._positions[o].y
-            robot_manager.avg_z += robot_manager._positions[o].z
+            orientation = robot_manager._trajectory.rpy()[o]
+            position = robot_manager._trajectory.position(o)
+            robot_manager.avg_roll += orientation[0]
+            robot_manager.avg_pitch += orientation[1]
+            robot_manager.avg_yaw += orientation[2]
+            robot_manager.avg_x += position[0]
+            robot_manager.avg_y += position[1]
+            robot_manager.avg_z += position[2]
             robot_manager.avg_roll = robot_manager.avg_roll / robot_manager.count_group
             robot_manager.avg_pitch = robot_manager.avg_pitch / robot_manager.count_group
             robot_manager.avg_yaw = robot_manager.avg_yaw / robot_manager.count_group
@@ -2,6 +2,8 @@ import os
 
 from pyrevolve.custom_logging.logger import logger
 from pyrevolve.gazebo.analyze import BodyAnalyzer
+from pyrevolve.util.supervisor.mock_simulator import MockBackend
+from pyrevolve.util.supervisor.simulator_backend import GazeboBackend
 from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
 from pyrevolve.util.supervisor.supervisor_collision import CollisionSimSupervisor
 
@@ -9,7 +11,9 @@ from pyrevolve.util.supervisor.supervisor_collision import CollisionSimSuperviso
 class AnalyzerQueue(SimulatorQueue):
     EVALUATION_TIMEOUT = 30  # seconds
 
-    def __init__(self, n_cores: int, settings, port_start=11345, simulator_cmd='gzserver'):
+    def __init__(self, n_cores: int, settings, port_start=11345, simulator_cmd=None):
+        if simulator_cmd is None:
+            simulator_cmd = 'mock' if settings.simulator_cmd == 'mock' else 'gzserver'
         super(AnalyzerQueue, self).__init__(n_cores, settings, port_start, simulator_cmd)
 
     def _simulator_supervisor(self, simulator_name_postfix):
@@ -22,8 +26,11 @@ class AnalyzerQueue(SimulatorQueue):
             simulator_name=f'analyzer_{simulator_name_postfix}'
         )
 
-    async def _connect_to_simulator(self, settings, address, port):
-        return await BodyAnalyzer.create(address, port)
+    def _create_backend(self):
+        if self._simulator_cmd == 'mock':
+            return MockBackend.body_analyzer(self._settings)
+        return GazeboBackend(lambda postfix: self._simulator_supervisor(simulator_name_postfix=postfix),
+                             BodyAnalyzer.create)
 
     async def _evaluate_robot(self, simulator_connection, robot, conf):
         if robot.failed_eval_attempt_count == 3:
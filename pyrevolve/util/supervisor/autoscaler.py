@@ -0,0 +1,157 @@
+import asyncio
+import statistics
+
+import psutil
+
+from pyrevolve.custom_logging.logger import logger
+
+
+class PoolSample:
+    """
+    State of a simulator pool over the last autoscaling interval
+    """
+
+    def __init__(self, n_workers, n_busy, backlog, cpu_percent, memory_percent,
+                 evaluation_times=None, simulator_memory=None):
+        """
+        :param n_workers: number of active simulators
+        :param n_busy: number of simulators evaluating a robot
+        :param backlog: number of robots waiting for a simulator
+        :param cpu_percent: system wide cpu utilization
+        :param memory_percent: system wide memory utilization
+        :param evaluation_times: {worker index: mean seconds per evaluation in the interval}
+        :param simulator_memory: {worker index: resident memory of the simulator processes in bytes}
+        """
+        self.n_workers = n_workers
+        self.n_busy = n_busy
+        self.backlog = backlog
+        self.cpu_percent = cpu_percent
+        self.memory_percent = memory_percent
+        self.evaluation_times = evaluation_times if evaluation_times is not None else {}
+        self.simulator_memory = simulator_memory if simulator_memory is not None else {}
+
+    def __repr__(self):
+        return f'{self.n_workers} simulators ({self.n_busy} busy), {self.backlog} robots waiting, ' \
+               f'cpu {self.cpu_percent:.0f}%, memory {self.memory_percent:.0f}%'
+
+
+def process_memory(pid):
+    """
+    :param pid: process id
+    :return: resident memory in bytes of the process and all its children, 0 if it does not exist anymore
+    """
+    try:
+        process = psutil.Process(pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes)
+    except psutil.NoSuchProcess:
+        return 0
+
+
+class SimulatorAutoscaler:
+    """
+    Grows and shrinks the simulators of a SimulatorQueue following the backlog of robots and the load of the
+    machine, and replaces the simulators that became unhealthy (too slow or too big).
+    """
+    CPU_HIGH = 90.0  # percent, above it the pool shrinks
+    CPU_LOW = 75.0  # percent, below it the pool can grow
+    MEMORY_HIGH = 90.0  # percent
+    SIMULATOR_MEMORY_LIMIT = 4 * 1024 ** 3  # bytes
+    SLOW_FACTOR = 3.0  # simulators this much slower than the median are replaced
+
+    def __init__(self, simulator_queue, min_cores, max_cores, interval=30):
+        """
+        :param simulator_queue: SimulatorQueue to scale
+        :param min_cores: minimum number of active simulators
+        :param max_cores: maximum number of active simulators
+        :param interval: seconds between two decisions
+        """
+        assert (0 < min_cores <= max_cores)
+        self.simulator_queue = simulator_queue
+        self.min_cores = min_cores
+        self.max_cores = max_cores
+        self.interval = interval
+        self._last_statistics = {}
+        self._task = None
+
+    def decide(self, sample):
+        """
+        :param sample: PoolSample of the last interval
+        :return: (change in the number of simulators, indices of the simulators to replace)
+        """
+        overloaded = sample.cpu_percent > self.CPU_HIGH or sample.memory_percent > self.MEMORY_HIGH
+        if overloaded and sample.n_workers > self.min_cores:
+            delta = -1
+        elif not overloaded \
+                and sample.backlog > 0 \
+                and sample.n_busy >= sample.n_workers \
+                and sample.cpu_percent < self.CPU_LOW \
+                and sample.n_workers < self.max_cores:
+            delta = 1
+        else:
+            delta = 0
+
+        unhealthy = set(i for i, memory in sample.simulator_memory.items() if memory > self.SIMULATOR_MEMORY_LIMIT)
+        if len(sample.evaluation_times) >= 3:
+            median = statistics.median(sample.evaluation_times.values())
+            unhealthy.update(i for i, evaluation_time in sample.evaluation_times.items()
+                             if evaluation_time > self.SLOW_FACTOR * median)
+        return delta, sorted(unhealthy)
+
+    def sample(self):
+        """
+        :return: PoolSample of the simulator queue since the last call
+        """
+        queue = self.simulator_queue
+        evaluation_times = {}
+        for i in queue.active_workers():
+            stats = queue.statistics[i]
+            last_evaluations, last_busy_time = self._last_statistics.get(i, (0, 0.0))
+            if stats.evaluations > last_evaluations:
+                evaluation_times[i] = (stats.busy_time - last_busy_time) / (stats.evaluations - last_evaluations)
+            self._last_statistics[i] = (stats.evaluations, stats.busy_time)
+
+        return PoolSample(
+            n_workers=len(queue.active_workers()),
+            n_busy=queue.n_busy(),
+            backlog=queue.backlog(),
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=psutil.virtual_memory().percent,
+            evaluation_times=evaluation_times,
+            simulator_memory={i: sum(process_memory(pid) for pid in queue.simulator_pids(i))
+                              for i in queue.active_workers()},
+        )
+
+    async def step(self):
+        sample = self.sample()
+        delta, unhealthy = self.decide(sample)
+        logger.info(f'Simulator pool: {sample}')
+        if delta > 0:
+            logger.info('Simulator pool: adding a simulator')
+            await self.simulator_queue.grow()
+        elif delta < 0:
+            logger.info('Simulator pool: removing a simulator')
+            self.simulator_queue.shrink()
+        for i in unhealthy:
+            logger.warning(f'Simulator pool: replacing unhealthy simulator {i}')
+            self.simulator_queue.recycle(i)
+
+    async def _run(self):
+        # the first call of cpu_percent only starts the measure
+        psutil.cpu_percent(interval=None)
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.step()
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception('Simulator autoscaler failed')
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
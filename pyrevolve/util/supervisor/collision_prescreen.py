@@ -0,0 +1,85 @@
+from pyrevolve.SDF.self_collision import check_robot_self_collisions
+from pyrevolve.custom_logging.logger import logger
+
+
+class CollisionPreScreenStatistics:
+    def __init__(self):
+        # decided locally
+        self.rejected = 0
+        self.accepted = 0
+        # forwarded to the analyzer, and how many of them the analyzer found colliding
+        self.forwarded = 0
+        self.analyzer_collisions = 0
+
+    @property
+    def hits(self):
+        return self.rejected + self.accepted
+
+    @property
+    def misses(self):
+        return self.forwarded
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def __repr__(self):
+        return f'hit rate {self.hit_rate():.3f} ({self.rejected} rejected, {self.accepted} accepted, ' \
+               f'{self.forwarded} forwarded to the analyzer of which {self.analyzer_collisions} colliding)'
+
+
+class CollisionPreScreen:
+    """
+    Checks the self collisions of the robots on their collision boxes, before the body analyzer.
+
+    Robots whose boxes clearly interpenetrate are rejected and robots whose boxes are clearly apart are accepted
+    without a round trip to the analyzer simulator. Only the robots with boxes in contact, whose outcome depends on
+    the physics engine, are sent to the analyzer queue.
+    It has the `test_robot` interface of the AnalyzerQueue, so it can replace it in the Population.
+    """
+
+    def __init__(self, analyzer_queue=None, margin=1e-3):
+        """
+        :param analyzer_queue: AnalyzerQueue for the ambiguous robots, if None they are accepted
+        :param margin: in meters, see `pyrevolve.SDF.self_collision.check_self_collisions`
+        """
+        self.analyzer_queue = analyzer_queue
+        self.margin = margin
+        self.statistics = CollisionPreScreenStatistics()
+
+    async def start(self):
+        if self.analyzer_queue is not None:
+            await self.analyzer_queue.start()
+
+    async def test_robot(self, robot, conf):
+        """
+        :param robot: individual to check
+        :param conf: configuration of the experiment
+        :return: (number of collisions, bounding box) like AnalyzerQueue, the bounding box is None if the robot
+        is not sent to the analyzer
+        """
+        report = check_robot_self_collisions(robot.phenotype, self.margin)
+
+        if report.colliding:
+            self.statistics.rejected += 1
+            logger.info(f'Robot {robot.phenotype.id} collides with itself: {report.colliding[0]}')
+            return len(report.colliding), None
+
+        if not report.touching or self.analyzer_queue is None:
+            self.statistics.accepted += 1
+            return 0, None
+
+        self.statistics.forwarded += 1
+        collisions, bounding_box = await self.analyzer_queue.test_robot(robot, conf)
+        if collisions > 0:
+            self.statistics.analyzer_collisions += 1
+        return collisions, bounding_box
+
+    def log_statistics(self):
+        logger.info(f'Collision pre-screen: {self.statistics}')
+        if self.analyzer_queue is not None:
+            self.analyzer_queue.log_statistics()
+
+    async def stop(self):
+        if self.analyzer_queue is not None:
+            await self.analyzer_queue.stop()
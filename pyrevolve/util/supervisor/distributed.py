@@ -0,0 +1,316 @@
+import asyncio
+import importlib
+import itertools
+import json
+import os
+import socket
+import struct
+import time
+
+from pyrevolve.custom_logging.logger import logger
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.revolve_bot import RevolveBot
+from pyrevolve.tol.manage.measures import BehaviouralMeasurements
+from pyrevolve.util.supervisor.scheduler import RobotScheduler, SchedulingStatistics
+
+_HEADER = struct.Struct('!I')
+
+
+async def send_message(writer, message):
+    """
+    Sends a json message prefixed by its length
+    """
+    data = json.dumps(message).encode()
+    writer.write(_HEADER.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def read_message(reader):
+    """
+    :return: the next json message
+    :raise asyncio.IncompleteReadError: if the connection is closed
+    """
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return json.loads(await reader.readexactly(length))
+
+
+def function_name(function):
+    """
+    :param function: module level function
+    :return: name with which the function can be imported on another machine
+    :raise ValueError: for lambdas and nested functions
+    """
+    if '<' in function.__qualname__:
+        raise ValueError(f'{function.__qualname__} cannot be evaluated remotely, use a module level function')
+    return f'{function.__module__}:{function.__qualname__}'
+
+
+def resolve_function(name):
+    module_name, qualname = name.split(':', 1)
+    function = importlib.import_module(module_name)
+    for attribute in qualname.split('.'):
+        function = getattr(function, attribute)
+    return function
+
+
+class EvaluationConfig:
+    """
+    Evaluation parameters of a PopulationConfig, as received by the workers
+    """
+
+    def __init__(self, evaluation_time, fitness_function):
+        self.evaluation_time = evaluation_time
+        self.fitness_function = fitness_function
+        self.experiment_management = None
+
+
+class WorkerStatistics:
+    def __init__(self):
+        self.evaluations = 0
+        self.lost = 0
+
+    def __repr__(self):
+        return f'{self.evaluations} evaluations, {self.lost} robots lost'
+
+
+class _Worker:
+    def __init__(self, name, capacity, writer):
+        self.name = name
+        self.writer = writer
+        self.slots = asyncio.Semaphore(capacity)
+        # job id -> queue item
+        self.jobs = {}
+        self.closed = asyncio.Event()
+
+
+class DistributedSimulatorQueue:
+    """
+    Drop-in replacement of SimulatorQueue that evaluates the robots on remote workers. It is the broker: the workers
+    (EvaluationWorker, any number on any host) connect to it, receive robots as yaml with the evaluation parameters
+    and send back fitness and behavioural measurements. The robots in evaluation on a worker that disconnects or
+    stops sending heartbeats are dispatched again to the other workers.
+    """
+    HEARTBEAT_TIMEOUT = 30  # seconds
+
+    def __init__(self, address, scheduling_policy='fifo', retries_last=False):
+        """
+        :param address: (host, port) on which the workers connect, port 0 to pick a free one
+        :param scheduling_policy: order of evaluation of the waiting robots, one of SCHEDULING_POLICIES
+        :param retries_last: whether the robots whose evaluation failed are evaluated after all the others
+        """
+        self.address = address
+        self._robot_queue = RobotScheduler(scheduling_policy, retries_last)
+        self._job_ids = itertools.count()
+        self._submission_times = {}
+        self._server = None
+        self._workers = {}
+        self.statistics = {}
+        self.scheduling_statistics = SchedulingStatistics()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_worker, *self.address)
+        self.address = self._server.sockets[0].getsockname()[:2]
+        logger.info(f'Evaluation broker listening on {self.address[0]}:{self.address[1]}')
+
+    def test_robot(self, robot, conf, deadline=None):
+        """
+        :param robot: individual to evaluate
+        :param conf: configuration of the experiment, its fitness function must be a module level function
+        :param deadline: time (as in time.time()) after which the robot is not evaluated anymore if it is still
+        waiting for a worker, its evaluation fails instead. None for no deadline
+        :return: future of (fitness, behavioural measurements)
+        """
+        message = {
+            'type': 'evaluate',
+            'job': next(self._job_ids),
+            'robot': robot.phenotype.to_yaml(),
+            'self_collide': robot.phenotype.self_collide,
+            'evaluation_time': conf.evaluation_time,
+            'fitness_function': function_name(conf.fitness_function),
+        }
+        future = asyncio.Future()
+        self._submission_times[future] = time.time()
+        self._robot_queue.put_nowait((robot, future, message, deadline))
+        return future
+
+    async def _handle_worker(self, reader, writer):
+        try:
+            hello = await asyncio.wait_for(read_message(reader), self.HEARTBEAT_TIMEOUT)
+        except Exception:
+            writer.close()
+            return
+        name = hello['name']
+        if name in self._workers:
+            name = f'{name}#{next(self._job_ids)}'
+        worker = _Worker(name, hello['capacity'], writer)
+        self._workers[name] = worker
+        self.statistics.setdefault(name, WorkerStatistics())
+        logger.info(f'Evaluation worker {name} connected with {hello["capacity"]} slots')
+
+        dispatcher = asyncio.ensure_future(self._dispatch(worker))
+        try:
+            while True:
+                # any message, results or heartbeats, proves that the worker is alive
+                message = await asyncio.wait_for(read_message(reader), self.HEARTBEAT_TIMEOUT)
+                if message['type'] == 'result':
+                    self._finish(worker, message)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.warning(f'Evaluation worker {name} lost: {e!r}')
+        finally:
+            dispatcher.cancel()
+            del self._workers[name]
+            for item in worker.jobs.values():
+                # the evaluation was not the fault of the robot, it keeps its failed attempts
+                self.statistics[name].lost += 1
+                self._robot_queue.put_nowait(item)
+            worker.jobs = {}
+            writer.close()
+            worker.closed.set()
+
+    def _expired(self, item):
+        robot, future, _message, deadline = item
+        if deadline is None or time.time() <= deadline:
+            return False
+        logger.warning(f"Deadline passed for robot {robot.phenotype.id}, it is not evaluated")
+        self._submission_times.pop(future, None)
+        self.scheduling_statistics.expired += 1
+        future.set_result((None, None))
+        return True
+
+    async def _dispatch(self, worker):
+        while True:
+            await worker.slots.acquire()
+            item = await self._robot_queue.get()
+            self._robot_queue.task_done()
+            if item[1].done() or self._expired(item):
+                worker.slots.release()
+                continue
+            message = item[2]
+            worker.jobs[message['job']] = item
+            try:
+                await send_message(worker.writer, message)
+            except ConnectionError:
+                # requeued by the connection handler
+                return
+
+    def _finish(self, worker, message):
+        item = worker.jobs.pop(message['job'], None)
+        if item is None:
+            return
+        worker.slots.release()
+        robot, future, _message, _deadline = item
+        self.statistics[worker.name].evaluations += 1
+        if future.done():
+            return
+
+        if message['measurements'] is None:
+            behavioural_measurements = None
+        else:
+            behavioural_measurements = BehaviouralMeasurements()
+            for key, value in message['measurements'].items():
+                setattr(behavioural_measurements, key, value)
+        now = time.time()
+        self.scheduling_statistics.record(robot.phenotype.id, now - self._submission_times.pop(future, now))
+        future.set_result((message['fitness'], behavioural_measurements))
+
+    def log_statistics(self):
+        """
+        Logs the statistics of the workers, and the scheduling statistics since the last call
+        """
+        for name, statistics in self.statistics.items():
+            logger.info(f'Evaluation worker {name}: {statistics}')
+        logger.info(f'Scheduling: {self.scheduling_statistics}')
+        self.scheduling_statistics.reset()
+
+    async def stop(self):
+        workers = list(self._workers.values())
+        for worker in workers:
+            try:
+                await send_message(worker.writer, {'type': 'stop'})
+            except ConnectionError:
+                pass
+        # the workers disconnect once stopped
+        if len(workers) > 0:
+            await asyncio.wait([asyncio.ensure_future(worker.closed.wait()) for worker in workers],
+                               timeout=self.HEARTBEAT_TIMEOUT)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class EvaluationWorker:
+    """
+    Agent evaluating on its local simulators the robots received from a DistributedSimulatorQueue
+    """
+    HEARTBEAT_INTERVAL = 5  # seconds
+
+    def __init__(self, broker_address, simulator_queue, capacity, name=None):
+        """
+        :param broker_address: (host, port) of the DistributedSimulatorQueue
+        :param simulator_queue: started SimulatorQueue evaluating the robots
+        :param capacity: number of robots evaluated at the same time
+        :param name: name of the worker in the statistics of the broker, host name and process id if None
+        """
+        self.broker_address = broker_address
+        self.simulator_queue = simulator_queue
+        self.capacity = capacity
+        self.name = name if name is not None else f'{socket.gethostname()}:{os.getpid()}'
+        self._write_lock = asyncio.Lock()
+        self._writer = None
+
+    async def _send(self, message):
+        async with self._write_lock:
+            await send_message(self._writer, message)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            await self._send({'type': 'heartbeat'})
+
+    async def _evaluate(self, message):
+        try:
+            phenotype = RevolveBot(self_collide=message['self_collide'])
+            phenotype.load_yaml(message['robot'])
+            phenotype.measure_phenotype()
+            conf = EvaluationConfig(message['evaluation_time'], resolve_function(message['fitness_function']))
+            fitness, behavioural_measurements = await self.simulator_queue.test_robot(Individual(None, phenotype),
+                                                                                      conf)
+        except Exception:
+            logger.exception(f'Failed to evaluate job {message["job"]}')
+            fitness, behavioural_measurements = None, None
+
+        measurements = None
+        if behavioural_measurements is not None:
+            measurements = {key: float(value) if value is not None else None
+                            for key, value in behavioural_measurements.items()}
+        await self._send({
+            'type': 'result',
+            'job': message['job'],
+            'fitness': float(fitness) if fitness is not None else None,
+            'measurements': measurements,
+        })
+
+    async def run(self):
+        """
+        Evaluates robots until the broker stops or disconnects
+        """
+        reader, self._writer = await asyncio.open_connection(*self.broker_address)
+        await self._send({'type': 'hello', 'name': self.name, 'capacity': self.capacity})
+        heartbeat = asyncio.ensure_future(self._heartbeat())
+        evaluations = set()
+        try:
+            while True:
+                message = await read_message(reader)
+                if message['type'] == 'stop':
+                    break
+                evaluation = asyncio.ensure_future(self._evaluate(message))
+                evaluations.add(evaluation)
+                evaluation.add_done_callback(evaluations.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning('Connection to the evaluation broker lost')
+        finally:
+            heartbeat.cancel()
+            for evaluation in evaluations:
+                evaluation.cancel()
+            self._writer.close()
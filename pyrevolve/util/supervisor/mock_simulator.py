@@ -0,0 +1,285 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+
+from pygazebo.msg import response_pb2
+from pygazebo.msg.contacts_pb2 import Contacts
+
+from pyrevolve.custom_logging.logger import logger
+from pyrevolve.revolve_bot.revolve_bot import RevolveBot
+from pyrevolve.spec.msgs import ModelInserted, RobotStates
+from pyrevolve.tol.manage import World
+from pyrevolve.util.supervisor.simulator_backend import SimulatorBackend
+
+
+class MockSimulatorCrash(ConnectionError):
+    """
+    The mock simulator crashed, like a gzserver dying in the middle of an evaluation.
+    The connection is unusable until the simulator is restarted.
+    """
+    pass
+
+
+def _set_time(msg, seconds):
+    msg.sec = int(seconds)
+    msg.nsec = int(round((seconds - int(seconds)) * 1e9))
+
+
+class MockModel:
+    """
+    Robot wandering in the mock world, its speed and path only depend on its body and brain
+    """
+
+    def __init__(self, name, description, position, life_timeout):
+        """
+        :param name: name of the model
+        :param description: sdf of the model without name nor pose, identical robots move in the same way
+        :param position: insertion position
+        :param life_timeout: simulated seconds after which the robot dies, None to live forever
+        """
+        self.name = name
+        self.life_timeout = life_timeout
+        self.age = 0.0
+        self.x, self.y, self.z = position
+
+        seed = int(hashlib.sha1(description.encode()).hexdigest(), 16)
+        self._rng = random.Random(seed)
+        self.speed = self._rng.uniform(0.0, 0.1)
+        self.heading = self._rng.uniform(-math.pi, math.pi)
+
+    @property
+    def dead(self):
+        return self.life_timeout is not None and self.age >= self.life_timeout
+
+    def step(self, dt):
+        self.age += dt
+        self.heading += self._rng.gauss(0.0, 0.05)
+        self.x += math.cos(self.heading) * self.speed * dt
+        self.y += math.sin(self.heading) * self.speed * dt
+
+    def contacts(self):
+        return self._rng.randint(0, 4)
+
+
+class MockWorld(World):
+    """
+    In-process replacement of a gzserver running the revolve world plugin, for testing and benchmarking
+    the orchestration without Gazebo. Inserted robots stream their states into `_update_states` and their
+    contacts into `_update_contacts`, exactly like the messages of the real simulator, and die
+    after their life timeout.
+    """
+
+    def __init__(self, conf, _private, world_address, speed=100.0, failure_rate=0.0):
+        """
+        :param speed: simulated seconds per real second, 0 to simulate as fast as possible
+        :param failure_rate: probability that the simulator crashes while inserting a robot
+        """
+        super(MockWorld, self).__init__(conf, _private, world_address)
+        self.speed = speed
+        self.failure_rate = failure_rate
+        self._models = {}
+        self._time = 0.0
+        self._crashed = False
+        self._running = asyncio.Event()
+        self._simulation = None
+        self._rng = random.Random()
+
+    @classmethod
+    async def create(cls, conf, world_address=None, speed=100.0, failure_rate=0.0):
+        self = cls(_private=cls._PRIVATE, conf=conf, world_address=world_address,
+                   speed=speed, failure_rate=failure_rate)
+        await self._init()
+        return self
+
+    async def _init(self):
+        if self._simulation is None:
+            self._simulation = asyncio.ensure_future(self._simulate())
+
+    async def disconnect(self):
+        if self._simulation is not None:
+            self._simulation.cancel()
+            self._simulation = None
+
+    def _check_crashed(self):
+        if self._crashed:
+            raise MockSimulatorCrash(f'Mock simulator {self.world_address} crashed')
+
+    async def set_state_update_frequency(self, freq):
+        self.state_update_frequency = freq
+
+    async def pause(self, pause=True):
+        self._check_crashed()
+
+    async def reset(self, rall=False, time_only=True, model_only=False):
+        self._check_crashed()
+        self.start_time = None
+        self.last_time = None
+        self._time = 0.0
+
+    async def insert_model(self, sdf, timeout=None):
+        self._check_crashed()
+        if self._rng.random() < self.failure_rate:
+            self._crashed = True
+            self._running.set()
+            self._check_crashed()
+
+        name = re.search(r'<model name="([^"]+)"', sdf).group(1)
+        description = sdf.replace(f'"{name}"', '', 1)
+        pose = re.search(r'<pose>([^<]+)</pose>', sdf)
+        if pose is not None:
+            position = [float(v) for v in pose.group(1).split()[:3]]
+            description = description.replace(pose.group(0), '', 1)
+        else:
+            position = [0.0, 0.0, 0.0]
+        model = MockModel(name, description, position, timeout)
+        self._models[name] = model
+        self._running.set()
+
+        inserted = ModelInserted()
+        _set_time(inserted.time, self._time)
+        inserted.model.name = name
+        inserted.model.pose.position.x, inserted.model.pose.position.y, inserted.model.pose.position.z = position
+        inserted.model.pose.orientation.x = inserted.model.pose.orientation.y = 0.0
+        inserted.model.pose.orientation.z = 0.0
+        inserted.model.pose.orientation.w = 1.0
+        return response_pb2.Response(id=0, request='insert_sdf', response='success',
+                                     serialized_data=inserted.SerializeToString())
+
+    async def delete_model(self, name, req="entity_delete"):
+        self._check_crashed()
+        self._models.pop(name, None)
+
+    async def _simulate(self):
+        try:
+            while True:
+                await self._running.wait()
+                if self._crashed:
+                    # a crashed simulator does not send anything anymore
+                    return
+                if len(self._models) == 0:
+                    self._running.clear()
+                    continue
+
+                dt = 1.0 / self.state_update_frequency
+                await asyncio.sleep(dt / self.speed if self.speed > 0 else 0)
+                if self._crashed:
+                    return
+                self._step(dt)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception('Mock simulator failed')
+
+    def _step(self, dt):
+        self._time += dt
+        states = RobotStates()
+        _set_time(states.time, self._time)
+        contacts = Contacts()
+        _set_time(contacts.time, self._time)
+
+        for i, model in enumerate(list(self._models.values())):
+            model.step(dt)
+            state = states.robot_state.add()
+            state.id = i
+            state.name = model.name
+            state.pose.position.x, state.pose.position.y, state.pose.position.z = model.x, model.y, model.z
+            state.pose.orientation.x = state.pose.orientation.y = 0.0
+            state.pose.orientation.z = math.sin(model.heading / 2)
+            state.pose.orientation.w = math.cos(model.heading / 2)
+            state.dead = model.dead
+            if model.dead:
+                # the world plugin removes the robots at the end of their life
+                del self._models[model.name]
+
+            n_contacts = model.contacts()
+            if n_contacts > 0:
+                contact = contacts.contact.add()
+                contact.collision1 = f'{model.name}::Core::collision'
+                contact.collision2 = 'ground_plane::link::collision'
+                contact.world = 'default'
+                _set_time(contact.time, self._time)
+                for _ in range(n_contacts):
+                    position = contact.position.add()
+                    position.x, position.y, position.z = model.x, model.y, 0.0
+
+        self._update_states(states.SerializeToString())
+        if len(contacts.contact) > 0:
+            self._update_contacts(contacts.SerializeToString())
+
+
+class MockBodyAnalyzer:
+    """
+    In-process replacement of the body analyzer simulator.
+    Collisions are detected as overlapping modules in the 2d substrate of the robot.
+    """
+
+    def __init__(self, analysis_time=0.0, failure_rate=0.0):
+        """
+        :param analysis_time: real seconds spent analyzing every robot
+        :param failure_rate: probability that the analyzer crashes while analyzing a robot
+        """
+        self.analysis_time = analysis_time
+        self.failure_rate = failure_rate
+        self._crashed = False
+        self._rng = random.Random()
+
+    @classmethod
+    async def create(cls, analysis_time=0.0, failure_rate=0.0):
+        return cls(analysis_time, failure_rate)
+
+    async def disconnect(self):
+        pass
+
+    async def analyze_robot(self, robot, max_attempts=5):
+        """
+        :param robot: RevolveBot to analyze
+        :return: (number of collisions, bounding box) like BodyAnalyzer.analyze_robot, the bounding box is None
+        """
+        if self._crashed or self._rng.random() < self.failure_rate:
+            self._crashed = True
+            raise MockSimulatorCrash('Mock body analyzer crashed')
+        await asyncio.sleep(self.analysis_time)
+        try:
+            robot.update_substrate(raise_for_intersections=True)
+        except RevolveBot.ItersectionCollisionException:
+            return 1, None
+        return 0, None
+
+
+class MockBackend(SimulatorBackend):
+    """
+    In-process mock simulators: there is no process to supervise, a new connection is a new simulator
+    """
+
+    def __init__(self, connect):
+        """
+        :param connect: coroutine function creating a mock simulator from its address and port
+        """
+        self._connect = connect
+
+    @classmethod
+    def world(cls, settings):
+        """
+        :return: backend of MockWorld simulators, configured by the --mock-* settings
+        """
+        return cls(lambda address, port: MockWorld.create(settings, world_address=(address, port),
+                                                          speed=settings.mock_speed,
+                                                          failure_rate=settings.mock_failure_rate))
+
+    @classmethod
+    def body_analyzer(cls, settings):
+        """
+        :return: backend of MockBodyAnalyzer simulators, configured by the --mock-* settings
+        """
+        return cls(lambda address, port: MockBodyAnalyzer.create(failure_rate=settings.mock_failure_rate))
+
+    async def launch(self, port, simulator_name_postfix):
+        return None, await self._connect("127.0.0.1", port)
+
+    async def connect(self, address, port):
+        return await self._connect(address, port)
+
+    async def restart(self, supervisor, address, port):
+        return await self._connect(address, port)
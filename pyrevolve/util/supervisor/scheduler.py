@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import math
+import statistics
+
+SCHEDULING_POLICIES = ['fifo', 'largest_first', 'expected_runtime']
+
+
+def body_size(robot):
+    """
+    :param robot: individual
+    :return: number of modules of the body of the individual, 0 if it was not measured
+    """
+    measurements = getattr(robot.phenotype, '_morphological_measurements', None)
+    if measurements is None or measurements.absolute_size is None:
+        return 0
+    return measurements.absolute_size
+
+
+class RuntimeEstimator:
+    """
+    Least squares fit of the wall time of an evaluation as a linear function of the size of the body
+    """
+
+    def __init__(self):
+        self.n = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+
+    def observe(self, size, seconds):
+        self.n += 1
+        self._sum_x += size
+        self._sum_y += seconds
+        self._sum_xx += size * size
+        self._sum_xy += size * seconds
+
+    def estimate(self, size):
+        """
+        :param size: number of modules of the body
+        :return: expected seconds of the evaluation, the size itself while there are not enough observations
+        """
+        denominator = self.n * self._sum_xx - self._sum_x ** 2
+        if self.n < 2 or denominator == 0:
+            return float(size)
+        slope = (self.n * self._sum_xy - self._sum_x * self._sum_y) / denominator
+        intercept = (self._sum_y - slope * self._sum_x) / self.n
+        return intercept + slope * size
+
+
+class SchedulingStatistics:
+    """
+    Latency from submission to result of the robots evaluated since the last reset, and the stragglers among them
+    """
+    STRAGGLER_FACTOR = 2.0  # robots taking this much longer than the median are stragglers
+
+    def __init__(self):
+        self.latencies = {}
+        self.expired = 0
+
+    def record(self, robot_id, latency):
+        self.latencies[robot_id] = latency
+
+    def stragglers(self):
+        """
+        :return: ids of the robots whose latency is more than STRAGGLER_FACTOR times the median
+        """
+        if len(self.latencies) == 0:
+            return []
+        median = statistics.median(self.latencies.values())
+        return [robot_id for robot_id, latency in self.latencies.items()
+                if latency > self.STRAGGLER_FACTOR * median]
+
+    def tail_time(self):
+        """
+        :return: seconds between the result of 90% of the robots and the last one
+        """
+        if len(self.latencies) == 0:
+            return 0.0
+        latencies = sorted(self.latencies.values())
+        return latencies[-1] - latencies[math.ceil(0.9 * len(latencies)) - 1]
+
+    def reset(self):
+        self.latencies = {}
+        self.expired = 0
+
+    def __repr__(self):
+        if len(self.latencies) == 0:
+            return f'no robot evaluated, {self.expired} expired'
+        latencies = sorted(self.latencies.values())
+        return f'{len(latencies)} robots, latency median {statistics.median(latencies):.1f}s ' \
+               f'max {latencies[-1]:.1f}s, tail {self.tail_time():.1f}s, ' \
+               f'{len(self.stragglers())} stragglers, {self.expired} expired'
+
+
+class RobotScheduler(asyncio.Queue):
+    """
+    Queue of the robots waiting for a simulator, ordered by priority instead of arrival.
+    Items are (robot, future, conf, deadline) tuples. The robots with the earliest deadline come first, then the
+    ones preferred by the policy:
+     - fifo: arrival order
+     - largest_first: largest bodies first, so that the slowest evaluations do not end up last
+     - expected_runtime: longest expected evaluations first, as estimated from the past ones
+    With retries_last, the robots whose evaluation failed come after all the others.
+    """
+
+    def __init__(self, policy='fifo', retries_last=False, estimator=None):
+        """
+        :param policy: one of SCHEDULING_POLICIES
+        :param retries_last: whether the robots are ordered by their number of failed evaluations first
+        :param estimator: RuntimeEstimator for the expected_runtime policy
+        """
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f'Unknown scheduling policy {policy}')
+        super(RobotScheduler, self).__init__()
+        self.policy = policy
+        self.retries_last = retries_last
+        self.estimator = estimator if estimator is not None else RuntimeEstimator()
+        self._counter = itertools.count()
+
+    def _init(self, maxsize):
+        self._queue = []
+
+    def _priority(self, robot):
+        if self.policy == 'largest_first':
+            return -body_size(robot)
+        elif self.policy == 'expected_runtime':
+            return -self.estimator.estimate(body_size(robot))
+        return 0
+
+    def _key(self, item):
+        robot, _future, _conf, deadline = item
+        retries = robot.failed_eval_attempt_count if self.retries_last else 0
+        return (retries,
+                deadline if deadline is not None else math.inf,
+                self._priority(robot),
+                next(self._counter))
+
+    def _put(self, item):
+        heapq.heappush(self._queue, (self._key(item), item))
+
+    def _get(self):
+        return heapq.heappop(self._queue)[1]
+
+    def peek(self):
+        """
+        :return: the next item, without removing it from the queue
+        """
+        if self.empty():
+            raise asyncio.QueueEmpty()
+        return self._queue[0][1]
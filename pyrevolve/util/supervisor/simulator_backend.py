@@ -0,0 +1,79 @@
+import asyncio
+
+from pyrevolve.custom_logging.logger import logger
+
+
+class SimulatorBackend:
+    """
+    Launches, connects to and restarts the simulators of a SimulatorQueue.
+    The queue only deals with (supervisor, connection) pairs, the supervisor is None when there is no process
+    to supervise.
+    """
+
+    async def launch(self, port, simulator_name_postfix):
+        """
+        :param port: port of the new simulator
+        :param simulator_name_postfix: postfix of the name of the simulator in the logs
+        :return: (supervisor, connection) of the new simulator
+        """
+        raise NotImplementedError()
+
+    async def connect(self, address, port):
+        """
+        :return: connection to the simulator already running on the address and port
+        """
+        raise NotImplementedError()
+
+    async def restart(self, supervisor, address, port):
+        """
+        Restarts a simulator that crashed or hung, its connection is already closed
+        :param supervisor: supervisor of the simulator
+        :return: the new connection to the simulator
+        """
+        raise NotImplementedError()
+
+
+class GazeboBackend(SimulatorBackend):
+    """
+    Simulators running in gzserver processes, started by a supervisor
+    """
+    CONNECTION_ATTEMPTS = 8
+
+    def __init__(self, create_supervisor, connect):
+        """
+        :param create_supervisor: function creating the supervisor of a simulator from the postfix of its name
+        :param connect: coroutine function connecting to a simulator from its address and port
+        """
+        self._create_supervisor = create_supervisor
+        self._connect = connect
+
+    async def launch(self, port, simulator_name_postfix):
+        supervisor = self._create_supervisor(simulator_name_postfix)
+        await supervisor.launch_simulator(port=port)
+        return supervisor, await self._connect_with_retries("127.0.0.1", port)
+
+    async def connect(self, address, port):
+        return await self._connect(address, port)
+
+    async def restart(self, supervisor, address, port):
+        logger.error("Restarting simulator... restarting")
+        await supervisor.relaunch(1, address=address, port=port)
+        logger.debug("Restarting simulator done... connecting")
+        connection = await self._connect_with_retries(address, port)
+        logger.debug("Restarting simulator done... connection done")
+        return connection
+
+    async def _connect_with_retries(self, address, port):
+        """
+        Connects to a simulator that was just launched, retrying with a growing delay while it is not listening yet
+        """
+        delay = 0.5
+        for attempt in range(self.CONNECTION_ATTEMPTS):
+            try:
+                return await self._connect(address, port)
+            except Exception:
+                if attempt == self.CONNECTION_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"Simulator on port {port} is not ready, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, 5)
@@ -1,29 +1,106 @@
 import asyncio
+import math
 import os
 import time
 
 from pyrevolve.custom_logging.logger import logger
 from pyrevolve.evolution.population import PopulationConfig
 from pyrevolve.tol.manage import World
+from pyrevolve.util.supervisor.autoscaler import SimulatorAutoscaler
+from pyrevolve.util.supervisor.mock_simulator import MockBackend
+from pyrevolve.util.supervisor.scheduler import RobotScheduler, SchedulingStatistics, body_size
+from pyrevolve.util.supervisor.simulator_backend import GazeboBackend
 from pyrevolve.util.supervisor.supervisor_multi import DynamicSimSupervisor
 from pyrevolve.SDF.math import Vector3
 from pyrevolve.tol.manage import measures
 
 
+class SimulatorStatistics:
+    """
+    Wall time spent by a simulator waiting for robots, evaluating them and restarting
+    """
+
+    def __init__(self):
+        self.evaluations = 0
+        self.failures = 0
+        self.idle_time = 0.0
+        self.busy_time = 0.0
+        self.restart_time = 0.0
+
+    @property
+    def utilization(self):
+        total = self.idle_time + self.busy_time + self.restart_time
+        return self.busy_time / total if total > 0 else 0.0
+
+    def __repr__(self):
+        return f'{self.evaluations} evaluations ({self.failures} failed), ' \
+               f'busy {self.busy_time:.1f}s, idle {self.idle_time:.1f}s, restarting {self.restart_time:.1f}s, ' \
+               f'utilization {self.utilization:.3f}'
+
+
 class SimulatorQueue:
     EVALUATION_TIMEOUT = 120  # seconds
+    HEARTBEAT_TIMEOUT = 15  # seconds without state updates after which a simulator is considered hung
+    INSERTION_TIMEOUT = 10  # seconds added to the timeout of a batch for every robot inserted after the first one
 
-    def __init__(self, n_cores: int, settings, port_start=11345, simulator_cmd=None):
+    def __init__(self, n_cores: int, settings, port_start=11345, simulator_cmd=None,
+                 min_cores=None, max_cores=None, n_spares=0, autoscale_interval=30,
+                 robots_per_simulator=1, robot_spacing=10.0, scheduling_policy='fifo', retries_last=False):
+        """
+        :param n_cores: number of simulators started
+        :param settings: command line settings
+        :param port_start: first port of the simulators, they use [port_start, port_end)
+        :param simulator_cmd: command running the simulator, settings.simulator_cmd if None
+        :param min_cores: minimum number of simulators when autoscaling, n_cores if None
+        :param max_cores: maximum number of simulators when autoscaling, n_cores if None
+        :param n_spares: number of pre-warmed simulators replacing the failed ones instantly
+        :param autoscale_interval: seconds between two autoscaling decisions
+        :param robots_per_simulator: number of robots evaluated together in the same world
+        :param robot_spacing: distance in meters between the robots evaluated together
+        :param scheduling_policy: order of evaluation of the waiting robots, one of SCHEDULING_POLICIES
+        :param retries_last: whether the robots whose evaluation failed are evaluated after all the others
+        """
         assert (n_cores > 0)
         self._n_cores = n_cores
         self._settings = settings
         self._port_start = port_start
         self._simulator_cmd = settings.simulator_cmd if simulator_cmd is None else simulator_cmd
+        self._min_cores = n_cores if min_cores is None else min_cores
+        self._max_cores = n_cores if max_cores is None else max_cores
+        assert (self._min_cores <= n_cores <= self._max_cores)
+        self._n_spares = n_spares
+        assert (robots_per_simulator > 0)
+        self._robots_per_simulator = robots_per_simulator
+        self._robot_spacing = robot_spacing
+        self._free_ports = list(range(port_start, self.port_end))
         self._supervisors = []
         self._connections = []
-        self._robot_queue = asyncio.Queue()
-        self._free_simulator = [True for _ in range(n_cores)]
+        self._ports = []
+        self._robot_queue = RobotScheduler(scheduling_policy, retries_last)
+        self._submission_times = {}
+        # futures of the robots of a failed batch, evaluated alone before a failure is counted against them
+        self._retry_alone = set()
+        self._free_simulator = []
+        # what a worker does after its current robot: None, 'retire' or 'recycle'
+        self._pending = []
         self._workers = []
+        self._spares = []
+        self._background = set()
+        self.statistics = []
+        self.scheduling_statistics = SchedulingStatistics()
+        # launches, connects to and restarts the simulators
+        self._backend = self._create_backend()
+
+        self.autoscaler = None
+        if self._min_cores < self._max_cores:
+            self.autoscaler = SimulatorAutoscaler(self, self._min_cores, self._max_cores, autoscale_interval)
+
+    @property
+    def port_end(self):
+        """
+        First port after the ones used by the simulators of this queue
+        """
+        return self._port_start + self._max_cores + self._n_spares
 
     def _simulator_supervisor(self, simulator_name_postfix):
         return DynamicSimSupervisor(
@@ -35,116 +112,369 @@ class SimulatorQueue:
             simulator_name=f'gazebo_{simulator_name_postfix}'
         )
 
-    async def _connect_to_simulator(self, settings, address, port):
-        return await World.create(settings, world_address=(address, port))
+    def _create_backend(self):
+        """
+        :return: the SimulatorBackend of the simulators of the queue
+        """
+        if self._simulator_cmd == 'mock':
+            return MockBackend.world(self._settings)
+        return GazeboBackend(lambda postfix: self._simulator_supervisor(simulator_name_postfix=postfix),
+                             lambda address, port: World.create(self._settings, world_address=(address, port)))
+
+    async def _launch_simulator(self, port):
+        """
+        :param port: port of the new simulator
+        :return: (supervisor, connection) of the new simulator
+        """
+        return await self._backend.launch(port, port - self._port_start)
 
-    async def _start_debug(self):
-        connection = await self._connect_to_simulator(self._settings, "127.0.0.1", self._port_start)
+    async def _shutdown_simulator(self, supervisor, connection, port):
+        try:
+            await asyncio.wait_for(connection.disconnect(), 10)
+        except asyncio.TimeoutError:
+            pass
+        except Exception:
+            logger.exception(f"Exception disconnecting from simulator on port {port}")
+        if supervisor is not None:
+            await supervisor.stop()
+        self._free_ports.append(port)
+
+    def _in_background(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def _add_worker(self, supervisor, connection, port):
+        i = len(self._workers)
+        self._supervisors.append(supervisor)
         self._connections.append(connection)
-        self._workers.append(asyncio.ensure_future(self._simulator_queue_worker(0)))
+        self._ports.append(port)
+        self._free_simulator.append(True)
+        self._pending.append(None)
+        self.statistics.append(SimulatorStatistics())
+        self._workers.append(asyncio.ensure_future(self._simulator_queue_worker(i)))
+        return i
+
+    async def _prewarm_spare(self):
+        port = self._free_ports.pop(0)
+        try:
+            simulator = await self._launch_simulator(port)
+        except Exception:
+            logger.exception(f"Failed to launch a spare simulator on port {port}")
+            self._free_ports.append(port)
+            return
+        self._spares.append(simulator + (port,))
+
+    async def _start_debug(self):
+        connection = await self._backend.connect("127.0.0.1", self._port_start)
+        self._add_worker(None, connection, self._port_start)
 
     async def start(self):
         if self._settings.simulator_cmd == 'debug':
             await self._start_debug()
             return
-        future_launches = []
-        future_connections = []
-        for i in range(self._n_cores):
-            simulator_supervisor = self._simulator_supervisor(
-                simulator_name_postfix=i
-            )
-            simulator_future_launch = simulator_supervisor.launch_simulator(port=self._port_start+i)
 
-            future_launches.append(simulator_future_launch)
-            self._supervisors.append(simulator_supervisor)
+        ports = [self._free_ports.pop(0) for _ in range(self._n_cores)]
+        simulators = await asyncio.gather(*[self._launch_simulator(port) for port in ports])
+        for (supervisor, connection), port in zip(simulators, ports):
+            self._add_worker(supervisor, connection, port)
+
+        await asyncio.gather(*[self._prewarm_spare() for _ in range(self._n_spares)])
+        if self.autoscaler is not None:
+            self.autoscaler.start()
 
-        await asyncio.sleep(5)
+    def active_workers(self):
+        """
+        :return: indices of the simulators evaluating robots, and not being removed
+        """
+        return [i for i, connection in enumerate(self._connections)
+                if connection is not None and self._pending[i] != 'retire']
 
-        for i, future_launch in enumerate(future_launches):
-            await future_launch
-            connection_future = self._connect_to_simulator(self._settings, "127.0.0.1", self._port_start+i)
-            future_connections.append(connection_future)
+    def n_busy(self):
+        return sum(1 for i in self.active_workers() if not self._free_simulator[i])
 
-        for i, future_conn in enumerate(future_connections):
-            self._connections.append(await future_conn)
-            self._workers.append(asyncio.ensure_future(self._simulator_queue_worker(i)))
+    def backlog(self):
+        return self._robot_queue.qsize()
 
-        await asyncio.sleep(1)
+    def simulator_pids(self, i):
+        supervisor = self._supervisors[i]
+        if supervisor is None:
+            return []
+        return [process.pid for process in supervisor.procs.values()]
 
-    def test_robot(self, robot, conf: PopulationConfig):
+    async def grow(self):
+        """
+        Adds a simulator to the pool, a pre-warmed one if available
+        """
+        if self._spares:
+            supervisor, connection, port = self._spares.pop(0)
+            self._in_background(self._prewarm_spare())
+        elif self._free_ports:
+            port = self._free_ports.pop(0)
+            try:
+                supervisor, connection = await self._launch_simulator(port)
+            except Exception:
+                logger.exception(f"Failed to launch a simulator on port {port}")
+                self._free_ports.append(port)
+                return
+        else:
+            return
+        self._add_worker(supervisor, connection, port)
+
+    def shrink(self):
+        """
+        Removes a simulator from the pool, an idle one if any, otherwise after its current robot
+        """
+        active = self.active_workers()
+        if len(active) <= 1:
+            return
+        idle = [i for i in active if self._free_simulator[i]]
+        i = idle[-1] if idle else active[-1]
+        self._pending[i] = 'retire'
+        if self._free_simulator[i]:
+            # waiting on the queue: no robot is lost by cancelling it
+            self._workers[i].cancel()
+            self._in_background(self._retire(i))
+
+    def recycle(self, i):
+        """
+        Replaces the simulator i after its current robot
+        """
+        if self._pending[i] is None:
+            self._pending[i] = 'recycle'
+
+    async def _retire(self, i):
+        supervisor, connection, port = self._supervisors[i], self._connections[i], self._ports[i]
+        self._supervisors[i] = self._connections[i] = None
+        await self._shutdown_simulator(supervisor, connection, port)
+
+    async def _replace_simulator(self, i):
+        """
+        Replaces the simulator i with a pre-warmed spare, falling back to a restart in place when there is none
+        """
+        if not self._spares:
+            await self._restart_simulator(i)
+            return
+        logger.error(f"Replacing simulator {i} with a spare simulator")
+        old_simulator = (self._supervisors[i], self._connections[i], self._ports[i])
+        self._supervisors[i], self._connections[i], self._ports[i] = self._spares.pop(0)
+
+        async def dispose_and_prewarm():
+            await self._shutdown_simulator(*old_simulator)
+            await self._prewarm_spare()
+        self._in_background(dispose_and_prewarm())
+
+    def test_robot(self, robot, conf: PopulationConfig, deadline=None):
         """
         :param robot: robot phenotype
         :param conf: configuration of the experiment
+        :param deadline: time (as in time.time()) after which the robot is not evaluated anymore if it is still
+        waiting for a simulator, its evaluation fails instead. None for no deadline
         :return:
         """
         future = asyncio.Future()
-        self._robot_queue.put_nowait((robot, future, conf))
+        self._submission_times[future] = time.time()
+        self._robot_queue.put_nowait((robot, future, conf, deadline))
         return future
 
     async def _restart_simulator(self, i):
         # restart simulator
         address = '127.0.0.1'
-        port = self._port_start+i
+        port = self._ports[i]
         logger.error("Restarting simulator")
         logger.error("Restarting simulator... disconnecting")
         try:
             await asyncio.wait_for(self._connections[i].disconnect(), 10)
         except asyncio.TimeoutError:
             pass
-        logger.error("Restarting simulator... restarting")
-        await self._supervisors[i].relaunch(10, address=address, port=port)
-        await asyncio.sleep(10)
-        logger.debug("Restarting simulator done... connecting")
-        self._connections[i] = await self._connect_to_simulator(self._settings, address, port)
-        logger.debug("Restarting simulator done... connection done")
-
-    async def _worker_evaluate_robot(self, connection, robot, future, conf):
-        await asyncio.sleep(0.01)
+        self._connections[i] = await self._backend.restart(self._supervisors[i], address, port)
+
+    async def _worker_evaluate_batch(self, connection, batch):
+        """
+        :param connection: connection to the simulator
+        :param batch: list of (robot, future, conf, deadline) evaluated together
+        :return: whether the evaluation succeeded, the futures of the robots are resolved only in that case
+        """
         start = time.time()
         try:
-            timeout = self.EVALUATION_TIMEOUT  # seconds
-            result = await asyncio.wait_for(self._evaluate_robot(connection, robot, conf), timeout=timeout)
+            # the robots of a batch are inserted one after the other
+            timeout = self.EVALUATION_TIMEOUT + (len(batch) - 1) * self.INSERTION_TIMEOUT  # seconds
+            if len(batch) == 1:
+                robot, _future, conf, _deadline = batch[0]
+                evaluation = self._evaluate_robot(connection, robot, conf)
+            else:
+                evaluation = self._evaluate_batch(connection, [(robot, conf) for robot, _future, conf, _deadline in batch])
+            result = await asyncio.wait_for(evaluation, timeout=timeout)
         except asyncio.TimeoutError:
             # WAITED TO MUCH, RESTART SIMULATOR
             elapsed = time.time()-start
             logger.error(f"Simulator restarted after {elapsed}")
             return False
         except Exception:
-            logger.exception(f"Exception running robot {robot.phenotype}")
+            logger.exception(f"Exception running robots {[robot.phenotype for robot, _, _, _ in batch]}")
             return False
 
         elapsed = time.time()-start
         logger.info(f"time taken to do a simulation {elapsed}")
 
-        robot.failed_eval_attempt_count = 0
-        future.set_result(result)
+        results = [result] if len(batch) == 1 else result
+        # one observation per simulation: the robots of a batch are simulated together, the wall time depends on
+        # the number of modules of all of them
+        self._robot_queue.estimator.observe(sum(body_size(robot) for robot, _, _, _ in batch), elapsed)
+        now = time.time()
+        for (robot, future, _conf, _deadline), robot_result in zip(batch, results):
+            robot.failed_eval_attempt_count = 0
+            self.scheduling_statistics.record(robot.phenotype.id, now - self._submission_times.pop(future, now))
+            future.set_result(robot_result)
+        return True
+
+    def _expired(self, item):
+        """
+        Fails the evaluation of the robot if its deadline passed
+
+        :param item: (robot, future, conf, deadline) taken from the queue
+        :return: whether the robot expired
+        """
+        robot, future, _conf, deadline = item
+        if deadline is None or time.time() <= deadline:
+            return False
+        logger.warning(f"Deadline passed for robot {robot.phenotype.id}, it is not evaluated")
+        self._submission_times.pop(future, None)
+        self._retry_alone.discard(future)
+        self.scheduling_statistics.expired += 1
+        future.set_result((None, None))
+        self._robot_queue.task_done()
         return True
 
+    async def _next_batch(self):
+        """
+        :return: the next robots to evaluate, waiting for at least one
+        """
+        batch = []
+        while len(batch) == 0:
+            item = await self._robot_queue.get()
+            if not self._expired(item):
+                batch.append(item)
+        if item[1] in self._retry_alone:
+            self._retry_alone.discard(item[1])
+            return batch
+        while len(batch) < self._robots_per_simulator and not self._robot_queue.empty() \
+                and self._robot_queue.peek()[1] not in self._retry_alone:
+            item = self._robot_queue.get_nowait()
+            if not self._expired(item):
+                batch.append(item)
+        return batch
+
+    def _fail_batch(self, batch):
+        """
+        Fails the evaluation of the robots of a batch that are not resolved yet, e.g. when their worker died
+        :param batch: list of (robot, future, conf, deadline) taken from the queue
+        """
+        for robot, future, _conf, _deadline in batch:
+            if not future.done():
+                logger.error(f"Evaluation of robot {robot.phenotype.id} failed, fitness set to None")
+                self._submission_times.pop(future, None)
+                self._retry_alone.discard(future)
+                future.set_result((None, None))
+            self._robot_queue.task_done()
+
     async def _simulator_queue_worker(self, i):
+        # robots taken from the queue and not done yet, failed if the worker dies
+        batch = []
         try:
             self._free_simulator[i] = True
+            statistics = self.statistics[i]
             while True:
                 logger.info(f"simulator {i} waiting for robot")
-                (robot, future, conf) = await self._robot_queue.get()
+                start = time.time()
+                batch = await self._next_batch()
+                statistics.idle_time += time.time() - start
                 self._free_simulator[i] = False
-                logger.info(f"Picking up robot {robot.phenotype.id} into simulator {i}")
-                success = await self._worker_evaluate_robot(self._connections[i], robot, future, conf)
+                logger.info(f"Picking up robots {[robot.phenotype.id for robot, _, _, _ in batch]} into simulator {i}")
+                start = time.time()
+                success = await self._worker_evaluate_batch(self._connections[i], batch)
+                statistics.busy_time += time.time() - start
+                statistics.evaluations += len(batch)
                 if success:
-                    if robot.failed_eval_attempt_count == 3:
-                        logger.info("Robot failed to be evaluated 3 times. Saving robot to failed_eval file")
-                        conf.experiment_management.export_failed_eval_robot(robot)
-                    robot.failed_eval_attempt_count = 0
-                    logger.info(f"simulator {i} finished robot {robot.phenotype.id}")
+                    for robot, _future, conf, _deadline in batch:
+                        if robot.failed_eval_attempt_count == 3:
+                            logger.info("Robot failed to be evaluated 3 times. Saving robot to failed_eval file")
+                            # there is no experiment management on the remote workers of a distributed evaluation
+                            if conf.experiment_management is not None:
+                                conf.experiment_management.export_failed_eval_robot(robot)
+                        robot.failed_eval_attempt_count = 0
+                        logger.info(f"simulator {i} finished robot {robot.phenotype.id}")
+                elif len(batch) > 1:
+                    # restart of the simulator happened, any robot of the batch may have caused the failure:
+                    # they are evaluated alone before a failure is counted against them
+                    for robot, future, conf, deadline in batch:
+                        logger.info(f"Robot {robot.phenotype.id} of a failed batch is evaluated again alone")
+                        self._retry_alone.add(future)
+                        await self._robot_queue.put((robot, future, conf, deadline))
                 else:
                     # restart of the simulator happened
-                    robot.failed_eval_attempt_count += 1
-                    logger.info(f"Robot {robot.phenotype.id} current failed attempt: {robot.failed_eval_attempt_count}")
-                    await self._robot_queue.put((robot, future, conf))
-                    await self._restart_simulator(i)
-                self._robot_queue.task_done()
+                    for robot, future, conf, deadline in batch:
+                        robot.failed_eval_attempt_count += 1
+                        logger.info(f"Robot {robot.phenotype.id} current failed attempt: "
+                                    f"{robot.failed_eval_attempt_count}")
+                        await self._robot_queue.put((robot, future, conf, deadline))
+                for _ in batch:
+                    self._robot_queue.task_done()
+                batch = []
+                if not success:
+                    statistics.failures += 1
+                    if self._pending[i] == 'recycle':
+                        self._pending[i] = None
+                    start = time.time()
+                    await self._replace_simulator(i)
+                    statistics.restart_time += time.time() - start
+                if self._pending[i] == 'retire':
+                    await self._retire(i)
+                    return
+                if self._pending[i] == 'recycle':
+                    self._pending[i] = None
+                    start = time.time()
+                    await self._replace_simulator(i)
+                    statistics.restart_time += time.time() - start
                 self._free_simulator[i] = True
         except Exception:
             logger.exception(f"Exception occurred for Simulator worker {i}")
+            # nobody else would resolve the futures of its robots
+            self._fail_batch(batch)
+
+    async def _wait_evaluation(self, robot_manager):
+        """
+        Waits until the simulator reports the robot dead. The simulator is considered hung, and the evaluation
+        failed, when it does not send any state update for HEARTBEAT_TIMEOUT seconds.
+        """
+        last_update = robot_manager.last_update
+        while True:
+            try:
+                # woken up as soon as the simulator reports the robot dead
+                await robot_manager.wait_dead(timeout=self.HEARTBEAT_TIMEOUT)
+                return
+            except asyncio.TimeoutError:
+                if robot_manager.last_update is last_update:
+                    logger.error(f"No state update for {robot_manager.name} in {self.HEARTBEAT_TIMEOUT}s")
+                    raise
+                last_update = robot_manager.last_update
+
+    async def _wait_or_stop(self, simulator_connection, robot_manager):
+        """
+        Waits for the end of the evaluation of the robot, a robot stopped early is deleted from the simulation
+        instead of being simulated until the end of its life.
+        """
+        await self._wait_evaluation(robot_manager)
+        if robot_manager.stopped_early is not None:
+            logger.info(f'Robot {robot_manager.name} stopped early: {robot_manager.stopped_early}')
+            await simulator_connection.delete_robot(robot_manager)
+
+    @staticmethod
+    def _release_robot(simulator_connection, robot_manager):
+        # the robots stopped early are already deleted
+        if robot_manager.stopped_early is None:
+            simulator_connection.unregister_robot(robot_manager)
 
     async def _evaluate_robot(self, simulator_connection, robot, conf):
         if robot.failed_eval_attempt_count == 3:
@@ -155,23 +485,101 @@ class SimulatorQueue:
             # Change this `max_age` from the command line parameters (--evalution-time)
             max_age = conf.evaluation_time
             robot_manager = await simulator_connection.insert_robot(robot.phenotype, Vector3(0, 0, self._settings.z_start), max_age)
+            early_stopping = getattr(conf, 'early_stopping', None)
+            if early_stopping is not None:
+                early_stopping.watch(robot_manager, max_age)
             start = time.time()
-            # Start a run loop to do some stuff
-            while not robot_manager.dead:  # robot_manager.age() < max_age:
-                await asyncio.sleep(1.0 / 2)  # 5= state_update_frequency
+            await self._wait_or_stop(simulator_connection, robot_manager)
             end = time.time()
             elapsed = end-start
             logger.info(f'Time taken: {elapsed}')
 
             robot_fitness = conf.fitness_function(robot_manager, robot)
 
-            simulator_connection.unregister_robot(robot_manager)
+            self._release_robot(simulator_connection, robot_manager)
             # await simulator_connection.delete_all_robots()
             # await simulator_connection.delete_robot(robot_manager)
             # await simulator_connection.pause(True)
             await simulator_connection.reset(rall=True, time_only=True, model_only=False)
             return robot_fitness, measures.BehaviouralMeasurements(robot_manager, robot)
 
+    def _batch_position(self, k):
+        """
+        :param k: index of the robot in the batch
+        :return: insertion position of the robot, in the k-th cell of a square grid centered on the origin
+        """
+        side = math.ceil(math.sqrt(self._robots_per_simulator))
+        row, column = divmod(k, side)
+        offset = (side - 1) / 2
+        return Vector3((column - offset) * self._robot_spacing,
+                       (row - offset) * self._robot_spacing,
+                       self._settings.z_start)
+
+    async def _evaluate_batch(self, simulator_connection, robots):
+        """
+        Evaluates the robots in the same world, far enough from each other not to collide
+
+        :param simulator_connection: connection to the simulator
+        :param robots: list of (robot, conf)
+        :return: list of (fitness, behavioural measurements), in the same order as the robots
+        """
+        results = [(None, None) for _ in robots]
+        robot_managers = []
+        for k, (robot, conf) in enumerate(robots):
+            if robot.failed_eval_attempt_count == 3:
+                logger.info(f'Robot {robot.phenotype.id} evaluation failed (reached max attempt of 3), '
+                            f'fitness set to None.')
+                continue
+            robot_manager = await simulator_connection.insert_robot(robot.phenotype, self._batch_position(k),
+                                                                    conf.evaluation_time)
+            early_stopping = getattr(conf, 'early_stopping', None)
+            if early_stopping is not None:
+                early_stopping.watch(robot_manager, conf.evaluation_time)
+            robot_managers.append((k, robot_manager))
+
+        start = time.time()
+        await asyncio.gather(*[self._wait_or_stop(simulator_connection, robot_manager)
+                               for _, robot_manager in robot_managers])
+        logger.info(f'Time taken: {time.time() - start}')
+
+        for k, robot_manager in robot_managers:
+            robot, conf = robots[k]
+            results[k] = (conf.fitness_function(robot_manager, robot),
+                          measures.BehaviouralMeasurements(robot_manager, robot))
+            self._release_robot(simulator_connection, robot_manager)
+        await simulator_connection.reset(rall=True, time_only=True, model_only=False)
+        return results
+
+    def log_statistics(self):
+        """
+        Logs the statistics of the simulators, and the scheduling statistics since the last call
+        """
+        for i, statistics in enumerate(self.statistics):
+            logger.info(f'Simulator {i}: {statistics}')
+        logger.info(f'Scheduling: {self.scheduling_statistics}')
+        stragglers = self.scheduling_statistics.stragglers()
+        if stragglers:
+            logger.info(f'Stragglers: {stragglers}')
+        self.scheduling_statistics.reset()
+
+    async def stop(self):
+        """
+        Stops the workers, disconnects from the simulators and terminates them
+        """
+        if self.autoscaler is not None:
+            self.autoscaler.stop()
+        for task in self._workers + list(self._background):
+            task.cancel()
+        simulators = [simulator for simulator in zip(self._supervisors, self._connections, self._ports)
+                      if simulator[1] is not None]
+        for supervisor, connection, port in simulators + self._spares:
+            await self._shutdown_simulator(supervisor, connection, port)
+        self._workers = []
+        self._connections = []
+        self._supervisors = []
+        self._ports = []
+        self._spares = []
+
     async def _joint(self):
         await self._robot_queue.join()
 
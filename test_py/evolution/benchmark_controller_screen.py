@@ -0,0 +1,58 @@
+"""
+Benchmark of the offline simulation of the controllers: time per brain for a python loop over the neurons, for the
+brains simulated one at a time and for the brains simulated in one batch, and how many brains are degenerate.
+
+Run with `python -m test_py.evolution.benchmark_controller_screen`
+"""
+import math
+import random
+import timeit
+
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.revolve_bot.brain.signals import simulate
+
+N_ROBOTS = 100
+# seconds of evaluation, updates of the controller per second
+DURATION = 30
+UPDATE_RATE = 8
+REPETITIONS = 5
+
+
+def python_loop(brain):
+    values = []
+    for k in range(1, DURATION * UPDATE_RATE + 1):
+        t = k / UPDATE_RATE
+        for node_id, node in brain.nodes.items():
+            if node.layer == 'output':
+                params = brain.params[node_id]
+                value = (math.sin((2.0 * math.pi / params.period) * (t - params.period * params.phase_offset))
+                         + 1.0) / 2.0
+                values.append(0.5 - (params.amplitude / 2.0) + value * params.amplitude)
+    return values
+
+
+def main():
+    random.seed(0)
+    conf = PlasticodingConfig()
+    brains = [random_initialization(conf, _id).develop()._brain for _id in range(1, N_ROBOTS + 1)]
+
+    def per_brain(seconds):
+        return seconds / (REPETITIONS * N_ROBOTS) * 1000
+
+    loop = timeit.timeit(lambda: [python_loop(brain) for brain in brains], number=REPETITIONS)
+    single = timeit.timeit(lambda: [simulate([brain], DURATION, UPDATE_RATE) for brain in brains], number=REPETITIONS)
+    batch = timeit.timeit(lambda: simulate(brains, DURATION, UPDATE_RATE), number=REPETITIONS)
+    screen = timeit.timeit(lambda: simulate(brains, DURATION, UPDATE_RATE).degenerate(), number=REPETITIONS)
+    descriptors = timeit.timeit(lambda: simulate(brains, DURATION, UPDATE_RATE).descriptors(), number=REPETITIONS)
+
+    signals = simulate(brains, DURATION, UPDATE_RATE)
+    print('{} brains, {:.1f} outputs on average, {} s at {} Hz, {} degenerate'.format(
+        N_ROBOTS, signals.n_outputs.mean(), DURATION, UPDATE_RATE, signals.degenerate().sum()))
+    print('per brain: python loop {:.3f} ms, one at a time {:.3f} ms, batched {:.3f} ms, '
+          'batched with the screening {:.3f} ms, with the descriptors {:.3f} ms'.format(
+              per_brain(loop), per_brain(single), per_brain(batch), per_brain(screen), per_brain(descriptors)))
+
+
+if __name__ == '__main__':
+    main()
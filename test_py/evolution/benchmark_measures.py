@@ -0,0 +1,73 @@
+"""
+Benchmark of the trajectory of a robot during its evaluation: the update at each pose message and the behavioural
+measures at the end, for the deques of Vector3 / roll pitch yaw against the preallocated arrays.
+
+Run with `python -m test_py.evolution.benchmark_measures`
+"""
+import random
+import timeit
+
+from pyrevolve import SDF
+from pyrevolve.angle.manage.robotmanager import RobotManager
+from pyrevolve.tol.manage import measures
+from pyrevolve.util import Time
+from test_py.evolution.test_measures import LegacyRobotManager, _Individual
+from test_py.generate.benchmark_sdf import random_robot
+from test_py.generate.benchmark_sdf_math import _Values, _World, random_states
+
+# 30 seconds of evaluation at 10 Hz, and a window over all of it
+N_STATES = 300
+REPETITIONS = 20
+
+
+def main():
+    rng = random.Random(0)
+    robot = random_robot(20, rng)
+    robot._morphological_measurements = robot.measure_body()
+    absolute_size = robot._morphological_measurements.measurements_to_dict()['absolute_size']
+    states = random_states(N_STATES, rng)
+    times = [Time(dbl=i * 0.1) for i in range(N_STATES)]
+    module_contacts = _Values(position=[None, None])
+    start = SDF.math.Vector3(0, 0, 0)
+
+    def legacy_updates():
+        legacy = LegacyRobotManager(start, Time(), N_STATES)
+        for time, state in zip(times, states):
+            legacy.update_state(time, state)
+            legacy.update_contacts(module_contacts)
+        return legacy
+
+    def updates():
+        world = _World()
+        robot_manager = RobotManager(robot, start, Time(), speed_window=N_STATES)
+        for time, state in zip(times, states):
+            robot_manager.update_state(world, time, state, None)
+            robot_manager.update_contacts(world, module_contacts)
+        return robot_manager
+
+    legacy = legacy_updates()
+    robot_manager = updates()
+    individual = _Individual(robot)
+
+    def legacy_measures():
+        # the legacy update also converted every orientation to roll / pitch / yaw
+        legacy.measures(absolute_size)
+
+    def array_measures():
+        robot_manager._trajectory._rpy = (0, None)
+        measures.BehaviouralMeasurements(robot_manager, individual)
+
+    legacy_update = min(timeit.repeat(legacy_updates, number=1, repeat=REPETITIONS)) / N_STATES
+    update = min(timeit.repeat(updates, number=1, repeat=REPETITIONS)) / N_STATES
+    print('update per pose message: deques {:.2f} us, arrays {:.2f} us'.format(legacy_update * 1e6, update * 1e6))
+
+    legacy_measure = min(timeit.repeat(legacy_measures, number=1, repeat=REPETITIONS))
+    measure = min(timeit.repeat(array_measures, number=1, repeat=REPETITIONS))
+    print('measures of {} states: deques {:.3f} ms, arrays {:.3f} ms'.format(
+        N_STATES, legacy_measure * 1e3, measure * 1e3))
+    print('whole evaluation: deques {:.3f} ms, arrays {:.3f} ms'.format(
+        (legacy_update * N_STATES + legacy_measure) * 1e3, (update * N_STATES + measure) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
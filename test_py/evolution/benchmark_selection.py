@@ -0,0 +1,40 @@
+"""
+Benchmark of the survivor selection of a steady state population: repeated tournaments on the list of individuals
+against the selection engine on the fitness array, and the NSGA-II selection of the engine.
+
+Run with `python -m test_py.evolution.benchmark_selection`
+"""
+import random
+import timeit
+
+from pyrevolve.evolution.pop_management.steady_state import steady_state_population_management
+from pyrevolve.evolution.selection import tournament_selection
+from pyrevolve.evolution.selection_engine import SelectionEngine
+from test_py.evolution.test_selection_engine import individuals
+
+POPULATION_SIZES = (100, 1000, 5000)
+REPETITIONS = 3
+
+
+def main():
+    random.seed(0)
+    engine = SelectionEngine(seed=0)
+    for population_size in POPULATION_SIZES:
+        old = individuals(*[random.random() for _ in range(population_size)])
+        # a tenth of the offspring was not evaluated
+        new = individuals(*[None if random.random() < 0.1 else random.random() for _ in range(population_size)])
+
+        legacy = min(timeit.repeat(lambda: steady_state_population_management(old, new, tournament_selection),
+                                   number=1, repeat=REPETITIONS))
+        vectorized = min(timeit.repeat(lambda: engine.steady_state_population_management(old, new),
+                                       number=1, repeat=REPETITIONS))
+        nsga2 = min(timeit.repeat(lambda: engine.nsga2(old + new, population_size,
+                                                      lambda individual: (individual.fitness, -id(individual) % 97)),
+                                  number=1, repeat=REPETITIONS))
+        print('{} + {} individuals: tournaments on lists {:.2f} ms, selection engine {:.2f} ms, '
+              'NSGA-II {:.2f} ms'.format(population_size, population_size, legacy * 1e3, vectorized * 1e3,
+                                         nsga2 * 1e3))
+
+
+if __name__ == '__main__':
+    main()
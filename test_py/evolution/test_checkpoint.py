@@ -0,0 +1,111 @@
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.evolution.checkpoint import Checkpoint, save_checkpoint, load_checkpoint
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.evolution.population import Population
+from pyrevolve.experiment_management import ExperimentManagement
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+
+
+class PopulationState:
+    def __init__(self, individuals, next_robot_id):
+        self.individuals = individuals
+        self.next_robot_id = next_robot_id
+
+
+class Conf:
+    def __init__(self, experiment_management):
+        self.experiment_management = experiment_management
+
+
+class Unpicklable:
+    def __reduce__(self):
+        raise RuntimeError('crash while writing')
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        conf = PlasticodingConfig()
+        self.individuals = [develop_individual(random_initialization(conf, robot_id)) for robot_id in range(1, 6)]
+        for i, individual in enumerate(self.individuals):
+            individual.fitness = i / 10
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_restore(self):
+        settings = parser.parse_args(['--manager', os.path.join(self.folder.name, 'manager.py')])
+        experiment_management = ExperimentManagement(settings)
+        experiment_management.create_exp_folders()
+        self.assertFalse(experiment_management.has_checkpoint(3))
+
+        random.seed(7)
+        experiment_management.export_checkpoint(PopulationState(self.individuals, 6), 3)
+        expected_random = [random.random() for _ in range(10)]
+        self.assertTrue(experiment_management.has_checkpoint(3))
+
+        random.seed(8)
+        checkpoint = experiment_management.read_checkpoint(3)
+        checkpoint.restore_random_state()
+        self.assertEqual(expected_random, [random.random() for _ in range(10)])
+
+        self.assertEqual(3, checkpoint.gen_num)
+        self.assertEqual(6, checkpoint.next_robot_id)
+        for expected, individual in zip(self.individuals, checkpoint.individuals):
+            self.assertEqual(expected.fitness, individual.fitness)
+            self.assertEqual(expected.phenotype.to_yaml(), individual.phenotype.to_yaml())
+            self.assertEqual(expected.phenotype._morphological_measurements.measurements_to_dict(),
+                             individual.phenotype._morphological_measurements.measurements_to_dict())
+
+    def test_atomic_write(self):
+        path = os.path.join(self.folder.name, 'checkpoint.pickle')
+        save_checkpoint(path, Checkpoint(1, self.individuals, 6))
+
+        self.individuals[0].fitness = Unpicklable()
+        with self.assertRaises(RuntimeError):
+            save_checkpoint(path, Checkpoint(2, self.individuals, 7))
+        self.assertEqual(['checkpoint.pickle'], os.listdir(self.folder.name))
+
+        checkpoint = load_checkpoint(path)
+        self.assertEqual(1, checkpoint.gen_num)
+        self.assertEqual(0.0, checkpoint.individuals[0].fitness)
+
+    def test_keep_checkpoints(self):
+        settings = parser.parse_args(['--manager', os.path.join(self.folder.name, 'manager.py')])
+        experiment_management = ExperimentManagement(settings)
+        experiment_management.create_exp_folders()
+        for gen_num in range(5):
+            experiment_management.export_checkpoint(PopulationState(self.individuals, 6), gen_num)
+        self.assertEqual([False, False, False, True, True],
+                         [experiment_management.has_checkpoint(gen_num) for gen_num in range(5)])
+
+    def test_recover_offspring(self):
+        settings = parser.parse_args(['--manager', os.path.join(self.folder.name, 'manager.py')])
+        experiment_management = ExperimentManagement(settings)
+        experiment_management.create_exp_folders()
+        experiment_management.export_checkpoint(PopulationState(self.individuals[:3], 4), 0)
+        experiment_management.export_offspring(self.individuals[3], 1)
+        # a crash while appending the next individual
+        with open(os.path.join(experiment_management.experiment_folder, 'checkpoints', 'offspring_1.pickle'), 'ab') as f:
+            f.write(b'\x80\x05\x95')
+
+        # no file of the robots was exported, the state comes from the checkpoint and the offspring file
+        self.assertEqual((0, True, 5), experiment_management.read_recovery_state(3, 2))
+        population = Population(Conf(experiment_management), None)
+        offspring = asyncio.get_event_loop().run_until_complete(population.load_offspring(0, 3, 2, 5))
+        self.assertEqual(1, len(offspring))
+        self.assertEqual(self.individuals[3].fitness, offspring[0].fitness)
+        self.assertEqual(self.individuals[3].phenotype.to_yaml(), offspring[0].phenotype.to_yaml())
+        self.assertEqual(5, population.next_robot_id)
+
+        # the offspring file is not needed anymore once the generation is checkpointed
+        experiment_management.export_checkpoint(PopulationState(self.individuals[1:4], 5), 1)
+        self.assertEqual([], experiment_management.read_offspring(1))
+        self.assertEqual((1, False, 6), experiment_management.read_recovery_state(3, 2))
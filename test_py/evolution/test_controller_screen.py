@@ -0,0 +1,135 @@
+import math
+import unittest
+
+import numpy as np
+
+from pyrevolve.evolution.controller_screen import ControllerScreen
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.revolve_bot.brain import BrainNN
+from pyrevolve.revolve_bot.brain.brain_nn import Connection, Node, Params
+from pyrevolve.revolve_bot.brain.signals import ActuatorSignals, simulate
+
+
+def add_node(brain, _id, layer, _type, **params):
+    node = Node()
+    node.id, node.layer, node.type, node.part_id = _id, layer, _type, _id
+    brain.nodes[_id] = node
+    if params:
+        brain.params[_id] = Params()
+        for name, value in params.items():
+            setattr(brain.params[_id], name, value)
+
+
+def add_connection(brain, src, dst, weight):
+    connection = Connection()
+    connection.src, connection.dst, connection.weight = src, dst, weight
+    brain.add_connection(connection)
+
+
+def oscillators(*params):
+    brain = BrainNN()
+    for i, (period, phase_offset, amplitude) in enumerate(params):
+        add_node(brain, f'node{i}', 'output', 'Oscillator', period=period, phase_offset=phase_offset,
+                 amplitude=amplitude)
+    return brain
+
+
+class _Robot:
+    def __init__(self, brain):
+        self.id = 'robot'
+        self._brain = brain
+
+
+class TestSignals(unittest.TestCase):
+    def test_oscillators(self):
+        brains = [oscillators((2.0, 0.25, 0.8), (1.5, 0.0, 1.0)), oscillators((4.0, 0.5, 0.5))]
+        signals = simulate(brains, 5, update_rate=8)
+        self.assertEqual((2, 2, 40), signals.values.shape)
+        self.assertListEqual([2, 1], list(signals.n_outputs))
+        self.assertTrue(np.all(np.isnan(signals.values[1, 1])))
+
+        for i, brain in enumerate(brains):
+            for j, params in enumerate(brain.params.values()):
+                for k, t in enumerate(signals.times):
+                    # NeuralNetwork::Step
+                    value = (math.sin((2.0 * math.pi / params.period) * (t - params.period * params.phase_offset))
+                             + 1.0) / 2.0
+                    value = 0.5 - (params.amplitude / 2.0) + value * params.amplitude
+                    self.assertEqual(value, signals.values[i, j, k])
+
+    def test_network(self):
+        brain = oscillators((2.0, 0.0, 1.0))
+        add_node(brain, 'sensor', 'input', 'Input')
+        add_node(brain, 'motor', 'output', 'Sigmoid', bias=0.1, gain=2.0)
+        add_node(brain, 'hidden', 'hidden', 'Simple', bias=-0.5, gain=0.5)
+        add_connection(brain, 'node0', 'motor', 1.5)
+        add_connection(brain, 'hidden', 'motor', -1.0)
+        add_connection(brain, 'sensor', 'hidden', 2.0)
+        add_connection(brain, 'motor', 'hidden', 0.3)
+        inputs = np.random.RandomState(0).uniform(size=(1, 16, 1))
+        signals = simulate([brain], 2, update_rate=8, inputs=inputs)
+
+        oscillator = motor = hidden = 0.0
+        for k, t in enumerate(signals.times):
+            next_motor = 1.0 / (1.0 + math.exp(-2.0 * (1.5 * oscillator - hidden - 0.1)))
+            next_hidden = 0.5 * (2.0 * inputs[0, k, 0] + 0.3 * motor + 0.5)
+            oscillator = (math.sin(math.pi * t) + 1.0) / 2.0
+            motor, hidden = next_motor, next_hidden
+            self.assertAlmostEqual(oscillator, signals.values[0, 0, k], places=12)
+            self.assertAlmostEqual(motor, signals.values[0, 1, k], places=12)
+
+        without_connections = simulate([brain], 2, update_rate=8, inputs=inputs, use_connections=False)
+        self.assertAlmostEqual(1.0 / (1.0 + math.exp(0.2)), without_connections.values[0, 1, -1])
+
+    def test_degenerate(self):
+        brains = [
+            oscillators((2.0, 0.0, 1.0)),
+            oscillators((2.0, 0.0, 0.0), (3.0, 0.5, 0.0)),
+            oscillators((0.0, 0.0, 1.0)),
+            oscillators((2.0, 0.0, 0.0), (3.0, 0.5, 1.0)),
+            BrainNN(),
+        ]
+        signals = simulate(brains, 10)
+        self.assertListEqual([False, True, True, False, True], list(signals.degenerate()))
+        self.assertListEqual([True, False], list(signals.constant_outputs()[3]))
+
+    def test_descriptors(self):
+        signals = simulate([oscillators((2.0, 0.0, 1.0), (2.0, 0.0, 0.5)), oscillators((0.5, 0.0, 0.2))], 16)
+        descriptors = signals.descriptors()
+        self.assertEqual((2, len(ActuatorSignals.DESCRIPTORS)), descriptors.shape)
+        amplitude, offset, frequency, synchrony = descriptors[0]
+        self.assertAlmostEqual(0.75, amplitude, places=2)
+        self.assertAlmostEqual(0.5, offset)
+        self.assertAlmostEqual(0.5, frequency)
+        self.assertAlmostEqual(1.0, synchrony)
+        self.assertAlmostEqual(2.0, descriptors[1, 2])
+        # a single output
+        self.assertEqual(0.0, descriptors[1, 3])
+
+    def test_plasticoding(self):
+        conf = PlasticodingConfig()
+        brains = [random_initialization(conf, _id).develop()._brain for _id in range(20)]
+        batched = simulate(brains, 10)
+        for i, brain in enumerate(brains):
+            single = simulate([brain], 10)
+            n_outputs = batched.n_outputs[i]
+            np.testing.assert_array_equal(single.values[0], batched.values[i, :n_outputs])
+            self.assertEqual(single.degenerate()[0], batched.degenerate()[i])
+        self.assertTrue(np.all(np.isfinite(batched.descriptors())))
+
+
+class TestControllerScreen(unittest.TestCase):
+    def test_screen(self):
+        screen = ControllerScreen(10)
+        self.assertFalse(screen.is_degenerate(_Robot(oscillators((2.0, 0.0, 1.0)))))
+        self.assertTrue(screen.is_degenerate(_Robot(oscillators((2.0, 0.0, 0.0)))))
+        self.assertTrue(screen.is_degenerate(_Robot(BrainNN())))
+
+        unknown = oscillators((2.0, 0.0, 1.0))
+        add_node(unknown, 'cpg', 'hidden', 'DifferentialCPG')
+        self.assertFalse(screen.is_degenerate(_Robot(unknown)))
+
+        self.assertEqual(3, screen.statistics.screened)
+        self.assertEqual(2, screen.statistics.rejected)
+        self.assertEqual(1, screen.statistics.unsupported)
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+
+from pyrevolve.evolution.deduplication import PhenotypeDeduplicator
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+
+
+class TestPhenotypeDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.evaluated = []
+
+    async def _evaluate(self, individual):
+        self.evaluated.append(individual)
+        fitness = float(len(self.evaluated))
+        await asyncio.sleep(0.01)
+        return fitness, None
+
+    def _individual(self, genotype):
+        individual = Individual(genotype)
+        individual.develop()
+        return individual
+
+    def test_coalesce(self):
+        conf = PlasticodingConfig()
+        genotype = random_initialization(conf, 1)
+        duplicate = genotype.clone()
+        duplicate.id = 2
+        individuals = [self._individual(genotype),
+                       self._individual(duplicate),
+                       self._individual(random_initialization(conf, 3))]
+        self.assertEqual(individuals[0].phenotype.fingerprint(), individuals[1].phenotype.fingerprint())
+
+        deduplicator = PhenotypeDeduplicator()
+
+        async def evaluate_all():
+            return await asyncio.gather(*[deduplicator.evaluate(individual, self._evaluate)
+                                          for individual in individuals])
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(evaluate_all())
+            # a later generation reuses the completed evaluation
+            later = loop.run_until_complete(deduplicator.evaluate(individuals[1], self._evaluate))
+        finally:
+            loop.close()
+
+        self.assertEqual(2, len(self.evaluated))
+        self.assertEqual(results[0], results[1])
+        self.assertNotEqual(results[0], results[2])
+        self.assertEqual(results[0], later)
+        self.assertEqual(2, deduplicator.hits)
+        self.assertEqual(2, deduplicator.misses)
+
+    def test_forget_failed(self):
+        conf = PlasticodingConfig()
+        individuals = [self._individual(random_initialization(conf, robot_id)) for robot_id in range(1, 4)]
+        deduplicator = PhenotypeDeduplicator(capacity=2)
+
+        async def fail(_individual):
+            return None, None
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual((None, None), loop.run_until_complete(deduplicator.evaluate(individuals[0], fail)))
+            # evaluated again
+            self.assertEqual(0, len(deduplicator))
+            loop.run_until_complete(deduplicator.evaluate(individuals[0], self._evaluate))
+            self.assertEqual(1, len(self.evaluated))
+
+            for individual in individuals[1:]:
+                loop.run_until_complete(deduplicator.evaluate(individual, self._evaluate))
+            # the least recently used evaluation was evicted
+            self.assertEqual(2, len(deduplicator))
+            loop.run_until_complete(deduplicator.evaluate(individuals[0], self._evaluate))
+        finally:
+            loop.close()
+        self.assertEqual(4, len(self.evaluated))
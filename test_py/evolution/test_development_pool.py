@@ -0,0 +1,55 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.evolution.development_pool import DevelopmentPool
+from pyrevolve.experiment_management import ExperimentManagement
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+
+
+class TestDevelopmentPool(unittest.TestCase):
+    def setUp(self):
+        self.conf = PlasticodingConfig()
+        self.genotypes = [random_initialization(self.conf, robot_id) for robot_id in range(1, 9)]
+        self.expected = [genotype.clone().develop() for genotype in self.genotypes]
+
+    def _develop(self, n_workers, experiment_management=None):
+        pool = DevelopmentPool(n_workers)
+
+        async def develop_all():
+            return await asyncio.gather(*pool.develop(self.genotypes, experiment_management=experiment_management))
+
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(develop_all())
+        finally:
+            loop.close()
+            pool.shutdown()
+
+    def _assert_same_individuals(self, individuals):
+        self.assertEqual(len(self.genotypes), len(individuals))
+        for expected, individual in zip(self.expected, individuals):
+            self.assertEqual(expected.to_yaml(), individual.phenotype.to_yaml())
+            self.assertIsNotNone(individual.phenotype._morphological_measurements)
+            self.assertIsNotNone(individual.phenotype._brain_measurements)
+
+    def test_inline(self):
+        self._assert_same_individuals(self._develop(0))
+
+    def test_process_pool(self):
+        self._assert_same_individuals(self._develop(2))
+
+    def test_worker_exports(self):
+        with tempfile.TemporaryDirectory() as folder:
+            settings = parser.parse_args(['--manager', os.path.join(folder, 'manager.py')])
+            experiment_management = ExperimentManagement(settings)
+            experiment_management.create_exp_folders()
+            self._assert_same_individuals(self._develop(2, experiment_management))
+            for genotype in self.genotypes:
+                self.assertTrue(os.path.isfile(os.path.join(experiment_management.data_folder, 'genotypes',
+                                                            f'genotype_robot_{genotype.id}.txt')))
+                self.assertTrue(os.path.isfile(os.path.join(experiment_management.data_folder, 'phenotypes',
+                                                            f'robot_{genotype.id}.yaml')))
@@ -0,0 +1,144 @@
+import math
+import unittest
+
+from pyrevolve.angle.manage.robotmanager import RobotManager
+from pyrevolve.evolution.early_stopping import DisplacementBound, EarlyStopping, EarlyStoppingPolicy, FlippedOver, \
+    stopped_early
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.SDF.math import Vector3
+from pyrevolve.tol.manage import measures
+from pyrevolve.util import Time
+from test_py.generate.benchmark_sdf_math import _Values, _World
+
+
+class _Robot:
+    id = 'robot_1'
+
+
+def state(x, roll=0.0):
+    return _Values(dead=False,
+                   pose=_Values(position=_Values(x=x, y=0.0, z=0.05),
+                                orientation=_Values(w=math.cos(roll / 2), x=math.sin(roll / 2), y=0.0, z=0.0)))
+
+
+def live(robot_manager, states, update_rate=10):
+    """
+    :return: number of states sent before the robot died
+    """
+    for k, robot_state in enumerate(states):
+        seconds = (k + 1) / update_rate
+        robot_manager.update_state(_World(), Time(sec=int(seconds), nsec=int(round(seconds % 1 * 1e9))),
+                                   robot_state, None)
+        if robot_manager.dead:
+            return k + 1
+    return len(states)
+
+
+def individual(fitness):
+    result = Individual(None)
+    result.fitness = fitness
+    return result
+
+
+class _Stop(EarlyStoppingPolicy):
+    def should_stop(self, robot_manager, age, evaluation_time):
+        return 'stop' if age >= 1.0 else None
+
+
+class TestEarlyStopping(unittest.TestCase):
+    def robot_manager(self):
+        return RobotManager(_Robot(), Vector3(0, 0, 0), Time(), speed_window=200)
+
+    def test_flipped_over(self):
+        early_stopping = EarlyStopping([FlippedOver(min_age=2.0)], check_interval=0.5)
+        robot_manager = self.robot_manager()
+        early_stopping.watch(robot_manager, 10)
+        # upside down from the start, stopped at the first check after the minimum age
+        n_states = live(robot_manager, [state(0.0, roll=3.0)] * 100)
+        self.assertEqual(21, n_states)
+        self.assertEqual('flipped over', robot_manager.stopped_early)
+        self.assertEqual(1, early_stopping.statistics.stopped)
+        self.assertAlmostEqual(7.9, early_stopping.statistics.simulation_time_saved)
+
+        upright = self.robot_manager()
+        early_stopping.watch(upright, 10)
+        self.assertEqual(100, live(upright, [state(0.0, roll=0.5)] * 100))
+        self.assertIsNone(upright.stopped_early)
+        self.assertFalse(upright.dead)
+        self.assertEqual(2, early_stopping.statistics.evaluations)
+
+    def test_displacement_bound(self):
+        policy = DisplacementBound(max_speed=0.1, fraction=0.5)
+        early_stopping = EarlyStopping([policy])
+        robot_manager = self.robot_manager()
+        early_stopping.watch(robot_manager, 10)
+        # no population yet
+        self.assertEqual(100, live(robot_manager, [state(0.0)] * 100))
+
+        policy.update([individual(None), individual(0.08), individual(0.2)])
+        self.assertEqual(0.08, policy.threshold)
+        # without moving during 5s, 0.49m in the 4.9s left is less than 0.08 m/s over the 9.9s of the trajectory
+        slow = self.robot_manager()
+        early_stopping.watch(slow, 10)
+        self.assertEqual(51, live(slow, [state(0.0)] * 100))
+        self.assertEqual('too slow', slow.stopped_early)
+
+        fast = self.robot_manager()
+        early_stopping.watch(fast, 10)
+        self.assertEqual(100, live(fast, [state(0.05 * k) for k in range(100)]))
+        self.assertIsNone(fast.stopped_early)
+
+    def test_selected(self):
+        early_stopping = EarlyStopping([_Stop()])
+        robot_manager = self.robot_manager()
+        early_stopping.watch(robot_manager, 10)
+        # checked at 0.1s, then every second
+        self.assertEqual(11, live(robot_manager, [state(0.01 * k) for k in range(100)]))
+        self.assertEqual('stop', robot_manager.stopped_early)
+
+        stopped = individual(0.5)
+        stopped.phenotype = _Values(id='robot_1', _behavioural_measurements=measures.BehaviouralMeasurements())
+        self.assertFalse(stopped_early(stopped))
+        stopped.phenotype._behavioural_measurements.early_stopped = 1.0
+        self.assertTrue(stopped_early(stopped))
+
+        other = individual(1.0)
+        early_stopping.observe_selection([stopped, other], [other, stopped])
+        self.assertEqual(1, early_stopping.generation_statistics.stopped_survived)
+        early_stopping.log_statistics()
+        self.assertEqual(0, early_stopping.generation_statistics.stopped)
+        self.assertEqual(1, early_stopping.statistics.stopped)
+        self.assertEqual(1, early_stopping.statistics.stopped_survived)
+
+    def test_shadow(self):
+        early_stopping = EarlyStopping([_Stop()], shadow_rate=0.5, seed=0)
+        offspring = []
+        for robot_id in range(1, 21):
+            robot = _Robot()
+            robot.id = f'robot_{robot_id}'
+            robot_manager = RobotManager(robot, Vector3(0, 0, 0), Time(), speed_window=200)
+            early_stopping.watch(robot_manager, 10)
+            live(robot_manager, [state(0.01 * k) for k in range(100)])
+            child = individual(float(robot_id))
+            child.phenotype = _Values(id=robot.id, _behavioural_measurements=measures.BehaviouralMeasurements())
+            if robot_manager.stopped_early is not None:
+                child.phenotype._behavioural_measurements.early_stopped = 1.0
+            else:
+                # a shadowed robot lives until the end of its life
+                self.assertFalse(robot_manager.dead)
+            offspring.append(child)
+
+        statistics = early_stopping.statistics
+        self.assertEqual(20, statistics.stopped + statistics.shadowed)
+        self.assertGreater(statistics.shadowed, 0)
+        self.assertGreater(statistics.stopped, 0)
+        self.assertIsNone(EarlyStopping([_Stop()]).statistics.wrongly_stopped())
+
+        # the best half survives
+        survivors = offspring[10:]
+        early_stopping.observe_selection(offspring, survivors)
+        shadowed_selected = sum(1 for child in survivors if not stopped_early(child))
+        self.assertEqual(shadowed_selected, statistics.shadowed_selected)
+        self.assertEqual(10 - shadowed_selected, statistics.stopped_survived)
+        self.assertAlmostEqual(statistics.stopped * shadowed_selected / statistics.shadowed,
+                               statistics.wrongly_stopped())
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.experiment_management import ExperimentManagement
+from pyrevolve.experiment_store import ExperimentStore, BEHAVIOUR, PHENOTYPE
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from test_py.evolution.test_checkpoint import PopulationState
+
+
+class Measurements:
+    """
+    Behavioural measurements, as exported by ExperimentManagement
+    """
+    def __init__(self, velocity, contacts):
+        self.velocity = velocity
+        self.contacts = contacts
+
+    def items(self):
+        return {
+            'velocity': self.velocity,
+            'contacts': self.contacts,
+        }.items()
+
+
+class TestExperimentStore(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.conf = PlasticodingConfig()
+        self.individuals = [develop_individual(random_initialization(self.conf, robot_id)) for robot_id in range(1, 5)]
+        for i, individual in enumerate(self.individuals):
+            if i == 0:
+                # failed evaluation
+                continue
+            individual.fitness = i / 10
+            individual.phenotype._behavioural_measurements = Measurements(i / 100, float(i))
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def _export(self, experiment_store):
+        settings = parser.parse_args([
+            '--manager', os.path.join(self.folder.name, experiment_store, 'manager.py'),
+            '--render-mode', 'lazy',
+            '--experiment-store', experiment_store,
+        ])
+        experiment_management = ExperimentManagement(settings)
+        experiment_management.create_exp_folders()
+        self.assertTrue(experiment_management.experiment_is_new())
+        for individual in self.individuals:
+            experiment_management.export_genotype(individual)
+            experiment_management.export_phenotype(individual)
+            experiment_management.export_phenotype_measurements(individual)
+            experiment_management.export_behavior_measures(individual.phenotype.id,
+                                                           individual.phenotype._behavioural_measurements)
+            experiment_management.export_fitness(individual)
+        experiment_management.export_snapshots(self.individuals[1:3], 0)
+        return experiment_management
+
+    def _assert_same_data(self, expected, experiment_management):
+        self.assertFalse(experiment_management.experiment_is_new())
+        self.assertEqual(expected.read_snapshot_ids(0), experiment_management.read_snapshot_ids(0))
+        self.assertEqual((0, True, 5), experiment_management.read_recovery_state(2, 2))
+        for individual in self.individuals:
+            _id = individual.phenotype.id
+            self.assertEqual(expected.read_fitness(_id), experiment_management.read_fitness(_id))
+            self.assertEqual(expected.read_behavior_measures(_id), experiment_management.read_behavior_measures(_id))
+            self.assertEqual(expected.read_phenotype(_id).to_yaml(), experiment_management.read_phenotype(_id).to_yaml())
+
+            genotype = random_initialization(self.conf, _id)
+            experiment_management.read_genotype(genotype, _id)
+            self.assertEqual(individual.genotype.genotype_text(), genotype.genotype_text())
+
+    def test_sqlite(self):
+        files = self._export('files')
+        sqlite = self._export('sqlite')
+        self.assertEqual(['robot_2', 'robot_3'], sqlite.read_snapshot_ids(0))
+        self._assert_same_data(files, sqlite)
+
+        store = sqlite.store
+        self.assertIsNone(store.measures('robot_1', BEHAVIOUR))
+        self.assertEqual(self.individuals[1].phenotype._morphological_measurements.measurements_to_dict()['hinge_count'],
+                         store.measures('robot_2', PHENOTYPE)['hinge_count'])
+
+    def test_store_lifecycle(self):
+        sqlite = self._export('sqlite')
+        path = os.path.join(sqlite.experiment_folder, 'experiment.sqlite')
+        sqlite.store.add_fitness('robot_5', 0.5)
+        # the buffered writes are committed with the checkpoint of the generation
+        sqlite.export_checkpoint(PopulationState(self.individuals, 6), 0)
+        store = ExperimentStore(path)
+        self.assertIn('robot_5', store.robot_ids())
+        store.close()
+
+        # a new manager reopens the store of the run
+        self.assertFalse(ExperimentManagement(sqlite.settings).experiment_is_new())
+        # the previous database is closed and replaced
+        sqlite.create_exp_folders()
+        self.assertTrue(sqlite.experiment_is_new())
+        self.assertTrue(os.path.isfile(path))
+
+    def test_import(self):
+        files = self._export('files')
+        store = ExperimentStore(os.path.join(self.folder.name, 'imported.sqlite'))
+        store.import_data_fullevolution(files.experiment_folder)
+        self.assertEqual(['robot_1', 'robot_2', 'robot_3', 'robot_4'], sorted(store.robot_ids()))
+        self.assertEqual([(0, 'robot_2'), (0, 'robot_3')], sorted(store.snapshots()))
+
+        headers, rows = store.all_measures()
+        self.assertEqual('robot_id', headers[0])
+        self.assertEqual('velocity', headers[1])
+        self.assertEqual('fitness', headers[-1])
+        rows = {row[0]: row for row in rows}
+        self.assertIsNone(rows['robot_1'][-1])
+        self.assertIsNone(rows['robot_1'][1])
+        self.assertEqual(0.3, rows['robot_4'][-1])
+        self.assertEqual(0.03, rows['robot_4'][1])
+        for individual in self.individuals:
+            self.assertEqual(individual.genotype.genotype_text(), store.genotype(individual.phenotype.id))
+        store.close()
@@ -0,0 +1,147 @@
+import math
+import pickle
+import random
+import unittest
+from collections import deque
+
+import numpy as np
+
+from pyrevolve import SDF
+from pyrevolve.angle.manage.robotmanager import RobotManager
+from pyrevolve.angle.manage.trajectory import RingBuffer, Trajectory
+from pyrevolve.tol.manage import measures
+from pyrevolve.util import Time
+from test_py.generate.benchmark_sdf import random_robot
+from test_py.generate.benchmark_sdf_math import _Values, _World, random_states
+
+
+class LegacyRobotManager:
+    """
+    Reference implementation of the window of the states of a robot, one deque per value
+    """
+
+    def __init__(self, position, time, speed_window):
+        self.speed_window = speed_window
+        self.starting_time = time
+        self.last_position = position
+        self.last_update = time
+        self._ds = deque(maxlen=speed_window)
+        self._dt = deque(maxlen=speed_window)
+        self._positions = deque(maxlen=speed_window)
+        self._orientations = deque(maxlen=speed_window)
+        self._contacts = deque(maxlen=speed_window)
+        self._times = deque(maxlen=speed_window)
+        self._dist = 0
+        self._time = 0
+
+    def update_state(self, time, state):
+        pos = state.pose.position
+        position = SDF.math.Vector3(pos.x, pos.y, pos.z)
+        rot = state.pose.orientation
+        euler = SDF.math.Quaternion(rot.w, rot.x, rot.y, rot.z).get_rpy()
+        if float(self.last_update - self.starting_time) < 0.0:
+            return
+
+        last = self.last_position
+        ds = math.sqrt((position.x - last.x) ** 2 + (position.y - last.y) ** 2)
+        dt = float(time - self.last_update)
+        self._dist += ds
+        self._time += dt
+        if len(self._dt) >= self.speed_window:
+            self._dist -= self._ds[0]
+            self._time -= self._dt[0]
+
+        self.last_position = position
+        self.last_update = time
+        self._positions.append(position)
+        self._times.append(time)
+        self._ds.append(ds)
+        self._dt.append(dt)
+        self._orientations.append(euler)
+
+    def update_contacts(self, module_contacts):
+        self._contacts.append(len(module_contacts.position))
+
+    def measures(self, absolute_size):
+        if len(self._positions) == 0:
+            dist, time = SDF.math.Vector3(0, 0, 0), Time()
+        else:
+            dist, time = self._positions[-1] - self._positions[0], self._times[-1] - self._times[0]
+        balance = None
+        if self._orientations:
+            roll_pitch = sum(abs(o[0]) * 180 / math.pi + abs(o[1]) * 180 / math.pi for o in self._orientations)
+            balance = 1 - roll_pitch / (len(self._orientations) * 180 * 2)
+        return {
+            'velocity': self._dist / self._time if self._time > 0 else 0,
+            'displacement_velocity': 0.0 if time.is_zero() else math.sqrt(dist.x ** 2 + dist.y ** 2) / float(time),
+            'displacement_velocity_hill': 0.0 if time.is_zero() else dist.y / float(time),
+            'head_balance': balance,
+            'contacts': sum(self._contacts) / absolute_size,
+        }
+
+
+class _Individual:
+    def __init__(self, phenotype):
+        self.phenotype = phenotype
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_wrap(self):
+        buffer = RingBuffer(3, 1)
+        self.assertEqual(0, len(buffer))
+        buffer.append((0,))
+        buffer.append((1,))
+        self.assertEqual(1, buffer.row(-1)[0])
+        for i in range(2, 5):
+            buffer.append((i,))
+        self.assertEqual(3, len(buffer))
+        np.testing.assert_array_equal([[2], [3], [4]], buffer.array())
+        self.assertEqual(2, buffer.row(0)[0])
+        self.assertEqual(4, buffer.row(-1)[0])
+        with self.assertRaises(IndexError):
+            buffer.row(3)
+
+
+class TestTrajectory(unittest.TestCase):
+    def test_times(self):
+        trajectory = Trajectory(4)
+        for sec, nsec in ((0, 0), (0, 250000000), (1, 500000000), (2, 750000000)):
+            trajectory.append((sec, nsec) + (0.0,) * 9)
+        np.testing.assert_allclose([0.0, 0.25, 1.5, 2.75], trajectory.times())
+
+
+class TestMeasures(unittest.TestCase):
+    def test_legacy(self):
+        rng = random.Random(0)
+        robot = random_robot(10, rng)
+        robot._morphological_measurements = robot.measure_body()
+        absolute_size = robot._morphological_measurements.measurements_to_dict()['absolute_size']
+
+        for speed_window, n_states in ((60, 10), (60, 200), (200, 200)):
+            world = _World()
+            start = SDF.math.Vector3(0.1, -0.2, 0.05)
+            robot_manager = RobotManager(robot, start, Time(), speed_window=speed_window)
+            legacy = LegacyRobotManager(start, Time(), speed_window)
+            for i, state in enumerate(random_states(n_states, rng)):
+                world.time = Time(dbl=i * 0.125)
+                robot_manager.update_state(world, world.time, state, None)
+                legacy.update_state(world.time, state)
+                module_contacts = _Values(position=[None] * rng.randrange(4))
+                robot_manager.update_contacts(world, module_contacts)
+                legacy.update_contacts(module_contacts)
+
+            expected = legacy.measures(absolute_size)
+            actual = dict(measures.BehaviouralMeasurements(robot_manager, _Individual(robot)).items())
+            for name, value in expected.items():
+                self.assertAlmostEqual(value, actual[name], places=12, msg=name)
+            self.assertAlmostEqual(legacy._dist, measures.path_length(robot_manager), places=12)
+
+            # the trajectory survives a checkpoint
+            copy = pickle.loads(pickle.dumps(robot_manager))
+            self.assertEqual(actual['head_balance'], measures.head_balance(copy))
+
+    def test_empty(self):
+        robot_manager = RobotManager(random_robot(5, random.Random(0)), SDF.math.Vector3(0, 0, 0), Time())
+        self.assertEqual(0, measures.velocity(robot_manager))
+        self.assertEqual(0.0, measures.displacement_velocity(robot_manager))
+        self.assertIsNone(measures.head_balance(robot_manager))
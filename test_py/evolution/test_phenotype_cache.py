@@ -0,0 +1,94 @@
+import tempfile
+import unittest
+
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.evolution.phenotype_cache import PhenotypeCache, CachePolicy
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+
+
+class TestPhenotypeCache(unittest.TestCase):
+    def setUp(self):
+        self.conf = PlasticodingConfig()
+
+    def _individual(self, genotype):
+        individual = Individual(genotype)
+        individual.develop()
+        individual.phenotype.measure_phenotype()
+        return individual
+
+    def test_canonical_hash(self):
+        genotype = random_initialization(self.conf, 1)
+        clone = genotype.clone()
+        clone.id = 2
+        self.assertEqual(genotype.canonical_hash(), clone.canonical_hash())
+
+        symbol = next(symbol for rule in clone.grammar.values() for symbol in rule if len(symbol[1]) > 0)
+        symbol[1][0] = float(symbol[1][0]) + 0.5
+        self.assertNotEqual(genotype.canonical_hash(), clone.canonical_hash())
+
+    def test_phenotype_hit(self):
+        cache = PhenotypeCache()
+        genotype = random_initialization(self.conf, 1)
+        self.assertIsNone(cache.phenotype(genotype))
+        individual = self._individual(genotype)
+        cache.store_phenotype(individual)
+
+        clone = genotype.clone()
+        clone.id = 2
+        phenotype = cache.phenotype(clone)
+        self.assertEqual('robot_2', phenotype.id)
+        self.assertEqual(individual.phenotype.to_yaml().replace('robot_1', 'robot_2'), phenotype.to_yaml())
+        self.assertEqual(individual.phenotype._morphological_measurements.measurements_to_dict(),
+                         phenotype._morphological_measurements.measurements_to_dict())
+        self.assertEqual((0.5, 0.0), cache.hit_rates())
+
+    def test_lru_eviction(self):
+        cache = PhenotypeCache(capacity=2)
+        individuals = [self._individual(random_initialization(self.conf, i)) for i in range(3)]
+        for individual in individuals:
+            cache.store_phenotype(individual)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.phenotype(individuals[0].genotype))
+        self.assertIsNotNone(cache.phenotype(individuals[2].genotype))
+
+    def test_disk_backing_store(self):
+        with tempfile.TemporaryDirectory() as cache_folder:
+            cache = PhenotypeCache(capacity=1, cache_folder=cache_folder, policy=CachePolicy.REUSE)
+            individuals = [self._individual(random_initialization(self.conf, i)) for i in range(2)]
+            cache.store_evaluation(individuals[0], 1.5, None)
+            cache.store_phenotype(individuals[1])
+
+            reloaded = PhenotypeCache(capacity=1, cache_folder=cache_folder, policy=CachePolicy.REUSE)
+            self.assertIsNotNone(reloaded.phenotype(individuals[0].genotype))
+            self.assertEqual((1.5, None), reloaded.evaluation(individuals[0]))
+
+    def test_policies(self):
+        individual = self._individual(random_initialization(self.conf, 1))
+
+        cache = PhenotypeCache(policy=CachePolicy.PHENOTYPE_ONLY)
+        cache.store_evaluation(individual, 1.0, None)
+        self.assertIsNone(cache.evaluation(individual))
+
+        cache = PhenotypeCache(policy=CachePolicy.REUSE)
+        self.assertIsNone(cache.evaluation(individual))
+        self.assertEqual(1.0, cache.store_evaluation(individual, 1.0, None))
+        self.assertEqual((1.0, None), cache.evaluation(individual))
+
+        cache = PhenotypeCache(policy=CachePolicy.RESAMPLE, resample_probability=1.0)
+        cache.store_evaluation(individual, 1.0, None)
+        self.assertIsNone(cache.evaluation(individual))
+        self.assertEqual(2.0, cache.store_evaluation(individual, 3.0, None))
+        # a failed evaluation gets no fitness, and keeps the previous samples
+        self.assertIsNone(cache.store_evaluation(individual, None, None))
+        self.assertEqual(2.0, cache.store_evaluation(individual, 2.0, None))
+
+    def test_failed_evaluation(self):
+        individual = self._individual(random_initialization(self.conf, 1))
+        cache = PhenotypeCache(policy=CachePolicy.REUSE)
+        self.assertIsNone(cache.store_evaluation(individual, None, None))
+        # simulated again
+        self.assertIsNone(cache.evaluation(individual))
+        self.assertIsNotNone(cache.phenotype(individual.genotype))
+        cache.store_evaluation(individual, 1.0, None)
+        self.assertEqual((1.0, None), cache.evaluation(individual))
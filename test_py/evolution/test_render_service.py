@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.evolution.render_service import RenderService, RenderMode, image_paths
+from pyrevolve.experiment_management import ExperimentManagement
+
+
+class FakePhenotype:
+    """
+    Phenotype whose images are the text of its id
+    """
+    def __init__(self, _id):
+        self.id = _id
+
+    def render_body(self, img_path):
+        with open(img_path, 'w') as f:
+            f.write(f'body {self.id}')
+
+    def render_brain(self, img_path):
+        with open(img_path, 'w') as f:
+            f.write(f'brain {self.id}')
+
+
+class TestRenderService(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.images = os.path.join(self.folder.name, 'phenotype_images')
+        self.snapshot = os.path.join(self.folder.name, 'selectedpop_1')
+        os.mkdir(self.images)
+        os.mkdir(self.snapshot)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def _assert_rendered(self, folder, phenotype_id):
+        body_path, brain_path = image_paths(folder, phenotype_id)
+        with open(body_path) as f:
+            self.assertEqual(f'body {phenotype_id}', f.read())
+        with open(brain_path) as f:
+            self.assertEqual(f'brain {phenotype_id}', f.read())
+
+    def _render_and_snapshot(self, mode):
+        service = RenderService(mode, n_workers=2)
+        phenotypes = [FakePhenotype(f'robot_{i}') for i in range(1, 5)]
+        for phenotype in phenotypes + phenotypes[:2]:
+            service.submit(phenotype, self.images)
+        for phenotype in phenotypes[:2]:
+            service.link(phenotype, self.images, self.snapshot)
+        return service, phenotypes
+
+    def test_inline(self):
+        service, phenotypes = self._render_and_snapshot(RenderMode.INLINE)
+        self.assertEqual(4, service.submitted)
+        self.assertEqual(4, service.duplicates)
+        for phenotype in phenotypes:
+            self._assert_rendered(self.images, phenotype.id)
+        for phenotype in phenotypes[:2]:
+            self._assert_rendered(self.snapshot, phenotype.id)
+            self.assertTrue(os.path.samefile(image_paths(self.images, phenotype.id)[0],
+                                             image_paths(self.snapshot, phenotype.id)[0]))
+
+    def test_background(self):
+        service, phenotypes = self._render_and_snapshot(RenderMode.BACKGROUND)
+        service.render_pending()
+        service.shutdown()
+        for phenotype in phenotypes:
+            self._assert_rendered(self.images, phenotype.id)
+        for phenotype in phenotypes[:2]:
+            self._assert_rendered(self.snapshot, phenotype.id)
+        self.assertEqual(2, service.links)
+
+    def test_lazy(self):
+        service, phenotypes = self._render_and_snapshot(RenderMode.LAZY)
+        self.assertEqual([], os.listdir(self.images))
+        self.assertEqual([], os.listdir(self.snapshot))
+        service.render_pending()
+        for phenotype in phenotypes:
+            self._assert_rendered(self.images, phenotype.id)
+        for phenotype in phenotypes[:2]:
+            self._assert_rendered(self.snapshot, phenotype.id)
+
+    def test_lazy_load(self):
+        phenotypes = {f'robot_{i}': FakePhenotype(f'robot_{i}') for i in range(1, 4)}
+        service = RenderService(RenderMode.LAZY, load_phenotype=phenotypes.get)
+        for phenotype in phenotypes.values():
+            service.link(phenotype, self.images, self.snapshot)
+        # the queued jobs don't keep the phenotypes, they are loaded when rendered
+        self.assertTrue(all(job.phenotype is None for job in service._jobs.values()))
+        service.render_pending()
+        for _id in phenotypes:
+            self._assert_rendered(self.snapshot, _id)
+        # only the keys of the rendered images are kept
+        self.assertEqual({}, service._jobs)
+        self.assertEqual(3, len(service))
+        service.submit(phenotypes['robot_1'], self.images)
+        self.assertEqual(1, service.duplicates)
+
+    def test_already_rendered(self):
+        phenotype = FakePhenotype('robot_1')
+        RenderService(RenderMode.INLINE).submit(phenotype, self.images)
+        service = RenderService(RenderMode.LAZY)
+        service.link(phenotype, self.images, self.snapshot)
+        self._assert_rendered(self.snapshot, phenotype.id)
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        settings = parser.parse_args([
+            '--manager', os.path.join(self.folder.name, 'manager.py'),
+            '--render-mode', 'lazy',
+            # the fake phenotypes are not exported, the queued ones are kept in memory
+            '--export-phenotype', 'False',
+        ])
+        self.experiment_management = ExperimentManagement(settings)
+        self.experiment_management.create_exp_folders()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_lazy_snapshot(self):
+        individuals = [Individual(None, FakePhenotype(f'robot_{i}')) for i in range(1, 4)]
+        for individual in individuals:
+            self.experiment_management.export_phenotype_images(os.path.join('data_fullevolution', 'phenotype_images'),
+                                                               individual)
+        self.experiment_management.export_snapshots(individuals, 0)
+
+        # the snapshot is complete, even if no image is rendered yet
+        self.assertEqual(['robot_1', 'robot_2', 'robot_3'], self.experiment_management.read_snapshot_ids(0))
+        self.assertEqual([], os.listdir(self.experiment_management.phenotype_images_folder))
+
+        self.experiment_management.render_service.render_pending()
+        snapshot_folder = os.path.join(self.experiment_management.experiment_folder, 'selectedpop_0')
+        self.assertEqual(7, len(os.listdir(snapshot_folder)))
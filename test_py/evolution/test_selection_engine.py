@@ -0,0 +1,107 @@
+import unittest
+
+import numpy as np
+
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.evolution.selection import tournament_selection
+from pyrevolve.evolution.selection_engine import SelectionEngine, crowding_distance, fitness_array, \
+    non_dominated_fronts
+
+
+def individuals(*fitnesses):
+    result = []
+    for fitness in fitnesses:
+        individual = Individual(None)
+        individual.fitness = fitness
+        result.append(individual)
+    return result
+
+
+class TestSelectionEngine(unittest.TestCase):
+    def test_fitness_array(self):
+        np.testing.assert_array_equal([1.0, -np.inf, -np.inf, 0.5],
+                                      fitness_array(individuals(1.0, None, float('nan'), 0.5)))
+
+    def test_distinct(self):
+        engine = SelectionEngine(seed=0)
+        fitness = engine.rng.uniform(size=200)
+        fitness[::7] = -np.inf
+        for indices in (engine.tournament_indices(fitness, 150, k=10),
+                        engine.roulette_indices(fitness, 150),
+                        engine.rank_indices(fitness, 150, pressure=2.0),
+                        engine.truncation_indices(fitness, 150)):
+            self.assertEqual(150, len(indices))
+            self.assertEqual(150, len(set(indices)))
+        # all the individuals, even with the highest selection pressure
+        self.assertEqual(200, len(set(engine.tournament_indices(fitness, 200, k=200))))
+
+    def test_seed(self):
+        population = individuals(*np.random.RandomState(1).uniform(size=50))
+        for method in ('tournament', 'roulette', 'rank'):
+            first = getattr(SelectionEngine(seed=3), method)(population, 10)
+            second = getattr(SelectionEngine(seed=3), method)(population, 10)
+            self.assertEqual(first, second)
+
+    def test_pressure(self):
+        fitness = np.arange(100, dtype=np.float64)
+        engine = SelectionEngine(seed=0)
+        for select in (lambda: engine.tournament_indices(fitness, 10, k=3),
+                       lambda: engine.roulette_indices(fitness, 10),
+                       lambda: engine.rank_indices(fitness, 10, pressure=2.0)):
+            mean = np.mean([fitness[select()].mean() for _ in range(200)])
+            self.assertGreater(mean, 55)
+        # the worst individual never wins a tournament, the individuals without fitness come last
+        for _ in range(20):
+            self.assertNotIn(0, engine.tournament_indices(fitness, 10, k=2))
+        with_missing = np.array([1.0, -np.inf, 3.0, 2.0])
+        # the worst fitness has a zero weight too
+        self.assertEqual({0, 1}, set(engine.roulette_indices(with_missing, 4)[2:]))
+        np.testing.assert_array_equal([2, 3, 0, 1], SelectionEngine.truncation_indices(with_missing, 4))
+
+    def test_uniform_roulette(self):
+        engine = SelectionEngine(seed=0)
+        counts = np.zeros(4)
+        for _ in range(2000):
+            counts[engine.roulette_indices(np.ones(4), 1)] += 1
+        self.assertTrue(np.all(np.abs(counts - 500) < 100))
+
+    def test_population_management(self):
+        engine = SelectionEngine(seed=0)
+        old = individuals(0.1, 0.5, None, 0.3)
+        new = individuals(0.4, 0.9)
+        self.assertEqual([new[1], old[1], new[0], old[3]], engine.plus_population_management(old, new))
+        survivors = engine.steady_state_population_management(old, new)
+        self.assertEqual(4, len(survivors))
+        self.assertEqual(4, len(set(survivors)))
+        self.assertIn(engine.tournament_selection(old), old)
+        # the single winner selectors are called on the individuals not selected yet
+        survivors = engine.steady_state_population_management(old, new, tournament_selection)
+        self.assertEqual(4, len(set(survivors)))
+        best = lambda individuals: max(individuals, key=lambda individual: fitness_array([individual])[0])
+        self.assertEqual([new[1], old[1], new[0], old[3]],
+                         engine.steady_state_population_management(old, new, best))
+        self.assertEqual([new[1], old[1], new[0], old[3]],
+                         engine.steady_state_population_management(old, new, engine.truncation))
+
+    def test_nsga2(self):
+        objectives = np.array([
+            [1.0, 0.0],
+            [0.0, 1.0],
+            [0.5, 0.5],
+            [0.4, 0.4],
+            [0.2, 0.1],
+            [0.45, 0.3],
+            [-np.inf, 2.0],
+        ])
+        fronts = non_dominated_fronts(objectives)
+        self.assertEqual([[0, 1, 2, 6], [3, 5], [4]], [list(front) for front in fronts])
+        distance = crowding_distance(objectives[fronts[0]])
+        self.assertTrue(np.all(np.isinf(distance[[0, 3]])))
+
+        # the least crowded individuals of the front that doesn't fit
+        middle = np.array([[0.0, 1.0], [0.5, 0.5], [0.6, 0.45], [1.0, 0.0]])
+        np.testing.assert_array_equal([0, 3, 1], SelectionEngine.nsga2_indices(middle, 3))
+        self.assertEqual({0, 1, 2, 6, 3}, set(SelectionEngine.nsga2_indices(objectives, 5)))
+        population = individuals(*range(7))
+        self.assertEqual([population[i] for i in SelectionEngine.nsga2_indices(objectives, 3)],
+                         SelectionEngine().nsga2(population, 3, lambda individual: objectives[individual.fitness]))
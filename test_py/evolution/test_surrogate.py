@@ -0,0 +1,111 @@
+import random
+import unittest
+
+import numpy as np
+
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.evolution.surrogate import RidgeRegressor, SurrogateFitness
+
+
+class _Measurements:
+    def __init__(self, **values):
+        self.values = values
+
+    def measurements_to_dict(self):
+        return dict(self.values)
+
+
+class _Phenotype:
+    def __init__(self, _id, x, y, brain=True):
+        self.id = _id
+        self._morphological_measurements = _Measurements(x=x)
+        self._brain_measurements = _Measurements(y=y) if brain else None
+
+
+def individual(_id, x, y, fitness=None, brain=True):
+    result = Individual(None, _Phenotype(f'robot_{_id}', x, y, brain))
+    result.fitness = fitness
+    return result
+
+
+def true_fitness(x, y):
+    return x ** 2 - y
+
+
+class TestRidgeRegressor(unittest.TestCase):
+    def test_quadratic(self):
+        rng = np.random.RandomState(0)
+        features = rng.uniform(-1, 1, (200, 2))
+        regressor = RidgeRegressor(regularization=1e-6)
+        regressor.add(features[:100], true_fitness(*features[:100].T))
+        regressor.add(features[100:], true_fitness(*features[100:].T))
+        self.assertEqual(200, len(regressor))
+
+        test = rng.uniform(-1, 1, (20, 2))
+        np.testing.assert_allclose(true_fitness(*test.T), regressor.predict(test), atol=1e-6)
+
+        # missing values are replaced by the mean of the samples
+        self.assertEqual(1, len(regressor.predict(np.array([[np.nan, 0.5]]))))
+
+    def test_capacity(self):
+        regressor = RidgeRegressor(capacity=10)
+        regressor.add(np.zeros((8, 1)), np.zeros(8))
+        regressor.add(np.ones((8, 1)), np.ones(8))
+        self.assertEqual(10, len(regressor))
+
+
+class TestSurrogateFitness(unittest.TestCase):
+    def test_inactive(self):
+        surrogate = SurrogateFitness(oversampling=3, min_samples=10)
+        self.assertEqual(4, surrogate.n_candidates(4))
+        candidates = [individual(i, 0.0, 0.0) for i in range(4)]
+        self.assertEqual(candidates, surrogate.select(candidates, 2))
+
+    def test_select(self):
+        random.seed(0)
+        rng = np.random.RandomState(0)
+        surrogate = SurrogateFitness(oversampling=3, min_samples=20, exploration=0.0)
+        evaluated = [individual(i, x, y, true_fitness(x, y)) for i, (x, y) in enumerate(rng.uniform(-1, 1, (30, 2)))]
+        # not evaluated, or without brain measurements
+        evaluated.append(individual(30, 0.0, 0.0, None))
+        evaluated.append(individual(31, 0.5, 0.0, 0.25, brain=False))
+        surrogate.observe(evaluated)
+        surrogate.observe(evaluated)
+        self.assertEqual(['x', 'y'], surrogate.descriptor_names)
+        self.assertEqual(31, len(surrogate.regressor))
+        self.assertEqual(12, surrogate.n_candidates(4))
+
+        candidates = [individual(100 + i, x, y) for i, (x, y) in enumerate(rng.uniform(-1, 1, (12, 2)))]
+        selected = surrogate.select(candidates, 4, evaluation_time=60)
+        best = sorted(candidates, key=lambda c: -true_fitness(c.phenotype._morphological_measurements.values['x'],
+                                                              c.phenotype._brain_measurements.values['y']))[:4]
+        self.assertEqual(set(best), set(selected))
+        # in the order of the candidates
+        self.assertEqual(sorted(selected, key=candidates.index), selected)
+
+        for candidate in selected:
+            values = dict(candidate.phenotype._morphological_measurements.values,
+                          **candidate.phenotype._brain_measurements.values)
+            candidate.fitness = true_fitness(values['x'], values['y'])
+        surrogate.observe(selected)
+
+        statistics = surrogate.generation_statistics
+        self.assertEqual(8, statistics.discarded)
+        self.assertAlmostEqual(8 * 60, statistics.simulation_time_saved)
+        self.assertGreater(statistics.rank_correlation(), 0.9)
+        self.assertLess(statistics.mean_absolute_error(), 0.1)
+
+        surrogate.log_statistics()
+        self.assertEqual(0, surrogate.generation_statistics.candidates)
+        self.assertEqual(12, surrogate.statistics.candidates)
+
+    def test_exploration(self):
+        random.seed(1)
+        surrogate = SurrogateFitness(oversampling=2, min_samples=1, exploration=0.5)
+        surrogate.observe([individual(i, float(i), 0.0, float(i)) for i in range(5)])
+        candidates = [individual(10 + i, float(i), 0.0) for i in range(8)]
+        selected = surrogate.select(candidates, 4)
+        self.assertEqual(4, len(selected))
+        # the best two predictions, and two candidates at random among the others
+        self.assertIn(candidates[7], selected)
+        self.assertIn(candidates[6], selected)
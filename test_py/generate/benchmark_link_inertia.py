@@ -0,0 +1,52 @@
+"""
+Benchmark of the center of mass alignment and inertia of the links of a robot, one collision at a time against the
+collisions of all the links in one numpy pass, for bodies of 20, 50 and 100 modules.
+
+Run with `python -m test_py.generate.benchmark_link_inertia`
+"""
+import random
+import timeit
+
+from pyrevolve import SDF
+from pyrevolve.SDF.link import calculate_mass_properties
+from pyrevolve.SDF.revolve_bot_sdf_builder import _revolve_bot_sdf_element
+from test_py.generate.benchmark_sdf import BODY_SIZES, random_robot
+from test_py.generate.test_sdf import legacy_mass_properties
+
+REPETITIONS = 20
+
+
+def main():
+    rng = random.Random(0)
+    for size in BODY_SIZES:
+        # the links are already aligned, aligning them again does the same work
+        sdf_root = _revolve_bot_sdf_element(random_robot(size, rng), SDF.math.Vector3(0, 0, 0.25), True)
+        links = [element for element in sdf_root.iter() if isinstance(element, SDF.Link)]
+
+        def remove_inertials():
+            for link in links:
+                link.remove(link.inertial)
+                link.inertial = None
+
+        def legacy():
+            remove_inertials()
+            for link in links:
+                com, mass, inertia = legacy_mass_properties(link)
+                link.set_position(com * 2.0)
+                for element in link.iter_elements(lambda elem: isinstance(elem, SDF.Posable)):
+                    element.translate(-com)
+                link.inertial = SDF.Inertial.from_mass_matrix(mass, inertia)
+                link.append(link.inertial)
+
+        def vectorized():
+            remove_inertials()
+            calculate_mass_properties(links)
+
+        print('{} modules, {} links: legacy {:.2f} ms, vectorized {:.2f} ms per robot'.format(
+            size, len(links),
+            timeit.timeit(legacy, number=REPETITIONS) / REPETITIONS * 1000,
+            timeit.timeit(vectorized, number=REPETITIONS) / REPETITIONS * 1000))
+
+
+if __name__ == '__main__':
+    main()
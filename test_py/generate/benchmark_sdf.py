@@ -0,0 +1,90 @@
+"""
+Benchmark of the sdf generation of RevolveBot: ElementTree serialization, streaming serialization and the cached
+document of which only the pose is filled in, for bodies of 20, 50 and 100 modules.
+
+Run with `python -m test_py.generate.benchmark_sdf`
+"""
+import random
+import timeit
+import xml.etree.ElementTree
+
+from pyrevolve import SDF
+from pyrevolve.SDF import xml_writer
+from pyrevolve.SDF.revolve_bot_sdf_builder import _revolve_bot_sdf_element
+from pyrevolve.revolve_bot import RevolveBot
+from pyrevolve.revolve_bot.brain import Brain
+from pyrevolve.revolve_bot.revolve_module import ActiveHingeModule, BrickModule, CoreModule
+
+BODY_SIZES = (20, 50, 100)
+REPETITIONS = 10
+
+
+def random_robot(n_modules, rng, _id='benchmark'):
+    """
+    :param n_modules: number of modules of the body, core included
+    :param rng: random.Random
+    :return: RevolveBot with a random tree of bricks and active hinges, whose modules may overlap
+    """
+    core = CoreModule()
+    core.id = 'module_0'
+    core.orientation = 0
+    core.rgb = core.DEFAULT_COLOR
+    # (module, free slot)
+    free_slots = [(core, slot) for slot in range(4)]
+    for module_id in range(1, n_modules):
+        parent, slot = free_slots.pop(rng.randrange(len(free_slots)))
+        module = ActiveHingeModule() if rng.random() < 0.5 else BrickModule()
+        module.id = f'module_{module_id}'
+        module.orientation = rng.choice([0, 90, 180, 270])
+        module.rgb = module.DEFAULT_COLOR
+        parent.children[slot] = module
+        if type(module) is ActiveHingeModule:
+            free_slots.append((module, 1))
+        else:
+            free_slots.extend((module, child_slot) for child_slot in range(1, 4))
+
+    robot = RevolveBot(_id)
+    robot._body = core
+    robot._brain = Brain()
+    return robot
+
+
+def main():
+    rng = random.Random(0)
+    poses = [SDF.math.Vector3(rng.uniform(-10, 10), rng.uniform(-10, 10), 0.25) for _ in range(REPETITIONS)]
+
+    for size in BODY_SIZES:
+        robot = random_robot(size, rng)
+
+        def element_tree():
+            for pose in poses:
+                sdf_root = _revolve_bot_sdf_element(robot, pose, robot.self_collide)
+                xml.etree.ElementTree.tostring(sdf_root, encoding='utf8', method='xml').decode()
+
+        def streaming():
+            for pose in poses:
+                SDF.revolve_bot_to_sdf(robot, pose, None, robot.self_collide)
+
+        def cached():
+            for pose in poses:
+                robot.to_sdf(pose)
+
+        # the first conversion fills the cache
+        robot.to_sdf(poses[0])
+        sdf_root = _revolve_bot_sdf_element(robot, poses[0], robot.self_collide)
+        serialization_tree = timeit.timeit(
+            lambda: xml.etree.ElementTree.tostring(sdf_root, encoding='utf8', method='xml'), number=REPETITIONS)
+        serialization_streaming = timeit.timeit(lambda: xml_writer.to_string(sdf_root), number=REPETITIONS)
+
+        print('{} modules: ElementTree {:.2f} ms, streaming {:.2f} ms, cached {:.3f} ms per document '
+              '(serialization alone {:.2f} ms -> {:.2f} ms)'.format(
+                size,
+                timeit.timeit(element_tree, number=1) / REPETITIONS * 1000,
+                timeit.timeit(streaming, number=1) / REPETITIONS * 1000,
+                timeit.timeit(cached, number=1) / REPETITIONS * 1000,
+                serialization_tree / REPETITIONS * 1000,
+                serialization_streaming / REPETITIONS * 1000))
+
+
+if __name__ == '__main__':
+    main()
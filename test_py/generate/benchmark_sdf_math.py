@@ -0,0 +1,87 @@
+"""
+Microbenchmarks of SDF.math: the small vector and quaternion operations, the sdf builder that is made of them and
+the update of the state of a robot at each pose message.
+
+Run with `python -m test_py.generate.benchmark_sdf_math`
+"""
+import math
+import random
+import timeit
+
+from pyrevolve import SDF
+from pyrevolve.SDF.revolve_bot_sdf_builder import _revolve_bot_sdf_element
+from pyrevolve.angle.manage.robotmanager import RobotManager
+from pyrevolve.util import Time
+from test_py.generate.benchmark_sdf import random_robot
+
+N_OPERATIONS = 100000
+N_STATES = 10000
+BODY_SIZE = 50
+REPETITIONS = 5
+
+
+class _Values:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class _World:
+    def __init__(self):
+        self.time = Time()
+
+    def age(self):
+        return self.time
+
+
+def random_states(n, rng):
+    """
+    :return: pose messages of a robot wandering on the ground
+    """
+    states = []
+    for _ in range(n):
+        yaw = rng.uniform(-math.pi, math.pi)
+        states.append(_Values(
+            dead=False,
+            pose=_Values(position=_Values(x=rng.uniform(-1, 1), y=rng.uniform(-1, 1), z=0.05),
+                         orientation=_Values(w=math.cos(yaw / 2), x=0.01, y=0.02, z=math.sin(yaw / 2)))))
+    return states
+
+
+def main():
+    rng = random.Random(0)
+    v1 = SDF.math.Vector3(0.1, 0.2, 0.3)
+    v2 = SDF.math.Vector3(-0.3, 0.5, 0.1)
+    q1 = SDF.math.Quaternion.from_angle_axis(0.5, SDF.math.Vector3(0, 0, 1))
+    q2 = SDF.math.Quaternion.from_angle_axis(1.5, SDF.math.Vector3(1, 0, 0))
+    operations = [
+        ('Vector3 + Vector3', lambda: v1 + v2),
+        ('Vector3.cross', lambda: v1.cross(v2)),
+        ('Vector3.copy', lambda: v1.copy()),
+        ('Quaternion * Quaternion', lambda: q1 * q2),
+        ('Quaternion * Vector3', lambda: q1 * v1),
+        ('Quaternion.get_rpy', lambda: q1.get_rpy()),
+    ]
+    for name, operation in operations:
+        seconds = min(timeit.repeat(operation, number=N_OPERATIONS, repeat=REPETITIONS))
+        print('{}: {:.2f} us'.format(name, seconds / N_OPERATIONS * 1e6))
+
+    robot = random_robot(BODY_SIZE, rng)
+    pose = SDF.math.Vector3(0, 0, 0.25)
+    seconds = min(timeit.repeat(lambda: _revolve_bot_sdf_element(robot, pose, True), number=1, repeat=REPETITIONS))
+    print('sdf builder, {} modules: {:.2f} ms'.format(BODY_SIZE, seconds * 1000))
+
+    states = random_states(N_STATES, rng)
+
+    def update_states():
+        world = _World()
+        robot_manager = RobotManager(robot, SDF.math.Vector3(0, 0, 0), Time(), speed_window=N_STATES)
+        for i, state in enumerate(states):
+            world.time = Time(dbl=i * 0.125)
+            robot_manager.update_state(world, world.time, state, None)
+
+    seconds = min(timeit.repeat(update_states, number=1, repeat=REPETITIONS))
+    print('RobotManager.update_state: {:.2f} us per pose message'.format(seconds / N_STATES * 1e6))
+
+
+if __name__ == '__main__':
+    main()
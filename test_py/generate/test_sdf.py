@@ -0,0 +1,108 @@
+import pickle
+import random
+import unittest
+import xml.dom.minidom
+import xml.etree.ElementTree
+
+import numpy as np
+
+from pyrevolve import SDF
+from pyrevolve.SDF import xml_writer
+from pyrevolve.SDF.inertial import transform_inertia_tensor
+from pyrevolve.SDF.link import calculate_mass_properties
+from pyrevolve.SDF.revolve_bot_sdf_builder import _revolve_bot_sdf_element
+from pyrevolve.revolve_bot import RevolveBot
+from test_py.generate.benchmark_sdf import random_robot
+
+
+def load_robot(name):
+    robot = RevolveBot()
+    robot.load_file(f'experiments/examples/yaml/{name}.yaml', conf_type='yaml')
+    return robot
+
+
+class TestXmlWriter(unittest.TestCase):
+    def test_element_tree(self):
+        for name in ('spider', 'gecko', 'snake'):
+            sdf_root = _revolve_bot_sdf_element(load_robot(name), SDF.math.Vector3(1, 2, 0.25), True)
+            expected = xml.etree.ElementTree.tostring(sdf_root, encoding='utf8', method='xml').decode()
+            self.assertEqual(expected, xml_writer.to_string(sdf_root))
+
+    def test_pretty(self):
+        sdf_root = _revolve_bot_sdf_element(load_robot('spider'), SDF.math.Vector3(0, 0, 0.25), False)
+        compact = xml.etree.ElementTree.tostring(sdf_root, encoding='utf8', method='xml')
+        expected = xml.dom.minidom.parseString(compact).toprettyxml(indent='\t')
+        self.assertEqual(expected, xml_writer.to_string(sdf_root, indent='\t'))
+
+    def test_escape(self):
+        element = xml.etree.ElementTree.Element('a', {'b': '"<&>\n'})
+        element.text = 'x < y & z'
+        self.assertEqual(xml.etree.ElementTree.tostring(element, encoding='utf8').decode(),
+                         xml_writer.to_string(element))
+
+
+class TestSDFTemplate(unittest.TestCase):
+    def test_render(self):
+        robot = load_robot('gecko')
+        template = SDF.SDFTemplate(robot)
+        for pose in (SDF.math.Vector3(0, 0, 0), SDF.math.Vector3(-3.5, 12.25, 0.25)):
+            self.assertEqual(SDF.revolve_bot_to_sdf(robot, pose, None), template.render(pose))
+
+    def test_cache(self):
+        robot = load_robot('spider')
+        pose = SDF.math.Vector3(5, 0, 0.25)
+        self.assertEqual(SDF.revolve_bot_to_sdf(robot, pose, None), robot.to_sdf(pose))
+        template = robot._sdf_template
+        robot.to_sdf(SDF.math.Vector3(0, 5, 0.25))
+        self.assertIs(template, robot._sdf_template)
+
+        # a different phenotype is converted again
+        robot._body.children[0].orientation = 0
+        self.assertEqual(SDF.revolve_bot_to_sdf(robot, pose, None), robot.to_sdf(pose))
+        self.assertIsNot(template, robot._sdf_template)
+
+        self.assertIsNone(pickle.loads(pickle.dumps(robot))._sdf_template)
+
+
+def legacy_mass_properties(link):
+    """
+    Reference center of mass and inertia tensor of a link, one collision at a time
+    """
+    com = SDF.math.Vector3(0, 0, 0)
+    i_final = np.zeros((3, 3))
+    total_mass = 0.0
+    for collision in link.collisions:
+        com += collision.mass * collision.get_center_of_mass()
+        total_mass += collision.mass
+        i_final += transform_inertia_tensor(collision.mass, collision.get_inertial().get_matrix(),
+                                            collision.get_position(), collision.get_rotation())
+    if total_mass > 0:
+        com /= total_mass
+    return com, total_mass, i_final
+
+
+class TestLinkMassProperties(unittest.TestCase):
+    def test_legacy(self):
+        rng = random.Random(0)
+        robots = [load_robot(name) for name in ('spider', 'gecko', 'snake')]
+        robots += [random_robot(size, rng) for size in (20, 50, 100)]
+        for robot in robots:
+            sdf_root = _revolve_bot_sdf_element(robot, SDF.math.Vector3(0, 0, 0.25), True)
+            for link in sdf_root.iter():
+                if not isinstance(link, SDF.Link):
+                    continue
+                com, mass, inertia = legacy_mass_properties(link)
+                np.testing.assert_allclose(com.data, link.get_center_of_mass().data, atol=1e-15)
+                self.assertAlmostEqual(mass, link.inertial.mass, places=15)
+                np.testing.assert_allclose(inertia, link.inertial.get_matrix(), rtol=1e-12, atol=1e-18)
+
+    def test_empty_link(self):
+        link = SDF.Link('empty')
+        self.assertEqual((0.0, 0.0, 0.0), tuple(link.get_center_of_mass()))
+        link.calculate_inertial()
+        self.assertEqual(0.0, link.inertial.mass)
+        np.testing.assert_array_equal(np.zeros((3, 3)), link.inertial.get_matrix())
+
+        links = [SDF.Link('empty'), SDF.Link('empty_too')]
+        calculate_mass_properties(links)
+        self.assertEqual([0.0, 0.0], [link.inertial.mass for link in links])
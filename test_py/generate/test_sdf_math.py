@@ -0,0 +1,114 @@
+import copy
+import pickle
+import random
+import unittest
+
+import numpy as np
+
+from pyrevolve.SDF.math import Quaternion, Vector3, batch
+from pyrevolve.SDF.math import transformations
+
+
+def random_quaternion(rng):
+    return Quaternion(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1))
+
+
+def random_vector(rng):
+    return Vector3(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1))
+
+
+class TestVector3(unittest.TestCase):
+    def test_interface(self):
+        v = Vector3(1, 2, 3)
+        self.assertEqual((1.0, 2.0, 3.0), tuple(v))
+        self.assertEqual(3, len(v))
+        self.assertEqual(2.0, v[1])
+        self.assertEqual(2.0, v.y)
+        self.assertEqual([2.0, 3.0], list(v[1:]))
+        np.testing.assert_array_equal([1.0, 2.0, 3.0], v.data)
+        np.testing.assert_array_equal([1.0, 2.0, 3.0], np.array(v))
+        self.assertEqual((1.0, 2.0, 3.0), tuple(Vector3(np.array([1, 2, 3]))))
+        with self.assertRaises(AssertionError):
+            Vector3([1, 2])
+
+        v[0] = 4
+        v.z = 5
+        self.assertEqual((4.0, 2.0, 5.0), tuple(v))
+        w = v.copy()
+        w += Vector3(1, 1, 1)
+        self.assertEqual((4.0, 2.0, 5.0), tuple(v))
+        self.assertEqual((5.0, 3.0, 6.0), tuple(w))
+        w -= Vector3(1, 1, 1)
+        self.assertEqual((4.0, 2.0, 5.0), tuple(w))
+
+        self.assertEqual((5.0, 3.0, 6.0), tuple(v + [1, 1, 1]))
+        self.assertEqual((-3.0, -1.0, -4.0), tuple([1, 1, 1] - v))
+        self.assertEqual((8.0, 4.0, 10.0), tuple(2 * v))
+        self.assertEqual((2.0, 1.0, 2.5), tuple(v / 2))
+        self.assertEqual((-4.0, -2.0, -5.0), tuple(-v))
+        self.assertAlmostEqual(1.0, v.normalized().norm())
+        self.assertEqual((4.0, 2.0, 5.0), tuple(copy.copy(v)))
+        self.assertEqual((4.0, 2.0, 5.0), tuple(pickle.loads(pickle.dumps(v))))
+
+    def test_products(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            a, b = random_vector(rng), random_vector(rng)
+            np.testing.assert_allclose(np.cross(a.data, b.data), a.cross(b).data)
+            self.assertAlmostEqual(np.dot(a.data, b.data), a.dot(b))
+            self.assertAlmostEqual(np.linalg.norm(a.data), a.norm())
+        self.assertTrue(Vector3(1, 0, 0).parallel_to(Vector3(2, 0, 0)))
+        self.assertTrue(Vector3(1, 0, 0).orthogonal_to(Vector3(0, 3, 0)))
+
+
+class TestQuaternion(unittest.TestCase):
+    def test_operations(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            q, r, v = random_quaternion(rng), random_quaternion(rng), random_vector(rng)
+            np.testing.assert_allclose(transformations.quaternion_multiply(q.data, r.data), (q * r).data)
+            matrix = transformations.quaternion_matrix(q.data)
+            np.testing.assert_allclose(matrix, q.get_matrix().data, atol=1e-12)
+            np.testing.assert_allclose(matrix[:3, :3].dot(v.data), (q * v).data, atol=1e-12)
+            np.testing.assert_allclose(transformations.euler_from_quaternion(q.data, 'sxyz'), q.get_rpy(),
+                                       atol=1e-12)
+            np.testing.assert_allclose(transformations.quaternion_conjugate(q.data), q.conjugated().data)
+            np.testing.assert_allclose(transformations.quaternion_inverse(q.data), q.inversed().data)
+            angle = rng.uniform(-np.pi, np.pi)
+            np.testing.assert_allclose(transformations.quaternion_about_axis(angle, v.data),
+                                       Quaternion.from_angle_axis(angle, v).data)
+
+            product = q.copy()
+            product *= r
+            np.testing.assert_allclose((q * r).data, product.data)
+
+    def test_gimbal_lock(self):
+        q = Quaternion.from_rpy(0.3, np.pi / 2, 0.0)
+        np.testing.assert_allclose(transformations.euler_from_quaternion(q.data, 'sxyz'), q.get_rpy(), atol=1e-12)
+        self.assertEqual((0.0, 0.0, 0.0), tuple(Quaternion(0, 0, 0, 0).get_rpy()))
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.quaternions = [random_quaternion(rng) for _ in range(50)] + [Quaternion.from_rpy(0.3, np.pi / 2, 0.0)]
+        self.vectors = [random_vector(rng) for _ in range(len(self.quaternions))]
+
+    def test_rotate(self):
+        rotated = batch.rotate(batch.as_quaternions(self.quaternions), batch.as_vectors(self.vectors))
+        np.testing.assert_allclose([tuple(q * v) for q, v in zip(self.quaternions, self.vectors)], rotated,
+                                   atol=1e-12)
+        rotated = batch.rotate(self.quaternions[0].data, batch.as_vectors(self.vectors))
+        np.testing.assert_allclose([tuple(self.quaternions[0] * v) for v in self.vectors], rotated, atol=1e-12)
+
+    def test_multiply_rpy(self):
+        quaternions = batch.as_quaternions(self.quaternions)
+        np.testing.assert_allclose([tuple(q * r) for q, r in zip(self.quaternions, reversed(self.quaternions))],
+                                   batch.quaternion_multiply(quaternions, quaternions[::-1]))
+        np.testing.assert_allclose([q.get_rpy() for q in self.quaternions], batch.rpy(quaternions), atol=1e-12)
+
+    def test_transform_points(self):
+        position, rotation = self.vectors[0], self.quaternions[0]
+        np.testing.assert_allclose([tuple(rotation * v + position) for v in self.vectors],
+                                   batch.transform_points(position, rotation, batch.as_vectors(self.vectors)),
+                                   atol=1e-12)
@@ -0,0 +1,33 @@
+"""
+Benchmark of the L-system early development on the test genotypes.
+
+Run with `python -m test_py.plasticonding.benchmark_development`
+"""
+import os
+import timeit
+
+from pyrevolve.genotype.plasticoding.plasticoding import Plasticoding, PlasticodingConfig
+from test_py.plasticonding.test_development import legacy_early_development
+
+LOCAL_FOLDER = os.path.dirname(__file__)
+REPETITIONS = 200
+
+
+def main():
+    conf = PlasticodingConfig()
+    for _id in (176, 180):
+        genotype = Plasticoding(conf, _id)
+        genotype.load_genotype(os.path.join(LOCAL_FOLDER, 'genotype_{}.txt'.format(_id)))
+
+        legacy = timeit.timeit(lambda: legacy_early_development(genotype), number=REPETITIONS)
+        compiled = timeit.timeit(genotype.early_development, number=REPETITIONS)
+        print('genotype {}: {} symbols, legacy {:.3f} ms, compiled {:.3f} ms, speedup {:.1f}x'.format(
+            _id,
+            len(genotype.intermediate_phenotype),
+            legacy / REPETITIONS * 1000,
+            compiled / REPETITIONS * 1000,
+            legacy / compiled))
+
+
+if __name__ == '__main__':
+    main()
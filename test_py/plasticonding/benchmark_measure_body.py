@@ -0,0 +1,35 @@
+"""
+Benchmark of the single-pass MeasureBody.measure_all against one pass per descriptor.
+
+Run with `python -m test_py.plasticonding.benchmark_measure_body`
+"""
+import random
+import timeit
+
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.revolve_bot.measure.measure_body import MeasureBody
+from test_py.plasticonding.test_development import legacy_measure_body
+
+N_ROBOTS = 100
+REPETITIONS = 10
+
+
+def main():
+    random.seed(0)
+    conf = PlasticodingConfig(e_max_groups=8, i_iterations=4)
+    bodies = [random_initialization(conf, _id).develop()._body for _id in range(N_ROBOTS)]
+    sizes = [MeasureBody(body).measure_all()['absolute_size'] for body in bodies]
+
+    legacy = timeit.timeit(lambda: [legacy_measure_body(body) for body in bodies], number=REPETITIONS)
+    single_pass = timeit.timeit(lambda: [MeasureBody(body).measure_all() for body in bodies], number=REPETITIONS)
+    print('{} bodies, {:.1f} modules on average: legacy {:.3f} ms, single pass {:.3f} ms per body, speedup {:.1f}x'.format(
+        N_ROBOTS,
+        sum(sizes) / len(sizes),
+        legacy / (REPETITIONS * N_ROBOTS) * 1000,
+        single_pass / (REPETITIONS * N_ROBOTS) * 1000,
+        legacy / single_pass))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark of the brain measurements on the adjacency indexes of BrainNN against scanning all the connections
+for every node, on the brains of 100-module bodies.
+
+Run with `python -m test_py.plasticonding.benchmark_measure_brain`
+"""
+import random
+import timeit
+
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.revolve_bot.measure.measure_body import MeasureBody
+from pyrevolve.revolve_bot.measure.measure_brain import MeasureBrain
+from test_py.plasticonding.test_development import legacy_measure_brain
+
+BODY_SIZE = 100
+N_ROBOTS = 50
+REPETITIONS = 10
+
+
+def measure_all(brain):
+    measure = MeasureBrain(brain, 10)
+    measure.measure_all()
+    return measure.measurements_to_dict()
+
+
+def main():
+    random.seed(0)
+    conf = PlasticodingConfig(e_max_groups=8, i_iterations=4, max_structural_modules=BODY_SIZE)
+    brains = []
+    _id = 0
+    while len(brains) < N_ROBOTS:
+        robot = random_initialization(conf, _id).develop()
+        _id += 1
+        if MeasureBody(robot._body).measure_all()['absolute_size'] == BODY_SIZE:
+            brains.append(robot._brain)
+    assert all(legacy_measure_brain(brain, 10) == measure_all(brain) for brain in brains)
+
+    legacy = timeit.timeit(lambda: [legacy_measure_brain(brain, 10) for brain in brains], number=REPETITIONS)
+    indexed = timeit.timeit(lambda: [measure_all(brain) for brain in brains], number=REPETITIONS)
+    print('{} brains, {:.1f} nodes and {:.1f} connections on average: '
+          'legacy {:.3f} ms, indexed {:.3f} ms per brain, speedup {:.1f}x'.format(
+              N_ROBOTS,
+              sum(len(brain.nodes) for brain in brains) / N_ROBOTS,
+              sum(len(brain.connections) for brain in brains) / N_ROBOTS,
+              legacy / (REPETITIONS * N_ROBOTS) * 1000,
+              indexed / (REPETITIONS * N_ROBOTS) * 1000,
+              legacy / indexed))
+
+
+if __name__ == '__main__':
+    main()
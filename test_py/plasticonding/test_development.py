@@ -1,7 +1,17 @@
+import fnmatch
+import math
 import unittest
 import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 import pyrevolve.revolve_bot
+import pyrevolve.revolve_bot.measure.measure_body
+import pyrevolve.revolve_bot.measure.measure_brain
+import pyrevolve.revolve_bot.brain.brain_nn
 import pyrevolve.genotype.plasticoding.plasticoding
 
 LOCAL_FOLDER = os.path.dirname(__file__)
@@ -100,6 +110,28 @@ class Test176(unittest.TestCase):
         # self.assertAlmostEqual(total_components, m.size, 3)
         self.assertAlmostEqual(total_components_abs, m.absolute_size, 3)
 
+    def test_fingerprint(self):
+        relabeled_genotype = pyrevolve.genotype.plasticoding.plasticoding.Plasticoding(self.conf, 177)
+        relabeled_genotype.load_genotype(os.path.join(LOCAL_FOLDER, 'genotype_176.txt'))
+        relabeled = relabeled_genotype.develop()
+        for module in relabeled._iter_all_elements():
+            old_id = module.id
+            module.id = 'relabeled_{}'.format(old_id)
+            for node in relabeled._brain.nodes.values():
+                if node.part_id == old_id:
+                    node.part_id = module.id
+        self.assertEqual(self.robot.fingerprint(), relabeled.fingerprint())
+
+        next(iter(relabeled._brain.params.values())).period += 1
+        self.assertNotEqual(self.robot.fingerprint(), relabeled.fingerprint())
+
+        rotated_genotype = pyrevolve.genotype.plasticoding.plasticoding.Plasticoding(self.conf, 176)
+        rotated_genotype.load_genotype(os.path.join(LOCAL_FOLDER, 'genotype_176.txt'))
+        rotated = rotated_genotype.develop()
+        self.assertEqual(self.robot.fingerprint(), rotated.fingerprint())
+        rotated._body.children[0].orientation += 90
+        self.assertNotEqual(self.robot.fingerprint(), rotated.fingerprint())
+
     def test_measurements_brain(self):
         amplitude_average = 0.551664
         amplitude_deviation = 0.915769767
@@ -155,3 +187,229 @@ class Test176(unittest.TestCase):
         self.assertAlmostEqual(period_deviation, m.dev_period, 3)
         self.assertAlmostEqual(recurrence, m.recurrence, 3)
         self.assertAlmostEqual(synaptic_reception, m.synaptic_reception, 3)
+
+
+def legacy_early_development(genotype):
+    """
+    Reference in-place rewriting, as the L-system used to be expanded
+    """
+    alphabet = pyrevolve.genotype.plasticoding.plasticoding.Alphabet
+    intermediate_phenotype = [[genotype.conf.axiom_w, []]]
+    for i in range(0, genotype.conf.i_iterations):
+        position = 0
+        for aux_index in range(0, len(intermediate_phenotype)):
+            symbol = intermediate_phenotype[position]
+            if [symbol[0], []] in alphabet.modules():
+                intermediate_phenotype.pop(position)
+                for ii in range(0, len(genotype.grammar[symbol[0]])):
+                    intermediate_phenotype.insert(position+ii, genotype.grammar[symbol[0]][ii])
+                position = position+ii+1
+            else:
+                position = position + 1
+    return intermediate_phenotype
+
+
+class TestEarlyDevelopment(unittest.TestCase):
+    def setUp(self):
+        self.conf = pyrevolve.genotype.plasticoding.plasticoding.PlasticodingConfig()
+
+    def _assert_same_expansion(self, genotype):
+        expected = legacy_early_development(genotype)
+        genotype.early_development()
+        self.assertEqual(len(expected), len(genotype.intermediate_phenotype))
+        for symbol, expected_symbol in zip(genotype.intermediate_phenotype, expected):
+            self.assertIs(symbol, expected_symbol)
+
+    def test_files(self):
+        for _id in (176, 180):
+            genotype = pyrevolve.genotype.plasticoding.plasticoding.Plasticoding(self.conf, _id)
+            genotype.load_genotype(os.path.join(LOCAL_FOLDER, 'genotype_{}.txt'.format(_id)))
+            self._assert_same_expansion(genotype)
+
+    def test_random(self):
+        for _id in range(20):
+            genotype = pyrevolve.genotype.plasticoding.plasticoding.initialization.random_initialization(self.conf, _id)
+            self._assert_same_expansion(genotype)
+
+    def test_phenotype(self):
+        genotype = pyrevolve.genotype.plasticoding.plasticoding.Plasticoding(self.conf, 176)
+        genotype.load_genotype(os.path.join(LOCAL_FOLDER, 'genotype_176.txt'))
+        robot = genotype.develop()
+
+        reference = pyrevolve.genotype.plasticoding.plasticoding.Plasticoding(self.conf, 176)
+        reference.load_genotype(os.path.join(LOCAL_FOLDER, 'genotype_176.txt'))
+        reference.intermediate_phenotype = legacy_early_development(reference)
+        reference_robot = reference.late_development()
+
+        self.assertEqual(robot.to_yaml(), reference_robot.to_yaml())
+
+
+def legacy_measure_body(body):
+    """
+    Reference measurements, one recursive pass per descriptor
+    """
+    m = pyrevolve.revolve_bot.measure.measure_body.MeasureBody(body)
+    m.measure_limbs()
+    m.measure_length_of_limbs()
+    m.measure_width_height()
+    m.measure_absolute_size()
+    m.measure_proportion()
+    m.measure_joints()
+    m.measure_coverage()
+    m.measure_symmetry()
+    m.measure_branching()
+    m.measure_sensors()
+    return m.measurements_to_dict()
+
+
+class TestMeasureBody(unittest.TestCase):
+    def test_single_pass(self):
+        conf = pyrevolve.genotype.plasticoding.plasticoding.PlasticodingConfig()
+        for _id in range(50):
+            genotype = pyrevolve.genotype.plasticoding.plasticoding.initialization.random_initialization(conf, _id)
+            robot = genotype.develop()
+            measure = pyrevolve.revolve_bot.measure.measure_body.MeasureBody(robot._body)
+            self.assertDictEqual(legacy_measure_body(robot._body), measure.measure_all())
+
+    def test_parallel(self):
+        """
+        Grid traversal state is local to each Render, so bodies can be measured concurrently
+        """
+        conf = pyrevolve.genotype.plasticoding.plasticoding.PlasticodingConfig()
+        bodies = [pyrevolve.genotype.plasticoding.plasticoding.initialization.random_initialization(conf, _id)
+                  .develop()._body
+                  for _id in range(1000)]
+        serial = [legacy_measure_body(body) for body in bodies]
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                parallel = list(executor.map(legacy_measure_body, bodies))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        self.assertListEqual(serial, parallel)
+
+
+def legacy_measure_brain(brain, max_param):
+    """
+    Reference brain measurements, scanning all the connections for every node
+    """
+    def sigmoid(value):
+        return 1 / (1 + math.exp(-value))
+
+    def median_over_max(values):
+        median = np.median(values) if values else 0
+        return 0 if median == 0 or max_param == 0 else median / max_param
+
+    params = brain.params
+    nodes = brain.nodes
+    periods = [params[param].period for param in params]
+    phase_offsets = [params[param].phase_offset for param in params]
+    amplitudes = [params[param].amplitude for param in params]
+    count_oscillators = len([node for node in nodes if nodes[node].type == 'Oscillator'])
+
+    dt = [np.std([params[param].period, params[param].phase_offset, params[param].amplitude]) for param in params]
+    stds = [np.std(values) if values else 0 for values in (periods, phase_offsets, amplitudes)]
+
+    reach = []
+    duplicates = fnmatch.filter(nodes, 'node*-*')
+    for node in nodes:
+        if node not in duplicates and nodes[node].type == 'Input':
+            connections_of_node = 0
+            for connection in brain.connections:
+                if connection.src == nodes[node].id:
+                    connections_of_node += 1
+            if connections_of_node == 0 or count_oscillators == 0:
+                reach.append(0)
+            else:
+                reach.append(connections_of_node / count_oscillators)
+
+    recurrent = len([c for c in brain.connections if c.src == c.dst])
+
+    balance_set = []
+    for node in nodes:
+        if nodes[node].type == 'Oscillator':
+            inhibitory = []
+            excitatory = []
+            for connection in brain.connections:
+                if connection.dst == nodes[node].id and connection.src != nodes[node].id:
+                    if connection.weight < 0:
+                        inhibitory.append(abs(connection.weight))
+                    if connection.weight > 0:
+                        excitatory.append(connection.weight)
+            inhibitory_sum = np.sum(inhibitory) if inhibitory else 0
+            excitatory_sum = np.sum(excitatory) if excitatory else 0
+            min_value = min(inhibitory_sum, excitatory_sum)
+            max_value = max(inhibitory_sum, excitatory_sum)
+            balance_set.append(0 if min_value == 0 or max_value == 0 else min_value / max_value)
+
+    return {
+        'avg_period': median_over_max(periods),
+        'dev_period': sigmoid(stds[0]) if periods else 0,
+        'avg_phase_offset': median_over_max(phase_offsets),
+        'dev_phase_offset': sigmoid(stds[1]) if phase_offsets else 0,
+        'avg_amplitude': median_over_max(amplitudes),
+        'dev_amplitude': sigmoid(stds[2]) if amplitudes else 0,
+        'avg_intra_dev_params': sigmoid(np.median(dt)) if dt else 0,
+        'avg_inter_dev_params': sigmoid(sum(stds) / 3),
+        'sensors_reach': np.median(reach) if reach else 0,
+        'recurrence': 0 if recurrent == 0 or count_oscillators == 0 else recurrent / count_oscillators,
+        'synaptic_reception': np.median(balance_set) if balance_set else 0,
+    }
+
+
+class TestMeasureBrain(unittest.TestCase):
+    def test_single_pass(self):
+        conf = pyrevolve.genotype.plasticoding.plasticoding.PlasticodingConfig()
+        for _id in range(50):
+            genotype = pyrevolve.genotype.plasticoding.plasticoding.initialization.random_initialization(conf, _id)
+            brain = genotype.develop()._brain
+            measure = pyrevolve.revolve_bot.measure.measure_brain.MeasureBrain(brain, 10)
+            measure.measure_all()
+            self.assertDictEqual(legacy_measure_brain(brain, 10), measure.measurements_to_dict())
+
+    def test_indexes(self):
+        conf = pyrevolve.genotype.plasticoding.plasticoding.PlasticodingConfig()
+        brain = pyrevolve.genotype.plasticoding.plasticoding.initialization.random_initialization(conf, 3) \
+            .develop()._brain
+        for node in brain.nodes.values():
+            self.assertListEqual([c for c in brain.connections if c.src == node.id], brain.outgoing(node.id))
+            self.assertListEqual([c for c in brain.connections if c.dst == node.id], brain.incoming(node.id))
+
+        # connections appended without the index are picked up
+        connection = pyrevolve.revolve_bot.brain.brain_nn.Connection()
+        connection.src, connection.dst, connection.weight = 'sensor', 'oscillator', 1.0
+        brain.connections.append(connection)
+        self.assertListEqual([connection], brain.outgoing('sensor'))
+
+        # a remove followed by an append keeps the number of connections
+        replacement = pyrevolve.revolve_bot.brain.brain_nn.Connection()
+        replacement.src, replacement.dst, replacement.weight = 'other sensor', 'oscillator', 1.0
+        brain.connections.remove(connection)
+        brain.connections.append(replacement)
+        self.assertListEqual([], brain.outgoing('sensor'))
+        self.assertListEqual([replacement], brain.outgoing('other sensor'))
+
+        # the ends of an indexed connection changed in place
+        replacement.src = 'sensor'
+        self.assertListEqual([replacement], brain.outgoing('sensor'))
+        self.assertListEqual([], brain.outgoing('other sensor'))
+
+        # a list of the same length replacing the connections
+        brain.connections = [connection if c is replacement else c for c in brain.connections]
+        self.assertListEqual([connection], brain.outgoing('sensor'))
+        self.assertListEqual([connection], brain.incoming('oscillator'))
+
+        # the indexes survive a pickle round trip
+        copy = pickle.loads(pickle.dumps(brain))
+        self.assertListEqual([c.src for c in copy.connections if c.dst == 'oscillator'],
+                             [c.src for c in copy.incoming('oscillator')])
+        copy.connections[-1].src = 'moved'
+        self.assertEqual(1, len(copy.outgoing('moved')))
+
+        params = brain.params_array()
+        self.assertEqual((len(brain.params), 3), params.shape)
+        self.assertListEqual([p.amplitude for p in brain.params.values()],
+                             list(params[:, brain.AMPLITUDE]))
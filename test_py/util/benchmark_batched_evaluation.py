@@ -0,0 +1,50 @@
+"""
+Benchmark of the evaluation of several robots in the same world against one robot per world, on the mock simulator
+running at a fixed real time factor.
+
+Run with `python -m test_py.util.benchmark_batched_evaluation`
+"""
+import asyncio
+import time
+
+from pyrevolve import parser
+from pyrevolve.evolution import fitness
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
+
+N_ROBOTS = 64
+N_CORES = 2
+SPEED = 300
+
+
+class Config:
+    evaluation_time = 30
+    fitness_function = staticmethod(fitness.displacement_velocity)
+
+
+async def evaluate(queue, individuals):
+    await queue.start()
+    await asyncio.gather(*[queue.test_robot(individual, Config()) for individual in individuals])
+    await queue.stop()
+
+
+def main():
+    conf = PlasticodingConfig(max_structural_modules=20)
+    individuals = [develop_individual(random_initialization(conf, robot_id)) for robot_id in range(1, N_ROBOTS + 1)]
+    settings = parser.parse_args(['--simulator-cmd', 'mock', '--mock-speed', str(SPEED)])
+
+    for robots_per_simulator in (1, 4, 9, 16):
+        queue = SimulatorQueue(N_CORES, settings, robots_per_simulator=robots_per_simulator)
+        loop = asyncio.new_event_loop()
+        start = time.time()
+        loop.run_until_complete(evaluate(queue, individuals))
+        elapsed = time.time() - start
+        loop.close()
+        print('{} robots per simulator: {:.0f} robots per core-hour'.format(
+            robots_per_simulator, N_ROBOTS / (elapsed * N_CORES) * 3600))
+
+
+if __name__ == '__main__':
+    main()
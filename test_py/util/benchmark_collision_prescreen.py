@@ -0,0 +1,45 @@
+"""
+Benchmark of the collision pre-screen: time per robot, and how many robots it decides without the body analyzer,
+for random Plasticoding robots and random trees of modules of 20, 50 and 100 modules.
+
+Run with `python -m test_py.util.benchmark_collision_prescreen`
+"""
+import random
+import time
+
+from pyrevolve.SDF.self_collision import check_robot_self_collisions
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from test_py.generate.benchmark_sdf import BODY_SIZES, random_robot
+
+N_ROBOTS = 100
+
+
+def screen(name, robots):
+    rejected = accepted = forwarded = 0
+    start = time.perf_counter()
+    for robot in robots:
+        report = check_robot_self_collisions(robot)
+        if report.colliding:
+            rejected += 1
+        elif report.touching:
+            forwarded += 1
+        else:
+            accepted += 1
+    seconds = time.perf_counter() - start
+    print('{}: {:.2f} ms per robot, {} rejected, {} accepted, {} forwarded to the analyzer'.format(
+        name, seconds / len(robots) * 1000, rejected, accepted, forwarded))
+
+
+def main():
+    conf = PlasticodingConfig()
+    screen('plasticoding', [develop_individual(random_initialization(conf, robot_id)).phenotype
+                            for robot_id in range(1, N_ROBOTS + 1)])
+    rng = random.Random(0)
+    for size in BODY_SIZES:
+        screen(f'{size} modules', [random_robot(size, rng) for _ in range(N_ROBOTS)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark of the SimulatorQueue orchestration on the mock simulator: throughput, queue overhead on top of the
+simulated evaluations, retries and end-to-end latency.
+
+Run with `python -m test_py.util.benchmark_simulator_queue`
+"""
+import asyncio
+import time
+
+from pyrevolve import parser
+from pyrevolve.evolution import fitness
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
+
+N_ROBOTS = 200
+N_CORES = 8
+
+
+class Config:
+    evaluation_time = 30
+    fitness_function = staticmethod(fitness.displacement_velocity)
+
+
+async def evaluate(queue, individuals):
+    async def timed(individual):
+        start = time.time()
+        await queue.test_robot(individual, Config())
+        return time.time() - start
+
+    await queue.start()
+    latencies = await asyncio.gather(*[timed(individual) for individual in individuals])
+    await queue.stop()
+    return latencies
+
+
+def main():
+    conf = PlasticodingConfig()
+    individuals = [develop_individual(random_initialization(conf, robot_id)) for robot_id in range(1, N_ROBOTS + 1)]
+
+    for speed, failure_rate in ((0, 0.0), (0, 0.05), (3000, 0.0)):
+        settings = parser.parse_args(['--simulator-cmd', 'mock',
+                                      '--mock-speed', str(speed),
+                                      '--mock-failure-rate', str(failure_rate)])
+        queue = SimulatorQueue(N_CORES, settings)
+        for individual in individuals:
+            individual.failed_eval_attempt_count = 0
+
+        loop = asyncio.new_event_loop()
+        start = time.time()
+        latencies = loop.run_until_complete(evaluate(queue, individuals))
+        elapsed = time.time() - start
+        loop.close()
+
+        simulated = Config.evaluation_time / speed * N_ROBOTS / N_CORES if speed > 0 else 0.0
+        failures = sum(statistics.failures for statistics in queue.statistics)
+        latencies.sort()
+        print('speed {}, failure rate {}: {:.0f} robots/min, overhead {:.3f}s, {} retries, '
+              'latency median {:.3f}s max {:.3f}s'.format(
+                speed, failure_rate,
+                N_ROBOTS / elapsed * 60,
+                elapsed - simulated,
+                failures,
+                latencies[len(latencies) // 2],
+                latencies[-1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import random
+import unittest
+
+import numpy as np
+
+from pyrevolve import SDF, parser
+from pyrevolve.SDF.self_collision import OrientedBoxes, box_separations, check_robot_self_collisions
+from pyrevolve.evolution.individual import Individual
+from pyrevolve.util.supervisor.analyzer_queue import AnalyzerQueue
+from pyrevolve.util.supervisor.collision_prescreen import CollisionPreScreen
+from test_py.generate.benchmark_sdf import random_robot
+from test_py.generate.test_sdf import load_robot
+from test_py.util.test_simulator_pool import FakeConfig, run
+
+
+def boxes(centers, rotations, sizes):
+    return OrientedBoxes(list(range(len(centers))),
+                         np.arange(len(centers)),
+                         np.array(centers, dtype=np.float64),
+                         SDF.math.batch.rotation_matrices(SDF.math.batch.as_quaternions(rotations)),
+                         np.array(sizes, dtype=np.float64) / 2)
+
+
+class TestBoxSeparations(unittest.TestCase):
+    def test_aligned(self):
+        identity = SDF.math.Quaternion()
+        pairs = boxes([(0, 0, 0), (1.5, 0, 0), (1, 0, 0), (0.5, 0.5, 0)], [identity] * 4, [(1, 1, 1)] * 4)
+        separations = box_separations(pairs, np.array([0, 0, 0]), np.array([1, 2, 3]))
+        np.testing.assert_allclose([0.5, 0.0, -0.5], separations)
+
+    def test_rotated(self):
+        # the bounding boxes overlap, the boxes don't
+        rotation = SDF.math.Quaternion.from_angle_axis(np.pi / 4, SDF.math.Vector3(0, 0, 1))
+        pair = boxes([(0, 0, 0), (1.3, 1.3, 0)], [rotation, rotation], [(1, 1, 1)] * 2)
+        self.assertAlmostEqual(1.3 * np.sqrt(2) - 1, box_separations(pair, np.array([0]), np.array([1]))[0])
+
+        pair = boxes([(0, 0, 0), (1.1, 0, 0)], [SDF.math.Quaternion(), rotation], [(1, 1, 1)] * 2)
+        self.assertAlmostEqual(1.1 - 0.5 - np.sqrt(2) / 2, box_separations(pair, np.array([0]), np.array([1]))[0])
+
+    def test_random(self):
+        rng = np.random.RandomState(0)
+        n = 100
+        pairs = boxes(rng.uniform(-1, 1, (2 * n, 3)), rng.normal(size=(2 * n, 4)), rng.uniform(0.2, 1.2, (2 * n, 3)))
+        first, second = np.arange(0, 2 * n, 2), np.arange(1, 2 * n, 2)
+        separations = box_separations(pairs, first, second)
+
+        grid = np.stack(np.meshgrid(*[np.linspace(-1, 1, 11)] * 3), axis=-1).reshape(-1, 3)
+        for i, j, separation in zip(first, second, separations):
+            points = pairs.centers[i] + (grid * pairs.half_sizes[i]).dot(pairs.axes[i].T)
+            local_points = (points - pairs.centers[j]).dot(pairs.axes[j])
+            inside = np.any(np.all(np.abs(local_points) <= pairs.half_sizes[j], axis=1))
+            if separation > 0:
+                self.assertFalse(inside)
+            elif separation < -0.1:
+                self.assertTrue(inside)
+
+
+class TestSelfCollisions(unittest.TestCase):
+    def test_robots(self):
+        for name in ('spider', 'gecko', 'snake'):
+            report = check_robot_self_collisions(load_robot(name))
+            self.assertEqual([], report.colliding)
+            self.assertEqual([], report.touching)
+
+        report = check_robot_self_collisions(random_robot(10, random.Random(27)))
+        self.assertEqual(3, len(report.colliding))
+
+        report = check_robot_self_collisions(random_robot(12, random.Random(76)))
+        self.assertTrue(report.ambiguous)
+        self.assertEqual([('component_NNEN_FixedBrick__box_collision', 'component_NWN_ActiveHinge__servo2_collision')],
+                         report.touching)
+
+    def test_no_self_collide(self):
+        robot = random_robot(10, random.Random(27))
+        robot.self_collide = False
+        self.assertEqual([], check_robot_self_collisions(robot).colliding)
+
+
+class TestCollisionPreScreen(unittest.TestCase):
+    def test_statistics(self):
+        settings = parser.parse_args(['--simulator-cmd', 'mock'])
+        prescreen = CollisionPreScreen(AnalyzerQueue(1, settings))
+        robots = [load_robot('snake'), random_robot(10, random.Random(27)), random_robot(12, random.Random(76))]
+
+        async def check():
+            await prescreen.start()
+            results = [await prescreen.test_robot(Individual(None, robot), FakeConfig()) for robot in robots]
+            await prescreen.stop()
+            return results
+
+        results = run(check())
+        self.assertEqual([(0, None), (3, None)], results[:2])
+        # the substrate of the mock analyzer has no intersection
+        self.assertEqual(0, results[2][0])
+        self.assertEqual(1, prescreen.statistics.rejected)
+        self.assertEqual(1, prescreen.statistics.accepted)
+        self.assertEqual(1, prescreen.statistics.forwarded)
+        self.assertAlmostEqual(2 / 3, prescreen.statistics.hit_rate())
+
+    def test_without_analyzer(self):
+        prescreen = CollisionPreScreen()
+        result = run(prescreen.test_robot(Individual(None, random_robot(12, random.Random(76))), FakeConfig()))
+        self.assertEqual((0, None), result)
+        self.assertEqual(1, prescreen.statistics.accepted)
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import subprocess
+import sys
+import unittest
+
+from pyrevolve.evolution import fitness
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.util.supervisor.distributed import DistributedSimulatorQueue, function_name, resolve_function
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeConfig:
+    evaluation_time = 5
+    fitness_function = staticmethod(fitness.displacement_velocity)
+
+
+class TestFunctionName(unittest.TestCase):
+    def test_round_trip(self):
+        name = function_name(fitness.displacement_velocity)
+        self.assertEqual('pyrevolve.evolution.fitness:displacement_velocity', name)
+        self.assertIs(fitness.displacement_velocity, resolve_function(name))
+
+    def test_lambda(self):
+        with self.assertRaises(ValueError):
+            function_name(lambda robot_manager, robot: 0.0)
+
+
+class TestDistributedSimulatorQueue(unittest.TestCase):
+    def setUp(self):
+        conf = PlasticodingConfig()
+        self.individuals = [develop_individual(random_initialization(conf, robot_id)) for robot_id in range(1, 9)]
+
+    def start_worker(self, address, port_start):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([ROOT, env.get('PYTHONPATH', '')])
+        return subprocess.Popen([sys.executable, os.path.join(ROOT, 'revolve.py'),
+                                 '--manager', 'experiments/examples/evaluation_worker.py',
+                                 '--simulator-cmd', 'mock', '--mock-speed', '5',
+                                 '--port-start', str(port_start),
+                                 '--broker-address', '{}:{}'.format(*address)],
+                                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def test_lost_worker(self):
+        queue = DistributedSimulatorQueue(('127.0.0.1', 0))
+        workers = []
+
+        async def evaluate():
+            await queue.start()
+            futures = [queue.test_robot(individual, FakeConfig()) for individual in self.individuals]
+            workers.append(self.start_worker(queue.address, 11345))
+            workers.append(self.start_worker(queue.address, 11445))
+            # kill the first worker while it evaluates its robots
+            while len(queue._workers) < 2 or sum(len(worker.jobs) for worker in queue._workers.values()) < 2:
+                await asyncio.sleep(0.1)
+            workers[0].kill()
+            results = await asyncio.gather(*futures)
+            await queue.stop()
+            return results
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(asyncio.wait_for(evaluate(), 300))
+        finally:
+            loop.close()
+            for worker in workers:
+                worker.kill()
+                worker.wait()
+
+        for fitness_value, behavioural_measurements in results:
+            self.assertIsNotNone(fitness_value)
+            self.assertIsNotNone(behavioural_measurements)
+        self.assertGreaterEqual(sum(statistics.lost for statistics in queue.statistics.values()), 1)
+        self.assertEqual(len(self.individuals), sum(statistics.evaluations for statistics in queue.statistics.values()))
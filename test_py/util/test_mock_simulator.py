@@ -0,0 +1,215 @@
+import asyncio
+import copy
+import os
+import random
+import tempfile
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.evolution import fitness
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.evolution.early_stopping import EarlyStopping, EarlyStoppingPolicy
+from pyrevolve.evolution.pop_management.steady_state import steady_state_population_management
+from pyrevolve.evolution.population import Population, PopulationConfig
+from pyrevolve.evolution.selection import multiple_selection, tournament_selection
+from pyrevolve.evolution.selection_engine import SelectionEngine
+from pyrevolve.evolution.surrogate import SurrogateFitness
+from pyrevolve.experiment_management import ExperimentManagement
+from pyrevolve.genotype.plasticoding.crossover.crossover import CrossoverConfig
+from pyrevolve.genotype.plasticoding.crossover.standard_crossover import standard_crossover
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.mutation.mutation import MutationConfig
+from pyrevolve.genotype.plasticoding.mutation.standard_mutation import standard_mutation
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.util.supervisor.analyzer_queue import AnalyzerQueue
+from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
+
+
+class FakeConfig:
+    evaluation_time = 2
+    fitness_function = staticmethod(fitness.displacement_velocity)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestMockSimulator(unittest.TestCase):
+    def setUp(self):
+        conf = PlasticodingConfig()
+        self.individuals = [develop_individual(random_initialization(conf, robot_id)) for robot_id in range(1, 4)]
+
+    async def _evaluate(self, queue, individuals, conf):
+        await queue.start()
+        try:
+            return await asyncio.gather(*[queue.test_robot(individual, conf) for individual in individuals])
+        finally:
+            await queue.stop()
+
+    def test_evaluate(self):
+        settings = parser.parse_args(['--simulator-cmd', 'mock', '--mock-speed', '0'])
+        twin = copy.deepcopy(self.individuals[0])
+        twin.phenotype._id = 'robot_100'
+        individuals = self.individuals + [twin]
+
+        queue = SimulatorQueue(2, settings)
+        results = run(self._evaluate(queue, individuals, FakeConfig()))
+
+        for fitness_value, behavioural_measurements in results:
+            self.assertIsNotNone(fitness_value)
+            self.assertIsNotNone(behavioural_measurements)
+        # identical robots move in the same way
+        self.assertEqual(results[0][0], results[-1][0])
+        self.assertEqual(4, sum(statistics.evaluations for statistics in queue.statistics))
+
+    def test_failure_restart(self):
+        settings = parser.parse_args(['--simulator-cmd', 'mock', '--mock-speed', '0', '--mock-failure-rate', '1'])
+        queue = SimulatorQueue(1, settings)
+        conf = FakeConfig()
+
+        results = run(self._evaluate(queue, self.individuals[:1], conf))
+
+        # the robot is given up after 3 failed attempts, each followed by a restart of the simulator
+        self.assertEqual([(None, None)], results)
+        self.assertEqual(3, queue.statistics[0].failures)
+
+    def test_analyzer(self):
+        settings = parser.parse_args(['--simulator-cmd', 'mock'])
+        results = run(self._evaluate(AnalyzerQueue(1, settings), self.individuals, FakeConfig()))
+        for collisions, _bounding_box in results:
+            self.assertIn(collisions, (0, 1))
+
+    def test_population(self):
+        population = self._evolve()
+        self.assertEqual(4, len(population.individuals))
+        self.assertEqual(7, population.next_robot_id)
+        for individual in population.individuals:
+            self.assertIsNotNone(individual.fitness)
+
+    def test_population_surrogate(self):
+        random.seed(2)
+        surrogate = SurrogateFitness(oversampling=2, min_samples=1, exploration=0.0)
+        population = self._evolve(surrogate=surrogate)
+
+        # 4 candidates developed, the 2 best predicted evaluated with the ids of the first two
+        self.assertEqual(7, population.next_robot_id)
+        self.assertEqual(4, surrogate.statistics.candidates)
+        self.assertEqual(2, surrogate.statistics.discarded)
+        self.assertAlmostEqual(4, surrogate.statistics.simulation_time_saved)
+        offspring = [individual for individual in population.individuals
+                     if individual.phenotype.id in ('robot_5', 'robot_6')]
+        for individual in offspring:
+            self.assertEqual(individual.phenotype.id, f'robot_{individual.genotype.id}')
+
+    def test_population_early_stopping(self):
+        class StopOffspring(EarlyStoppingPolicy):
+            def __init__(self):
+                self.active = False
+
+            def update(self, individuals):
+                self.active = True
+
+            def should_stop(self, robot_manager, age, evaluation_time):
+                return 'offspring' if self.active and age >= 1.0 else None
+
+        random.seed(0)
+        early_stopping = EarlyStopping([StopOffspring()], check_interval=0.0)
+        population = self._evolve(early_stopping=early_stopping)
+
+        # the initial population is evaluated completely, the offspring is stopped after 1s out of 2s
+        self.assertEqual(6, early_stopping.statistics.evaluations)
+        self.assertEqual({'offspring': 2}, early_stopping.statistics.reasons)
+        self.assertGreater(early_stopping.statistics.simulation_time_saved, 1.0)
+        self.assertLessEqual(early_stopping.statistics.simulation_time_saved, 2.0)
+        n_stopped = 0
+        for individual in population.individuals:
+            self.assertIsNotNone(individual.fitness)
+            early_stopped = individual.phenotype._behavioural_measurements.early_stopped
+            if individual.phenotype.id in ('robot_5', 'robot_6'):
+                n_stopped += 1
+                self.assertGreaterEqual(early_stopped, 1.0)
+                self.assertLess(early_stopped, 1.5)
+            else:
+                self.assertIsNone(early_stopped)
+        self.assertEqual(n_stopped, early_stopping.statistics.stopped_survived)
+
+    def test_population_selection_engine(self):
+        random.seed(0)
+        engine = SelectionEngine(seed=0)
+        # wired as in manager_pop
+        population = self._evolve(selection=engine.tournament_selection,
+                                  parent_selection=lambda individuals: engine.tournament(individuals, 2),
+                                  population_management=engine.steady_state_population_management,
+                                  population_management_selector=None)
+        self.assertEqual(4, len(population.individuals))
+        self.assertEqual(4, len(set(id(individual) for individual in population.individuals)))
+
+    def _evolve(self, **population_options):
+        with tempfile.TemporaryDirectory() as folder:
+            settings = parser.parse_args([
+                '--manager', os.path.join(folder, 'manager.py'),
+                '--simulator-cmd', 'mock',
+                '--mock-speed', '0',
+                '--render-mode', 'lazy',
+                '--evaluation-time', '2',
+            ])
+            experiment_management = ExperimentManagement(settings)
+            experiment_management.create_exp_folders()
+            genotype_conf = PlasticodingConfig(max_structural_modules=10)
+            options = dict(
+                selection=lambda individuals: tournament_selection(individuals, 2),
+                parent_selection=lambda individuals: multiple_selection(individuals, 2, tournament_selection),
+                population_management=steady_state_population_management,
+                population_management_selector=tournament_selection,
+            )
+            options.update(population_options)
+            population_conf = PopulationConfig(
+                population_size=4,
+                genotype_constructor=random_initialization,
+                genotype_conf=genotype_conf,
+                fitness_function=fitness.displacement_velocity,
+                mutation_operator=standard_mutation,
+                mutation_conf=MutationConfig(mutation_prob=0.8, genotype_conf=genotype_conf),
+                crossover_operator=standard_crossover,
+                crossover_conf=CrossoverConfig(crossover_prob=0.8),
+                evaluation_time=settings.evaluation_time,
+                offspring_size=2,
+                experiment_name=settings.experiment_name,
+                experiment_management=experiment_management,
+                **options
+            )
+
+            async def evolve():
+                simulator_queue = SimulatorQueue(2, settings)
+                await simulator_queue.start()
+                analyzer_queue = AnalyzerQueue(1, settings)
+                await analyzer_queue.start()
+                population = Population(population_conf, simulator_queue, analyzer_queue)
+                await population.init_pop()
+                population = await population.next_gen(1)
+                await simulator_queue.stop()
+                await analyzer_queue.stop()
+                return population
+
+            return run(evolve())
+
+    def test_batch(self):
+        settings = parser.parse_args(['--simulator-cmd', 'mock', '--mock-speed', '0'])
+        single = run(self._evaluate(SimulatorQueue(1, settings), self.individuals, FakeConfig()))
+
+        queue = SimulatorQueue(1, settings, robots_per_simulator=4, robot_spacing=5.0)
+        batched = run(self._evaluate(queue, self.individuals, FakeConfig()))
+
+        # evaluated together, each robot moves as if it were alone in the world
+        self.assertEqual([fitness_value for fitness_value, _ in single],
+                         [fitness_value for fitness_value, _ in batched])
+        self.assertEqual(3, queue.statistics[0].evaluations)
+        # the batch is observed once by the runtime estimator
+        self.assertEqual(1, queue._robot_queue.estimator.n)
+        positions = [queue._batch_position(k) for k in range(4)]
+        self.assertEqual([(-2.5, -2.5), (2.5, -2.5), (-2.5, 2.5), (2.5, 2.5)],
+                         [(position.x, position.y) for position in positions])
@@ -0,0 +1,102 @@
+import asyncio
+import time
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.evolution import fitness
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.util.supervisor.scheduler import RobotScheduler, RuntimeEstimator, SchedulingStatistics
+from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
+
+
+class Measurements:
+    def __init__(self, absolute_size):
+        self.absolute_size = absolute_size
+
+
+class Phenotype:
+    def __init__(self, _id, absolute_size):
+        self.id = _id
+        self._morphological_measurements = Measurements(absolute_size)
+
+
+class Robot:
+    def __init__(self, _id, absolute_size, failed_eval_attempt_count=0):
+        self.phenotype = Phenotype(_id, absolute_size)
+        self.failed_eval_attempt_count = failed_eval_attempt_count
+
+
+class FakeConfig:
+    evaluation_time = 2
+    fitness_function = staticmethod(fitness.displacement_velocity)
+
+
+def order(scheduler, items):
+    for item in items:
+        scheduler.put_nowait(item)
+    return [scheduler.get_nowait()[0].phenotype.id for _ in items]
+
+
+class TestRobotScheduler(unittest.TestCase):
+    def setUp(self):
+        self.robots = [Robot(1, 5), Robot(2, 20), Robot(3, 10, failed_eval_attempt_count=1), Robot(4, 15)]
+
+    def test_policies(self):
+        items = [(robot, None, None, None) for robot in self.robots]
+        self.assertEqual([1, 2, 3, 4], order(RobotScheduler('fifo'), items))
+        self.assertEqual([2, 4, 3, 1], order(RobotScheduler('largest_first'), items))
+        self.assertEqual([2, 4, 1, 3], order(RobotScheduler('largest_first', retries_last=True), items))
+        with self.assertRaises(ValueError):
+            RobotScheduler('random')
+
+    def test_deadline(self):
+        items = [(robot, None, None, deadline) for robot, deadline in zip(self.robots, [None, 200, 100, 200])]
+        self.assertEqual([3, 2, 4, 1], order(RobotScheduler('fifo'), items))
+
+    def test_expected_runtime(self):
+        estimator = RuntimeEstimator()
+        self.assertEqual(7.0, estimator.estimate(7))
+        # small bodies are slow to simulate here
+        for size, seconds in [(5, 50.0), (10, 40.0), (20, 20.0)]:
+            estimator.observe(size, seconds)
+        self.assertAlmostEqual(30.0, estimator.estimate(15))
+        items = [(robot, None, None, None) for robot in self.robots]
+        self.assertEqual([1, 3, 4, 2], order(RobotScheduler('expected_runtime', estimator=estimator), items))
+
+    def test_statistics(self):
+        statistics = SchedulingStatistics()
+        for robot_id, latency in enumerate([1.0, 1.2, 0.9, 1.1, 1.0, 1.0, 0.8, 1.1, 1.0, 5.0]):
+            statistics.record(robot_id, latency)
+        self.assertEqual([9], statistics.stragglers())
+        self.assertAlmostEqual(3.8, statistics.tail_time())
+
+
+class TestDeadline(unittest.TestCase):
+    def test_expired(self):
+        conf = PlasticodingConfig()
+        individuals = [develop_individual(random_initialization(conf, robot_id)) for robot_id in range(1, 4)]
+        settings = parser.parse_args(['--simulator-cmd', 'mock', '--mock-speed', '0'])
+        queue = SimulatorQueue(1, settings)
+
+        async def evaluate():
+            await queue.start()
+            results = await asyncio.gather(
+                queue.test_robot(individuals[0], FakeConfig(), deadline=time.time() - 1),
+                queue.test_robot(individuals[1], FakeConfig(), deadline=time.time() + 60),
+                queue.test_robot(individuals[2], FakeConfig()))
+            await queue.stop()
+            return results
+
+        loop = asyncio.new_event_loop()
+        try:
+            expired, on_time, no_deadline = loop.run_until_complete(evaluate())
+        finally:
+            loop.close()
+
+        self.assertEqual((None, None), expired)
+        self.assertIsNotNone(on_time[0])
+        self.assertIsNotNone(no_deadline[0])
+        self.assertEqual(1, queue.scheduling_statistics.expired)
+        self.assertEqual(['robot_2', 'robot_3'], sorted(queue.scheduling_statistics.latencies))
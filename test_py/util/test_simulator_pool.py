@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.evolution import fitness
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.util.supervisor.autoscaler import PoolSample, SimulatorAutoscaler
+from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
+
+
+class FakeConfig:
+    evaluation_time = 2
+    fitness_function = staticmethod(fitness.displacement_velocity)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestSimulatorAutoscaler(unittest.TestCase):
+    def setUp(self):
+        self.autoscaler = SimulatorAutoscaler(None, min_cores=2, max_cores=4)
+
+    def test_grow(self):
+        self.assertEqual((1, []), self.autoscaler.decide(PoolSample(2, 2, 10, 50.0, 40.0)))
+        # nothing waiting, idle simulators, busy machine or full pool
+        self.assertEqual((0, []), self.autoscaler.decide(PoolSample(2, 2, 0, 50.0, 40.0)))
+        self.assertEqual((0, []), self.autoscaler.decide(PoolSample(2, 1, 10, 50.0, 40.0)))
+        self.assertEqual((0, []), self.autoscaler.decide(PoolSample(2, 2, 10, 80.0, 40.0)))
+        self.assertEqual((0, []), self.autoscaler.decide(PoolSample(4, 4, 10, 50.0, 40.0)))
+
+    def test_shrink(self):
+        self.assertEqual((-1, []), self.autoscaler.decide(PoolSample(3, 3, 10, 95.0, 40.0)))
+        self.assertEqual((-1, []), self.autoscaler.decide(PoolSample(3, 3, 10, 50.0, 95.0)))
+        self.assertEqual((0, []), self.autoscaler.decide(PoolSample(2, 2, 10, 95.0, 40.0)))
+
+    def test_unhealthy(self):
+        sample = PoolSample(4, 4, 0, 50.0, 40.0,
+                            evaluation_times={0: 30.0, 1: 31.0, 2: 29.0, 3: 200.0},
+                            simulator_memory={0: 10 ** 8, 1: 10 ** 10, 2: 10 ** 8, 3: 10 ** 8})
+        self.assertEqual((0, [1, 3]), self.autoscaler.decide(sample))
+
+
+class TestSimulatorPool(unittest.TestCase):
+    def setUp(self):
+        conf = PlasticodingConfig()
+        self.individuals = [develop_individual(random_initialization(conf, robot_id)) for robot_id in range(1, 5)]
+        self.settings = parser.parse_args(['--simulator-cmd', 'mock', '--mock-speed', '0'])
+
+    def test_spare_replacement(self):
+        queue = SimulatorQueue(1, self.settings, n_spares=1)
+
+        async def evaluate():
+            await queue.start()
+            crashed = queue._connections[0]
+            crashed._crashed = True
+            result = await queue.test_robot(self.individuals[0], FakeConfig())
+            replacement = queue._connections[0]
+            # a new spare is pre-warmed in the background
+            await asyncio.gather(*queue._background)
+            n_spares = len(queue._spares)
+            await queue.stop()
+            return result, crashed, replacement, n_spares
+
+        (fitness_value, _), crashed, replacement, n_spares = run(evaluate())
+        self.assertIsNotNone(fitness_value)
+        self.assertIsNot(crashed, replacement)
+        self.assertEqual(1, queue.statistics[0].failures)
+        self.assertLess(queue.statistics[0].restart_time, 1)
+        self.assertEqual(1, n_spares)
+
+    def test_grow_shrink(self):
+        queue = SimulatorQueue(2, self.settings, min_cores=1, max_cores=3, n_spares=1)
+        self.assertEqual(11345 + 4, queue.port_end)
+
+        async def scale():
+            await queue.start()
+            await queue.grow()
+            grown = len(queue.active_workers())
+            queue.shrink()
+            queue.shrink()
+            await asyncio.gather(*queue._background)
+            results = await asyncio.gather(*[queue.test_robot(individual, FakeConfig())
+                                             for individual in self.individuals])
+            shrunk = len(queue.active_workers())
+            await queue.stop()
+            return grown, shrunk, results
+
+        grown, shrunk, results = run(scale())
+        self.assertEqual(3, grown)
+        self.assertEqual(1, shrunk)
+        for fitness_value, _ in results:
+            self.assertIsNotNone(fitness_value)
+        self.assertEqual(4, sum(statistics.evaluations for statistics in queue.statistics))
@@ -0,0 +1,206 @@
+import asyncio
+import time
+import unittest
+
+from pyrevolve import parser
+from pyrevolve.angle.manage.robotmanager import RobotManager
+from pyrevolve.evolution.development_pool import develop_individual
+from pyrevolve.genotype.plasticoding.plasticoding import PlasticodingConfig
+from pyrevolve.genotype.plasticoding.initialization import random_initialization
+from pyrevolve.util import Time
+from pyrevolve.util.supervisor.mock_simulator import MockBackend
+from pyrevolve.util.supervisor.simulator_backend import GazeboBackend
+from pyrevolve.util.supervisor.simulator_queue import SimulatorQueue
+
+
+class FakeConnection:
+    """
+    Connection to a simulator in which every robot dies after `life_time` seconds
+    """
+    def __init__(self, life_time):
+        self.life_time = life_time
+
+    async def insert_robot(self, revolve_bot, pose, max_age):
+        robot_manager = RobotManager(revolve_bot, pose, Time())
+        asyncio.get_event_loop().call_later(self.life_time, setattr, robot_manager, 'dead', True)
+        return robot_manager
+
+    def unregister_robot(self, robot_manager):
+        pass
+
+    async def reset(self, **kwargs):
+        pass
+
+
+class FakeConfig:
+    evaluation_time = 0.1
+
+    @staticmethod
+    def fitness_function(robot_manager, robot):
+        return 1.0
+
+
+class FakeSupervisor:
+    def __init__(self):
+        self.launches = []
+
+    async def launch_simulator(self, port):
+        self.launches.append(port)
+
+    async def relaunch(self, sleep_time, address, port):
+        self.launches.append(port)
+
+
+class TestSimulatorQueue(unittest.TestCase):
+    def setUp(self):
+        self.individual = develop_individual(random_initialization(PlasticodingConfig(), 1))
+        self.queue = SimulatorQueue(1, parser.parse_args([]))
+
+    def test_wait_dead(self):
+        robot_manager = RobotManager(self.individual.phenotype, None, Time())
+
+        async def die_later():
+            asyncio.get_event_loop().call_later(0.05, setattr, robot_manager, 'dead', True)
+            await robot_manager.wait_dead(timeout=1)
+
+        loop = asyncio.new_event_loop()
+        try:
+            start = time.time()
+            loop.run_until_complete(die_later())
+            self.assertTrue(robot_manager.dead)
+            self.assertLess(time.time() - start, 0.5)
+
+            alive = RobotManager(self.individual.phenotype, None, Time())
+            with self.assertRaises(asyncio.TimeoutError):
+                loop.run_until_complete(alive.wait_dead(timeout=0.05))
+        finally:
+            loop.close()
+
+    def test_evaluate_robot(self):
+        async def evaluate():
+            self.queue._add_worker(None, FakeConnection(0.05), 11345)
+            await asyncio.sleep(0.1)
+            start = time.time()
+            fitness, _behavioural_measurements = await self.queue.test_robot(self.individual, FakeConfig())
+            elapsed = time.time() - start
+            await self.queue._joint()
+            self.queue._workers[0].cancel()
+            return fitness, elapsed
+
+        loop = asyncio.new_event_loop()
+        try:
+            fitness, elapsed = loop.run_until_complete(evaluate())
+        finally:
+            loop.close()
+
+        self.assertEqual(1.0, fitness)
+        # no polling interval nor fixed sleeps on top of the life of the robot
+        self.assertLess(elapsed, 0.3)
+        statistics = self.queue.statistics[0]
+        self.assertEqual(1, statistics.evaluations)
+        self.assertGreater(statistics.idle_time, 0.05)
+        self.assertGreater(statistics.busy_time, 0.04)
+
+    def test_backend(self):
+        self.assertIsInstance(self.queue._backend, GazeboBackend)
+        self.assertIsInstance(SimulatorQueue(1, parser.parse_args(['--simulator-cmd', 'mock']))._backend, MockBackend)
+
+        supervisor = FakeSupervisor()
+        attempts = []
+
+        async def connect(address, port):
+            attempts.append(port)
+            if len(attempts) == 1:
+                raise ConnectionRefusedError()
+            return FakeConnection(0.05)
+
+        async def launch_and_restart():
+            backend = GazeboBackend(lambda postfix: supervisor, connect)
+            launched, connection = await backend.launch(11346, 1)
+            self.assertIs(supervisor, launched)
+            self.assertIsInstance(connection, FakeConnection)
+            self.assertIsInstance(await backend.restart(supervisor, '127.0.0.1', 11346), FakeConnection)
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(launch_and_restart())
+        finally:
+            loop.close()
+        # the first connection is retried while the simulator is not listening yet
+        self.assertEqual([11346, 11346, 11346], attempts)
+        self.assertEqual([11346, 11346], supervisor.launches)
+
+    def test_worker_dies(self):
+        async def crash(connection, batch):
+            raise RuntimeError('worker bug')
+
+        async def evaluate():
+            self.queue._worker_evaluate_batch = crash
+            self.queue._add_worker(None, FakeConnection(0.05), 11345)
+            result = await asyncio.wait_for(self.queue.test_robot(self.individual, FakeConfig()), 1)
+            await asyncio.wait_for(self.queue._joint(), 1)
+            return result
+
+        loop = asyncio.new_event_loop()
+        try:
+            # the evaluation fails instead of waiting forever
+            self.assertEqual((None, None), loop.run_until_complete(evaluate()))
+        finally:
+            loop.close()
+
+    def test_failed_robot_on_remote_worker(self):
+        async def evaluate():
+            self.queue._add_worker(None, FakeConnection(0.05), 11345)
+            self.individual.failed_eval_attempt_count = 3
+            # like the EvaluationConfig of a distributed worker
+            conf = FakeConfig()
+            conf.experiment_management = None
+            first = await asyncio.wait_for(self.queue.test_robot(self.individual, conf), 1)
+            # the worker is still alive
+            second = await asyncio.wait_for(self.queue.test_robot(self.individual, conf), 1)
+            self.queue._workers[0].cancel()
+            return first, second
+
+        loop = asyncio.new_event_loop()
+        try:
+            first, second = loop.run_until_complete(evaluate())
+        finally:
+            loop.close()
+        self.assertEqual(1.0, second[0])
+
+    def test_failed_batch_retried_alone(self):
+        individuals = [develop_individual(random_initialization(PlasticodingConfig(), robot_id))
+                       for robot_id in range(1, 4)]
+        crashing = individuals[1].phenotype.id
+        insertions = []
+
+        class CrashingConnection(FakeConnection):
+            async def insert_robot(self, revolve_bot, pose, max_age):
+                insertions.append(revolve_bot.id)
+                if revolve_bot.id == crashing:
+                    raise ConnectionError('physics crash')
+                return await super().insert_robot(revolve_bot, pose, max_age)
+
+        async def restart(i):
+            pass
+
+        async def evaluate():
+            queue = SimulatorQueue(1, parser.parse_args([]), robots_per_simulator=3)
+            queue._replace_simulator = restart
+            queue._add_worker(None, CrashingConnection(0.05), 11345)
+            conf = FakeConfig()
+            conf.experiment_management = None
+            futures = [queue.test_robot(individual, conf) for individual in individuals]
+            results = await asyncio.wait_for(asyncio.gather(*futures), 5)
+            queue._workers[0].cancel()
+            return results
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(evaluate())
+        finally:
+            loop.close()
+        # only the robot crashing the simulator is failed, its batch-mates are evaluated alone
+        self.assertEqual([1.0, None, 1.0], [fitness for fitness, _ in results])
+        # the batch crashes before the insertion of the third robot, then the crashing robot fails 3 times alone
+        self.assertEqual([2, 4, 1], [insertions.count(individual.phenotype.id) for individual in individuals])